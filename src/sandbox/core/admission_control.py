@@ -0,0 +1,340 @@
+"""
+Adaptive admission control for execution tools.
+
+Per-connection rate limits cap how often each client may call a tool, but
+not how much work the server takes on. The AdmissionController sits in
+front of the execution tools and bounds the executions in flight with a
+limit that adapts to observed latency (AIMD: additive increase while
+latency holds steady, multiplicative decrease when it climbs or the host
+runs out of CPU or memory). Requests over the limit wait in a
+priority-ordered queue for a bounded time or are rejected. While the
+server is under pressure, admitted requests are marked degraded so tools
+can trim optional work.
+"""
+
+import functools
+import heapq
+import itertools
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Callable, Dict, List, Optional
+
+import psutil
+
+from .metrics_registry import MetricFamily
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """Tool priority; lower values are admitted first."""
+    CRITICAL = 0  # Never queued or rejected
+    HIGH = 1
+    NORMAL = 2
+    LOW = 3  # Rejected outright while the host is overloaded
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is not admitted."""
+
+    def __init__(self, tool: str, reason: str, retry_after: float):
+        super().__init__(f"{tool} rejected: {reason}")
+        self.tool = tool
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+@dataclass
+class AdmissionTicket:
+    """An admitted request, returned to the controller when it finishes."""
+    tool: str
+    priority: Priority
+    queue_wait: float = 0.0
+    degraded: bool = False
+    timed_out: bool = False  # Set by the tool; treated as an overload signal
+    admitted_at: float = field(default_factory=time.monotonic)
+
+
+class AdaptiveLimit:
+    """
+    AIMD concurrency limit driven by latency.
+
+    Each tool keeps a slow baseline and a fast recent average of its
+    latency. The limit grows by 1/limit per completion while it is in use,
+    and shrinks by the backoff factor (at most once per cooldown) when a
+    tool's recent latency exceeds tolerance times its baseline, or on
+    timeouts and host pressure.
+    """
+
+    def __init__(self, initial: int = 8, min_limit: int = 1, max_limit: int = 32,
+                 backoff: float = 0.75, tolerance: float = 2.0, cooldown: float = 1.0):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.tolerance = tolerance
+        self.cooldown = cooldown
+        self._latency: Dict[str, List[float]] = {}  # Tool -> [baseline, recent]
+        self._last_decrease = 0.0
+
+    @property
+    def value(self) -> int:
+        return max(self.min_limit, int(self.limit))
+
+    def on_complete(self, tool: str, latency: float, in_flight: int, overloaded: bool):
+        """Update the limit from one completed request."""
+        averages = self._latency.get(tool)
+        if averages is None:
+            averages = self._latency[tool] = [latency, latency]
+        baseline, recent = averages
+        recent += 0.3 * (latency - recent)
+        # The baseline follows slowly, so a sustained slowdown still stands out
+        baseline += 0.02 * (latency - baseline)
+        averages[0], averages[1] = baseline, recent
+
+        if overloaded or recent > baseline * self.tolerance:
+            self.decrease()
+        elif in_flight * 2 >= self.value:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def decrease(self):
+        now = time.monotonic()
+        if now - self._last_decrease >= self.cooldown:
+            self.limit = max(self.min_limit, self.limit * self.backoff)
+            self._last_decrease = now
+
+
+class _Waiter:
+    __slots__ = ("event", "granted", "cancelled")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.granted = False
+        self.cancelled = False
+
+
+class AdmissionController:
+    """Bounds in-flight executions with an adaptive limit and a priority queue."""
+
+    def __init__(self, limit: Optional[AdaptiveLimit] = None, max_queue: int = 32,
+                 max_queue_wait: float = 10.0, cpu_threshold: float = 90.0,
+                 memory_threshold: float = 90.0,
+                 tool_priorities: Optional[Dict[str, Priority]] = None):
+        """
+        Initialize the controller.
+
+        Args:
+            limit: Concurrency limit (default: AdaptiveLimit())
+            max_queue: Requests allowed to wait for a slot
+            max_queue_wait: Seconds a request waits before it is rejected
+            cpu_threshold: Host CPU percent treated as overload
+            memory_threshold: Host memory percent treated as overload
+            tool_priorities: Priority per tool name (default: NORMAL)
+        """
+        self.limit = limit or AdaptiveLimit()
+        self.max_queue = max_queue
+        self.max_queue_wait = max_queue_wait
+        self.cpu_threshold = cpu_threshold
+        self.memory_threshold = memory_threshold
+        self.tool_priorities = dict(tool_priorities or {})
+
+        self.in_flight = 0
+        self._queue: List[tuple] = []  # (priority, sequence, waiter)
+        self._queued = 0
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        self._host_sample = (0.0, False)  # (monotonic time, overloaded)
+        self._average_latency = 0.0
+        self.stats = {'admitted': 0, 'queued': 0, 'rejected': 0, 'degraded': 0,
+                      'queue_wait_seconds': 0.0}
+
+    def admit(self, tool: str, priority: Optional[Priority] = None) -> AdmissionTicket:
+        """
+        Admit a request, waiting in the queue if the limit is reached.
+
+        Raises:
+            AdmissionRejected: If the queue is full, the wait times out, or a
+                low-priority request arrives while the host is overloaded
+        """
+        if priority is None:
+            priority = self.tool_priorities.get(tool, Priority.NORMAL)
+        overloaded = self.host_overloaded()
+
+        with self._lock:
+            if priority == Priority.CRITICAL:
+                return self._grant(tool, priority, 0.0, overloaded)
+            if priority >= Priority.LOW and overloaded:
+                self._reject_locked()
+                raise AdmissionRejected(tool, "host overloaded", self._retry_after())
+            if self.in_flight < self.limit.value and not self._queued:
+                return self._grant(tool, priority, 0.0, overloaded)
+
+            if self._queued >= self.max_queue:
+                self._reject_locked()
+                raise AdmissionRejected(tool, "queue full", self._retry_after())
+
+            waiter = _Waiter()
+            heapq.heappush(self._queue, (int(priority), next(self._sequence), waiter))
+            self._queued += 1
+            self.stats['queued'] += 1
+
+        started = time.monotonic()
+        waiter.event.wait(self.max_queue_wait)
+        waited = time.monotonic() - started
+
+        with self._lock:
+            if not waiter.granted:
+                waiter.cancelled = True
+                self._queued -= 1
+                self._reject_locked()
+                raise AdmissionRejected(tool, f"no slot within {self.max_queue_wait:g}s", self._retry_after())
+            self.stats['queue_wait_seconds'] += waited
+            # The slot was handed over by release(); in_flight already counts it
+            ticket = AdmissionTicket(tool, priority, queue_wait=waited, degraded=True)
+            self.stats['admitted'] += 1
+            self.stats['degraded'] += 1
+        self._local.ticket = ticket
+        return ticket
+
+    def release(self, ticket: AdmissionTicket):
+        """Return a ticket's slot and feed its latency to the limit."""
+        latency = time.monotonic() - ticket.admitted_at
+        overloaded = ticket.timed_out or self.host_overloaded()
+
+        with self._lock:
+            self._average_latency += 0.1 * (latency - self._average_latency)
+            self.limit.on_complete(ticket.tool, latency, self.in_flight, overloaded)
+            self.in_flight -= 1
+            self._dispatch_locked()
+
+        if getattr(self._local, 'ticket', None) is ticket:
+            self._local.ticket = None
+
+    @contextmanager
+    def guard(self, tool: str, priority: Optional[Priority] = None):
+        """Admit a request for the duration of a with block."""
+        ticket = self.admit(tool, priority)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    def controlled(self, tool: str, priority: Optional[Priority] = None,
+                   on_reject: Optional[Callable[[AdmissionRejected], Any]] = None):
+        """
+        Decorator running a tool function under admission control.
+
+        Rejections are passed to on_reject, whose return value becomes the
+        tool's result (default: a JSON error payload).
+        """
+        on_reject = on_reject or rejection_response
+
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                try:
+                    ticket = self.admit(tool, priority)
+                except AdmissionRejected as e:
+                    return on_reject(e)
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.release(ticket)
+            return wrapper
+        return decorator
+
+    def current_ticket(self) -> Optional[AdmissionTicket]:
+        """Ticket of the request running on this thread, if any."""
+        return getattr(self._local, 'ticket', None)
+
+    def host_overloaded(self) -> bool:
+        """Whether host CPU or memory is past its threshold, sampled at most once a second."""
+        sampled_at, overloaded = self._host_sample
+        now = time.monotonic()
+        if now - sampled_at >= 1.0:
+            try:
+                overloaded = (psutil.cpu_percent(interval=None) >= self.cpu_threshold or
+                              psutil.virtual_memory().percent >= self.memory_threshold)
+            except Exception as e:
+                logger.debug(f"Host load sample failed: {e}")
+                overloaded = False
+            self._host_sample = (now, overloaded)
+        return overloaded
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats,
+                'in_flight': self.in_flight,
+                'queue_depth': self._queued,
+                'limit': self.limit.value,
+                'host_overloaded': self._host_sample[1],
+                'average_latency_seconds': self._average_latency
+            }
+
+    def collect_metrics(self) -> List[MetricFamily]:
+        """Metric families for the metrics registry."""
+        stats = self.get_stats()
+        decisions = MetricFamily("sandbox_admission_decisions", "counter",
+                                 "Admission decisions for execution requests", ["decision"])
+        for decision in ('admitted', 'queued', 'rejected', 'degraded'):
+            decisions.add(stats[decision], decision)
+        return [
+            decisions,
+            MetricFamily("sandbox_admission_in_flight", "gauge", "Executions in flight")
+                .add(stats['in_flight']),
+            MetricFamily("sandbox_admission_queue_depth", "gauge", "Requests waiting for admission")
+                .add(stats['queue_depth']),
+            MetricFamily("sandbox_admission_limit", "gauge", "Current adaptive concurrency limit")
+                .add(stats['limit']),
+            MetricFamily("sandbox_admission_queue_wait_seconds", "counter",
+                         "Total time admitted requests spent queued", unit="seconds")
+                .add(stats['queue_wait_seconds'])
+        ]
+
+    def _grant(self, tool: str, priority: Priority, waited: float, overloaded: bool) -> AdmissionTicket:
+        self.in_flight += 1
+        degraded = overloaded or self.in_flight > self.limit.value
+        ticket = AdmissionTicket(tool, priority, queue_wait=waited, degraded=degraded)
+        self.stats['admitted'] += 1
+        if degraded:
+            self.stats['degraded'] += 1
+        self._local.ticket = ticket
+        return ticket
+
+    def _dispatch_locked(self):
+        """Hand free slots to the highest-priority live waiters."""
+        while self._queue and self.in_flight < self.limit.value:
+            _, _, waiter = heapq.heappop(self._queue)
+            if waiter.cancelled:
+                continue
+            waiter.granted = True
+            self._queued -= 1
+            self.in_flight += 1
+            waiter.event.set()
+
+    def _reject_locked(self):
+        self.stats['rejected'] += 1
+        if self.in_flight >= self.limit.value:
+            self.limit.decrease()
+
+    def _retry_after(self) -> float:
+        """Rough wait until a slot frees up: queued work over the current limit."""
+        return round(max(1.0, self._average_latency * (self._queued + 1) / self.limit.value), 1)
+
+
+def rejection_response(error: AdmissionRejected) -> str:
+    """JSON payload returned by tools whose request was not admitted."""
+    return json.dumps({
+        'success': False,
+        'error': f"Server overloaded ({error.reason}). Retry after {error.retry_after:.1f} seconds.",
+        'error_type': 'Overloaded',
+        'retry_after': error.retry_after
+    }, indent=2)
@@ -0,0 +1,452 @@
+"""
+Out-of-band transfer channel for artifact content.
+
+MCP tool results are JSON, so binary artifacts sent inline have to be
+hex or base64 encoded and held in memory in full. Instead, the server can
+issue a short-lived handle for an artifact and the client fetches the raw
+bytes from a small HTTP server bound to loopback or to a Unix socket.
+Responses are streamed from the file with sendfile() and honour single
+byte ranges, so large videos and datasets can be downloaded or resumed in
+pieces without passing through the JSON-RPC channel.
+
+Handle URLs look like http://127.0.0.1:<port>/artifacts/<token>, or
+http+unix://<quoted socket path>/artifacts/<token> for a Unix socket.
+"""
+
+import http.client
+import logging
+import os
+import secrets
+import shutil
+import socket
+import socketserver
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple, Union
+from urllib.parse import quote, unquote, urlsplit
+
+from .metrics_registry import MetricFamily
+
+logger = logging.getLogger(__name__)
+
+_PATH_PREFIX = "/artifacts/"
+
+
+class RangeNotSatisfiable(ValueError):
+    """Raised when a Range header cannot be served for a file of a given size."""
+
+
+@dataclass
+class TransferHandle:
+    """A short-lived capability to download one file."""
+    token: str
+    path: Path
+    name: str
+    size: int
+    mime_type: str
+    expires_at: float  # Epoch seconds
+    url: str
+    sha256: Optional[str] = None
+
+    @property
+    def expired(self) -> bool:
+        return time.time() >= self.expires_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'token': self.token,
+            'url': self.url,
+            'name': self.name,
+            'size': self.size,
+            'mime_type': self.mime_type,
+            'sha256': self.sha256,
+            'expires_at': self.expires_at,
+            'accept_ranges': 'bytes'
+        }
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a Range header into an inclusive (start, end) byte range.
+
+    Only single ranges are served; a missing, non-byte or multi-range header
+    returns None and the whole file is sent.
+
+    Raises:
+        RangeNotSatisfiable: If the range lies outside the file or is malformed
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, _, last = header[len("bytes="):].strip().partition("-")
+    try:
+        if not first:
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length <= 0 or size == 0:
+                raise RangeNotSatisfiable(header)
+            return max(0, size - length), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        raise RangeNotSatisfiable(header) from None
+    if start < 0 or start >= size or end < start:
+        raise RangeNotSatisfiable(header)
+    return start, min(end, size - 1)
+
+
+class _TransferRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "SandboxArtifactTransfer/1.0"
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def log_message(self, format, *args):
+        logger.debug("artifact transfer: " + format, *args)
+
+    def _serve(self, send_body: bool):
+        service: ArtifactTransferService = self.server.service
+        token = self.path.split("?", 1)[0]
+        handle = service.resolve(token[len(_PATH_PREFIX):]) if token.startswith(_PATH_PREFIX) else None
+        if handle is None:
+            self._send_error(404, "Unknown or expired transfer handle")
+            return
+
+        try:
+            f = open(handle.path, 'rb')
+        except OSError:
+            self._send_error(410, "Artifact is no longer available")
+            return
+
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            try:
+                byte_range = parse_range(self.headers.get("Range"), size)
+            except RangeNotSatisfiable:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+            start, end = byte_range if byte_range else (0, size - 1)
+            length = end - start + 1 if size else 0
+            self.send_response(206 if byte_range else 200)
+            self.send_header("Content-Type", handle.mime_type)
+            self.send_header("Content-Length", str(length))
+            self.send_header("Accept-Ranges", "bytes")
+            self.send_header("Content-Disposition", f"attachment; filename*=UTF-8''{quote(handle.name)}")
+            if byte_range:
+                self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+            if handle.sha256:
+                self.send_header("X-Content-SHA256", handle.sha256)
+            self.end_headers()
+
+            if send_body and length:
+                try:
+                    sent = self.connection.sendfile(f, start, length)
+                except (BrokenPipeError, ConnectionResetError):
+                    # Client went away mid-transfer; it can resume with a range
+                    self.close_connection = True
+                    return
+                service.record_transfer(sent, partial=bool(byte_range))
+
+    def _send_error(self, status: int, message: str):
+        body = message.encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+
+class _TCPTransferServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+class _UnixTransferServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self):
+        request, _ = super().get_request()
+        # BaseHTTPRequestHandler logs client_address[0]
+        return request, ("unix", 0)
+
+
+class ArtifactTransferService:
+    """
+    Issues transfer handles and serves them over a local HTTP endpoint.
+
+    The endpoint starts on the first issued handle and listens on loopback
+    (an ephemeral port by default) or on a Unix socket readable only by the
+    server's user. Handles are random tokens that expire after ttl seconds.
+
+    Usage:
+        service = ArtifactTransferService()
+        handle = service.issue(artifact.storage_path, name=artifact.metadata.name)
+        data = fetch_artifact(handle.url)
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 unix_socket: Optional[str] = None, ttl: float = 300.0,
+                 max_ttl: Optional[float] = 3600.0, max_handles: int = 1024):
+        """
+        Initialize the service.
+
+        Args:
+            host: Interface for the HTTP endpoint; keep this on loopback
+            port: TCP port (0 picks a free one)
+            unix_socket: Serve on this Unix socket path instead of TCP
+            ttl: Default handle lifetime in seconds
+            max_ttl: Longest lifetime issue() grants, whatever is requested
+                (None for no limit)
+            max_handles: Live handles kept; the oldest are dropped beyond this
+        """
+        self.host = host
+        self.port = port
+        self.unix_socket = unix_socket
+        self.ttl = ttl
+        self.max_ttl = max_ttl
+        self.max_handles = max_handles
+
+        self._handles: Dict[str, TransferHandle] = {}
+        self._lock = threading.Lock()
+        self._server: Optional[socketserver.BaseServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._base_url: Optional[str] = None
+        self.stats = {'handles_issued': 0, 'transfers': 0, 'partial_transfers': 0,
+                      'bytes_sent': 0}
+
+    @property
+    def running(self) -> bool:
+        return self._server is not None
+
+    def start(self) -> str:
+        """Start the endpoint if needed; returns its base URL."""
+        with self._lock:
+            if self._server is None:
+                self._server = self._bind()
+                self._server.service = self
+                self._thread = threading.Thread(target=self._server.serve_forever, daemon=True,
+                                                name="ArtifactTransferServer")
+                self._thread.start()
+                logger.info(f"Artifact transfer endpoint listening on {self._base_url}")
+            return self._base_url
+
+    def stop(self):
+        """Stop the endpoint and revoke every handle."""
+        with self._lock:
+            server, self._server = self._server, None
+            self._handles.clear()
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+            if self.unix_socket:
+                try:
+                    os.unlink(self.unix_socket)
+                except OSError:
+                    pass
+
+    def issue(self, path: Union[str, Path], name: Optional[str] = None,
+              mime_type: str = "application/octet-stream", ttl: Optional[float] = None,
+              sha256: Optional[str] = None) -> TransferHandle:
+        """
+        Issue a handle for a file.
+
+        Args:
+            path: File to serve
+            name: Download file name (default: the file's name)
+            mime_type: Content-Type sent with the bytes
+            ttl: Lifetime in seconds (default: the service's ttl), at most max_ttl
+            sha256: Content hash to pass along, if known
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+            ValueError: If ttl is not positive
+        """
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            raise ValueError(f"Transfer handle ttl must be positive: {ttl}")
+        if self.max_ttl is not None:
+            ttl = min(ttl, self.max_ttl)
+        path = Path(path)
+        size = path.stat().st_size
+        base_url = self.start()
+        token = secrets.token_urlsafe(24)
+        handle = TransferHandle(
+            token=token,
+            path=path,
+            name=name or path.name,
+            size=size,
+            mime_type=mime_type,
+            expires_at=time.time() + ttl,
+            url=f"{base_url}{_PATH_PREFIX}{token}",
+            sha256=sha256
+        )
+        with self._lock:
+            self._sweep_locked()
+            self._handles[token] = handle
+            while len(self._handles) > self.max_handles:
+                del self._handles[next(iter(self._handles))]
+            self.stats['handles_issued'] += 1
+        return handle
+
+    def resolve(self, token: str) -> Optional[TransferHandle]:
+        """The live handle for a token, or None if unknown or expired."""
+        with self._lock:
+            handle = self._handles.get(token)
+            if handle is not None and handle.expired:
+                del self._handles[token]
+                return None
+            return handle
+
+    def revoke(self, token: str) -> bool:
+        with self._lock:
+            return self._handles.pop(token, None) is not None
+
+    def record_transfer(self, sent: int, partial: bool = False):
+        with self._lock:
+            self.stats['transfers'] += 1
+            self.stats['bytes_sent'] += sent
+            if partial:
+                self.stats['partial_transfers'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._sweep_locked()
+            return {**self.stats, 'active_handles': len(self._handles),
+                    'endpoint': self._base_url if self._server is not None else None}
+
+    def collect_metrics(self) -> List[MetricFamily]:
+        """Metric families for the metrics registry."""
+        stats = self.get_stats()
+        return [
+            MetricFamily("sandbox_artifact_transfer_handles", "counter", "Artifact transfer handles issued")
+                .add(stats['handles_issued']),
+            MetricFamily("sandbox_artifact_transfer_active_handles", "gauge", "Unexpired transfer handles")
+                .add(stats['active_handles']),
+            MetricFamily("sandbox_artifact_transfers", "counter", "Artifact downloads served, by kind",
+                         ["kind"])
+                .add(stats['transfers'] - stats['partial_transfers'], "full")
+                .add(stats['partial_transfers'], "range"),
+            MetricFamily("sandbox_artifact_transfer_bytes", "counter",
+                         "Artifact bytes sent over the transfer channel", unit="bytes")
+                .add(stats['bytes_sent'])
+        ]
+
+    def _bind(self) -> socketserver.BaseServer:
+        if self.unix_socket:
+            try:
+                os.unlink(self.unix_socket)
+            except FileNotFoundError:
+                pass
+            parent = Path(self.unix_socket).parent
+            parent.mkdir(parents=True, exist_ok=True)
+            # The socket is the only access control here. Bind it inside a private
+            # 0700 directory, restrict it, then move it into place, so it is never
+            # reachable with looser permissions (the process umask is left alone;
+            # names are kept short for the ~108 byte socket path limit)
+            private_dir = tempfile.mkdtemp(prefix=".t", dir=str(parent))
+            try:
+                staging_path = os.path.join(private_dir, "s")
+                server = _UnixTransferServer(staging_path, _TransferRequestHandler)
+                try:
+                    os.chmod(staging_path, 0o600)
+                    os.replace(staging_path, self.unix_socket)
+                except OSError:
+                    server.server_close()
+                    raise
+            finally:
+                shutil.rmtree(private_dir, ignore_errors=True)
+            self._base_url = f"http+unix://{quote(self.unix_socket, safe='')}"
+        else:
+            server = _TCPTransferServer((self.host, self.port), _TransferRequestHandler)
+            host, port = server.server_address[:2]
+            self._base_url = f"http://{host}:{port}"
+        return server
+
+    def _sweep_locked(self):
+        now = time.time()
+        for token in [t for t, h in self._handles.items() if h.expires_at <= now]:
+            del self._handles[token]
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path: str, timeout: Optional[float] = None):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self.sock = sock
+
+
+def fetch_artifact(url: str, destination: Union[str, Path, BinaryIO, None] = None,
+                   byte_range: Optional[Tuple[int, Optional[int]]] = None,
+                   timeout: float = 30.0, chunk_size: int = 1024 * 1024) -> Union[bytes, int]:
+    """
+    Download a transfer handle's bytes.
+
+    Args:
+        url: Handle URL (http:// or http+unix://)
+        destination: File path or binary file object to stream into; the
+            content is returned as bytes when omitted
+        byte_range: Inclusive (start, end) to fetch, with end None for the
+            rest of the file
+        timeout: Socket timeout in seconds
+        chunk_size: Bytes read per chunk when streaming
+
+    Returns:
+        The content, or the number of bytes written to destination
+
+    Raises:
+        OSError: If the handle is unknown, expired or the range is invalid
+    """
+    parts = urlsplit(url)
+    if parts.scheme == "http+unix":
+        conn = _UnixHTTPConnection(unquote(parts.netloc), timeout=timeout)
+    elif parts.scheme == "http":
+        conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=timeout)
+    else:
+        raise ValueError(f"Unsupported transfer URL: {url}")
+
+    headers = {}
+    if byte_range is not None:
+        start, end = byte_range
+        headers["Range"] = f"bytes={start}-{'' if end is None else end}"
+
+    try:
+        conn.request("GET", parts.path, headers=headers)
+        response = conn.getresponse()
+        if response.status not in (200, 206):
+            raise OSError(f"Artifact transfer failed: HTTP {response.status} "
+                          f"{response.read().decode('utf-8', 'replace')}")
+        if destination is None:
+            return response.read()
+
+        if isinstance(destination, (str, Path)):
+            with open(destination, 'wb') as out:
+                return _copy_response(response, out, chunk_size)
+        return _copy_response(response, destination, chunk_size)
+    finally:
+        conn.close()
+
+
+def _copy_response(response: http.client.HTTPResponse, out: BinaryIO, chunk_size: int) -> int:
+    written = 0
+    while True:
+        chunk = response.read(chunk_size)
+        if not chunk:
+            return written
+        out.write(chunk)
+        written += len(chunk)
@@ -5,7 +5,7 @@ Connection manager for MCP/WebSocket connections with enhanced error recovery an
 import time
 import threading
 import logging
-from collections import defaultdict, deque
+from collections import defaultdict
 from typing import Dict, Set, Optional, Tuple, Any, List
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
@@ -13,6 +13,8 @@ from enum import Enum
 import asyncio
 
 from .types import SecurityLevel
+from .metrics_registry import MetricFamily
+from .rate_limiter import RateLimit, RateLimiter, create_rate_limiter
 
 logger = logging.getLogger(__name__)
 
@@ -161,41 +163,6 @@ class RetryMechanism:
         raise last_exception
 
 
-class SlidingWindowRateLimiter:
-    """Sliding window rate limiter for tool executions."""
-
-    def __init__(self, max_requests: int, window_seconds: int, burst_limit: int = 5):
-        self.max_requests = max_requests
-        self.window_seconds = window_seconds
-        self.burst_limit = burst_limit
-        self.requests: Dict[str, deque] = defaultdict(deque)
-
-    def is_allowed(self, connection_id: str) -> Tuple[bool, float]:
-        """
-        Check if a request is allowed for the given connection.
-
-        Returns:
-            Tuple of (allowed: bool, retry_after: float)
-        """
-        now = time.time()
-        request_times = self.requests[connection_id]
-
-        # Remove old requests outside the window
-        while request_times and request_times[0] < now - self.window_seconds:
-            request_times.popleft()
-
-        # Check if under the limit
-        if len(request_times) < self.max_requests:
-            request_times.append(now)
-            return True, 0.0
-
-        # Calculate retry time
-        oldest_request = request_times[0]
-        retry_after = (oldest_request + self.window_seconds) - now
-
-        return False, max(0.0, retry_after)
-
-
 class ConnectionManager:
     """
     Enhanced connection manager for MCP/WebSocket connections with comprehensive error recovery.
@@ -213,7 +180,9 @@ class ConnectionManager:
         self.connections_by_ip: Dict[str, Set[str]] = defaultdict(set)
 
         # Rate limiting
-        self.rate_limiter = None
+        self.rate_limiter: Optional[RateLimiter] = None
+        self.connection_rate_limits: List[RateLimit] = []
+        self.tool_rate_limits: Dict[str, RateLimit] = {}
 
         # Error recovery components
         self.circuit_breaker = CircuitBreaker()
@@ -239,9 +208,19 @@ class ConnectionManager:
         logger.info(f"ConnectionManager initialized with max_connections={max_connections}, "
                    f"max_per_ip={max_per_ip}, timeout={connection_timeout}s")
 
-    def set_rate_limiter(self, rate_limiter: SlidingWindowRateLimiter):
-        """Set the rate limiter for tool executions."""
+    def set_rate_limiter(self, rate_limiter: RateLimiter, connection_limits: List[RateLimit],
+                         tool_limits: Optional[Dict[str, RateLimit]] = None):
+        """
+        Set the rate limiter for tool executions.
+
+        Args:
+            rate_limiter: Limiter holding the per-key state
+            connection_limits: Limits applied to every connection
+            tool_limits: Additional per-connection limits for specific tools
+        """
         self.rate_limiter = rate_limiter
+        self.connection_rate_limits = list(connection_limits)
+        self.tool_rate_limits = dict(tool_limits or {})
 
     def _record_error(self, connection_id: str, error_type: ErrorCategory,
                       message: str, recoverable: bool = True):
@@ -416,7 +395,7 @@ class ConnectionManager:
             self.active_connections[connection_id].last_activity = datetime.now()
             return True
 
-    def check_rate_limit(self, connection_id: str) -> Tuple[bool, float]:
+    def check_rate_limit(self, connection_id: str, tool: Optional[str] = None) -> Tuple[bool, float]:
         """
         Check if a tool execution is allowed for the connection.
 
@@ -430,7 +409,11 @@ class ConnectionManager:
             if connection_id not in self.active_connections:
                 return False, 0.0  # Connection doesn't exist
 
-            return self.rate_limiter.is_allowed(connection_id)
+        checks = [(f"connection:{connection_id}:{limit.period:g}s", limit)
+                  for limit in self.connection_rate_limits]
+        if tool in self.tool_rate_limits:
+            checks.append((f"tool:{tool}:{connection_id}", self.tool_rate_limits[tool]))
+        return self.rate_limiter.acquire(checks)
 
     def attempt_reconnection(self, connection_id: str, client_ip: str,
                            user_agent: Optional[str] = None,
@@ -557,6 +540,40 @@ class ConnectionManager:
                 'circuit_breaker_state': self.circuit_breaker.state
             }
 
+    def collect_metrics(self) -> List[MetricFamily]:
+        """Metric families for the metrics registry."""
+        with self.lock:
+            state_counts = {state.value: 0 for state in ConnectionState}
+            for conn in self.active_connections.values():
+                state_counts[conn.state.value] += 1
+
+            active = MetricFamily("sandbox_connections", "gauge", "Tracked connections by state", ["state"])
+            for state, count in state_counts.items():
+                active.add(count, state)
+
+            errors = MetricFamily("sandbox_connection_errors", "counter", "Connection errors by category",
+                                  ["category"])
+            for category in ErrorCategory:
+                errors.add(self.connection_metrics['errors_by_category'].get(category.value, 0),
+                           category.value)
+
+            return [
+                active,
+                MetricFamily("sandbox_connections_limit", "gauge", "Maximum concurrent connections")
+                    .add(self.max_connections),
+                MetricFamily("sandbox_connection_pool_utilization", "gauge",
+                             "Active connections over the connection limit")
+                    .add(len(self.active_connections) / self.max_connections if self.max_connections else 0),
+                MetricFamily("sandbox_connections_opened", "counter", "Connections established")
+                    .add(self.connection_metrics['total_connections_created']),
+                MetricFamily("sandbox_connections_closed", "counter", "Connections closed")
+                    .add(self.connection_metrics['total_connections_closed']),
+                errors,
+                MetricFamily("sandbox_circuit_breaker_open", "gauge",
+                             "1 while the connection circuit breaker is open")
+                    .add(1 if self.circuit_breaker.state == "OPEN" else 0)
+            ] + (self.rate_limiter.collect_metrics() if self.rate_limiter else [])
+
     def _cleanup_loop(self):
         """Enhanced background thread to clean up expired connections and perform health checks."""
         consecutive_errors = 0
@@ -677,11 +694,17 @@ def initialize_connection_manager(config):
 
     # Set up rate limiter if enabled
     if config.enable_rate_limiting:
-        rate_limiter = SlidingWindowRateLimiter(
-            max_requests=rate_limits.max_requests_per_minute,
-            window_seconds=rate_limits.rate_limit_window_seconds,
-            burst_limit=rate_limits.burst_limit
-        )
-        _connection_manager.set_rate_limiter(rate_limiter)
+        connection_limits = [
+            RateLimit(rate_limits.max_requests_per_minute, period=rate_limits.rate_limit_window_seconds,
+                      burst=rate_limits.burst_limit),
+            RateLimit(rate_limits.max_requests_per_hour, period=3600)
+        ]
+        tool_limits = {
+            tool: RateLimit(per_minute, period=60,
+                            burst=min(per_minute, rate_limits.burst_limit) if rate_limits.burst_limit else None)
+            for tool, per_minute in rate_limits.tool_requests_per_minute.items()
+        }
+        _connection_manager.set_rate_limiter(create_rate_limiter(rate_limits.shared_state_path),
+                                             connection_limits, tool_limits)
 
     return _connection_manager
\ No newline at end of file
@@ -13,6 +13,8 @@ import subprocess
 import threading
 import traceback
 import tempfile
+import uuid
+from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, Optional, List, Callable, Union
 from dataclasses import dataclass, field
@@ -25,6 +27,8 @@ import json
 from .execution_context import PersistentExecutionContext
 from .manim_support import ManIMHelper
 from .types import ExecutionContext, ExecutionResult, ResourceLimits, ExecutionRecord
+from .metrics_registry import MetricFamily
+from .profiler import ProfileResult, SamplingProfiler
 
 # Import logging and error handling
 from .logging_system import (
@@ -93,9 +97,18 @@ class ExecutionEngine:
     with proper timeout handling, context management, and environment isolation.
     """
     
-    def __init__(self, security_manager=None, structured_logger=None, error_handler=None, performance_monitor=None):
-        """Initialize the execution engine."""
+    def __init__(self, security_manager=None, structured_logger=None, error_handler=None, performance_monitor=None,
+                 artifact_manager=None, profile_interval: float = 0.01):
+        """
+        Initialize the execution engine.
+        
+        Args:
+            artifact_manager: Receives profiles of profiled executions as flamegraph artifacts
+            profile_interval: Seconds between stack samples when profiling
+        """
         self.security_manager = security_manager
+        self.artifact_manager = artifact_manager
+        self.profile_interval = profile_interval
         self.execution_history: List[ExecutionRecord] = []
         self.active_contexts: Dict[str, PersistentExecutionContext] = {}
         self.manim_helpers: Dict[str, ManIMHelper] = {}
@@ -146,13 +159,16 @@ class ExecutionEngine:
     
     @with_error_handling(ErrorCategory.EXECUTION, "execution_engine")
     @with_performance_monitoring("execution_engine", "execute_python")
-    def execute_python(self, code: str, context: ExecutionContext) -> ExecutionResult:
+    def execute_python(self, code: str, context: ExecutionContext,
+                       profile: Optional[bool] = None) -> ExecutionResult:
         """
         Execute Python code with timeout handling and context management.
         
         Args:
             code: Python code to execute
             context: Execution context with configuration
+            profile: Sample the execution's stack and attach a flamegraph
+                profile (default: context.profiling)
             
         Returns:
             ExecutionResult with execution details
@@ -184,6 +200,10 @@ class ExecutionEngine:
             
             # Execute with timeout and proper working directory
             with TimeoutHandler(context.resource_limits.max_execution_time):
+                profiler = None
+                if context.profiling if profile is None else profile:
+                    profiler = SamplingProfiler(interval=self.profile_interval)
+                    profiler.start()
                 try:
                     # Change to workspace directory if available
                     workspace_path = context.environment_vars.get('WORKSPACE_PATH')
@@ -202,6 +222,8 @@ class ExecutionEngine:
                             cache_key=f"{context.workspace_id}_{hash(code)}",
                             validate=False  # Already validated above
                         )
+                    if profiler:
+                        profiler.stop()
                     
                     # Convert to ExecutionResult
                     execution_time = time.time() - start_time
@@ -213,6 +235,10 @@ class ExecutionEngine:
                         execution_time=execution_time,
                         artifacts=result_dict.get('artifacts', [])
                     )
+                    if profiler:
+                        result.metadata['profile'] = self._publish_profile(
+                            profiler.result, execution_id, context
+                        )
                     
                     # Update statistics
                     self.total_executions += 1
@@ -248,6 +274,9 @@ class ExecutionEngine:
                 except KeyboardInterrupt:
                     # Handle timeout interruption
                     raise ExecutionTimeoutError(f"Execution timed out after {context.resource_limits.max_execution_time} seconds")
+                finally:
+                    if profiler and profiler.result is None:
+                        profiler.stop()
                     
         except ExecutionTimeoutError as e:
             execution_time = time.time() - start_time
@@ -260,6 +289,9 @@ class ExecutionEngine:
                 error_type="TimeoutError",
                 execution_time=execution_time
             )
+            # A profile is most useful for the runs that time out
+            if profiler and profiler.result is not None:
+                result.metadata['profile'] = self._publish_profile(profiler.result, execution_id, context)
             
             logger.warning(f"Python execution timed out (ID: {execution_id})")
             return result
@@ -625,6 +657,57 @@ class ExecutionEngine:
             }
         }
     
+    def _publish_profile(self, profile: ProfileResult, execution_id: str,
+                         context: ExecutionContext) -> Dict[str, Any]:
+        """
+        Store a profile as a collapsed-stack artifact and summarize it.
+        
+        Without an artifact manager, the collapsed stacks are returned inline.
+        """
+        summary = profile.summary()
+        collapsed = profile.to_collapsed()
+        if self.artifact_manager is None:
+            summary['collapsed'] = collapsed
+            return summary
+        
+        try:
+            from .artifact_manager import ArtifactMetadata
+            now = datetime.now()
+            metadata = ArtifactMetadata(
+                artifact_id=str(uuid.uuid4()),
+                name=f"profile_{execution_id}.folded",
+                original_path="",
+                size=len(collapsed),
+                created=now,
+                modified=now,
+                content_type=".folded",
+                mime_type="text/plain",
+                hash_sha256="",  # Calculated during storage
+                category="profile",
+                tags=["profile", "flamegraph"],
+                workspace_id=context.workspace_id,
+                user_id=context.user_id,
+                description=f"Collapsed stacks sampled every {profile.interval * 1000:g}ms; "
+                            f"render with flamegraph.pl, inferno or speedscope"
+            )
+            summary['artifact_id'] = self.artifact_manager.store_artifact(collapsed.encode('utf-8'), metadata)
+        except Exception as e:
+            logger.error(f"Failed to store profile for {execution_id}: {e}")
+            summary['collapsed'] = collapsed
+        return summary
+    
+    def collect_metrics(self) -> List[MetricFamily]:
+        """Metric families for the metrics registry."""
+        return [
+            MetricFamily("sandbox_executions", "counter", "Code executions", ["outcome"])
+                .add(self.successful_executions, "success")
+                .add(self.failed_executions, "failure"),
+            MetricFamily("sandbox_execution_contexts_active", "gauge", "Active execution contexts")
+                .add(len(self.active_contexts)),
+            MetricFamily("sandbox_execution_history_size", "gauge", "Executions kept in history")
+                .add(len(self.execution_history))
+        ]
+    
     def cleanup_context(self, context_id: str) -> bool:
         """
         Clean up resources for a specific context.
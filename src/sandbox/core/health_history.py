@@ -0,0 +1,197 @@
+"""
+Fixed-size columnar time series store for health history.
+
+Samples are kept in NumPy ring buffers, one float64 array per metric plus an
+epoch-seconds timestamp column, at three resolutions. Every sample is kept at
+1-second resolution for the most recent window. Older data survives as
+1-minute and 1-hour aggregates, built as samples arrive. Memory use is
+fixed by the tier capacities. Range queries binary search the timestamp
+column instead of scanning stored reports.
+"""
+
+import math
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# (resolution seconds, capacity) per tier, finest first
+DEFAULT_TIERS = ((1, 3600), (60, 1440), (3600, 720))
+
+
+class _Tier:
+    """Ring buffer of rows at one resolution."""
+
+    def __init__(self, resolution: int, capacity: int, columns: Sequence[str]):
+        self.resolution = resolution
+        self.capacity = capacity
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.columns = {name: np.full(capacity, np.nan) for name in columns}
+        self.head = 0  # Next slot to write
+        self.size = 0
+
+    def append(self, timestamp: float, row: np.ndarray, names: Sequence[str]):
+        # Samples landing in the same bucket as the newest row replace it
+        last = (self.head - 1) % self.capacity
+        if self.size and self.timestamps[last] == timestamp:
+            slot = last
+        else:
+            slot = self.head
+            self.head = (self.head + 1) % self.capacity
+            self.size = min(self.size + 1, self.capacity)
+
+        self.timestamps[slot] = timestamp
+        for index, name in enumerate(names):
+            self.columns[name][slot] = row[index]
+
+    def oldest(self) -> Optional[float]:
+        if not self.size:
+            return None
+        return float(self.timestamps[(self.head - self.size) % self.capacity])
+
+    def slots_between(self, start: float, end: float) -> np.ndarray:
+        """Slot indices, oldest first, of rows with start <= timestamp < end."""
+        if not self.size:
+            return np.empty(0, dtype=np.int64)
+        first = (self.head - self.size) % self.capacity
+        # The live rows are at most two sorted runs: [first, capacity) and [0, head)
+        if first + self.size <= self.capacity:
+            runs = [(first, first + self.size)]
+        else:
+            runs = [(first, self.capacity), (0, self.head)]
+
+        slots = []
+        for run_start, run_end in runs:
+            segment = self.timestamps[run_start:run_end]
+            lo = np.searchsorted(segment, start, side="left")
+            hi = np.searchsorted(segment, end, side="left")
+            if hi > lo:
+                slots.append(np.arange(run_start + lo, run_start + hi))
+        return np.concatenate(slots) if slots else np.empty(0, dtype=np.int64)
+
+
+class _Accumulator:
+    """Running aggregate of the samples in one bucket of a coarser tier."""
+
+    def __init__(self, width: int):
+        self.bucket: Optional[float] = None
+        self.sums = np.zeros(width)
+        self.counts = np.zeros(width)
+        self.maxima = np.full(width, np.nan)
+
+    def reset(self, bucket: float):
+        self.bucket = bucket
+        self.sums[:] = 0
+        self.counts[:] = 0
+        self.maxima[:] = np.nan
+
+    def add(self, row: np.ndarray):
+        present = ~np.isnan(row)
+        self.sums[present] += row[present]
+        self.counts[present] += 1
+        self.maxima = np.fmax(self.maxima, row)
+
+    def result(self, max_mask: np.ndarray) -> np.ndarray:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = np.where(self.counts > 0, self.sums / np.maximum(self.counts, 1), np.nan)
+        return np.where(max_mask, self.maxima, means)
+
+
+class HealthHistory:
+    """Multi-resolution ring buffer of numeric health metrics."""
+
+    def __init__(self, columns: Sequence[str], max_columns: Iterable[str] = (),
+                 tiers: Sequence[Tuple[int, int]] = DEFAULT_TIERS):
+        """
+        Initialize the history.
+
+        Args:
+            columns: Metric names stored per sample
+            max_columns: Columns downsampled by maximum instead of mean, e.g.
+                status levels, where the worst value in a bucket matters
+            tiers: (resolution seconds, capacity) pairs, finest first
+        """
+        self.names = list(columns)
+        self._index = {name: i for i, name in enumerate(self.names)}
+        self._max_mask = np.array([name in set(max_columns) for name in self.names], dtype=bool)
+        self.tiers = [_Tier(resolution, capacity, self.names) for resolution, capacity in tiers]
+        self._accumulators = [_Accumulator(len(self.names)) for _ in self.tiers[1:]]
+        self._lock = threading.Lock()
+
+    def record(self, timestamp: float, values: Dict[str, Optional[float]]):
+        """Add a sample; unknown names are ignored and missing ones stored as NaN."""
+        row = np.full(len(self.names), np.nan)
+        for name, value in values.items():
+            index = self._index.get(name)
+            if index is not None and value is not None:
+                row[index] = value
+
+        with self._lock:
+            finest = self.tiers[0]
+            finest.append(self._bucket(timestamp, finest.resolution), row, self.names)
+
+            for tier, accumulator in zip(self.tiers[1:], self._accumulators):
+                bucket = self._bucket(timestamp, tier.resolution)
+                if accumulator.bucket is not None and bucket != accumulator.bucket:
+                    tier.append(accumulator.bucket, accumulator.result(self._max_mask), self.names)
+                    accumulator.reset(bucket)
+                elif accumulator.bucket is None:
+                    accumulator.reset(bucket)
+                accumulator.add(row)
+
+    def query(self, start: float, end: float = math.inf) -> List[Dict[str, object]]:
+        """
+        Samples with start <= timestamp < end, oldest first.
+
+        Each span of the range is served from the finest tier still holding
+        it, so recent data is at full resolution and older data is coarser.
+        Each row has 'timestamp', 'resolution' (seconds) and a value per
+        column (None where not recorded).
+        """
+        rows: List[Dict[str, object]] = []
+        with self._lock:
+            upper = end
+            for tier in self.tiers:
+                oldest = tier.oldest()
+                if oldest is None:
+                    continue
+                # Finer tiers already returned everything from `upper` on
+                slots = tier.slots_between(start, upper)
+                if len(slots):
+                    rows[:0] = self._rows(tier, slots)
+                upper = min(upper, oldest)
+                if upper <= start:
+                    break
+        return rows
+
+    def latest(self) -> Optional[Dict[str, object]]:
+        """The most recent sample at full resolution."""
+        with self._lock:
+            tier = self.tiers[0]
+            if not tier.size:
+                return None
+            return self._rows(tier, np.array([(tier.head - 1) % tier.capacity]))[0]
+
+    def memory_bytes(self) -> int:
+        """Bytes held by the ring buffers; fixed once constructed."""
+        return sum(tier.timestamps.nbytes + sum(c.nbytes for c in tier.columns.values())
+                   for tier in self.tiers)
+
+    def __len__(self) -> int:
+        return sum(tier.size for tier in self.tiers)
+
+    def _rows(self, tier: _Tier, slots: np.ndarray) -> List[Dict[str, object]]:
+        timestamps = tier.timestamps[slots].tolist()
+        columns = {name: tier.columns[name][slots].tolist() for name in self.names}
+        rows = []
+        for i, timestamp in enumerate(timestamps):
+            row: Dict[str, object] = {'timestamp': timestamp, 'resolution': tier.resolution}
+            for name in self.names:
+                value = columns[name][i]
+                row[name] = None if math.isnan(value) else value
+            rows.append(row)
+        return rows
+
+    @staticmethod
+    def _bucket(timestamp: float, resolution: int) -> float:
+        return float(math.floor(timestamp / resolution) * resolution)
@@ -15,6 +15,8 @@ from datetime import datetime, timedelta
 from enum import Enum
 
 from .logging_system import StructuredLogger, ErrorHandler, PerformanceMonitor, DiagnosticTools
+from .metrics_registry import MetricFamily
+from .health_history import HealthHistory
 
 
 class HealthStatus(Enum):
@@ -25,6 +27,24 @@ class HealthStatus(Enum):
     UNHEALTHY = "unhealthy"
 
 
+# Numeric severity of each status, as stored in history and exported as metrics
+STATUS_LEVELS = {status.value: level for level, status in enumerate(HealthStatus)}
+LEVEL_STATUSES = {level: status for status, level in STATUS_LEVELS.items()}
+
+# History columns taken from component metrics: column -> (component, metric)
+HISTORY_METRICS = {
+    'cpu_percent': ('system', 'cpu_percent'),
+    'memory_percent': ('memory', 'system_memory_percent'),
+    'process_memory_mb': ('memory', 'process_memory_mb'),
+    'disk_percent': ('disk', 'disk_percent'),
+    'load_average_1min': ('cpu', 'load_average_1min'),
+    'recent_errors': ('errors', 'recent_errors'),
+    'error_recovery_rate': ('errors', 'recovery_rate'),
+    'operation_success_rate': ('performance', 'success_rate'),
+    'average_duration_ms': ('performance', 'average_duration_ms')
+}
+
+
 @dataclass
 class ComponentHealth:
     """Health status of a system component."""
@@ -64,9 +84,13 @@ class HealthMonitor:
             'performance': self._check_performance_health
         }
         
-        # Health history
-        self.health_history: List[Dict[str, Any]] = []
-        self.max_history = 1000
+        # Health history: fixed-size columnar store, downsampled with age
+        status_columns = ['status.overall'] + [f"status.{name}" for name in self.health_checkers]
+        self.health_history = HealthHistory(
+            status_columns + ['health_score'] + list(HISTORY_METRICS),
+            max_columns=status_columns
+        )
+        self.latest_report: Optional[Dict[str, Any]] = None
         
         # Monitoring configuration
         self.monitoring_interval = 60  # seconds
@@ -124,12 +148,27 @@ class HealthMonitor:
         }
         
         # Store in history
-        self.health_history.append(health_report)
-        if len(self.health_history) > self.max_history:
-            self.health_history = self.health_history[-self.max_history//2:]
+        self.latest_report = health_report
+        self.health_history.record(time.time(), self._history_values(health_report))
         
         return health_report
     
+    @staticmethod
+    def _history_values(health_report: Dict[str, Any]) -> Dict[str, Optional[float]]:
+        """Numeric values of a health report stored in the history."""
+        values = {
+            'status.overall': STATUS_LEVELS[health_report['overall_status']],
+            'health_score': health_report['summary']['health_score']
+        }
+        components = health_report['components']
+        for name, health in components.items():
+            values[f"status.{name}"] = STATUS_LEVELS.get(health['status'], STATUS_LEVELS['unhealthy'])
+        for column, (component, metric) in HISTORY_METRICS.items():
+            value = components.get(component, {}).get('metrics', {}).get(metric)
+            if isinstance(value, (int, float)):
+                values[column] = value
+        return values
+    
     def _check_system_health(self) -> ComponentHealth:
         """Check overall system health."""
         try:
@@ -577,21 +616,59 @@ class HealthMonitor:
                 time.sleep(self.monitoring_interval)
     
     def get_health_history(self, hours: int = 24) -> List[Dict[str, Any]]:
-        """Get health history for the specified number of hours."""
-        cutoff_time = datetime.now() - timedelta(hours=hours)
-        
-        filtered_history = []
-        for health_report in self.health_history:
-            report_time = datetime.fromisoformat(health_report['timestamp'])
-            if report_time >= cutoff_time:
-                filtered_history.append(health_report)
+        """
+        Get health history for the specified number of hours.
         
-        return filtered_history
+        Recent entries are individual checks; older ones are 1-minute or
+        1-hour aggregates (worst status, mean metrics), as given by each
+        entry's resolution_seconds.
+        """
+        history = []
+        for row in self.health_history.query(time.time() - hours * 3600):
+            entry = {
+                'timestamp': datetime.fromtimestamp(row.pop('timestamp')).isoformat(),
+                'resolution_seconds': row.pop('resolution'),
+                'overall_status': self._status_name(row.pop('status.overall')),
+                'health_score': row.pop('health_score'),
+                'components': {},
+                'metrics': {}
+            }
+            for column, value in row.items():
+                if column.startswith('status.'):
+                    if value is not None:
+                        entry['components'][column[len('status.'):]] = self._status_name(value)
+                else:
+                    entry['metrics'][column] = value
+            history.append(entry)
+        return history
+    
+    @staticmethod
+    def _status_name(level: Optional[float]) -> Optional[str]:
+        if level is None:
+            return None
+        return LEVEL_STATUSES.get(int(round(level)), HealthStatus.UNHEALTHY.value)
     
     def get_diagnostic_report(self) -> Dict[str, Any]:
         """Get comprehensive diagnostic report."""
         return self.diagnostic_tools.generate_diagnostic_report()
     
+    def collect_metrics(self) -> List[MetricFamily]:
+        """
+        Metric families for the metrics registry.
+        
+        Reports the most recent health check rather than running the checks
+        on every scrape.
+        """
+        status = MetricFamily("sandbox_health_status", "gauge",
+                              "Component health: 0 healthy, 1 warning, 2 critical, 3 unhealthy",
+                              ["component"])
+        latest = self.latest_report
+        if latest:
+            status.add(STATUS_LEVELS.get(latest['overall_status'], 3), "overall")
+            for name, health in sorted(latest['components'].items()):
+                status.add(STATUS_LEVELS.get(health['status'], 3), name)
+        return [status]
+    
     def cleanup(self):
         """Cleanup monitoring resources."""
         self.monitoring_active = False
@@ -22,6 +22,15 @@ from contextlib import contextmanager
 import functools
 import queue
 import atexit
+import math
+from collections import deque
+
+from .metrics_registry import DEFAULT_LATENCY_BUCKETS, MetricFamily
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
 class LogLevel(Enum):
@@ -72,6 +81,34 @@ class LogEntry:
         result['timestamp'] = self.timestamp.isoformat()
         result['level'] = self.level.value
         return result
+    
+    def to_json(self) -> bytes:
+        """
+        Serialize to a single JSON line (without the newline).
+        
+        Unlike to_dict(), metadata is not deep-copied, and values JSON cannot
+        represent are written as their str().
+        """
+        data = {
+            'timestamp': self.timestamp.isoformat(),
+            'level': self.level.value,
+            'message': self.message,
+            'category': self.category,
+            'component': self.component,
+            'context_id': self.context_id,
+            'user_id': self.user_id,
+            'execution_id': self.execution_id,
+            'error_type': self.error_type,
+            'stack_trace': self.stack_trace,
+            'metadata': self.metadata,
+            'performance_data': self.performance_data
+        }
+        if orjson is not None:
+            try:
+                return orjson.dumps(data, default=str)
+            except TypeError:
+                pass  # e.g. non-string dict keys; the stdlib encoder coerces them
+        return json.dumps(data, default=str).encode('utf-8')
 
 
 @dataclass
@@ -121,12 +158,42 @@ class PerformanceMetrics:
 
 
 class StructuredLogger:
-    """Structured logger with JSON output and comprehensive metadata."""
+    """
+    Structured logger with JSON output and comprehensive metadata.
+    
+    log() only builds the entry and enqueues it on a bounded queue; a
+    background thread drains the queue in batches, writes each batch of
+    JSON lines with a single write and flush, and passes the entries to the
+    console and file handlers. When the queue is full, entries are dropped
+    and counted rather than blocking the caller.
+    """
+    
+    _LEVELS = {
+        LogLevel.DEBUG: logging.DEBUG,
+        LogLevel.INFO: logging.INFO,
+        LogLevel.WARNING: logging.WARNING,
+        LogLevel.ERROR: logging.ERROR,
+        LogLevel.CRITICAL: logging.CRITICAL
+    }
     
-    def __init__(self, name: str, log_dir: Optional[Path] = None):
+    def __init__(self, name: str, log_dir: Optional[Path] = None,
+                 max_queue_size: int = 10000, batch_size: int = 256,
+                 flush_interval: float = 0.05):
+        """
+        Initialize the logger.
+        
+        Args:
+            name: Logger name, also used for the log file names
+            log_dir: Directory for log files (default: ./logs)
+            max_queue_size: Entries buffered before new ones are dropped
+            batch_size: Maximum entries written per batch
+            flush_interval: Seconds the worker waits to fill a batch
+        """
         self.name = name
         self.log_dir = log_dir or Path("logs")
         self.log_dir.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
         
         # Create logger
         self.logger = logging.getLogger(name)
@@ -139,9 +206,15 @@ class StructuredLogger:
         # Setup handlers
         self._setup_handlers()
         
-        # Thread-safe log queue
-        self.log_queue = queue.Queue()
-        self.log_thread = threading.Thread(target=self._log_worker, daemon=True)
+        # Pipeline counters
+        self._stats_lock = threading.Lock()
+        self.stats = {'enqueued': 0, 'dropped': 0, 'written': 0, 'batches': 0}
+        self._reported_drops = 0
+        
+        # Bounded log queue drained by the worker thread
+        self.log_queue = queue.Queue(maxsize=max_queue_size)
+        self.log_thread = threading.Thread(target=self._log_worker, daemon=True,
+                                           name=f"StructuredLogger-{name}")
         self.log_thread.start()
         
         # Register cleanup
@@ -170,7 +243,7 @@ class StructuredLogger:
         file_handler.setFormatter(file_formatter)
         self.logger.addHandler(file_handler)
         
-        # JSON handler for structured logs
+        # JSON handler for structured logs (written to in binary batches by the worker)
         json_log_file = self.log_dir / f"{self.name}_structured.jsonl"
         self.json_handler = logging.handlers.RotatingFileHandler(
             json_log_file, maxBytes=10*1024*1024, backupCount=5
@@ -178,24 +251,83 @@ class StructuredLogger:
         self.json_handler.setLevel(logging.DEBUG)
     
     def _log_worker(self):
-        """Background worker for processing log entries."""
+        """Background worker: drain the queue in batches and write them."""
         while True:
             try:
-                log_entry = self.log_queue.get(timeout=1)
-                if log_entry is None:  # Shutdown signal
-                    break
-                
-                # Write structured log to JSON file
-                json_line = json.dumps(log_entry.to_dict())
-                self.json_handler.stream.write(json_line + '\n')
-                self.json_handler.stream.flush()
-                
-                self.log_queue.task_done()
+                first = self.log_queue.get(timeout=1)
             except queue.Empty:
                 continue
+            
+            batch = [first]
+            shutdown = first is None
+            deadline = time.monotonic() + self.flush_interval
+            while not shutdown and len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    entry = self.log_queue.get(timeout=remaining) if remaining > 0 \
+                        else self.log_queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(entry)
+                shutdown = entry is None
+            
+            entries = [entry for entry in batch if entry is not None]
+            try:
+                self._write_batch(entries)
             except Exception as e:
                 # Fallback logging to avoid infinite loops
                 print(f"Error in log worker: {e}", file=sys.stderr)
+            finally:
+                for _ in batch:
+                    self.log_queue.task_done()
+            
+            if shutdown:
+                break
+    
+    def _write_batch(self, entries: List[LogEntry]):
+        """Write a batch of entries to the JSON log and the stdlib handlers."""
+        with self._stats_lock:
+            dropped = self.stats['dropped'] - self._reported_drops
+            self._reported_drops = self.stats['dropped']
+        if dropped:
+            entries.append(LogEntry(
+                timestamp=datetime.now(),
+                level=LogLevel.WARNING,
+                message=f"Log queue full: dropped {dropped} entries",
+                component="logging",
+                metadata={'dropped': dropped}
+            ))
+        if not entries:
+            return
+        
+        # One write and one flush per batch
+        stream = self.json_handler.stream
+        if stream is None:
+            stream = self.json_handler.stream = self.json_handler._open()
+        payload = b"\n".join(entry.to_json() for entry in entries) + b"\n"
+        raw = getattr(stream, "buffer", None)
+        if raw is not None:
+            raw.write(payload)
+            raw.flush()
+        else:
+            stream.write(payload.decode("utf-8"))
+            stream.flush()
+        if self.json_handler.maxBytes and (raw or stream).tell() >= self.json_handler.maxBytes:
+            self.json_handler.doRollover()
+        
+        # Console and file handlers run here rather than on the caller's thread
+        for entry in entries:
+            levelno = self._LEVELS[entry.level]
+            if self.logger.isEnabledFor(levelno):
+                record = self.logger.makeRecord(self.name, levelno, "(structured)", 0,
+                                                entry.message, None, None)
+                record.created = entry.timestamp.timestamp()
+                record.msecs = (record.created - int(record.created)) * 1000
+                self.logger.handle(record)
+        
+        with self._stats_lock:
+            self.stats['written'] += len(entries)
+            self.stats['batches'] += 1
     
     def log(self, level: LogLevel, message: str, **kwargs):
         """Log a structured message."""
@@ -227,14 +359,47 @@ class StructuredLogger:
             **log_entry_kwargs
         )
         
-        # Queue for structured logging
+        # Queue for the worker; drop rather than block when full
         try:
             self.log_queue.put_nowait(log_entry)
+            counter = 'enqueued'
         except queue.Full:
-            pass  # Drop log if queue is full to avoid blocking
+            counter = 'dropped'
+        with self._stats_lock:
+            self.stats[counter] += 1
+    
+    def flush(self, timeout: float = 5.0) -> bool:
+        """
+        Wait until every queued entry has been written.
         
-        # Standard logging
-        getattr(self.logger, level.value.lower())(message)
+        Returns:
+            True if the queue drained within the timeout
+        """
+        deadline = time.monotonic() + timeout
+        with self.log_queue.all_tasks_done:
+            while self.log_queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self.log_thread.is_alive():
+                    return False
+                self.log_queue.all_tasks_done.wait(remaining)
+        return True
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Pipeline counters: entries enqueued, dropped and written, and batches written."""
+        with self._stats_lock:
+            return {**self.stats, 'queued': self.log_queue.qsize()}
+    
+    def collect_metrics(self) -> List[MetricFamily]:
+        """Metric families for the metrics registry."""
+        stats = self.get_stats()
+        return [
+            MetricFamily("sandbox_log_queue_depth", "gauge", "Log entries waiting to be written",
+                         ["logger"]).add(stats['queued'], self.name),
+            MetricFamily("sandbox_log_entries_written", "counter", "Log entries written",
+                         ["logger"]).add(stats['written'], self.name),
+            MetricFamily("sandbox_log_entries_dropped", "counter", "Log entries dropped on a full queue",
+                         ["logger"]).add(stats['dropped'], self.name)
+        ]
     
     def debug(self, message: str, **kwargs):
         """Log debug message."""
@@ -257,11 +422,12 @@ class StructuredLogger:
         self.log(LogLevel.CRITICAL, message, **kwargs)
     
     def cleanup(self):
-        """Cleanup resources."""
+        """Cleanup resources, writing out everything still queued."""
         try:
             # Signal shutdown to worker thread
-            self.log_queue.put(None)
-            self.log_thread.join(timeout=5)
+            if self.log_thread.is_alive():
+                self.log_queue.put(None, timeout=5)
+                self.log_thread.join(timeout=5)
         except:
             pass
 
@@ -475,18 +641,192 @@ class ErrorHandler:
         }
 
 
+class LatencyHistogram:
+    """
+    Log-bucketed latency histogram with constant memory.
+    
+    Bucket bounds grow geometrically, so any recorded value and any
+    percentile read back is within relative_error of the true value.
+    Recording is O(1); percentiles scan the fixed set of buckets.
+    """
+    
+    def __init__(self, min_ms: float = 0.001, max_ms: float = 3_600_000.0,
+                 relative_error: float = 0.02):
+        self.min_ms = min_ms
+        self.max_ms = max_ms
+        self._growth = (1 + relative_error) / (1 - relative_error)
+        self._log_growth = math.log(self._growth)
+        self.counts = [0] * (self._index(max_ms) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_seen = math.inf
+        self.max_seen = 0.0
+    
+    def _index(self, value_ms: float) -> int:
+        if value_ms <= self.min_ms:
+            return 0
+        return int(math.log(value_ms / self.min_ms) / self._log_growth) + 1
+    
+    def record(self, value_ms: float):
+        """Add one measurement."""
+        index = self._index(min(value_ms, self.max_ms))
+        self.counts[index] += 1
+        self.count += 1
+        self.total_ms += value_ms
+        if value_ms < self.min_seen:
+            self.min_seen = value_ms
+        if value_ms > self.max_seen:
+            self.max_seen = value_ms
+    
+    def percentile(self, q: float) -> float:
+        """Approximate q-th percentile (0-100) in milliseconds."""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(q / 100 * self.count))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                break
+        if index == 0:
+            value = self.min_ms
+        else:
+            # 2LU/(L+U) of the bucket's bounds (L, U] is within relative_error of both
+            value = self.min_ms * self._growth ** index * 2 / (self._growth + 1)
+        return min(max(value, self.min_seen), self.max_seen)
+    
+    @property
+    def mean(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+    
+    def cumulative_counts(self, bounds_ms) -> List[int]:
+        """Approximate number of measurements at or below each bound."""
+        cumulative = []
+        seen = 0
+        next_index = 0
+        for bound in bounds_ms:
+            last_index = min(self._index(bound), len(self.counts) - 1)
+            seen += sum(self.counts[next_index:last_index + 1])
+            next_index = max(next_index, last_index + 1)
+            cumulative.append(seen)
+        return cumulative
+
+
+class RateMeter:
+    """Exponentially weighted moving average of events per second."""
+    
+    def __init__(self, window_seconds: float = 60.0, tick_seconds: float = 5.0):
+        self.window_seconds = window_seconds
+        self.tick_seconds = tick_seconds
+        self.rate = 0.0
+        self._pending = 0
+        self._initialized = False
+        self._last_tick = time.monotonic()
+    
+    def mark(self, n: int = 1):
+        """Count events; the rate is updated on the next tick."""
+        self._pending += n
+    
+    def tick(self, now: Optional[float] = None):
+        """Fold pending events into the rate if a tick interval has passed."""
+        now = time.monotonic() if now is None else now
+        elapsed = now - self._last_tick
+        if elapsed < self.tick_seconds:
+            return
+        instant_rate = self._pending / elapsed
+        if self._initialized:
+            alpha = 1 - math.exp(-elapsed / self.window_seconds)
+            self.rate += alpha * (instant_rate - self.rate)
+        else:
+            self.rate = instant_rate
+            self._initialized = True
+        self._pending = 0
+        self._last_tick = now
+
+
+class OperationStats:
+    """Streaming aggregates for one (component, operation) pair."""
+    
+    def __init__(self):
+        self.count = 0
+        self.success_count = 0
+        self.latency = LatencyHistogram()
+        self.rate = RateMeter()
+        self.last_seen = 0.0
+        self.total_memory_mb = 0.0
+        self.total_cpu_percent = 0.0
+    
+    def record(self, duration_ms: float, success: bool, memory_mb: float = 0.0,
+               cpu_percent: float = 0.0):
+        self.count += 1
+        if success:
+            self.success_count += 1
+        self.latency.record(duration_ms)
+        self.total_memory_mb += memory_mb
+        self.total_cpu_percent += cpu_percent
+        self.rate.mark()
+        self.last_seen = time.time()
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Summary with latency percentiles and the recent rate."""
+        return {
+            'operations': self.count,
+            'success_count': self.success_count,
+            'success_rate': self.success_count / self.count if self.count else 0,
+            'total_duration_ms': self.latency.total_ms,
+            'avg_duration_ms': self.latency.mean,
+            'min_duration_ms': self.latency.min_seen if self.count else 0.0,
+            'max_duration_ms': self.latency.max_seen,
+            'p50_ms': self.latency.percentile(50),
+            'p95_ms': self.latency.percentile(95),
+            'p99_ms': self.latency.percentile(99),
+            'avg_memory_mb': self.total_memory_mb / self.count if self.count else 0.0,
+            'avg_cpu_percent': self.total_cpu_percent / self.count if self.count else 0.0,
+            'rate_per_second': self.rate.rate
+        }
+
+
 class PerformanceMonitor:
-    """Performance monitoring and metrics collection."""
+    """
+    Performance monitoring and metrics collection.
     
-    def __init__(self, logger: StructuredLogger):
+    Operations are aggregated per (component, operation) into counters,
+    latency histograms and EWMA rates, so recording is O(1) and memory does
+    not grow with the number of operations. Process and system resource
+    usage is sampled by a background thread rather than around each
+    operation.
+    """
+    
+    def __init__(self, logger: StructuredLogger, sample_interval: float = 60.0,
+                 max_samples: int = 1440):
+        """
+        Initialize the monitor.
+        
+        Args:
+            logger: Logger receiving per-operation debug entries
+            sample_interval: Seconds between resource samples
+            max_samples: Resource samples kept in memory
+        """
         self.logger = logger
-        self.metrics: List[PerformanceMetrics] = []
-        self.max_metrics = 10000
         self.start_time = time.time()
+        self.sample_interval = sample_interval
+        self.rate_tick_seconds = 5.0
         
-        # System monitoring
+        self._lock = threading.Lock()
+        self.operations: Dict[tuple, OperationStats] = {}
+        
+        # Per-minute operation counts for the last hour
+        self._minute_counts = [0] * 60
+        self._current_minute = int(time.time() // 60)
+        
+        # Resource samples from the background thread
         self.process = psutil.Process()
+        self.resource_samples: deque = deque(maxlen=max_samples)
+        self.latest_sample: Optional[PerformanceMetrics] = None
+        
+        # System monitoring
         self.monitoring_active = True
+        self._stop_event = threading.Event()
         self.monitor_thread = threading.Thread(target=self._monitor_system, daemon=True)
         self.monitor_thread.start()
     
@@ -494,9 +834,7 @@ class PerformanceMonitor:
     def measure_operation(self, component: str, operation: str, 
                          context_id: Optional[str] = None, **metadata):
         """Context manager to measure operation performance."""
-        start_time = time.time()
-        start_memory = self.process.memory_info().rss / 1024 / 1024  # MB
-        start_cpu = self.process.cpu_percent()
+        start_time = time.perf_counter()
         
         success = True
         try:
@@ -505,116 +843,127 @@ class PerformanceMonitor:
             success = False
             raise
         finally:
-            end_time = time.time()
-            end_memory = self.process.memory_info().rss / 1024 / 1024  # MB
-            duration_ms = (end_time - start_time) * 1000
-            
-            # Calculate CPU usage (approximate)
-            cpu_usage = self.process.cpu_percent()
-            
-            metrics = PerformanceMetrics(
-                timestamp=datetime.now(),
-                component=component,
-                operation=operation,
-                duration_ms=duration_ms,
-                memory_usage_mb=end_memory,
-                cpu_usage_percent=cpu_usage,
-                success=success,
-                context_id=context_id,
-                metadata=metadata
-            )
-            
-            self._record_metrics(metrics)
+            duration_ms = (time.perf_counter() - start_time) * 1000
+            self.record_operation(component, operation, duration_ms, success,
+                                  context_id=context_id, **metadata)
     
-    def _record_metrics(self, metrics: PerformanceMetrics):
-        """Record performance metrics."""
-        self.metrics.append(metrics)
+    def record_operation(self, component: str, operation: str, duration_ms: float,
+                         success: bool = True, context_id: Optional[str] = None, **metadata):
+        """
+        Record one completed operation.
         
-        # Keep metrics manageable
-        if len(self.metrics) > self.max_metrics:
-            self.metrics = self.metrics[-self.max_metrics//2:]
+        Memory and CPU usage are attributed from the latest resource sample,
+        so recording makes no psutil calls.
+        """
+        key = (component, operation)
+        now = time.time()
+        sample = self.latest_sample
+        memory_mb = sample.memory_usage_mb if sample else 0.0
+        cpu_percent = sample.cpu_usage_percent if sample else 0.0
+        with self._lock:
+            stats = self.operations.get(key)
+            if stats is None:
+                stats = self.operations[key] = OperationStats()
+            stats.record(duration_ms, success, memory_mb, cpu_percent)
+            self._advance_minute(now)
+            self._minute_counts[self._current_minute % 60] += 1
         
         # Log performance data
         self.logger.debug(
-            f"Performance: {metrics.component}.{metrics.operation} "
-            f"took {metrics.duration_ms:.2f}ms",
-            component=metrics.component,
-            performance_data=metrics.to_dict()
+            f"Performance: {component}.{operation} took {duration_ms:.2f}ms",
+            component=component,
+            context_id=context_id,
+            performance_data={
+                'operation': operation,
+                'duration_ms': duration_ms,
+                'success': success,
+                'metadata': metadata
+            }
         )
     
+    def _advance_minute(self, now: float):
+        """Move the per-minute ring to the current minute, clearing minutes that passed."""
+        minute = int(now // 60)
+        if minute != self._current_minute:
+            for passed in range(self._current_minute + 1, min(minute, self._current_minute + 60) + 1):
+                self._minute_counts[passed % 60] = 0
+            self._current_minute = minute
+    
     def _monitor_system(self):
-        """Background system monitoring."""
+        """Background system monitoring and rate updates."""
+        self.process.cpu_percent()  # First call only primes the counter
+        next_sample = time.monotonic()
         while self.monitoring_active:
             try:
-                # System metrics
-                cpu_percent = psutil.cpu_percent(interval=1)
-                memory = psutil.virtual_memory()
-                disk = psutil.disk_usage('/')
-                
-                # Process metrics
-                process_memory = self.process.memory_info().rss / 1024 / 1024  # MB
-                process_cpu = self.process.cpu_percent()
-                
-                system_metrics = PerformanceMetrics(
-                    timestamp=datetime.now(),
-                    component="system",
-                    operation="monitor",
-                    duration_ms=0,
-                    memory_usage_mb=process_memory,
-                    cpu_usage_percent=process_cpu,
-                    success=True,
-                    metadata={
-                        'system_cpu_percent': cpu_percent,
-                        'system_memory_percent': memory.percent,
-                        'system_disk_percent': disk.percent,
-                        'uptime_seconds': time.time() - self.start_time
-                    }
-                )
-                
-                self._record_metrics(system_metrics)
+                now = time.monotonic()
+                with self._lock:
+                    for stats in self.operations.values():
+                        stats.rate.tick(now)
                 
-                time.sleep(60)  # Monitor every minute
+                if now >= next_sample:
+                    self._sample_resources()
+                    next_sample = now + self.sample_interval
                 
             except Exception as e:
                 self.logger.warning(f"System monitoring error: {e}")
-                time.sleep(60)
+            
+            self._stop_event.wait(min(self.rate_tick_seconds, self.sample_interval))
     
-    def get_performance_summary(self) -> Dict[str, Any]:
-        """Get performance summary statistics."""
-        if not self.metrics:
-            return {
-                'total_operations': 0,
-                'average_duration_ms': 0,
-                'success_rate': 0,
-                'components': {}
-            }
+    def _sample_resources(self):
+        """Take one process and system resource sample."""
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage('/')
         
-        recent_time = datetime.now() - timedelta(hours=1)
-        recent_metrics = [m for m in self.metrics if m.timestamp >= recent_time]
-        
-        total_duration = sum(m.duration_ms for m in self.metrics)
-        successful_ops = sum(1 for m in self.metrics if m.success)
+        sample = PerformanceMetrics(
+            timestamp=datetime.now(),
+            component="system",
+            operation="monitor",
+            duration_ms=0,
+            memory_usage_mb=self.process.memory_info().rss / 1024 / 1024,
+            cpu_usage_percent=self.process.cpu_percent(),
+            success=True,
+            metadata={
+                'system_cpu_percent': psutil.cpu_percent(),
+                'system_memory_percent': memory.percent,
+                'system_disk_percent': disk.percent,
+                'uptime_seconds': time.time() - self.start_time
+            }
+        )
+        self.resource_samples.append(sample)
+        self.latest_sample = sample
         
-        components = {}
-        for metric in self.metrics:
-            comp = metric.component
-            if comp not in components:
-                components[comp] = {
+        self.logger.debug(
+            f"Resource sample: {sample.memory_usage_mb:.1f}MB, {sample.cpu_usage_percent:.1f}% CPU",
+            component="system",
+            performance_data=sample.to_dict()
+        )
+    
+    def get_performance_summary(self) -> Dict[str, Any]:
+        """Get performance summary statistics."""
+        with self._lock:
+            self._advance_minute(time.time())
+            recent_operations = sum(self._minute_counts)
+            
+            components: Dict[str, Dict[str, Any]] = {}
+            for (component, operation), stats in sorted(self.operations.items()):
+                comp_data = components.setdefault(component, {
                     'operations': 0,
                     'total_duration_ms': 0,
                     'success_count': 0,
                     'avg_memory_mb': 0,
-                    'avg_cpu_percent': 0
-                }
-            
-            comp_data = components[comp]
-            comp_data['operations'] += 1
-            comp_data['total_duration_ms'] += metric.duration_ms
-            comp_data['avg_memory_mb'] += metric.memory_usage_mb
-            comp_data['avg_cpu_percent'] += metric.cpu_usage_percent
-            
-            if metric.success:
-                comp_data['success_count'] += 1
+                    'avg_cpu_percent': 0,
+                    'by_operation': {}
+                })
+                comp_data['operations'] += stats.count
+                comp_data['total_duration_ms'] += stats.latency.total_ms
+                comp_data['success_count'] += stats.success_count
+                comp_data['avg_memory_mb'] += stats.total_memory_mb
+                comp_data['avg_cpu_percent'] += stats.total_cpu_percent
+                comp_data['by_operation'][operation] = stats.to_dict()
+        
+        total_operations = sum(c['operations'] for c in components.values())
+        total_duration = sum(c['total_duration_ms'] for c in components.values())
+        successful_ops = sum(c['success_count'] for c in components.values())
         
         # Calculate averages
         for comp_data in components.values():
@@ -624,18 +973,52 @@ class PerformanceMonitor:
             comp_data['avg_cpu_percent'] = comp_data['avg_cpu_percent'] / ops
             comp_data['success_rate'] = comp_data['success_count'] / ops
         
+        sample = self.latest_sample
         return {
-            'total_operations': len(self.metrics),
-            'average_duration_ms': total_duration / len(self.metrics),
-            'success_rate': successful_ops / len(self.metrics),
-            'recent_operations': len(recent_metrics),
+            'total_operations': total_operations,
+            'average_duration_ms': total_duration / total_operations if total_operations else 0,
+            'success_rate': successful_ops / total_operations if total_operations else 0,
+            'recent_operations': recent_operations,
             'uptime_seconds': time.time() - self.start_time,
-            'components': components
+            'components': components,
+            'resources': sample.to_dict() if sample else {}
         }
     
+    def collect_metrics(self) -> List[MetricFamily]:
+        """Metric families for the metrics registry."""
+        labels = ["component", "operation"]
+        duration = MetricFamily("sandbox_operation_duration_seconds", "histogram",
+                                "Duration of monitored operations", labels, unit="seconds")
+        operations = MetricFamily("sandbox_operations", "counter", "Monitored operations",
+                                  labels + ["outcome"])
+        rate = MetricFamily("sandbox_operation_rate", "gauge",
+                            "Operations per second, 1-minute moving average", labels)
+        
+        bounds_ms = [bound * 1000 for bound in DEFAULT_LATENCY_BUCKETS]
+        with self._lock:
+            for (component, operation), stats in sorted(self.operations.items()):
+                cumulative = stats.latency.cumulative_counts(bounds_ms)
+                duration.add_histogram(list(zip(DEFAULT_LATENCY_BUCKETS, cumulative)), stats.count,
+                                       stats.latency.total_ms / 1000, component, operation)
+                operations.add(stats.success_count, component, operation, "success")
+                operations.add(stats.count - stats.success_count, component, operation, "failure")
+                rate.add(stats.rate.rate, component, operation)
+        
+        families = [duration, operations, rate]
+        sample = self.latest_sample
+        if sample is not None:
+            families.append(MetricFamily("sandbox_process_resident_memory_bytes", "gauge",
+                                         "Resident memory of the server process", unit="bytes")
+                            .add(sample.memory_usage_mb * 1024 * 1024))
+            families.append(MetricFamily("sandbox_process_cpu_percent", "gauge",
+                                         "CPU usage of the server process")
+                            .add(sample.cpu_usage_percent))
+        return families
+    
     def cleanup(self):
         """Cleanup monitoring resources."""
         self.monitoring_active = False
+        self._stop_event.set()
         try:
             self.monitor_thread.join(timeout=5)
         except:
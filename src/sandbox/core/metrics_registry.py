@@ -0,0 +1,278 @@
+"""
+Unified metrics registry with OpenMetrics text exposition.
+
+Components publish metrics by registering a collector: a callable that
+returns MetricFamily objects built from the component's own counters when
+the registry is scraped. The registry renders everything in the OpenMetrics
+text format, served over HTTP at /metrics or dumped periodically to a file
+when the server runs over stdio.
+"""
+
+import logging
+import math
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+METRIC_TYPES = ("counter", "gauge", "histogram", "info", "stateset", "unknown")
+
+# Latency histogram bucket bounds, in seconds
+DEFAULT_LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                           1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+_NAME_RE = re.compile(r"^[a-zA-Z_:][a-zA-Z0-9_:]*$")
+_LABEL_RE = re.compile(r"^[a-zA-Z_][a-zA-Z0-9_]*$")
+
+Collector = Callable[[], Iterable["MetricFamily"]]
+
+# Suffix the single sample of a counter or info series carries
+_SAMPLE_SUFFIXES = {"counter": "_total", "info": "_info"}
+
+
+class MetricFamily:
+    """A named metric with a fixed type, label names and a set of samples."""
+
+    def __init__(self, name: str, metric_type: str, documentation: str,
+                 labels: Sequence[str] = (), unit: str = ""):
+        """
+        Create a metric family.
+
+        Args:
+            name: Metric name without type suffixes (no _total for counters)
+            metric_type: One of METRIC_TYPES
+            documentation: Help text
+            labels: Label names every sample must provide
+            unit: Unit, which must also be the name's suffix (e.g. "seconds")
+        """
+        if not _NAME_RE.match(name):
+            raise ValueError(f"Invalid metric name: {name}")
+        if metric_type not in METRIC_TYPES:
+            raise ValueError(f"Invalid metric type: {metric_type}")
+        if unit and not name.endswith("_" + unit):
+            raise ValueError(f"Metric {name} must end with its unit {unit}")
+        for label in labels:
+            if not _LABEL_RE.match(label) or label == "le":
+                raise ValueError(f"Invalid label name: {label}")
+
+        self.name = name
+        self.type = metric_type
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.unit = unit
+        self.samples: List[Tuple[str, Tuple[Tuple[str, str], ...], float]] = []
+
+    def add(self, value: float, *label_values: Any) -> "MetricFamily":
+        """Add a counter, gauge, info or unknown sample."""
+        suffix = _SAMPLE_SUFFIXES.get(self.type, "")
+        self.samples.append((suffix, self._label_pairs(label_values), float(value)))
+        return self
+
+    def add_histogram(self, buckets: Sequence[Tuple[float, int]], count: int,
+                      total: float, *label_values: Any) -> "MetricFamily":
+        """
+        Add a histogram series.
+
+        Args:
+            buckets: (upper bound, cumulative count) pairs in increasing order,
+                without the +Inf bucket, which is added from count
+            count: Number of observations
+            total: Sum of observations
+        """
+        if self.type != "histogram":
+            raise ValueError(f"{self.name} is not a histogram")
+        pairs = self._label_pairs(label_values)
+        for bound, cumulative in buckets:
+            self.samples.append(("_bucket", pairs + (("le", _format_bound(bound)),), cumulative))
+        self.samples.append(("_bucket", pairs + (("le", "+Inf"),), count))
+        self.samples.append(("_count", pairs, count))
+        self.samples.append(("_sum", pairs, total))
+        return self
+
+    def _label_pairs(self, label_values: Sequence[Any]) -> Tuple[Tuple[str, str], ...]:
+        if len(label_values) != len(self.labels):
+            raise ValueError(f"{self.name} expects labels {self.labels}, got {label_values}")
+        return tuple(zip(self.labels, (str(v) for v in label_values)))
+
+
+class MetricsRegistry:
+    """Registry of metric collectors, rendered on demand."""
+
+    def __init__(self, max_series_per_family: int = 500):
+        """
+        Initialize the registry.
+
+        Args:
+            max_series_per_family: Samples beyond this count are dropped from a
+                family, guarding scrapers against unbounded label values
+        """
+        self.max_series_per_family = max_series_per_family
+        self._collectors: Dict[str, Collector] = {}
+        self._lock = threading.Lock()
+        self._truncated: set = set()
+
+    def register_collector(self, name: str, collector: Collector):
+        """Register a collector, replacing any previous one with the same name."""
+        with self._lock:
+            self._collectors[name] = collector
+
+    def unregister_collector(self, name: str) -> bool:
+        """Remove a collector; returns whether it was registered."""
+        with self._lock:
+            return self._collectors.pop(name, None) is not None
+
+    def collector_names(self) -> List[str]:
+        with self._lock:
+            return sorted(self._collectors)
+
+    def collect(self) -> List[MetricFamily]:
+        """Run every collector; a failing collector is logged and skipped."""
+        with self._lock:
+            collectors = list(self._collectors.items())
+
+        families: Dict[str, MetricFamily] = {}
+        for collector_name, collector in collectors:
+            try:
+                collected = list(collector())
+            except Exception as e:
+                logger.warning(f"Metrics collector {collector_name} failed: {e}")
+                continue
+
+            for family in collected:
+                existing = families.get(family.name)
+                if existing is None:
+                    families[family.name] = family
+                elif existing.type == family.type and existing.labels == family.labels:
+                    existing.samples.extend(family.samples)
+                else:
+                    logger.warning(f"Metric {family.name} from {collector_name} conflicts with "
+                                   f"an earlier definition; skipped")
+
+        for family in families.values():
+            if len(family.samples) > self.max_series_per_family:
+                if family.name not in self._truncated:
+                    self._truncated.add(family.name)
+                    logger.warning(f"Metric {family.name} has {len(family.samples)} samples; "
+                                   f"keeping the first {self.max_series_per_family}")
+                del family.samples[self.max_series_per_family:]
+
+        return [families[name] for name in sorted(families)]
+
+    def render(self) -> str:
+        """Render all metrics in the OpenMetrics text format."""
+        lines = []
+        for family in self.collect():
+            lines.append(f"# TYPE {family.name} {family.type}")
+            if family.unit:
+                lines.append(f"# UNIT {family.name} {family.unit}")
+            lines.append(f"# HELP {family.name} {_escape(family.documentation)}")
+            for suffix, labels, value in family.samples:
+                if labels:
+                    label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+                    lines.append(f"{family.name}{suffix}{{{label_text}}} {_format_value(value)}")
+                else:
+                    lines.append(f"{family.name}{suffix} {_format_value(value)}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write_to_file(self, path: str):
+        """Write the rendered metrics to a file atomically."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f".{path.name}.tmp")
+        temp_path.write_text(self.render(), encoding="utf-8")
+        os.replace(temp_path, path)
+
+
+class MetricsFileExporter:
+    """Background thread dumping a registry to a file, for stdio deployments."""
+
+    def __init__(self, registry: MetricsRegistry, path: str, interval: float = 15.0):
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True, name="MetricsFileExporter")
+            self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.registry.write_to_file(self.path)
+            except Exception as e:
+                logger.warning(f"Failed to write metrics to {self.path}: {e}")
+            self._stop_event.wait(self.interval)
+
+
+def collect_cache_metrics(cache_manager) -> List[MetricFamily]:
+    """Metric families for a CacheManager, built from get_combined_stats()."""
+    stats = cache_manager.get_combined_stats()
+    hits = MetricFamily("sandbox_cache_hits", "counter", "Cache hits", ["cache"])
+    misses = MetricFamily("sandbox_cache_misses", "counter", "Cache misses", ["cache"])
+    entries = MetricFamily("sandbox_cache_entries", "gauge", "Entries held in the cache", ["cache"])
+    memory = MetricFamily("sandbox_cache_memory_bytes", "gauge", "Memory used by the cache",
+                          ["cache"], unit="bytes")
+    hit_ratio = MetricFamily("sandbox_cache_hit_ratio", "gauge", "Hits over lookups since start",
+                             ["cache"])
+
+    for cache_type, cache_stats in sorted(stats.get("cache_types", {}).items()):
+        cache_hits = cache_stats.get("hit_count", 0)
+        cache_misses = cache_stats.get("miss_count", 0)
+        lookups = cache_hits + cache_misses
+        hits.add(cache_hits, cache_type)
+        misses.add(cache_misses, cache_type)
+        entries.add(cache_stats.get("total_entries", 0), cache_type)
+        memory.add(cache_stats.get("memory_usage_bytes", 0), cache_type)
+        hit_ratio.add(cache_hits / lookups if lookups else 0.0, cache_type)
+
+    return [hits, misses, entries, memory, hit_ratio]
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_bound(bound: float) -> str:
+    """Canonical number for an le label: 1.0 rather than 1."""
+    bound = float(bound)
+    if math.isinf(bound):
+        return "+Inf" if bound > 0 else "-Inf"
+    return repr(bound)
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, float):
+        if math.isnan(value):
+            return "NaN"
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        if value.is_integer() and abs(value) < 1e15:
+            return str(int(value))
+    return repr(value)
+
+
+# Global metrics registry instance
+_metrics_registry: Optional[MetricsRegistry] = None
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Get the global metrics registry instance."""
+    global _metrics_registry
+    if _metrics_registry is None:
+        _metrics_registry = MetricsRegistry()
+    return _metrics_registry
@@ -0,0 +1,176 @@
+"""
+Low-overhead sampling profiler for sandboxed executions.
+
+A side thread periodically reads the profiled thread's stack through
+sys._current_frames() and counts identical stacks. Nothing runs in the
+profiled thread between samples, so the overhead is bounded by the sampling
+rate. Samples taken while the profiled thread is inside the profiler itself
+(e.g. waiting in stop() for the sampler to exit) are discarded. Results are
+written in the collapsed ("folded") stack format read by
+flamegraph.pl, inferno and speedscope.
+"""
+
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from types import CodeType, FrameType, FunctionType
+from typing import Dict, List, Optional
+
+
+@dataclass
+class ProfileResult:
+    """Aggregated samples from one profiling session."""
+    interval: float
+    duration: float
+    sample_count: int
+    stacks: Dict[str, int] = field(default_factory=dict)  # Collapsed stack -> samples
+    sampler_time: float = 0.0  # Seconds spent taking samples
+
+    @property
+    def overhead(self) -> float:
+        """Fraction of wall time the sampler held the interpreter."""
+        return self.sampler_time / self.duration if self.duration > 0 else 0.0
+
+    def to_collapsed(self) -> str:
+        """Stacks in the collapsed format: one "frame;frame;frame count" line each."""
+        lines = [f"{stack} {count}" for stack, count in
+                 sorted(self.stacks.items(), key=lambda item: (-item[1], item[0]))]
+        return "\n".join(lines) + ("\n" if lines else "")
+
+    def top_frames(self, limit: int = 10) -> List[Dict[str, object]]:
+        """Leaf frames with the most samples (self time)."""
+        totals: Dict[str, int] = {}
+        for stack, count in self.stacks.items():
+            leaf = stack.rsplit(";", 1)[-1]
+            totals[leaf] = totals.get(leaf, 0) + count
+        ranked = sorted(totals.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [
+            {'frame': frame, 'samples': count,
+             'fraction': count / self.sample_count if self.sample_count else 0.0}
+            for frame, count in ranked
+        ]
+
+    def summary(self) -> Dict[str, object]:
+        return {
+            'interval': self.interval,
+            'duration': self.duration,
+            'sample_count': self.sample_count,
+            'unique_stacks': len(self.stacks),
+            'overhead': self.overhead,
+            'top_frames': self.top_frames()
+        }
+
+
+class SamplingProfiler:
+    """
+    Samples one thread's stack from a side thread.
+
+    Usage:
+        with SamplingProfiler(interval=0.01) as profiler:
+            run_code()
+        profiler.result.to_collapsed()
+    """
+
+    def __init__(self, interval: float = 0.01, max_depth: int = 128,
+                 thread_id: Optional[int] = None):
+        """
+        Initialize the profiler.
+
+        Args:
+            interval: Seconds between samples
+            max_depth: Frames kept per stack, counted from the leaf
+            thread_id: Thread to sample (default: the thread calling start())
+        """
+        self.interval = interval
+        self.max_depth = max_depth
+        self.thread_id = thread_id
+        self.result: Optional[ProfileResult] = None
+
+        self._stacks: Dict[str, int] = {}
+        self._labels: Dict[CodeType, str] = {}
+        self._root_frame: Optional[FrameType] = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._sample_count = 0
+        self._sampler_time = 0.0
+        self._start_time = 0.0
+
+    def start(self):
+        """Start sampling; only frames below the caller's frame are recorded."""
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+            self._root_frame = sys._getframe(1)
+            if self._root_frame.f_code is type(self).__enter__.__code__:
+                self._root_frame = self._root_frame.f_back
+        self._start_time = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="SamplingProfiler")
+        self._thread.start()
+
+    def stop(self) -> ProfileResult:
+        """Stop sampling and return the aggregated result."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._root_frame = None
+
+        self.result = ProfileResult(
+            interval=self.interval,
+            duration=time.perf_counter() - self._start_time,
+            sample_count=self._sample_count,
+            stacks=dict(self._stacks),
+            sampler_time=self._sampler_time
+        )
+        return self.result
+
+    def __enter__(self) -> "SamplingProfiler":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            started = time.perf_counter()
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                break
+            self._record(frame)
+            self._sampler_time += time.perf_counter() - started
+
+    def _record(self, frame: FrameType):
+        """Count the stack ending at frame, root first."""
+        labels = []
+        root = self._root_frame
+        while frame is not None and frame is not root:
+            if frame.f_code in _PROFILER_CODES:
+                return  # Time spent in start()/stop() or on the sampler thread
+            labels.append(self._label(frame.f_code))
+            frame = frame.f_back
+        if not labels:
+            return
+        del labels[self.max_depth:]
+        labels.reverse()
+
+        stack = ";".join(labels)
+        self._stacks[stack] = self._stacks.get(stack, 0) + 1
+        self._sample_count += 1
+
+    def _label(self, code: CodeType) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            filename = code.co_filename
+            if not filename.startswith("<"):
+                filename = os.path.basename(filename)
+            label = f"{code.co_name} ({filename}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+
+# Code objects of the profiler's own methods, whose frames are never profiled
+_PROFILER_CODES = frozenset(
+    member.__code__ for member in vars(SamplingProfiler).values() if isinstance(member, FunctionType)
+)
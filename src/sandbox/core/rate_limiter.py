@@ -0,0 +1,278 @@
+"""
+GCRA rate limiting shared by connections, users and tools.
+
+The generic cell rate algorithm keeps one number per key, the theoretical
+arrival time (TAT) of the next request. A request is allowed when it does
+not push the TAT further than the burst tolerance past now, which behaves
+like a token bucket holding `burst` tokens that refills at `rate` per
+`period`. A key whose TAT has passed is indistinguishable from a fresh one,
+so idle keys are evicted without losing anything.
+
+State lives in a backend: in memory for a single process, or in a SQLite
+file so that several server processes enforce the same limits.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .metrics_registry import MetricFamily
+
+logger = logging.getLogger(__name__)
+
+# (key, emission interval, tolerance) for one limit being checked
+_Check = Tuple[str, float, float]
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """Allow `rate` requests per `period` seconds, up to `burst` at once."""
+    rate: float
+    period: float = 1.0
+    burst: Optional[int] = None  # Default: rate, i.e. a full period's worth
+
+    def __post_init__(self):
+        if self.rate <= 0 or self.period <= 0:
+            raise ValueError(f"Rate limit needs a positive rate and period: {self}")
+        if self.burst is not None and self.burst < 1:
+            raise ValueError(f"Rate limit burst must be at least 1: {self}")
+
+    @property
+    def emission_interval(self) -> float:
+        """Seconds of capacity one request uses."""
+        return self.period / self.rate
+
+    @property
+    def tolerance(self) -> float:
+        """How far the TAT may run ahead of now."""
+        burst = self.burst if self.burst is not None else max(1, int(self.rate))
+        return self.emission_interval * burst
+
+
+def _gcra(tats: Sequence[Optional[float]], checks: Sequence[_Check], cost: float,
+          now: float) -> Tuple[bool, float, List[float]]:
+    """
+    Apply GCRA to every check at once.
+
+    Returns:
+        (allowed, retry_after, new TATs); nothing is consumed unless every
+        check allows the request
+    """
+    new_tats = []
+    retry_after = 0.0
+    for tat, (_, emission, tolerance) in zip(tats, checks):
+        new_tat = max(tat if tat is not None else now, now) + emission * cost
+        overshoot = new_tat - now - tolerance
+        if overshoot > 0:
+            retry_after = max(retry_after, overshoot)
+        new_tats.append(new_tat)
+    return retry_after == 0.0, retry_after, new_tats
+
+
+class MemoryBackend:
+    """Per-process limiter state: a dict of key -> TAT."""
+
+    def __init__(self, sweep_interval: float = 60.0):
+        self.sweep_interval = sweep_interval
+        self._tats: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+
+    @staticmethod
+    def now() -> float:
+        return time.monotonic()
+
+    def update(self, checks: Sequence[_Check], cost: float, now: float) -> Tuple[bool, float]:
+        with self._lock:
+            allowed, retry_after, new_tats = _gcra([self._tats.get(c[0]) for c in checks],
+                                                   checks, cost, now)
+            if allowed:
+                for (key, _, _), tat in zip(checks, new_tats):
+                    self._tats[key] = tat
+            if now - self._last_sweep >= self.sweep_interval:
+                self._sweep_locked(now)
+        return allowed, retry_after
+
+    def reset(self, key: str):
+        with self._lock:
+            self._tats.pop(key, None)
+
+    def evict_idle(self) -> int:
+        with self._lock:
+            return self._sweep_locked(self.now())
+
+    def __len__(self) -> int:
+        return len(self._tats)
+
+    def _sweep_locked(self, now: float) -> int:
+        idle = [key for key, tat in self._tats.items() if tat <= now]
+        for key in idle:
+            del self._tats[key]
+        self._last_sweep = now
+        return len(idle)
+
+
+class SQLiteBackend:
+    """
+    Limiter state in a SQLite file shared by server processes.
+
+    Each update runs in one immediate transaction, so concurrent processes
+    see a consistent TAT per key. Wall-clock time is used because
+    monotonic clocks are not comparable across processes.
+    """
+
+    def __init__(self, path: str, sweep_interval: float = 60.0, busy_timeout: float = 5.0):
+        self.path = str(path)
+        self.sweep_interval = sweep_interval
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._last_sweep = time.time()
+
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS rate_limits (key TEXT PRIMARY KEY, tat REAL NOT NULL)")
+
+    @staticmethod
+    def now() -> float:
+        return time.time()
+
+    def update(self, checks: Sequence[_Check], cost: float, now: float) -> Tuple[bool, float]:
+        conn = self._connection()
+        keys = [c[0] for c in checks]
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(
+                f"SELECT key, tat FROM rate_limits WHERE key IN ({','.join('?' * len(keys))})", keys
+            ).fetchall()
+            stored = dict(rows)
+            allowed, retry_after, new_tats = _gcra([stored.get(key) for key in keys], checks, cost, now)
+            if allowed:
+                conn.executemany("INSERT OR REPLACE INTO rate_limits (key, tat) VALUES (?, ?)",
+                                 zip(keys, new_tats))
+            if now - self._last_sweep >= self.sweep_interval:
+                conn.execute("DELETE FROM rate_limits WHERE tat <= ?", (now,))
+                self._last_sweep = now
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return allowed, retry_after
+
+    def reset(self, key: str):
+        self._connection().execute("DELETE FROM rate_limits WHERE key = ?", (key,))
+
+    def evict_idle(self) -> int:
+        return self._connection().execute("DELETE FROM rate_limits WHERE tat <= ?", (self.now(),)).rowcount
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM rate_limits").fetchone()[0]
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Autocommit mode; update() manages its own transaction
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+
+class RateLimiter:
+    """
+    Checks requests against any number of keyed limits.
+
+    Usage:
+        limiter = RateLimiter()
+        allowed, retry_after = limiter.acquire([
+            (f"connection:{connection_id}", RateLimit(60, period=60, burst=10)),
+            (f"tool:{tool}", RateLimit(5, period=1)),
+        ])
+    """
+
+    def __init__(self, backend=None):
+        """
+        Initialize the limiter.
+
+        Args:
+            backend: MemoryBackend (default) or SQLiteBackend
+        """
+        self.backend = backend if backend is not None else MemoryBackend()
+        self._stats_lock = threading.Lock()
+        self.stats = {'allowed': 0, 'rejected': 0, 'errors': 0}
+
+    def acquire(self, checks: Iterable[Tuple[str, RateLimit]], cost: float = 1.0) -> Tuple[bool, float]:
+        """
+        Take `cost` requests from every limit, or from none of them.
+
+        Returns:
+            Tuple of (allowed: bool, retry_after: float)
+        """
+        checks = [(key, limit.emission_interval, limit.tolerance) for key, limit in checks]
+        if not checks:
+            return True, 0.0
+        try:
+            allowed, retry_after = self.backend.update(checks, cost, self.backend.now())
+        except sqlite3.Error as e:
+            # Shared state unavailable: fail open rather than reject everyone
+            logger.warning(f"Rate limiter backend error: {e}")
+            with self._stats_lock:
+                self.stats['errors'] += 1
+            return True, 0.0
+
+        with self._stats_lock:
+            self.stats['allowed' if allowed else 'rejected'] += 1
+        return allowed, retry_after
+
+    def is_allowed(self, key: str, limit: RateLimit) -> Tuple[bool, float]:
+        """Check a single keyed limit."""
+        return self.acquire([(key, limit)])
+
+    def reset(self, key: str):
+        """Forget a key's state, restoring its full burst."""
+        self.backend.reset(key)
+
+    def evict_idle(self) -> int:
+        """Drop keys with no remaining state; returns how many were dropped."""
+        return self.backend.evict_idle()
+
+    def get_stats(self) -> Dict[str, object]:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats['tracked_keys'] = len(self.backend)
+        stats['backend'] = type(self.backend).__name__
+        return stats
+
+    def collect_metrics(self) -> List[MetricFamily]:
+        """Metric families for the metrics registry."""
+        stats = self.get_stats()
+        decisions = MetricFamily("sandbox_rate_limit_decisions", "counter",
+                                 "Rate limiter decisions", ["decision"])
+        for decision in ('allowed', 'rejected'):
+            decisions.add(stats[decision], decision)
+        return [
+            decisions,
+            MetricFamily("sandbox_rate_limit_keys", "gauge", "Keys with rate limiter state")
+                .add(stats['tracked_keys'])
+        ]
+
+
+def create_rate_limiter(shared_state_path: Optional[str] = None) -> RateLimiter:
+    """
+    Create a limiter, shared across processes when a state file is given.
+
+    Args:
+        shared_state_path: SQLite file for shared state
+            (default: $SANDBOX_RATE_LIMIT_DB; in memory if neither is set)
+    """
+    path = shared_state_path or os.environ.get("SANDBOX_RATE_LIMIT_DB")
+    if path:
+        try:
+            return RateLimiter(SQLiteBackend(path))
+        except sqlite3.Error as e:
+            logger.warning(f"Cannot open shared rate limit state {path}: {e}; using in-memory state")
+    return RateLimiter()
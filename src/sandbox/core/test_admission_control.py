@@ -0,0 +1,183 @@
+"""
+Unit tests for adaptive admission control.
+"""
+
+import json
+import threading
+import time
+import unittest
+
+from .admission_control import (
+    AdaptiveLimit, AdmissionController, AdmissionRejected, Priority
+)
+
+
+class TestAdaptiveLimit(unittest.TestCase):
+    """Test cases for the AIMD concurrency limit."""
+
+    def test_additive_increase_while_in_use(self):
+        """Test that steady completions grow the limit by 1/limit, up to max_limit."""
+        limit = AdaptiveLimit(initial=4, max_limit=6)
+        limit.on_complete("run", 0.1, in_flight=4, overloaded=False)
+        self.assertAlmostEqual(limit.limit, 4.25)
+
+        for _ in range(100):
+            limit.on_complete("run", 0.1, in_flight=limit.value, overloaded=False)
+        self.assertEqual(limit.limit, 6)
+
+    def test_no_increase_while_mostly_idle(self):
+        """Test that a limit less than half used does not grow."""
+        limit = AdaptiveLimit(initial=8)
+        for _ in range(10):
+            limit.on_complete("run", 0.1, in_flight=3, overloaded=False)
+        self.assertEqual(limit.limit, 8)
+
+    def test_multiplicative_decrease_on_latency_spike(self):
+        """Test that recent latency over tolerance times the baseline backs the limit off."""
+        limit = AdaptiveLimit(initial=16, backoff=0.5, cooldown=0)
+        for _ in range(5):
+            limit.on_complete("run", 0.1, in_flight=1, overloaded=False)
+
+        limit.on_complete("run", 1.0, in_flight=1, overloaded=False)
+        self.assertEqual(limit.limit, 8)
+
+        # A slow tool's own baseline is not compared with the fast one's
+        limit.on_complete("install", 5.0, in_flight=1, overloaded=False)
+        self.assertEqual(limit.limit, 8)
+
+        limit.on_complete("run", 0.1, in_flight=1, overloaded=True)
+        self.assertEqual(limit.limit, 4)
+
+    def test_decrease_respects_cooldown_and_floor(self):
+        """Test that decreases are spaced by the cooldown and stop at min_limit."""
+        limit = AdaptiveLimit(initial=8, min_limit=2, backoff=0.5, cooldown=60)
+        limit.decrease()
+        limit.decrease()
+        self.assertEqual(limit.limit, 4)
+
+        limit.cooldown = 0
+        for _ in range(5):
+            limit.decrease()
+        self.assertEqual((limit.limit, limit.value), (2, 2))
+
+
+class TestAdmissionController(unittest.TestCase):
+    """Test cases for queueing, timeouts and rejection."""
+
+    def _controller(self, limit: int = 1, overloaded: bool = False, **kwargs) -> AdmissionController:
+        controller = AdmissionController(AdaptiveLimit(initial=limit, max_limit=limit), **kwargs)
+        self._set_overloaded(controller, overloaded)
+        return controller
+
+    @staticmethod
+    def _set_overloaded(controller: AdmissionController, overloaded: bool):
+        """Pin the host load sample so psutil is not consulted."""
+        controller._host_sample = (time.monotonic() + 3600, overloaded)
+
+    def _wait_for_queue(self, controller: AdmissionController, depth: int):
+        deadline = time.monotonic() + 5
+        while controller.get_stats()['queue_depth'] < depth:
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.001)
+
+    def test_admits_up_to_limit(self):
+        """Test that requests under the limit are admitted at once and released slots reused."""
+        controller = self._controller(limit=2)
+        first = controller.admit("run")
+        second = controller.admit("run")
+        self.assertEqual(controller.get_stats()['in_flight'], 2)
+        self.assertFalse(first.degraded or second.degraded)
+
+        controller.release(first)
+        controller.release(second)
+        with controller.guard("run") as ticket:
+            self.assertIs(controller.current_ticket(), ticket)
+        self.assertIsNone(controller.current_ticket())
+        self.assertEqual(controller.get_stats()['in_flight'], 0)
+
+    def test_queue_wait_times_out(self):
+        """Test that a queued request is rejected once max_queue_wait passes."""
+        controller = self._controller(max_queue_wait=0.05)
+        held = controller.admit("run")
+
+        started = time.monotonic()
+        with self.assertRaises(AdmissionRejected) as raised:
+            controller.admit("run")
+
+        self.assertGreaterEqual(time.monotonic() - started, 0.05)
+        self.assertIn("no slot within", raised.exception.reason)
+        self.assertGreaterEqual(raised.exception.retry_after, 1.0)
+        stats = controller.get_stats()
+        self.assertEqual((stats['queued'], stats['rejected'], stats['queue_depth']), (1, 1, 0))
+
+        # The timed-out waiter is skipped, not handed the freed slot
+        controller.release(held)
+        self.assertEqual(controller.get_stats()['in_flight'], 0)
+
+    def test_full_queue_rejects_immediately(self):
+        """Test that a request finding the queue full is rejected without waiting."""
+        controller = self._controller(max_queue=0, max_queue_wait=30)
+        controller.admit("run")
+
+        started = time.monotonic()
+        with self.assertRaises(AdmissionRejected) as raised:
+            controller.admit("run")
+
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(raised.exception.reason, "queue full")
+
+    def test_overload_rejects_low_and_admits_critical(self):
+        """Test that low priority is shed under pressure while critical bypasses the limit."""
+        controller = self._controller(overloaded=True, max_queue=0,
+                                      tool_priorities={"cleanup": Priority.LOW, "status": Priority.CRITICAL})
+        with self.assertRaises(AdmissionRejected) as raised:
+            controller.admit("cleanup")
+        self.assertEqual(raised.exception.reason, "host overloaded")
+
+        tickets = [controller.admit("status") for _ in range(3)]
+        self.assertEqual(controller.get_stats()['in_flight'], 3)
+        self.assertTrue(all(ticket.degraded for ticket in tickets))
+
+    def test_queued_requests_dispatched_by_priority(self):
+        """Test that a freed slot goes to the highest-priority waiter, which is marked degraded."""
+        controller = self._controller(max_queue_wait=5)
+        held = controller.admit("run")
+        admitted = []
+
+        def request(tool, priority):
+            ticket = controller.admit(tool, priority)
+            admitted.append((tool, ticket.degraded, ticket.queue_wait > 0))
+            controller.release(ticket)
+
+        threads = [threading.Thread(target=request, args=("normal", Priority.NORMAL))]
+        threads[0].start()
+        self._wait_for_queue(controller, 1)
+        threads.append(threading.Thread(target=request, args=("high", Priority.HIGH)))
+        threads[1].start()
+        self._wait_for_queue(controller, 2)
+
+        controller.release(held)
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(admitted, [("high", True, True), ("normal", True, True)])
+        self.assertEqual(controller.get_stats()['in_flight'], 0)
+
+    def test_controlled_returns_rejection_payload(self):
+        """Test that the decorator turns a rejection into the tool's JSON error result."""
+        controller = self._controller(max_queue=0)
+
+        @controller.controlled("run")
+        def tool():
+            return "ran"
+
+        held = controller.admit("other")
+        payload = json.loads(tool())
+        controller.release(held)
+
+        self.assertEqual((payload['success'], payload['error_type']), (False, 'Overloaded'))
+        self.assertEqual(tool(), "ran")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,183 @@
+"""
+Unit tests for the out-of-band artifact transfer channel.
+"""
+
+import http.client
+import io
+import os
+import shutil
+import stat
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+from urllib.parse import urlsplit
+
+from .artifact_transfer import (
+    ArtifactTransferService, RangeNotSatisfiable, fetch_artifact, parse_range
+)
+
+
+class TestParseRange(unittest.TestCase):
+    """Test cases for Range header parsing."""
+
+    def test_whole_file_when_not_a_single_byte_range(self):
+        """Test that missing, non-byte and multi-range headers serve the whole file."""
+        for header in (None, "", "items=0-5", "bytes=0-1,4-5"):
+            self.assertIsNone(parse_range(header, 100), header)
+
+    def test_satisfiable_ranges(self):
+        """Test closed, open-ended and suffix ranges, clamped to the file."""
+        cases = {
+            "bytes=0-99": (0, 99),
+            "bytes=10-19": (10, 19),
+            "bytes=990-5000": (990, 999),
+            "bytes=500-": (500, 999),
+            "bytes=999-": (999, 999),
+            "bytes=-100": (900, 999),
+            "bytes=-5000": (0, 999),
+        }
+        for header, expected in cases.items():
+            self.assertEqual(parse_range(header, 1000), expected, header)
+
+    def test_unsatisfiable_ranges(self):
+        """Test ranges outside the file or malformed, which are answered with 416."""
+        for header, size in (("bytes=1000-", 1000), ("bytes=5-2", 1000), ("bytes=abc-", 1000),
+                             ("bytes=-0", 1000), ("bytes=-", 1000), ("bytes=0-", 0), ("bytes=-10", 0)):
+            with self.assertRaises(RangeNotSatisfiable, msg=header):
+                parse_range(header, size)
+
+
+class _TransferCases:
+    """Transfers every endpoint must serve; mixed into a TestCase per transport."""
+
+    def setUp(self):
+        """Set up a service and a file of known bytes."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.data = bytes(range(256)) * 40
+        self.path = os.path.join(self.temp_dir, "data.bin")
+        with open(self.path, "wb") as f:
+            f.write(self.data)
+        self.service = self._service()
+
+    def tearDown(self):
+        """Clean up test environment."""
+        self.service.stop()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_full_and_ranged_get(self):
+        """Test whole-file and byte-range downloads, into memory or a file."""
+        handle = self.service.issue(self.path, name="report data.bin", sha256="abc")
+
+        self.assertEqual(fetch_artifact(handle.url), self.data)
+        self.assertEqual(fetch_artifact(handle.url, byte_range=(10, 19)), self.data[10:20])
+        self.assertEqual(fetch_artifact(handle.url, byte_range=(10000, None)), self.data[10000:])
+
+        destination = os.path.join(self.temp_dir, "copy.bin")
+        self.assertEqual(fetch_artifact(handle.url, destination, chunk_size=1000), len(self.data))
+        with open(destination, "rb") as f:
+            self.assertEqual(f.read(), self.data)
+
+        # The server thread records a transfer after the client may already have read it
+        deadline = time.monotonic() + 5
+        while self.service.get_stats()['transfers'] < 4 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        stats = self.service.get_stats()
+        self.assertEqual((stats['transfers'], stats['partial_transfers']), (4, 2))
+        self.assertEqual(stats['bytes_sent'], 2 * len(self.data) + 10 + len(self.data) - 10000)
+
+    def test_expired_and_unknown_handles_return_404(self):
+        """Test that an expired, revoked or unknown token is not served."""
+        expired = self.service.issue(self.path)
+        revoked = self.service.issue(self.path)
+        expired.expires_at = time.time() - 1
+        self.service.revoke(revoked.token)
+
+        for url in (expired.url, revoked.url, expired.url.rsplit("/", 1)[0] + "/unknown"):
+            with self.assertRaisesRegex(OSError, "HTTP 404"):
+                fetch_artifact(url)
+        self.assertIsNone(self.service.resolve(expired.token))
+
+    def test_removed_file_returns_410(self):
+        """Test that a handle whose file was deleted reports it gone."""
+        handle = self.service.issue(self.path)
+        os.unlink(self.path)
+
+        with self.assertRaisesRegex(OSError, "HTTP 410"):
+            fetch_artifact(handle.url)
+
+    def test_ttl_clamped_to_maximum(self):
+        """Test that a requested lifetime beyond max_ttl is cut down to it."""
+        self.service.max_ttl = 60
+        before = time.time()
+
+        self.assertLessEqual(self.service.issue(self.path, ttl=86400).expires_at, before + 61)
+        self.assertGreater(self.service.issue(self.path, ttl=30).expires_at, before + 29)
+        with self.assertRaises(ValueError):
+            self.service.issue(self.path, ttl=0)
+
+
+class TestTCPTransfer(_TransferCases, unittest.TestCase):
+    """Test cases for the loopback TCP endpoint."""
+
+    def _service(self):
+        return ArtifactTransferService()
+
+    def _request(self, url, headers):
+        parts = urlsplit(url)
+        conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=10)
+        try:
+            conn.request("GET", parts.path, headers=headers)
+            response = conn.getresponse()
+            return response.status, dict(response.getheaders()), response.read()
+        finally:
+            conn.close()
+
+    def test_range_response_headers(self):
+        """Test the 200, 206 and 416 responses and their headers."""
+        handle = self.service.issue(self.path, name="report data.bin", mime_type="video/mp4", sha256="abc")
+        self.assertTrue(handle.url.startswith("http://127.0.0.1:"))
+
+        status, headers, body = self._request(handle.url, {})
+        self.assertEqual((status, headers["Content-Length"], headers["Accept-Ranges"]),
+                         (200, str(len(self.data)), "bytes"))
+        self.assertEqual(headers["Content-Type"], "video/mp4")
+        self.assertEqual(headers["X-Content-SHA256"], "abc")
+        self.assertEqual(headers["Content-Disposition"], "attachment; filename*=UTF-8''report%20data.bin")
+
+        status, headers, body = self._request(handle.url, {"Range": "bytes=-16"})
+        self.assertEqual((status, headers["Content-Range"], body),
+                         (206, f"bytes {len(self.data) - 16}-{len(self.data) - 1}/{len(self.data)}",
+                          self.data[-16:]))
+
+        status, headers, body = self._request(handle.url, {"Range": f"bytes={len(self.data)}-"})
+        self.assertEqual((status, headers["Content-Range"], body), (416, f"bytes */{len(self.data)}", b""))
+
+
+class TestUnixSocketTransfer(_TransferCases, unittest.TestCase):
+    """Test cases for the Unix socket endpoint."""
+
+    def _service(self):
+        self.socket_path = os.path.join(self.temp_dir, "run", "transfer.sock")
+        return ArtifactTransferService(unix_socket=self.socket_path)
+
+    def test_socket_private_and_removed_on_stop(self):
+        """Test that the socket is owner-only, addressed by http+unix URLs and unlinked on stop."""
+        # The process-wide umask must not be touched while other threads create files
+        with patch("os.umask", side_effect=AssertionError("umask changed")):
+            handle = self.service.issue(self.path)
+
+        self.assertTrue(handle.url.startswith("http+unix://"))
+        self.assertEqual(stat.S_IMODE(os.stat(self.socket_path).st_mode), 0o600)
+        self.assertEqual(os.listdir(os.path.dirname(self.socket_path)), ["transfer.sock"])
+        out = io.BytesIO()
+        self.assertEqual(fetch_artifact(handle.url, out, byte_range=(0, 99)), 100)
+        self.assertEqual(out.getvalue(), self.data[:100])
+
+        self.service.stop()
+        self.assertFalse(os.path.exists(self.socket_path))
+        self.assertIsNone(self.service.resolve(handle.token))
+
+
+if __name__ == '__main__':
+    unittest.main()
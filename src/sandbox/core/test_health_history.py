@@ -0,0 +1,104 @@
+"""
+Unit tests for the multi-resolution health history.
+"""
+
+import unittest
+
+from .health_history import HealthHistory
+
+
+class TestRingBuffer(unittest.TestCase):
+    """Test cases for a single ring-buffer tier."""
+
+    def setUp(self):
+        """Set up a five-slot history."""
+        self.history = HealthHistory(["cpu", "status"], max_columns=["status"], tiers=((1, 5),))
+
+    def test_wraparound_keeps_newest_in_order(self):
+        """Test that every head position yields the newest rows, oldest first."""
+        for count in range(1, 13):
+            self.history.record(100 + count - 1, {"cpu": count})
+
+            kept = list(range(max(0, count - 5), count))
+            rows = self.history.query(0)
+            self.assertEqual([r["timestamp"] for r in rows], [100.0 + i for i in kept], count)
+            self.assertEqual([r["cpu"] for r in rows], [i + 1.0 for i in kept])
+            self.assertEqual(len(self.history), len(kept))
+
+    def test_range_query_across_the_wrap(self):
+        """Test half-open ranges whose rows span the end and start of the buffer."""
+        for t in range(100, 108):
+            self.history.record(t, {"cpu": t})
+        self.assertEqual(self.history.tiers[0].head, 3)
+
+        self.assertEqual([r["timestamp"] for r in self.history.query(104, 107)], [104.0, 105.0, 106.0])
+        self.assertEqual([r["timestamp"] for r in self.history.query(106)], [106.0, 107.0])
+        self.assertEqual(self.history.query(200), [])
+        self.assertEqual(self.history.query(0, 103), [])
+
+    def test_samples_within_a_bucket_replace(self):
+        """Test that a second sample in the same second overwrites the first."""
+        self.history.record(10.2, {"cpu": 1})
+        self.history.record(10.7, {"cpu": 2, "unknown": 5})
+
+        self.assertEqual(len(self.history), 1)
+        self.assertEqual(self.history.latest(), {"timestamp": 10.0, "resolution": 1, "cpu": 2.0, "status": None})
+
+    def test_memory_fixed_by_capacity(self):
+        """Test that recording never grows the buffers."""
+        before = self.history.memory_bytes()
+        for t in range(1000):
+            self.history.record(t, {"cpu": t, "status": 0})
+        self.assertEqual(self.history.memory_bytes(), before)
+
+
+class TestTierRollup(unittest.TestCase):
+    """Test cases for downsampling into coarser tiers."""
+
+    def test_closed_buckets_roll_up_by_mean_and_max(self):
+        """Test that coarse rows average value columns and keep the worst status."""
+        history = HealthHistory(["cpu", "status"], max_columns=["status"], tiers=((1, 30), (10, 10)))
+        for t in range(60):
+            history.record(t, {"cpu": t, "status": 2 if t == 23 else 0})
+
+        rows = history.query(0)
+
+        # Buckets 0-20 come from the coarse tier, 30-59 at full resolution; 50 is still open
+        self.assertEqual([(r["timestamp"], r["resolution"]) for r in rows[:3]],
+                         [(0.0, 10), (10.0, 10), (20.0, 10)])
+        self.assertEqual([r["cpu"] for r in rows[:3]], [4.5, 14.5, 24.5])
+        self.assertEqual([r["status"] for r in rows[:3]], [0.0, 0.0, 2.0])
+        self.assertEqual([r["timestamp"] for r in rows[3:]], [float(t) for t in range(30, 60)])
+        self.assertTrue(all(r["resolution"] == 1 for r in rows[3:]))
+        self.assertEqual(history.tiers[1].size, 5)
+
+    def test_missing_values_ignored_in_means(self):
+        """Test that NaN gaps do not drag the mean down and an all-missing bucket stays empty."""
+        history = HealthHistory(["cpu", "memory"], tiers=((1, 2), (10, 4)))
+        for t in range(20):
+            history.record(t, {"cpu": 10.0 if t % 2 else None})
+
+        row = history.query(0, 10)[0]
+
+        self.assertEqual((row["timestamp"], row["cpu"], row["memory"]), (0.0, 10.0, None))
+
+    def test_three_tiers_served_finest_first(self):
+        """Test that each span of a long range comes from the finest tier still holding it."""
+        history = HealthHistory(["cpu"], tiers=((1, 10), (10, 6), (60, 5)))
+        for t in range(300):
+            history.record(t, {"cpu": t})
+
+        rows = history.query(0)
+
+        self.assertEqual([(r["timestamp"], r["resolution"]) for r in rows],
+                         [(float(t), 60) for t in (0, 60, 120, 180)] +
+                         [(float(t), 10) for t in range(230, 290, 10)] +
+                         [(float(t), 1) for t in range(290, 300)])
+        self.assertEqual(rows[0]["cpu"], 29.5)
+        self.assertEqual(rows[4]["cpu"], 234.5)
+        self.assertEqual([r["timestamp"] for r in history.query(250, 295)],
+                         [250.0, 260.0, 270.0, 280.0, 290.0, 291.0, 292.0, 293.0, 294.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
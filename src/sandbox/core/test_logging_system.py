@@ -0,0 +1,221 @@
+"""
+Unit tests for the structured logging pipeline.
+"""
+
+import json
+import math
+import random
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+import uuid
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import Mock
+
+from .logging_system import (
+    LatencyHistogram, LogLevel, PerformanceMetrics, PerformanceMonitor, RateMeter, StructuredLogger
+)
+
+
+class TestStructuredLogger(unittest.TestCase):
+    """Test cases for StructuredLogger batching, dropping and shutdown."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.loggers = []
+
+    def tearDown(self):
+        """Clean up test environment."""
+        for structured_logger in self.loggers:
+            structured_logger.cleanup()
+            for handler in structured_logger.logger.handlers[:]:
+                handler.close()
+                structured_logger.logger.removeHandler(handler)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _logger(self, **kwargs) -> StructuredLogger:
+        structured_logger = StructuredLogger(f"test-{uuid.uuid4().hex[:8]}", log_dir=Path(self.temp_dir), **kwargs)
+        self.loggers.append(structured_logger)
+        return structured_logger
+
+    def _lines(self, structured_logger):
+        path = Path(self.temp_dir) / f"{structured_logger.name}_structured.jsonl"
+        return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+    def test_entries_written_in_batches(self):
+        """Test that queued entries are written batch_size at a time, in order."""
+        structured_logger = self._logger(batch_size=10, flush_interval=0.5)
+        for i in range(25):
+            structured_logger.debug(f"entry {i}", component="test", step=i)
+
+        self.assertTrue(structured_logger.flush())
+
+        stats = structured_logger.get_stats()
+        self.assertEqual((stats["enqueued"], stats["written"], stats["batches"]), (25, 25, 3))
+        self.assertEqual(stats["queued"], 0)
+        lines = self._lines(structured_logger)
+        self.assertEqual([line["message"] for line in lines], [f"entry {i}" for i in range(25)])
+        self.assertEqual(lines[3]["metadata"], {"step": 3})
+        self.assertEqual(lines[3]["level"], LogLevel.DEBUG.value)
+
+    def test_full_queue_drops_and_reports(self):
+        """Test that entries logged onto a full queue are counted and reported once."""
+        structured_logger = self._logger(max_queue_size=5, flush_interval=0.01)
+        writing, release = threading.Event(), threading.Event()
+        write_batch = structured_logger._write_batch
+
+        def blocked_write(entries):
+            writing.set()
+            release.wait(5)
+            write_batch(entries)
+        structured_logger._write_batch = blocked_write
+
+        structured_logger.info("first")
+        self.assertTrue(writing.wait(5))
+        for i in range(8):
+            structured_logger.info(f"queued {i}")
+        self.assertEqual(structured_logger.get_stats()["dropped"], 3)
+
+        release.set()
+        self.assertTrue(structured_logger.flush())
+
+        stats = structured_logger.get_stats()
+        self.assertEqual((stats["enqueued"], stats["dropped"]), (6, 3))
+        messages = [line["message"] for line in self._lines(structured_logger)]
+        self.assertEqual([m for m in messages if not m.startswith("Log queue full")],
+                         ["first"] + [f"queued {i}" for i in range(5)])
+        warnings = [line for line in self._lines(structured_logger) if line["component"] == "logging"]
+        self.assertEqual([w["metadata"] for w in warnings], [{"dropped": 3}])
+
+    def test_cleanup_flushes_pending_entries(self):
+        """Test that shutdown writes everything still queued without waiting out the batch interval."""
+        structured_logger = self._logger(batch_size=1000, flush_interval=30)
+        for i in range(20):
+            structured_logger.warning(f"pending {i}")
+
+        started = time.monotonic()
+        structured_logger.cleanup()
+
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertFalse(structured_logger.log_thread.is_alive())
+        self.assertEqual(len(self._lines(structured_logger)), 20)
+        self.assertEqual(structured_logger.get_stats()["written"], 20)
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    """Test cases for the log-bucketed latency histogram."""
+
+    def test_percentiles_within_relative_error(self):
+        """Test that every percentile is within relative_error of the exact nearest-rank value."""
+        rng = random.Random(7)
+        for relative_error in (0.01, 0.02, 0.05):
+            histogram = LatencyHistogram(relative_error=relative_error)
+            values = [math.exp(rng.uniform(math.log(0.01), math.log(60000))) for _ in range(5000)]
+            for value in values:
+                histogram.record(value)
+            values.sort()
+
+            for q in (1, 10, 25, 50, 75, 90, 95, 99, 99.9, 100):
+                exact = values[max(1, math.ceil(q / 100 * len(values))) - 1]
+                self.assertLessEqual(abs(histogram.percentile(q) - exact) / exact, relative_error + 1e-9,
+                                     (relative_error, q))
+
+    def test_error_bound_holds_at_bucket_edges(self):
+        """Test the worst case: the true value at either edge of its bucket."""
+        for relative_error in (0.01, 0.02, 0.05):
+            histogram = LatencyHistogram(relative_error=relative_error)
+            growth = (1 + relative_error) / (1 - relative_error)
+            lower, upper = histogram.min_ms * growth ** 100, histogram.min_ms * growth ** 101
+            # Both land in the bucket (lower, upper]; the clamp to the seen range cannot help
+            for value in (lower * (1 + 1e-9), upper * (1 - 1e-9)):
+                histogram.record(value)
+
+            for q, exact in ((50, lower), (100, upper)):
+                self.assertLessEqual(abs(histogram.percentile(q) - exact) / exact, relative_error * (1 + 1e-6))
+
+    def test_bucket_edges(self):
+        """Test bucket bounds, clamping to the seen range and cumulative counts."""
+        histogram = LatencyHistogram()
+        self.assertEqual(histogram.percentile(50), 0.0)
+        for value in (0.0005, 1.0, 1.0, 250.0, 10_000_000.0):
+            histogram.record(value)
+
+        self.assertEqual(histogram.count, 5)
+        # Values below min_ms share the first bucket, values above max_ms the last
+        self.assertEqual(histogram.percentile(0), histogram.min_ms)
+        self.assertLessEqual(abs(histogram.percentile(100) - histogram.max_ms) / histogram.max_ms, 0.02)
+        self.assertEqual(histogram.max_seen, 10_000_000.0)
+        self.assertEqual(histogram.cumulative_counts([0.001, 1.1, 1000, histogram.max_ms]), [1, 3, 4, 5])
+        self.assertEqual(histogram.mean, sum((0.0005, 1.0, 1.0, 250.0, 10_000_000.0)) / 5)
+
+
+class TestRateMeter(unittest.TestCase):
+    """Test cases for the EWMA rate meter."""
+
+    def test_rate_decays_exponentially(self):
+        """Test that an idle meter decays by exp(-elapsed / window) per tick."""
+        meter = RateMeter(window_seconds=60, tick_seconds=5)
+        start = meter._last_tick
+        meter.mark(50)
+        meter.tick(start + 2)
+        self.assertEqual(meter.rate, 0.0)
+
+        meter.tick(start + 5)
+        self.assertAlmostEqual(meter.rate, 10.0)
+
+        for step in range(1, 13):
+            meter.tick(start + 5 + 5 * step)
+        self.assertAlmostEqual(meter.rate, 10.0 * math.exp(-1))
+
+    def test_rate_converges_to_steady_input(self):
+        """Test that a constant event rate pulls the average to that rate."""
+        meter = RateMeter(window_seconds=60, tick_seconds=5)
+        now = meter._last_tick
+        meter.mark(100)
+        meter.tick(now + 5)
+        for _ in range(200):
+            now += 5
+            meter.mark(10)
+            meter.tick(now)
+        self.assertAlmostEqual(meter.rate, 2.0, places=4)
+
+
+class TestPerformanceMonitor(unittest.TestCase):
+    """Test cases for the PerformanceMonitor summary."""
+
+    def setUp(self):
+        """Set up a monitor whose background sampling is stopped."""
+        self.monitor = PerformanceMonitor(Mock(), sample_interval=3600)
+        self.monitor.cleanup()
+        self.monitor.monitor_thread.join(5)
+
+    def _sample(self, memory_mb: float, cpu_percent: float):
+        self.monitor.latest_sample = PerformanceMetrics(
+            timestamp=datetime.now(), component="system", operation="monitor", duration_ms=0,
+            memory_usage_mb=memory_mb, cpu_usage_percent=cpu_percent, success=True)
+
+    def test_summary_reports_resource_averages(self):
+        """Test that components average the resource usage in effect when each operation ran."""
+        self._sample(100.0, 10.0)
+        self.monitor.record_operation("executor", "run", 4.0)
+        self.monitor.record_operation("executor", "run", 6.0, success=False)
+        self._sample(400.0, 40.0)
+        self.monitor.record_operation("executor", "install", 20.0)
+
+        component = self.monitor.get_performance_summary()["components"]["executor"]
+
+        self.assertEqual(component["operations"], 3)
+        self.assertAlmostEqual(component["avg_memory_mb"], 200.0)
+        self.assertAlmostEqual(component["avg_cpu_percent"], 20.0)
+        self.assertAlmostEqual(component["avg_duration_ms"], 10.0)
+        self.assertAlmostEqual(component["success_rate"], 2 / 3)
+        self.assertEqual(component["by_operation"]["run"]["avg_memory_mb"], 100.0)
+        self.assertEqual(component["by_operation"]["install"]["avg_cpu_percent"], 40.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
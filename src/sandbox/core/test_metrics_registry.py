@@ -0,0 +1,185 @@
+"""
+Unit tests for the metrics registry and OpenMetrics exposition.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from .metrics_registry import MetricFamily, MetricsRegistry
+
+
+def _requests():
+    return [MetricFamily("sandbox_requests", "counter", "Requests handled", ["method"])
+            .add(3, "GET").add(1, "POST")]
+
+
+class TestOpenMetricsExposition(unittest.TestCase):
+    """Test cases for the OpenMetrics text rendering."""
+
+    def setUp(self):
+        """Set up an empty registry."""
+        self.registry = MetricsRegistry()
+
+    def test_render_matches_exposition_format(self):
+        """Test metadata lines, sample suffixes, label and help escaping, and the EOF marker."""
+        duration = MetricFamily("sandbox_duration_seconds", "histogram", "Duration", ["tool"], unit="seconds")
+        duration.add_histogram([(0.005, 1), (1, 3)], 4, 2.5, "run")
+        self.registry.register_collector("requests", _requests)
+        self.registry.register_collector("mixed", lambda: [
+            duration,
+            MetricFamily("sandbox_queue_depth", "gauge", 'Waiting "jobs"\nper queue\\').add(2.5),
+            MetricFamily("sandbox_build", "info", "Build details", ["version"]).add(1, 'v"1"\n'),
+        ])
+
+        self.assertEqual(self.registry.render(), "\n".join([
+            "# TYPE sandbox_build info",
+            "# HELP sandbox_build Build details",
+            'sandbox_build_info{version="v\\"1\\"\\n"} 1',
+            "# TYPE sandbox_duration_seconds histogram",
+            "# UNIT sandbox_duration_seconds seconds",
+            "# HELP sandbox_duration_seconds Duration",
+            'sandbox_duration_seconds_bucket{tool="run",le="0.005"} 1',
+            'sandbox_duration_seconds_bucket{tool="run",le="1.0"} 3',
+            'sandbox_duration_seconds_bucket{tool="run",le="+Inf"} 4',
+            'sandbox_duration_seconds_count{tool="run"} 4',
+            'sandbox_duration_seconds_sum{tool="run"} 2.5',
+            "# TYPE sandbox_queue_depth gauge",
+            '# HELP sandbox_queue_depth Waiting \\"jobs\\"\\nper queue\\\\',
+            "sandbox_queue_depth 2.5",
+            "# TYPE sandbox_requests counter",
+            "# HELP sandbox_requests Requests handled",
+            'sandbox_requests_total{method="GET"} 3',
+            'sandbox_requests_total{method="POST"} 1',
+            "# EOF",
+            "",
+        ]))
+
+    def test_special_values(self):
+        """Test NaN, infinities and large integers."""
+        self.registry.register_collector("values", lambda: [
+            MetricFamily("sandbox_value", "gauge", "Value", ["case"])
+            .add(float("nan"), "nan").add(float("inf"), "inf").add(float("-inf"), "-inf")
+            .add(1e20, "large").add(-3, "negative")
+        ])
+
+        samples = [line for line in self.registry.render().splitlines() if not line.startswith("#")]
+
+        self.assertEqual(samples, [
+            'sandbox_value{case="nan"} NaN',
+            'sandbox_value{case="inf"} +Inf',
+            'sandbox_value{case="-inf"} -Inf',
+            'sandbox_value{case="large"} 1e+20',
+            'sandbox_value{case="negative"} -3',
+        ])
+
+    def test_empty_registry_renders_eof(self):
+        """Test that an exposition with no metrics is still terminated."""
+        self.assertEqual(self.registry.render(), "# EOF\n")
+
+    def test_invalid_families_rejected(self):
+        """Test names, types, units and labels the format does not allow."""
+        for args, kwargs in [
+            (("1_bad", "gauge", ""), {}),
+            (("sandbox_x", "summary-ish", ""), {}),
+            (("sandbox_x", "gauge", ""), {"unit": "seconds"}),
+            (("sandbox_x", "gauge", "", ["le"]), {}),
+            (("sandbox_x", "gauge", "", ["bad-label"]), {}),
+        ]:
+            with self.assertRaises(ValueError, msg=args):
+                MetricFamily(*args, **kwargs)
+
+        family = MetricFamily("sandbox_x", "gauge", "", ["a", "b"])
+        with self.assertRaises(ValueError):
+            family.add(1, "only-one")
+        with self.assertRaises(ValueError):
+            family.add_histogram([], 0, 0, "a", "b")
+
+
+class TestCollectorRegistration(unittest.TestCase):
+    """Test cases for registering and merging collectors."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.registry = MetricsRegistry(max_series_per_family=3)
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_register_replace_and_unregister(self):
+        """Test that collectors are keyed by name and run on every scrape."""
+        calls = []
+
+        def counting():
+            calls.append(1)
+            return _requests()
+
+        self.registry.register_collector("b", counting)
+        self.registry.register_collector("a", lambda: [])
+        self.registry.register_collector("b", counting)
+        self.assertEqual(self.registry.collector_names(), ["a", "b"])
+
+        self.registry.collect()
+        self.registry.collect()
+        self.assertEqual(len(calls), 2)
+
+        self.assertTrue(self.registry.unregister_collector("b"))
+        self.assertFalse(self.registry.unregister_collector("b"))
+        self.assertEqual(self.registry.collect(), [])
+
+    def test_failing_collector_skipped(self):
+        """Test that one broken collector does not hide the others."""
+        def broken():
+            raise RuntimeError("boom")
+
+        self.registry.register_collector("broken", broken)
+        self.registry.register_collector("requests", _requests)
+
+        with self.assertLogs("sandbox.core.metrics_registry", "WARNING"):
+            families = self.registry.collect()
+
+        self.assertEqual([f.name for f in families], ["sandbox_requests"])
+
+    def test_families_merged_across_collectors(self):
+        """Test that matching families merge and conflicting redefinitions are dropped."""
+        self.registry.register_collector("first", _requests)
+        self.registry.register_collector("second", lambda: [
+            MetricFamily("sandbox_requests", "counter", "Requests handled", ["method"]).add(2, "PUT")])
+        self.registry.register_collector("third", lambda: [
+            MetricFamily("sandbox_requests", "gauge", "Requests handled", ["method"]).add(9, "GET")])
+
+        with self.assertLogs("sandbox.core.metrics_registry", "WARNING"):
+            families = self.registry.collect()
+
+        self.assertEqual(len(families), 1)
+        self.assertEqual([(labels, value) for _, labels, value in families[0].samples],
+                         [((("method", "GET"),), 3.0), ((("method", "POST"),), 1.0),
+                          ((("method", "PUT"),), 2.0)])
+
+    def test_series_capped_per_family(self):
+        """Test that a family with unbounded labels is truncated."""
+        family = MetricFamily("sandbox_sessions", "gauge", "Per session", ["session"])
+        for i in range(10):
+            family.add(i, f"s{i}")
+        self.registry.register_collector("sessions", lambda: [family])
+
+        with self.assertLogs("sandbox.core.metrics_registry", "WARNING"):
+            self.assertEqual(len(self.registry.collect()[0].samples), 3)
+
+    def test_write_to_file(self):
+        """Test that the file exporter writes the rendered exposition."""
+        self.registry.register_collector("requests", _requests)
+        path = os.path.join(self.temp_dir, "metrics", "sandbox.prom")
+
+        self.registry.write_to_file(path)
+
+        with open(path, encoding="utf-8") as f:
+            self.assertEqual(f.read(), self.registry.render())
+        self.assertEqual(os.listdir(os.path.dirname(path)), ["sandbox.prom"])
+
+
+if __name__ == '__main__':
+    unittest.main()
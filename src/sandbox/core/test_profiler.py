@@ -0,0 +1,94 @@
+"""
+Unit tests for the sampling profiler.
+"""
+
+import sys
+import time
+import unittest
+from unittest.mock import Mock
+
+from .profiler import ProfileResult, SamplingProfiler
+
+
+def _spin(seconds: float):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def _workload():
+    _spin(0.15)
+    _nested()
+
+
+def _nested():
+    _spin(0.15)
+
+
+class TestCollapsedStacks(unittest.TestCase):
+    """Test cases for the collapsed stack output."""
+
+    def test_collapsed_format_and_order(self):
+        """Test one "root;...;leaf count" line per stack, most samples first."""
+        result = ProfileResult(interval=0.01, duration=1.0, sample_count=6,
+                               stacks={"main;b": 2, "main;a;c": 3, "main;a": 1})
+
+        self.assertEqual(result.to_collapsed(), "main;a;c 3\nmain;b 2\nmain;a 1\n")
+        self.assertEqual([f["frame"] for f in result.top_frames()], ["c", "b", "a"])
+        self.assertEqual(ProfileResult(interval=0.01, duration=0, sample_count=0).to_collapsed(), "")
+
+    def test_profiled_stacks_start_below_caller(self):
+        """Test that real samples are rooted at the profiled code and exclude the profiler."""
+        with SamplingProfiler(interval=0.002) as profiler:
+            _workload()
+        result = profiler.result
+
+        self.assertGreater(result.sample_count, 10)
+        lines = result.to_collapsed().splitlines()
+        self.assertEqual(sum(int(line.rsplit(" ", 1)[1]) for line in lines), result.sample_count)
+        for line in lines:
+            stack = line.rsplit(" ", 1)[0]
+            self.assertTrue(stack.startswith("_workload (test_profiler.py:"), stack)
+            self.assertNotIn("profiler.py:", stack.replace("test_profiler.py:", ""))
+            self.assertNotIn("threading.py", stack)
+        self.assertTrue(any("_nested (test_profiler.py:" in line for line in lines))
+
+
+class TestProfilerFrameFiltering(unittest.TestCase):
+    """Test cases for discarding the profiler's own frames."""
+
+    def setUp(self):
+        """Set up a started profiler whose sampler never fires."""
+        self.profiler = SamplingProfiler(interval=3600)
+        self.profiler.start()
+        self.sampler = self.profiler._thread
+
+    def tearDown(self):
+        """Clean up test environment."""
+        self.profiler._stop_event.set()
+        self.sampler.join(5)
+
+    def test_samples_inside_stop_are_discarded(self):
+        """Test that a sample taken while the profiled thread waits in stop() is not counted."""
+        self.profiler._record(sys._getframe())
+        self.assertEqual(self.profiler._sample_count, 1)
+
+        # The sampler fires while the profiled thread is joining it in stop()
+        self.profiler._thread = Mock()
+        self.profiler._thread.join.side_effect = lambda: self.profiler._record(sys._getframe())
+        result = self.profiler.stop()
+
+        self.assertEqual(result.sample_count, 1)
+        self.assertEqual(len(result.stacks), 1)
+        self.assertNotIn("stop (", next(iter(result.stacks)))
+
+    def test_sampler_thread_frames_are_discarded(self):
+        """Test that the sampler thread's own stack is never recorded."""
+        self.profiler._record(sys._current_frames()[self.sampler.ident])
+
+        self.assertEqual(self.profiler._sample_count, 0)
+        self.assertEqual(self.profiler._stacks, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
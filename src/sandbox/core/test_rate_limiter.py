@@ -0,0 +1,154 @@
+"""
+Unit tests for the GCRA rate limiter.
+"""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from ..intelligent.config import SandboxConfig
+from .connection_manager import initialize_connection_manager
+from .rate_limiter import MemoryBackend, RateLimit, RateLimiter, SQLiteBackend
+
+
+class _LimiterCases:
+    """GCRA behaviour every backend must share; mixed into a TestCase per backend."""
+
+    def setUp(self):
+        """Set up a limiter on a clock the test advances."""
+        self.clock = 1_000_000.0
+        self.limiter = self._limiter()
+
+    def _limiter(self) -> RateLimiter:
+        backend = self._backend()
+        backend.now = lambda: self.clock
+        return RateLimiter(backend)
+
+    def _burst(self, limiter, key, limit, attempts):
+        return [limiter.is_allowed(key, limit)[0] for _ in range(attempts)]
+
+    def test_burst_then_reject(self):
+        """Test that a full burst passes at once and the next request waits one interval."""
+        limit = RateLimit(60, period=60, burst=5)
+
+        self.assertEqual(self._burst(self.limiter, "k", limit, 5), [True] * 5)
+        allowed, retry_after = self.limiter.is_allowed("k", limit)
+
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(retry_after, 1.0)
+
+    def test_default_burst_is_a_full_period(self):
+        """Test that without a burst, rate requests fit in one instant."""
+        limit = RateLimit(60, period=60)
+
+        self.assertEqual(self._burst(self.limiter, "k", limit, 61), [True] * 60 + [False])
+
+    def test_refill_at_rate_up_to_burst(self):
+        """Test that capacity returns one request per interval and never beyond the burst."""
+        limit = RateLimit(2, period=1, burst=3)
+        self._burst(self.limiter, "k", limit, 3)
+
+        self.clock += 0.5
+        self.assertEqual(self._burst(self.limiter, "k", limit, 2), [True, False])
+
+        self.clock += 60
+        self.assertEqual(self._burst(self.limiter, "k", limit, 4), [True, True, True, False])
+
+    def test_all_or_nothing_across_keys(self):
+        """Test that a request rejected by one limit consumes none of the others."""
+        roomy, tight = RateLimit(10, burst=10), RateLimit(1, burst=1)
+        self.assertTrue(self.limiter.acquire([("a", roomy), ("b", tight)])[0])
+        for _ in range(5):
+            self.assertFalse(self.limiter.acquire([("a", roomy), ("b", tight)])[0])
+
+        self.assertEqual(self._burst(self.limiter, "a", roomy, 10), [True] * 9 + [False])
+        self.assertEqual(self.limiter.get_stats()['rejected'], 6)
+
+    def test_cost_and_reset(self):
+        """Test weighted requests and that reset restores the full burst."""
+        limit = RateLimit(1, burst=4)
+        self.assertTrue(self.limiter.acquire([("k", limit)], cost=3)[0])
+        self.assertFalse(self.limiter.acquire([("k", limit)], cost=2)[0])
+
+        self.limiter.reset("k")
+        self.assertTrue(self.limiter.acquire([("k", limit)], cost=4)[0])
+
+    def test_idle_keys_evicted(self):
+        """Test that keys whose TAT has passed are dropped without changing decisions."""
+        limit = RateLimit(1, burst=2)
+        for key in ("a", "b"):
+            self.limiter.is_allowed(key, limit)
+        self.assertEqual(self.limiter.get_stats()['tracked_keys'], 2)
+
+        self.clock += 10
+        self.assertEqual(self.limiter.evict_idle(), 2)
+        self.assertEqual(self.limiter.get_stats()['tracked_keys'], 0)
+        self.assertEqual(self._burst(self.limiter, "a", limit, 3), [True, True, False])
+
+
+class TestMemoryBackend(_LimiterCases, unittest.TestCase):
+    """Test cases for the in-process backend."""
+
+    def _backend(self):
+        return MemoryBackend()
+
+
+class TestSQLiteBackend(_LimiterCases, unittest.TestCase):
+    """Test cases for the shared SQLite backend."""
+
+    def setUp(self):
+        """Set up a state file shared by the limiters."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "state", "limits.db")
+        super().setUp()
+
+    def tearDown(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _backend(self):
+        return SQLiteBackend(self.path)
+
+    def test_limiters_share_state(self):
+        """Test that two limiters on one file, as in two processes, draw from one burst."""
+        other = self._limiter()
+        limit = RateLimit(60, period=60, burst=4)
+
+        decisions = [limiter.is_allowed("shared", limit)[0] for limiter in (self.limiter, other) * 3]
+
+        self.assertEqual(decisions, [True] * 4 + [False] * 2)
+        self.assertEqual(other.get_stats()['tracked_keys'], 1)
+
+    def test_backend_errors_fail_open(self):
+        """Test that an unavailable store allows the request and counts the error."""
+        with patch.object(self.limiter.backend, "update", side_effect=sqlite3.OperationalError("locked")):
+            self.assertEqual(self.limiter.is_allowed("k", RateLimit(1, burst=1)), (True, 0.0))
+        self.assertEqual(self.limiter.get_stats()['errors'], 1)
+
+
+class TestConnectionDefaults(unittest.TestCase):
+    """Test cases for the limits built from the default configuration."""
+
+    def test_default_burst_allows_a_full_window(self):
+        """Test that connections may still burst a full minute's requests, as before GCRA."""
+        config = SandboxConfig()
+        config.rate_limits.tool_requests_per_minute = {"execute": 20}
+
+        manager = initialize_connection_manager(config)
+
+        per_minute = manager.connection_rate_limits[0]
+        self.assertIsNone(config.rate_limits.burst_limit)
+        self.assertAlmostEqual(per_minute.tolerance / per_minute.emission_interval, 60)
+        tool = manager.tool_rate_limits["execute"]
+        self.assertAlmostEqual(tool.tolerance / tool.emission_interval, 20)
+
+        config.rate_limits.burst_limit = 5
+        tool = initialize_connection_manager(config).tool_rate_limits["execute"]
+        self.assertAlmostEqual(tool.tolerance / tool.emission_interval, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+"""
+Unit tests for the core workspace manager.
+"""
+
+import shutil
+import tempfile
+import threading
+import unittest
+from datetime import datetime
+from unittest.mock import Mock, patch
+
+from ..intelligent.workspace.env_cache import EnvironmentCache
+from ..intelligent.workspace.lifecycle import LifecycleEvent, LifecycleEventData
+from .workspace_manager import Workspace, WorkspaceConfig, WorkspaceManager
+
+
+class TestWorkspaceManager(unittest.TestCase):
+    """Test cases for WorkspaceManager tracking and eviction."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.manager = WorkspaceManager(base_workspace_dir=self.temp_dir,
+                                        enable_intelligent_features=False,
+                                        max_concurrent_workspaces=2)
+
+    def tearDown(self):
+        """Clean up test environment."""
+        self.manager.shutdown()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _create(self, workspace_id: str) -> Workspace:
+        return self.manager.create_workspace(
+            workspace_id, config=WorkspaceConfig(workspace_id=workspace_id, use_isolation=False))
+
+    def _track_session_workspace(self, workspace_id: str) -> Workspace:
+        workspace = Workspace(workspace_id=workspace_id, workspace_path=self.manager.base_workspace_dir,
+                              session=Mock())
+        with self.manager._lock:
+            self.manager._workspaces[workspace_id] = workspace
+        return workspace
+
+    def test_lru_eviction_at_capacity(self):
+        """Test that the least recently accessed workspace makes room for a new one."""
+        self._create("first")
+        self._create("second")
+        self.manager.get_workspace("first")
+
+        self._create("third")
+
+        ids = {w.workspace_id for w in self.manager.list_workspaces()}
+        self.assertEqual(ids, {"first", "third"})
+        self.assertFalse((self.manager.base_workspace_dir / "second").exists())
+
+    def test_session_ended_stops_tracking(self):
+        """Test that a SESSION_ENDED event drops only session-backed workspaces."""
+        self._track_session_workspace("isolated")
+        self._create("simple")
+
+        for workspace_id in ("isolated", "simple", "unknown"):
+            self.manager._on_lifecycle_event(
+                LifecycleEventData(LifecycleEvent.SESSION_ENDED, workspace_id, datetime.now()))
+        self.manager._on_lifecycle_event(
+            LifecycleEventData(LifecycleEvent.WORKSPACE_CREATED, "simple", datetime.now()))
+
+        self.assertEqual([w.workspace_id for w in self.manager.list_workspaces()], ["simple"])
+
+    def test_lifecycle_events_concurrent_with_access(self):
+        """Test that events from other threads do not disturb readers of the workspace map."""
+        self.manager._max_concurrent = 1000
+        errors = []
+
+        def churn(prefix):
+            try:
+                for i in range(300):
+                    workspace_id = f"{prefix}-{i}"
+                    self._track_session_workspace(workspace_id)
+                    self.manager._on_lifecycle_event(
+                        LifecycleEventData(LifecycleEvent.SESSION_ENDED, workspace_id, datetime.now()))
+            except Exception as e:
+                errors.append(e)
+
+        def read():
+            try:
+                for _ in range(300):
+                    for workspace in self.manager.list_workspaces():
+                        self.manager.get_workspace(workspace.workspace_id)
+                    self.manager.get_statistics()
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=churn, args=("a",)),
+                   threading.Thread(target=churn, args=("b",)),
+                   threading.Thread(target=read), threading.Thread(target=read)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(self.manager.list_workspaces(), [])
+
+    def test_venv_template_uses_only_trusted_requirements(self):
+        """Test that workspace requirements outside the allow-list are not installed on the host."""
+        workspace_path = self.manager.base_workspace_dir / "venv"
+        workspace_path.mkdir()
+        (workspace_path / "requirements.txt").write_text("requests==2.31.0\n-e .\nevil==1.0\n")
+        self.manager._env_cache = EnvironmentCache(cache_dir=self.temp_dir + "/env_cache",
+                                                   allowed_packages=["requests"])
+
+        with patch.object(self.manager._env_cache, "clone_venv", return_value=True) as clone_venv:
+            self.assertTrue(self.manager._create_virtual_environment(workspace_path))
+
+        clone_venv.assert_called_once_with(workspace_path / ".venv", ["requests==2.31.0"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -40,6 +40,7 @@ class ExecutionContext:
     artifacts_dir: Optional[Path] = None
     execution_globals: Dict[str, Any] = field(default_factory=dict)
     session_id: Optional[str] = None
+    profiling: bool = False  # Sample Python executions and store flamegraph profiles
     
     def __post_init__(self):
         """Initialize context after creation."""
@@ -89,6 +90,17 @@ class ServerConfig:
     enable_web_apps: bool = True
     enable_intelligent_features: bool = True
     log_level: str = "INFO"
+    metrics_file: Optional[str] = None  # OpenMetrics dump in stdio mode (default: logs/metrics.prom)
+    metrics_dump_interval: float = 15.0
+    max_concurrent_executions: int = 8  # Initial adaptive concurrency limit
+    degraded_execution_timeout: int = 15  # Timeout cap for executions admitted under load
+    artifact_inline_max_bytes: int = 1024 * 1024  # Larger content may be sent via a transfer handle
+    artifact_transfer_by_default: bool = False  # Hand out transfer handles without use_transfer=True
+    artifact_transfer_host: str = "127.0.0.1"
+    artifact_transfer_port: int = 0  # 0 picks a free port
+    artifact_transfer_socket: Optional[str] = None  # Serve transfers on a Unix socket instead of TCP
+    artifact_transfer_ttl: int = 300  # Seconds a transfer handle stays valid
+    artifact_transfer_max_ttl: int = 3600  # Longest lifetime a client may request for a handle
     
     @classmethod
     def from_dict(cls, config_dict: Dict[str, Any]) -> 'ServerConfig':
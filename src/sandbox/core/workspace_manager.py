@@ -12,15 +12,20 @@ import os
 import tempfile
 import shutil
 import logging
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import Dict, Any, Optional, List
 from dataclasses import dataclass, field
 from datetime import datetime
 
 from .types import ExecutionContext, ResourceLimits, SecurityLevel
-from ..intelligent.workspace.lifecycle import WorkspaceLifecycleManager, WorkspaceSession
+from ..intelligent.workspace.lifecycle import (
+    WorkspaceLifecycleManager, WorkspaceSession, LifecycleEvent, LifecycleEventData
+)
 from ..intelligent.workspace.models import IsolationConfig, SandboxWorkspace
 from ..intelligent.workspace.security import SecurityPolicy
+from ..intelligent.workspace.env_cache import EnvironmentCache
 from ..intelligent.types import WorkspaceStatus
 
 logger = logging.getLogger(__name__)
@@ -73,7 +78,8 @@ class WorkspaceManager:
     def __init__(self, 
                  base_workspace_dir: Optional[str] = None,
                  enable_intelligent_features: bool = True,
-                 max_concurrent_workspaces: int = 10):
+                 max_concurrent_workspaces: int = 10,
+                 env_cache: Optional[EnvironmentCache] = None):
         """
         Initialize the workspace manager.
         
@@ -81,6 +87,7 @@ class WorkspaceManager:
             base_workspace_dir: Base directory for workspaces (default: temp dir)
             enable_intelligent_features: Enable intelligent workspace features
             max_concurrent_workspaces: Maximum concurrent workspaces
+            env_cache: Host-level venv template cache (created on first use if None)
         """
         # Set up base workspace directory
         if base_workspace_dir:
@@ -90,8 +97,13 @@ class WorkspaceManager:
 
         self.base_workspace_dir.mkdir(parents=True, exist_ok=True)
         
-        # Initialize workspace tracking
-        self._workspaces: Dict[str, Workspace] = {}
+        self._env_cache = env_cache
+        
+        # Initialize workspace tracking (ordered least to most recently accessed).
+        # Lifecycle events arrive on monitor and cleanup threads, so every
+        # access to _workspaces goes through _lock.
+        self._workspaces: "OrderedDict[str, Workspace]" = OrderedDict()
+        self._lock = threading.RLock()
         self._max_concurrent = max_concurrent_workspaces
         
         # Initialize intelligent workspace manager if enabled
@@ -106,6 +118,7 @@ class WorkspaceManager:
                     max_concurrent_workspaces=max_concurrent_workspaces,
                     workspace_timeout_minutes=60
                 )
+                self._lifecycle_manager.add_event_handler(self._on_lifecycle_event)
                 logger.info("Intelligent workspace features enabled")
             except Exception as e:
                 logger.warning(f"Failed to initialize intelligent features: {e}")
@@ -132,13 +145,16 @@ class WorkspaceManager:
             ValueError: If workspace ID already exists
             RuntimeError: If maximum concurrent workspaces exceeded
         """
-        if workspace_id in self._workspaces:
-            raise ValueError(f"Workspace ID already exists: {workspace_id}")
+        with self._lock:
+            if workspace_id in self._workspaces:
+                raise ValueError(f"Workspace ID already exists: {workspace_id}")
+            at_capacity = len(self._workspaces) >= self._max_concurrent
         
-        if len(self._workspaces) >= self._max_concurrent:
+        if at_capacity:
             self._cleanup_expired_workspaces()
-            if len(self._workspaces) >= self._max_concurrent:
-                raise RuntimeError(f"Maximum concurrent workspaces ({self._max_concurrent}) exceeded")
+            with self._lock:
+                if len(self._workspaces) >= self._max_concurrent:
+                    raise RuntimeError(f"Maximum concurrent workspaces ({self._max_concurrent}) exceeded")
         
         # Use provided config or create default
         if config is None:
@@ -151,7 +167,8 @@ class WorkspaceManager:
             else:
                 workspace = self._create_simple_workspace(workspace_id, source_path, config)
             
-            self._workspaces[workspace_id] = workspace
+            with self._lock:
+                self._workspaces[workspace_id] = workspace
             logger.info(f"Created workspace: {workspace_id}")
             return workspace
             
@@ -169,7 +186,10 @@ class WorkspaceManager:
         Returns:
             Workspace object if found, None otherwise
         """
-        workspace = self._workspaces.get(workspace_id)
+        with self._lock:
+            workspace = self._workspaces.get(workspace_id)
+            if workspace:
+                self._workspaces.move_to_end(workspace_id)
         if workspace:
             workspace.update_access()
         return workspace
@@ -181,7 +201,8 @@ class WorkspaceManager:
         Returns:
             List of Workspace objects
         """
-        return list(self._workspaces.values())
+        with self._lock:
+            return list(self._workspaces.values())
     
     def get_workspace_path(self, workspace_id: str) -> Optional[Path]:
         """
@@ -247,7 +268,8 @@ class WorkspaceManager:
         Returns:
             True if cleanup was successful
         """
-        workspace = self._workspaces.get(workspace_id)
+        with self._lock:
+            workspace = self._workspaces.get(workspace_id)
         if not workspace:
             logger.warning(f"Workspace not found for cleanup: {workspace_id}")
             return False
@@ -261,8 +283,9 @@ class WorkspaceManager:
                 if workspace.workspace_path.exists():
                     shutil.rmtree(workspace.workspace_path, ignore_errors=True)
             
-            # Remove from tracking
-            del self._workspaces[workspace_id]
+            # Remove from tracking (may already be gone via the lifecycle event)
+            with self._lock:
+                self._workspaces.pop(workspace_id, None)
             
             logger.info(f"Cleaned up workspace: {workspace_id}")
             return True
@@ -281,7 +304,8 @@ class WorkspaceManager:
         Returns:
             Dictionary containing status information
         """
-        workspace = self._workspaces.get(workspace_id)
+        with self._lock:
+            workspace = self._workspaces.get(workspace_id)
         if not workspace:
             return {"error": "Workspace not found"}
         
@@ -349,7 +373,8 @@ class WorkspaceManager:
         logger.info("Shutting down workspace manager")
         
         # Clean up all workspaces
-        workspace_ids = list(self._workspaces.keys())
+        with self._lock:
+            workspace_ids = list(self._workspaces.keys())
         for workspace_id in workspace_ids:
             try:
                 self.cleanup_workspace(workspace_id)
@@ -435,13 +460,34 @@ class WorkspaceManager:
         )
     
     def _create_virtual_environment(self, workspace_path: Path) -> bool:
-        """Create a virtual environment in the workspace."""
+        """
+        Create a virtual environment in the workspace.
+        
+        The venv is cloned from a host-level template, so it is only built
+        once per host. requirements.txt comes from the workspace and is not
+        trusted: only the requirements the cache allows on the host go into
+        the template, and the rest are left to be installed inside the
+        sandbox. Falls back to a plain venv if no template can be built.
+        """
+        venv_path = workspace_path / ".venv"
+        try:
+            if self._env_cache is None:
+                self._env_cache = EnvironmentCache()
+            
+            requirements = self._env_cache.read_requirements(workspace_path / "requirements.txt")
+            trusted, untrusted = self._env_cache.split_requirements(requirements)
+            if untrusted:
+                logger.info(f"Leaving {len(untrusted)} requirements to be installed in the sandbox")
+            if self._env_cache.clone_venv(venv_path, trusted):
+                logger.info(f"Cloned virtual environment template to {venv_path}")
+                return True
+        except Exception as e:
+            logger.warning(f"Could not clone virtual environment template: {e}")
+        
         try:
             import subprocess
             import sys
             
-            venv_path = workspace_path / ".venv"
-            
             # Create virtual environment
             result = subprocess.run([
                 sys.executable, "-m", "venv", str(venv_path)
@@ -459,20 +505,26 @@ class WorkspaceManager:
             return False
     
     def _cleanup_expired_workspaces(self):
-        """Clean up expired workspaces to free up slots."""
-        # For now, just clean up the oldest workspaces if we're at capacity
-        # In the future, this could be based on last access time
-        if len(self._workspaces) >= self._max_concurrent:
-            # Sort by creation time and remove oldest
-            sorted_workspaces = sorted(
-                self._workspaces.items(),
-                key=lambda x: x[1].created_at
-            )
-            
-            # Remove oldest workspace
-            oldest_id = sorted_workspaces[0][0]
-            logger.info(f"Cleaning up oldest workspace to free capacity: {oldest_id}")
-            self.cleanup_workspace(oldest_id)
+        """Clean up the least recently accessed workspace to free a slot."""
+        with self._lock:
+            if len(self._workspaces) < self._max_concurrent:
+                return
+            # Workspaces are kept in access order, so the first one is the LRU
+            oldest_id = next(iter(self._workspaces))
+        logger.info(f"Cleaning up least recently used workspace to free capacity: {oldest_id}")
+        self.cleanup_workspace(oldest_id)
+    
+    def _on_lifecycle_event(self, event_data: LifecycleEventData):
+        """Stop tracking workspaces whose session ended in the lifecycle manager."""
+        if event_data.event != LifecycleEvent.SESSION_ENDED:
+            return
+        
+        with self._lock:
+            workspace = self._workspaces.get(event_data.workspace_id)
+            if not (workspace and workspace.session):
+                return
+            self._workspaces.pop(event_data.workspace_id, None)
+        logger.info(f"Workspace session ended, stopped tracking: {event_data.workspace_id}")
     
     def get_statistics(self) -> Dict[str, Any]:
         """
@@ -482,7 +534,7 @@ class WorkspaceManager:
             Dictionary containing statistics
         """
         stats = {
-            "active_workspaces": len(self._workspaces),
+            "active_workspaces": len(self.list_workspaces()),
             "max_concurrent": self._max_concurrent,
             "intelligent_features_enabled": self._intelligent_enabled,
             "base_workspace_dir": str(self.base_workspace_dir)
@@ -493,4 +545,7 @@ class WorkspaceManager:
             intelligent_stats = self._lifecycle_manager.get_statistics()
             stats["intelligent_stats"] = intelligent_stats
         
+        if self._env_cache:
+            stats["env_cache"] = self._env_cache.get_stats()
+        
         return stats
\ No newline at end of file
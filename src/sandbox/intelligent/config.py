@@ -41,9 +41,11 @@ class RateLimits:
     """Configuration for rate limiting."""
     max_requests_per_minute: int = 60  # Maximum tool executions per minute per connection
     max_requests_per_hour: int = 1000  # Maximum tool executions per hour per connection
-    burst_limit: int = 10  # Maximum burst requests allowed
+    burst_limit: Optional[int] = None  # Maximum burst requests allowed (None: max_requests_per_minute)
     enable_sliding_window: bool = True  # Use sliding window rate limiting
     rate_limit_window_seconds: int = 60  # Rate limit window in seconds
+    tool_requests_per_minute: Dict[str, int] = field(default_factory=dict)  # Per-tool limits per connection
+    shared_state_path: Optional[str] = None  # SQLite file sharing limits across server processes
 
 
 @dataclass
@@ -7,7 +7,11 @@ Handles task execution, error handling, recovery, and sandbox command execution.
 from .engine import ExecutionEngine
 from .models import ExecutionResult, TaskResult, RetryContext, SandboxExecutor as SandboxExecutorModel
 from .sandbox_executor import SandboxExecutor
+from .scheduler import DAGScheduler, FailurePolicy
 from .toolchain_support import DevelopmentToolchainSupport, ToolchainType, BuildSystem, TestFramework
+from .impact_analysis import TestImpactAnalyzer, TestSelection
+from .sharding import ShardResult, TestDurationStore
+from .action_cache import ActionCache, CachedAction
 
 __all__ = [
     'ExecutionEngine',
@@ -16,8 +20,16 @@ __all__ = [
     'RetryContext',
     'SandboxExecutorModel',
     'SandboxExecutor',
+    'DAGScheduler',
+    'FailurePolicy',
     'DevelopmentToolchainSupport',
     'ToolchainType',
     'BuildSystem',
-    'TestFramework'
+    'TestFramework',
+    'TestImpactAnalyzer',
+    'TestSelection',
+    'ShardResult',
+    'TestDurationStore',
+    'ActionCache',
+    'CachedAction'
 ]
\ No newline at end of file
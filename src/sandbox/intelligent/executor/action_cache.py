@@ -0,0 +1,324 @@
+"""
+Local action cache for builds and dependency installs.
+
+An action (a build or install command) is keyed by a fingerprint of its
+inputs: the command, toolchain version, environment and the contents of the
+input files. The files the action created or changed in the workspace are
+stored in a content-addressed object store, so a later run with the same
+fingerprint restores them instead of re-running the command.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import stat
+import time
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# Never part of an action's inputs or outputs
+SANDBOX_DIRS = {".git", ".hg", ".svn", ".sandbox", ".sandbox_journal"}
+
+# Dependency and build output directories, excluded from source tree hashes
+OUTPUT_DIRS = {
+    "node_modules", ".venv", "venv", "__pycache__", "build", "dist", "target",
+    ".pytest_cache", ".mypy_cache", ".tox", "htmlcov", ".gradle"
+}
+
+# Files that determine what a dependency install produces
+DEPENDENCY_MANIFESTS = [
+    "requirements.txt", "requirements-dev.txt", "setup.py", "setup.cfg", "pyproject.toml",
+    "poetry.lock", "Pipfile", "Pipfile.lock", "package.json", "package-lock.json", "yarn.lock",
+    "pnpm-lock.yaml", "Cargo.toml", "Cargo.lock", "go.mod", "go.sum", "pom.xml",
+    "build.gradle", "build.gradle.kts", "Gemfile", "Gemfile.lock", "composer.json", "composer.lock"
+]
+
+# (mtime_ns, size) or the link target for symlinks
+FileState = Tuple[int, int]
+
+
+@dataclass
+class CachedAction:
+    """A stored action result and the workspace files it produced."""
+    key: str
+    command: str
+    exit_code: int
+    output: str
+    error_output: str
+    duration: float
+    outputs: Dict[str, Dict[str, object]] = field(default_factory=dict)  # Relative path -> object info
+    created_at: float = field(default_factory=time.time)
+
+
+class ActionCache:
+    """Content-addressed cache of action outputs, keyed by input fingerprints."""
+
+    def __init__(self, cache_dir: str, max_size_bytes: int = 2 * 1024 ** 3):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding the object store and action records
+            max_size_bytes: Size the object store is pruned to after each store
+        """
+        self.cache_dir = Path(cache_dir)
+        self.objects_dir = self.cache_dir / "objects"
+        self.actions_dir = self.cache_dir / "actions"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.actions_dir.mkdir(parents=True, exist_ok=True)
+        self.max_size_bytes = max_size_bytes
+
+        # Content hashes by path, reused while (mtime_ns, size) is unchanged
+        self._hash_cache: Dict[str, Tuple[FileState, str]] = {}
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "files_restored": 0}
+
+    def fingerprint(self, workspace: str, command: str, toolchain_version: str = "",
+                    env_vars: Optional[Dict[str, str]] = None,
+                    input_files: Optional[Iterable[str]] = None) -> str:
+        """
+        Compute the cache key for an action.
+
+        Args:
+            workspace: Workspace root
+            command: Command the action runs
+            toolchain_version: Version string of the compiler or runtime
+            env_vars: Environment variables passed to the command
+            input_files: Workspace-relative input files; defaults to the whole
+                source tree (excluding dependency and build output directories)
+        """
+        root = Path(workspace)
+        digest = hashlib.sha256()
+        digest.update(json.dumps({
+            "command": command,
+            "toolchain_version": toolchain_version,
+            "env": sorted((env_vars or {}).items())
+        }).encode())
+
+        if input_files is None:
+            paths = self._walk(root, SANDBOX_DIRS | OUTPUT_DIRS)
+        else:
+            paths = sorted(p for p in input_files if os.path.lexists(root / p))
+
+        for rel_path in paths:
+            digest.update(rel_path.encode() + b"\0")
+            digest.update(self._describe(root / rel_path).encode() + b"\0")
+
+        return digest.hexdigest()
+
+    def snapshot(self, workspace: str) -> Dict[str, FileState]:
+        """Record the state of every workspace file, to find an action's outputs later."""
+        root = Path(workspace)
+        states = {}
+        for rel_path in self._walk(root, SANDBOX_DIRS):
+            try:
+                info = os.lstat(root / rel_path)
+            except OSError:
+                continue
+            states[rel_path] = (info.st_mtime_ns, info.st_size)
+        return states
+
+    @staticmethod
+    def changed_files(before: Dict[str, FileState], after: Dict[str, FileState]) -> List[str]:
+        """Files created or modified between two snapshots."""
+        return sorted(path for path, state in after.items() if before.get(path) != state)
+
+    def lookup(self, key: str) -> Optional[CachedAction]:
+        """Return the cached action for a key, if every stored object is still present."""
+        record_path = self.actions_dir / f"{key}.json"
+        try:
+            entry = CachedAction(**json.loads(record_path.read_text()))
+        except (OSError, ValueError, TypeError):
+            self.stats["misses"] += 1
+            return None
+
+        for info in entry.outputs.values():
+            if "hash" in info and not self._object_path(info["hash"]).exists():
+                self.stats["misses"] += 1
+                return None
+
+        os.utime(record_path)  # Mark as recently used for pruning
+        self.stats["hits"] += 1
+        return entry
+
+    def store(self, keys: Iterable[str], workspace: str, outputs: List[str],
+              command: str, exit_code: int, output: str, error_output: str,
+              duration: float) -> CachedAction:
+        """
+        Store an action's outputs and result under one or more keys.
+
+        Storing under the fingerprint taken after the action as well as the
+        one taken before lets actions that write into their own input tree
+        hit on the next run.
+        """
+        root = Path(workspace)
+        keys = list(dict.fromkeys(keys))
+        entry = CachedAction(
+            key=keys[0],
+            command=command,
+            exit_code=exit_code,
+            output=output,
+            error_output=error_output,
+            duration=duration
+        )
+
+        for rel_path in outputs:
+            path = root / rel_path
+            try:
+                info = os.lstat(path)
+            except OSError:
+                continue
+            if stat.S_ISLNK(info.st_mode):
+                entry.outputs[rel_path] = {"link": os.readlink(path)}
+            elif stat.S_ISREG(info.st_mode):
+                content_hash = self._hash_file(path)
+                self._store_object(path, content_hash)
+                entry.outputs[rel_path] = {"hash": content_hash, "mode": stat.S_IMODE(info.st_mode)}
+
+        record = json.dumps(asdict(entry))
+        for key in keys:
+            temp_path = self.actions_dir / f"{key}.json.tmp"
+            temp_path.write_text(record)
+            os.replace(temp_path, self.actions_dir / f"{key}.json")
+
+        self.stats["stores"] += 1
+        self.prune()
+        return entry
+
+    def restore(self, entry: CachedAction, workspace: str) -> List[str]:
+        """
+        Write a cached action's outputs into the workspace.
+
+        Files whose contents already match are left alone.
+
+        Returns:
+            Workspace-relative paths of all outputs of the action
+        """
+        root = Path(workspace)
+        for rel_path, info in entry.outputs.items():
+            path = root / rel_path
+            path.parent.mkdir(parents=True, exist_ok=True)
+
+            if "link" in info:
+                if os.path.islink(path) and os.readlink(path) == info["link"]:
+                    continue
+                if os.path.lexists(path):
+                    os.unlink(path)
+                os.symlink(info["link"], path)
+            else:
+                if path.is_file() and not path.is_symlink() and self._hash_file(path) == info["hash"]:
+                    continue
+                temp_path = path.with_name(f".{path.name}.restore")
+                shutil.copyfile(self._object_path(info["hash"]), temp_path)
+                os.chmod(temp_path, info["mode"])
+                os.replace(temp_path, path)
+            self.stats["files_restored"] += 1
+
+        return list(entry.outputs)
+
+    def prune(self) -> int:
+        """
+        Evict least recently used actions until the object store fits its budget.
+
+        Returns:
+            Number of bytes freed
+        """
+        objects = {p.name: p.stat().st_size for p in self.objects_dir.glob("*/*")}
+        total = sum(objects.values())
+        if total <= self.max_size_bytes:
+            return 0
+
+        records = sorted(self.actions_dir.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        referenced: Dict[str, int] = {}
+        record_hashes: Dict[Path, List[str]] = {}
+        for record_path in records:
+            try:
+                outputs = json.loads(record_path.read_text()).get("outputs", {})
+            except (OSError, ValueError):
+                outputs = {}
+            hashes = [info["hash"] for info in outputs.values() if "hash" in info]
+            record_hashes[record_path] = hashes
+            for content_hash in hashes:
+                referenced[content_hash] = referenced.get(content_hash, 0) + 1
+
+        freed = 0
+        for record_path in records:
+            if total - freed <= self.max_size_bytes:
+                break
+            record_path.unlink()
+            for content_hash in record_hashes[record_path]:
+                referenced[content_hash] -= 1
+                if referenced[content_hash] == 0 and content_hash in objects:
+                    self._object_path(content_hash).unlink()
+                    freed += objects.pop(content_hash)
+
+        return freed
+
+    def get_stats(self) -> Dict[str, object]:
+        """Hit/miss counters and store size."""
+        sizes = [p.stat().st_size for p in self.objects_dir.glob("*/*")]
+        return {
+            **self.stats,
+            "actions": sum(1 for _ in self.actions_dir.glob("*.json")),
+            "objects": len(sizes),
+            "object_bytes": sum(sizes)
+        }
+
+    def _walk(self, root: Path, excluded_dirs: set) -> List[str]:
+        """Sorted workspace-relative paths of files (and symlinks) under root."""
+        paths = []
+        for dirpath, dirnames, filenames in os.walk(root):
+            kept = []
+            for name in dirnames:
+                if name in excluded_dirs:
+                    continue
+                if os.path.islink(os.path.join(dirpath, name)):
+                    filenames.append(name)  # Record directory symlinks as links
+                else:
+                    kept.append(name)
+            dirnames[:] = kept
+
+            rel_dir = os.path.relpath(dirpath, root)
+            for name in filenames:
+                paths.append(name if rel_dir == "." else f"{rel_dir}/{name}".replace(os.sep, "/"))
+        return sorted(paths)
+
+    def _describe(self, path: Path) -> str:
+        """Content identity of an input file: a hash, or the target of a symlink."""
+        if path.is_symlink():
+            return "link:" + os.readlink(path)
+        try:
+            return self._hash_file(path)
+        except OSError:
+            return "missing"
+
+    def _hash_file(self, path: Path) -> str:
+        """SHA-256 of a file, cached while its mtime and size are unchanged."""
+        info = os.stat(path)
+        state = (info.st_mtime_ns, info.st_size)
+        cached = self._hash_cache.get(str(path))
+        if cached is not None and cached[0] == state:
+            return cached[1]
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        content_hash = digest.hexdigest()
+        self._hash_cache[str(path)] = (state, content_hash)
+        return content_hash
+
+    def _object_path(self, content_hash: str) -> Path:
+        return self.objects_dir / content_hash[:2] / content_hash
+
+    def _store_object(self, path: Path, content_hash: str) -> None:
+        """Copy a file into the object store unless it is already there."""
+        object_path = self._object_path(content_hash)
+        if object_path.exists():
+            return
+        object_path.parent.mkdir(exist_ok=True)
+        temp_path = object_path.with_suffix(".tmp")
+        shutil.copyfile(path, temp_path)
+        os.replace(temp_path, object_path)
@@ -4,8 +4,10 @@ Concrete implementation of task execution functionality.
 
 import os
 import subprocess
+import threading
 import time
 import traceback
+import uuid
 from datetime import datetime
 from pathlib import Path
 from typing import List, Optional, Dict, Any
@@ -17,6 +19,8 @@ from .models import (
     AttemptInfo, ErrorRecoveryStrategy
 )
 from .multi_file_coordinator import MultiFileCoordinator, FileOperation, MultiFileTransaction
+from .scheduler import DAGScheduler, FailurePolicy
+from ..workspace.security import DiskQuotaManager
 
 
 class SandboxCommandExecutor(SandboxExecutorInterface):
@@ -24,9 +28,13 @@ class SandboxCommandExecutor(SandboxExecutorInterface):
     Concrete implementation of sandbox command execution with file tracking.
     """
     
-    def __init__(self, workspace_path: str, isolation_enabled: bool = True):
+    def __init__(self, workspace_path: str, isolation_enabled: bool = True,
+                 disk_quota: Optional[DiskQuotaManager] = None,
+                 quota_workspace_id: Optional[str] = None):
         self.workspace_path = Path(workspace_path)
         self.isolation_enabled = isolation_enabled
+        self.disk_quota = disk_quota
+        self.quota_workspace_id = quota_workspace_id
         self.file_changes: List[FileChange] = []
         self.commands_executed: List[CommandInfo] = []
         self.multi_file_coordinator = MultiFileCoordinator(workspace_path)
@@ -61,10 +69,17 @@ class SandboxCommandExecutor(SandboxExecutorInterface):
             else:
                 timeout = 300  # default 5 minutes
 
+        # Cap any single file the command writes to the remaining disk quota
+        shell_command = command
+        if self.disk_quota is not None and self.quota_workspace_id:
+            fsize_ulimit = self.disk_quota.fsize_ulimit(self.quota_workspace_id)
+            if fsize_ulimit:
+                shell_command = f"{fsize_ulimit}; {command}"
+
         try:
             if timeout is not None:
                 result = subprocess.run(
-                    command,
+                    shell_command,
                     shell=True,
                     cwd=str(work_dir),
                     capture_output=True,
@@ -74,7 +89,7 @@ class SandboxCommandExecutor(SandboxExecutorInterface):
             else:
                 # No timeout - run without timeout parameter
                 result = subprocess.run(
-                    command,
+                    shell_command,
                     shell=True,
                     cwd=str(work_dir),
                     capture_output=True,
@@ -109,6 +124,10 @@ class SandboxCommandExecutor(SandboxExecutorInterface):
                 duration=time.time() - start_time
             )
         
+        # Shell commands write outside the executor APIs; re-measure on next reconciliation
+        if self.disk_quota is not None and self.quota_workspace_id:
+            self.disk_quota.mark_dirty(self.quota_workspace_id)
+        
         self.commands_executed.append(command_info)
         return command_info
     
@@ -129,7 +148,7 @@ class SandboxCommandExecutor(SandboxExecutorInterface):
             )
             
             # Write the file
-            full_path.write_text(content, encoding='utf-8')
+            self._write_with_quota(full_path, content)
             
             self.file_changes.append(file_change)
             return True
@@ -157,7 +176,7 @@ class SandboxCommandExecutor(SandboxExecutorInterface):
             )
             
             # Write the new content
-            full_path.write_text(content, encoding='utf-8')
+            self._write_with_quota(full_path, content)
             
             self.file_changes.append(file_change)
             return True
@@ -186,7 +205,10 @@ class SandboxCommandExecutor(SandboxExecutorInterface):
             
             # Delete the file
             if full_path.exists():
+                file_size = full_path.stat().st_size
                 full_path.unlink()
+                if self.disk_quota is not None and self.quota_workspace_id:
+                    self.disk_quota.record_delete(self.quota_workspace_id, file_size)
             
             self.file_changes.append(file_change)
             return True
@@ -221,6 +243,25 @@ class SandboxCommandExecutor(SandboxExecutorInterface):
         result = self.execute_command(command)
         return result.exit_code == 0
     
+    def _write_with_quota(self, full_path: Path, content: str) -> None:
+        """
+        Write text content, charging it against the disk quota first if one applies.
+        
+        Raises:
+            DiskQuotaExceededError: If the write would exceed the hard quota
+        """
+        if self.disk_quota is None or not self.quota_workspace_id:
+            full_path.write_text(content, encoding='utf-8')
+            return
+        
+        data = content.encode('utf-8')
+        delta = self.disk_quota.charge_write(self.quota_workspace_id, str(full_path), len(data))
+        try:
+            full_path.write_bytes(data)
+        except Exception:
+            self.disk_quota.refund(self.quota_workspace_id, delta)
+            raise
+    
     def _resolve_path(self, file_path: str) -> Path:
         """Resolve a file path within the workspace."""
         path = Path(file_path)
@@ -255,7 +296,7 @@ class SandboxCommandExecutor(SandboxExecutorInterface):
                                    transaction_id: Optional[str] = None) -> bool:
         """Execute multiple file operations as a coordinated transaction."""
         if not transaction_id:
-            transaction_id = f"tx_{int(time.time())}"
+            transaction_id = f"tx_{uuid.uuid4().hex}"
         
         try:
             # Create and execute transaction
@@ -476,12 +517,31 @@ class ExecutionEngine(ExecutionEngineInterface):
     handling, recovery, and sandbox command execution.
     """
     
-    def __init__(self):
+    def __init__(self, max_parallel_tasks: int = 4,
+                 failure_policy: FailurePolicy = FailurePolicy.FAIL_FAST,
+                 resource_limits: Optional[Dict[str, int]] = None,
+                 disk_quota: Optional[DiskQuotaManager] = None):
+        """
+        Initialize the execution engine.
+        
+        Args:
+            max_parallel_tasks: Maximum number of independent tasks run concurrently
+            failure_policy: Whether to stop on the first failure or keep running
+                tasks that do not depend on the failed one
+            resource_limits: Concurrency limits per task resource class
+                (``task.metadata["resource_class"]``), e.g. {"build": 1}
+            disk_quota: Disk quota manager of the workspaces plans run in; writes
+                by tasks are charged to the workspace containing the plan's root
+        """
         self._execution_history: List[ExecutionResult] = []
         self._error_recovery_manager = ErrorRecoveryManager()
+        self.max_parallel_tasks = max_parallel_tasks
+        self.failure_policy = failure_policy
+        self.resource_limits = resource_limits or {}
+        self.disk_quota = disk_quota
     
     def execute_plan(self, plan: TaskPlan) -> ExecutionResult:
-        """Execute a complete task plan sequentially."""
+        """Execute a complete task plan, running independent tasks in parallel."""
         start_time = time.time()
         
         result = ExecutionResult(
@@ -499,70 +559,52 @@ class ExecutionEngine(ExecutionEngineInterface):
             if root_path:
                 workspace_path = root_path
         
-        # Create sandbox command executor
-        sandbox_executor = SandboxCommandExecutor(workspace_path)
-        
         # Validate environment before execution
         if not self.validate_environment(SandboxExecutor(workspace_path=workspace_path)):
             result.success = False
             result.summary = "Failed to validate sandbox environment"
             return result
         
-        # Execute tasks sequentially based on dependencies
-        remaining_tasks = plan.tasks.copy()
+        quota_workspace_id = None
+        if self.disk_quota:
+            quota_workspace_id = self.disk_quota.workspace_for_path(workspace_path)
         
-        while remaining_tasks:
-            # Find next executable task (dependencies met)
-            next_task = None
-            tasks_to_remove = []
-            
-            for task in remaining_tasks:
-                if task.status == TaskStatus.COMPLETED:
-                    tasks_to_remove.append(task)
-                    continue
-                
-                # Check if all dependencies are completed
-                dependencies_met = all(
-                    dep_task and dep_task.status == TaskStatus.COMPLETED
-                    for dep_id in task.dependencies
-                    if (dep_task := plan.get_task(dep_id)) is not None
+        # Each worker thread gets its own command executor so per-task
+        # file change and command histories do not interleave
+        worker_state = threading.local()
+        
+        def run_task(task: Task) -> TaskResult:
+            sandbox_executor = getattr(worker_state, "executor", None)
+            if sandbox_executor is None:
+                sandbox_executor = SandboxCommandExecutor(
+                    workspace_path, disk_quota=self.disk_quota,
+                    quota_workspace_id=quota_workspace_id
                 )
-                
-                if dependencies_met and task.status == TaskStatus.NOT_STARTED:
-                    next_task = task
-                    break
-            
-            # Remove completed tasks from remaining list
-            for task in tasks_to_remove:
-                remaining_tasks.remove(task)
-            
-            if not next_task:
-                # No more executable tasks - check if we're done or stuck
-                incomplete_tasks = [t for t in remaining_tasks if t.status != TaskStatus.COMPLETED]
-                if incomplete_tasks:
-                    result.success = False
-                    result.summary = f"Execution stuck - {len(incomplete_tasks)} tasks cannot proceed due to unmet dependencies"
-                break
-            
-            # Execute the next task
-            next_task.status = TaskStatus.IN_PROGRESS
-            task_result = self.execute_task(next_task, sandbox_executor)
+                worker_state.executor = sandbox_executor
+            return self.execute_task(task, sandbox_executor)
+        
+        def record_result(task: Task, task_result: TaskResult) -> None:
             result.add_task_result(task_result)
-            
             if task_result.success:
-                next_task.status = TaskStatus.COMPLETED
-                next_task.actual_duration = int(task_result.duration / 60)  # Convert to minutes
-            else:
-                next_task.status = TaskStatus.ERROR
-                next_task.error_info = task_result.error_info
-                result.success = False
-                
-                # For now, stop execution on first error
-                # TODO: Add configuration for error handling strategy
-                break
+                task.actual_duration = int(task_result.duration / 60)  # Convert to minutes
+        
+        scheduler = DAGScheduler(
+            max_workers=self.max_parallel_tasks,
+            failure_policy=self.failure_policy,
+            resource_limits=self.resource_limits
+        )
+        outcome = scheduler.run(plan.tasks, run_task, record_result)
+        
+        if not outcome.success:
+            result.success = False
         
         result.total_duration = time.time() - start_time
         result.summary = self._generate_execution_summary(result)
+        if outcome.blocked:
+            result.summary += (f"\n        - Blocked: {len(outcome.blocked)} tasks cannot proceed "
+                               f"due to unmet dependencies")
+        if outcome.skipped:
+            result.summary += f"\n        - Skipped: {len(outcome.skipped)} tasks after failures"
         
         self._execution_history.append(result)
         return result
@@ -0,0 +1,230 @@
+"""
+Test impact analysis for Python workspaces.
+
+Builds an import graph of the workspace and maps changed files to the test
+files that (transitively) import them, so a test run after an edit can be
+limited to the affected tests. Parsed imports are cached per file and only
+re-parsed when the file's mtime or size changes.
+"""
+
+import ast
+import os
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+# Directories that never contain first-party code
+IGNORED_DIRS = {
+    ".git", ".hg", ".svn", ".tox", ".nox", ".venv", "venv", "env", "node_modules",
+    "__pycache__", "build", "dist", ".mypy_cache", ".pytest_cache", "htmlcov",
+    ".sandbox_journal"
+}
+
+# Files whose changes can affect any test, forcing a full run
+GLOBAL_FILES = {
+    "conftest.py", "pytest.ini", "setup.cfg", "tox.ini", "pyproject.toml", "setup.py",
+    "requirements.txt", "requirements-dev.txt", "poetry.lock", "Pipfile", "Pipfile.lock"
+}
+
+
+@dataclass
+class TestSelection:
+    """Result of mapping changed files to the tests they affect."""
+    changed_files: List[str]
+    selected_tests: List[str] = field(default_factory=list)  # Workspace-relative paths
+    full_run_required: bool = False
+    reason: str = ""
+
+
+@dataclass
+class _ModuleInfo:
+    """Cached import information for one Python file."""
+    signature: Tuple[float, int]  # (mtime, size)
+    imports: Set[str]
+
+
+class TestImpactAnalyzer:
+    """Maps changed files to affected test files through the import graph."""
+
+    __test__ = False  # Not a test class, despite the name
+
+    def __init__(self, workspace_path: str, source_roots: Optional[List[str]] = None):
+        """
+        Initialize the analyzer.
+
+        Args:
+            workspace_path: Root of the project
+            source_roots: Directories (relative to the workspace) that act as
+                import roots; defaults to the workspace itself plus "src" if present
+        """
+        self.workspace_path = Path(workspace_path).resolve()
+        if source_roots is None:
+            source_roots = ["."] + (["src"] if (self.workspace_path / "src").is_dir() else [])
+        self.source_roots = [(self.workspace_path / root).resolve() for root in source_roots]
+        self._modules: Dict[str, _ModuleInfo] = {}  # Keyed by workspace-relative path
+
+    def select_tests(self, changed_files: Iterable[str]) -> TestSelection:
+        """
+        Find the test files affected by a set of changed files.
+
+        A full run is required when a changed file cannot be traced through
+        the import graph: files outside the workspace, non-Python files other
+        than the test files themselves, or project-wide files such as
+        conftest.py and pytest.ini.
+        """
+        changed = sorted({self._relative(path) for path in changed_files})
+        selection = TestSelection(changed_files=changed)
+
+        for path in changed:
+            if path is None:
+                selection.full_run_required = True
+                selection.reason = "Changed file is outside the workspace"
+                return selection
+            if Path(path).name in GLOBAL_FILES:
+                selection.full_run_required = True
+                selection.reason = f"{path} affects all tests"
+                return selection
+            if not path.endswith(".py"):
+                selection.full_run_required = True
+                selection.reason = f"Cannot trace non-Python file {path}"
+                return selection
+
+        self.refresh()
+        importers = self._reverse_graph()
+
+        # Walk from the changed modules to everything that imports them
+        affected: Set[str] = set()
+        queue = deque()
+        for path in changed:
+            affected.add(path)
+            queue.extend(self._module_names(path))
+        seen_modules: Set[str] = set()
+        while queue:
+            module = queue.popleft()
+            if module in seen_modules:
+                continue
+            seen_modules.add(module)
+            for importer in importers.get(module, ()):
+                if importer not in affected:
+                    affected.add(importer)
+                    queue.extend(self._module_names(importer))
+
+        selection.selected_tests = sorted(
+            path for path in affected if self.is_test_file(path) and path in self._modules
+        )
+        selection.reason = (f"{len(selection.selected_tests)} test files affected by "
+                            f"{len(changed)} changed files")
+        return selection
+
+    def refresh(self) -> None:
+        """Rescan the workspace, re-parsing only files that changed."""
+        current: Dict[str, _ModuleInfo] = {}
+        for file_path in self._iter_python_files():
+            rel_path = file_path.relative_to(self.workspace_path).as_posix()
+            try:
+                stat = file_path.stat()
+            except OSError:
+                continue
+            signature = (stat.st_mtime, stat.st_size)
+
+            cached = self._modules.get(rel_path)
+            if cached is not None and cached.signature == signature:
+                current[rel_path] = cached
+            else:
+                current[rel_path] = _ModuleInfo(signature, self._parse_imports(file_path, rel_path))
+
+        self._modules = current
+
+    @staticmethod
+    def is_test_file(path: str) -> bool:
+        """Whether a workspace-relative path follows pytest's test file naming."""
+        name = Path(path).name
+        return name.endswith(".py") and (name.startswith("test_") or name.endswith("_test.py"))
+
+    def _iter_python_files(self):
+        """Yield the Python files of the workspace, skipping ignored directories."""
+        for root, dirs, files in os.walk(self.workspace_path):
+            dirs[:] = [d for d in dirs if d not in IGNORED_DIRS and not d.startswith(".")]
+            for name in files:
+                if name.endswith(".py"):
+                    yield Path(root) / name
+
+    def _parse_imports(self, file_path: Path, rel_path: str) -> Set[str]:
+        """Return the absolute module names imported by a file."""
+        try:
+            tree = ast.parse(file_path.read_text(encoding="utf-8", errors="replace"))
+        except (OSError, SyntaxError, ValueError):
+            return set()
+
+        package = self._package_of(rel_path)
+        imports: Set[str] = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                imports.update(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom):
+                base = node.module or ""
+                if node.level:
+                    if package is None:
+                        continue
+                    parts = package.split(".") if package else []
+                    if node.level - 1 > len(parts):
+                        continue
+                    parts = parts[:len(parts) - (node.level - 1)]
+                    base = ".".join(parts + ([base] if base else []))
+                if base:
+                    imports.add(base)
+                # "from pkg import name" may import the submodule pkg.name
+                imports.update(f"{base}.{alias.name}" if base else alias.name
+                               for alias in node.names if alias.name != "*")
+
+        # Importing a.b.c also executes a and a.b
+        for name in list(imports):
+            parts = name.split(".")
+            imports.update(".".join(parts[:i]) for i in range(1, len(parts)))
+        return imports
+
+    def _module_names(self, rel_path: str) -> List[str]:
+        """Dotted names a workspace file can be imported as, one per source root."""
+        names = []
+        path = self.workspace_path / rel_path
+        for root in self.source_roots:
+            try:
+                parts = list(path.relative_to(root).with_suffix("").parts)
+            except ValueError:
+                continue
+            if parts and parts[-1] == "__init__":
+                parts = parts[:-1]
+            if parts:
+                names.append(".".join(parts))
+        return names
+
+    def _package_of(self, rel_path: str) -> Optional[str]:
+        """Package a file belongs to, used to resolve relative imports."""
+        names = self._module_names(rel_path)
+        if not names:
+            return None
+        # The shortest name comes from the innermost source root
+        name = min(names, key=len)
+        if Path(rel_path).name == "__init__.py":
+            return name
+        return name.rpartition(".")[0]
+
+    def _reverse_graph(self) -> Dict[str, Set[str]]:
+        """Map each imported module name to the files importing it."""
+        importers: Dict[str, Set[str]] = {}
+        for rel_path, info in self._modules.items():
+            for module in info.imports:
+                importers.setdefault(module, set()).add(rel_path)
+        return importers
+
+    def _relative(self, path: str) -> Optional[str]:
+        """Workspace-relative POSIX path, or None for paths outside the workspace."""
+        candidate = Path(path)
+        if not candidate.is_absolute():
+            candidate = self.workspace_path / candidate
+        try:
+            return candidate.resolve().relative_to(self.workspace_path).as_posix()
+        except ValueError:
+            return None
@@ -14,7 +14,7 @@ class ExecutionEngineInterface(ABC):
     @abstractmethod
     def execute_plan(self, plan: TaskPlan) -> ExecutionResult:
         """
-        Execute a complete task plan sequentially.
+        Execute a complete task plan in dependency order.
         
         Args:
             plan: The task plan to execute
@@ -1,15 +1,33 @@
 """
 Multi-file operation coordination and conflict resolution.
+
+Transactions are journaled: operations are staged as temp files next to
+their targets (nothing in the workspace changes while staging), then
+committed with atomic os.replace calls. A manifest in .sandbox_journal
+records each transaction's progress so a crash mid-commit is rolled
+forward, and a crash while staging is rolled back, the first time a
+coordinator is created for the workspace in a process. Each running
+transaction holds an exclusive flock on its own lock file, so recovery
+only touches manifests whose owner has died.
 """
 
+import json
 import os
 import shutil
-from dataclasses import dataclass, field
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Set, Tuple
 from ..types import FileChange, ErrorInfo
 
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
 
 @dataclass
 class FileOperation:
@@ -33,13 +51,24 @@ class FileConflict:
     suggested_resolution: Optional[str] = None
 
 
+@dataclass
+class JournalEntry:
+    """Pending change to one path, applied when the transaction commits."""
+    target_path: str  # Absolute path of the file being changed
+    action: str  # write, delete
+    temp_path: Optional[str] = None  # Staged contents for writes
+    original_path: Optional[str] = None  # Hard link keeping the replaced file until commit ends
+    committed: bool = False
+
+
 @dataclass
 class MultiFileTransaction:
     """Represents a transaction of multiple file operations."""
     transaction_id: str
     operations: List[FileOperation] = field(default_factory=list)
     conflicts: List[FileConflict] = field(default_factory=list)
-    backup_paths: Dict[str, str] = field(default_factory=dict)
+    journal: Dict[str, JournalEntry] = field(default_factory=dict)  # Keyed by target path
+    created_dirs: List[str] = field(default_factory=list)
     completed_operations: List[FileOperation] = field(default_factory=list)
     failed_operations: List[FileOperation] = field(default_factory=list)
     timestamp: datetime = field(default_factory=datetime.now)
@@ -60,11 +89,35 @@ class MultiFileTransaction:
 class MultiFileCoordinator:
     """Coordinates multi-file operations with conflict detection and rollback."""
     
-    def __init__(self, workspace_path: str):
+    JOURNAL_DIR = ".sandbox_journal"
+    
+    # Workspaces already recovered by a coordinator in this process
+    _recovered_workspaces: Set[str] = set()
+    _recovery_guard = threading.Lock()
+    
+    def __init__(self, workspace_path: str, max_workers: int = 8, durable: bool = True):
+        """
+        Initialize the coordinator.
+        
+        Args:
+            workspace_path: Root directory all operations are confined to
+            max_workers: Threads used to stage independent operations
+            durable: fsync staged files and directories before reporting a commit
+        """
         self.workspace_path = Path(workspace_path)
-        self.backup_dir = self.workspace_path / ".sandbox_backups"
-        self.backup_dir.mkdir(exist_ok=True)
+        self.max_workers = max(1, max_workers)
+        self.durable = durable
+        self.journal_dir = self.workspace_path / self.JOURNAL_DIR
+        self.journal_dir.mkdir(exist_ok=True)
         self.active_transactions: Dict[str, MultiFileTransaction] = {}
+        self._journal_lock = threading.Lock()
+        
+        workspace_key = str(self.workspace_path.resolve())
+        with MultiFileCoordinator._recovery_guard:
+            first = workspace_key not in MultiFileCoordinator._recovered_workspaces
+            MultiFileCoordinator._recovered_workspaces.add(workspace_key)
+        if first:
+            self.recover_incomplete_transactions()
     
     def create_transaction(self, transaction_id: str, 
                          operations: List[FileOperation]) -> MultiFileTransaction:
@@ -82,7 +135,15 @@ class MultiFileCoordinator:
         return transaction
     
     def execute_transaction(self, transaction_id: str) -> bool:
-        """Execute a multi-file transaction with rollback on failure."""
+        """
+        Execute a multi-file transaction atomically.
+        
+        Operations are grouped into dependency levels; the operations of a
+        level are staged in parallel as temp files. Once everything is
+        staged the journal is committed with os.replace. If any operation
+        fails, the staged files are discarded and the workspace is left
+        untouched.
+        """
         if transaction_id not in self.active_transactions:
             raise ValueError(f"Transaction {transaction_id} not found")
         
@@ -94,37 +155,122 @@ class MultiFileCoordinator:
             raise ValueError(f"Cannot execute transaction with critical conflicts: "
                            f"{[c.description for c in critical_conflicts]}")
         
+        owner_lock = self._acquire_owner_lock(transaction_id, blocking=True)
         try:
-            # Create backups for existing files
-            self._create_backups(transaction)
+            levels = self._group_operations_by_level(transaction.operations)
+            self._write_manifest(transaction, "staging")
             
-            # Execute operations in dependency order
-            ordered_operations = self._order_operations_by_dependencies(transaction.operations)
+            workers = min(self.max_workers, max((len(level) for level in levels), default=1))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="FileTxn") as pool:
+                for level in levels:
+                    self._stage_level(level, transaction, pool)
             
-            for operation in ordered_operations:
-                try:
-                    self._execute_operation(operation, transaction)
-                    transaction.completed_operations.append(operation)
-                except Exception as e:
-                    transaction.failed_operations.append(operation)
-                    # Rollback on failure
-                    self._rollback_transaction(transaction)
-                    raise RuntimeError(f"Operation failed: {operation.file_path} - {str(e)}")
-            
-            # Clean up backups on success
-            self._cleanup_backups(transaction)
+            self._write_manifest(transaction, "committing")
+            self._commit_journal(transaction)
             return True
             
-        except Exception as e:
-            # Ensure rollback is called on any failure
-            if not transaction.failed_operations:
-                self._rollback_transaction(transaction)
-            raise e
+        except Exception:
+            self._rollback_transaction(transaction)
+            raise
         finally:
+            self._remove_manifest(transaction)
+            self._release_owner_lock(transaction_id, owner_lock, unlink=True)
             # Remove from active transactions
             if transaction_id in self.active_transactions:
                 del self.active_transactions[transaction_id]
     
+    def recover_incomplete_transactions(self) -> List[str]:
+        """
+        Finish or undo transactions interrupted by a crash.
+        
+        Transactions that reached the commit phase are rolled forward, since
+        all of their contents were already staged; earlier ones are rolled
+        back by deleting their temp files. Manifests whose owner still holds
+        its lock belong to running transactions and are left alone.
+        
+        Returns:
+            IDs of the recovered transactions
+        """
+        recovered = []
+        for manifest_path in sorted(self.journal_dir.glob("*.json")):
+            owner_lock = self._acquire_owner_lock(manifest_path.stem, blocking=False)
+            if owner_lock is None:
+                continue
+            try:
+                if self._recover_manifest(manifest_path):
+                    recovered.append(manifest_path.stem)
+            finally:
+                self._release_owner_lock(manifest_path.stem, owner_lock,
+                                         unlink=not manifest_path.exists())
+        
+        return recovered
+    
+    def _recover_manifest(self, manifest_path: Path) -> bool:
+        """Roll one dead transaction forward or back; False if it already finished."""
+        try:
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return False  # Owner finished between the listing and taking the lock
+        except (OSError, ValueError):
+            manifest_path.unlink()
+            return False
+        
+        if fcntl is None and manifest.get("pid") == os.getpid():
+            return False  # No flock here; at least spare this process's transactions
+        
+        entries = [JournalEntry(**entry) for entry in manifest.get("entries", [])]
+        if manifest.get("state") == "committing":
+            for entry in entries:
+                if entry.action == "write" and entry.temp_path and os.path.exists(entry.temp_path):
+                    os.replace(entry.temp_path, entry.target_path)
+                elif entry.action == "delete" and os.path.exists(entry.target_path):
+                    os.unlink(entry.target_path)
+        
+        # Whatever is left over are staged files or links to replaced files
+        suffixes = (f".{manifest['transaction_id']}.txn", f".{manifest['transaction_id']}.orig")
+        for directory in manifest.get("directories", []):
+            if os.path.isdir(directory):
+                for name in os.listdir(directory):
+                    if name.endswith(suffixes):
+                        os.unlink(os.path.join(directory, name))
+        
+        manifest_path.unlink()
+        return True
+    
+    def _lock_path(self, transaction_id: str) -> Path:
+        return self.journal_dir / f"{transaction_id}.lock"
+    
+    def _acquire_owner_lock(self, transaction_id: str, blocking: bool) -> Optional[int]:
+        """
+        Take the exclusive lock marking a transaction's owner as alive.
+        
+        Returns the lock's file descriptor (-1 where fcntl is unavailable),
+        or None when blocking is False and another owner holds the lock.
+        """
+        if fcntl is None:
+            return -1
+        fd = os.open(self._lock_path(transaction_id), os.O_CREAT | os.O_RDWR, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            if blocking:
+                raise
+            return None
+        return fd
+    
+    def _release_owner_lock(self, transaction_id: str, fd: int, unlink: bool) -> None:
+        """Release a lock from _acquire_owner_lock, deleting its file if done."""
+        if fd < 0:
+            return
+        if unlink:
+            try:
+                self._lock_path(transaction_id).unlink()
+            except FileNotFoundError:
+                pass
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+    
     def _detect_conflicts(self, operations: List[FileOperation]) -> List[FileConflict]:
         """Detect conflicts between file operations."""
         conflicts = []
@@ -245,128 +391,303 @@ class MultiFileCoordinator:
     
     def _order_operations_by_dependencies(self, operations: List[FileOperation]) -> List[FileOperation]:
         """Order operations based on their dependencies using topological sort."""
-        # Build adjacency list
-        graph: Dict[str, List[str]] = {}
-        in_degree: Dict[str, int] = {}
-        op_map: Dict[str, FileOperation] = {}
+        return [op for level in self._group_operations_by_level(operations) for op in level]
+    
+    def _group_operations_by_level(self, operations: List[FileOperation]) -> List[List[FileOperation]]:
+        """
+        Group operations into dependency levels (Kahn's algorithm by layers).
         
-        for op in operations:
-            op_map[op.file_path] = op
-            graph[op.file_path] = op.dependencies.copy()
-            in_degree[op.file_path] = 0
+        Operations in the same level do not depend on each other and touch
+        different paths, so they can be staged in parallel. Operations on
+        the same path keep their list order.
+        """
+        active = [i for i, op in enumerate(operations) if op.operation_type != "skip"]
         
-        # Calculate in-degrees
-        for op in operations:
+        providers: Dict[str, List[int]] = {}
+        for i in active:
+            providers.setdefault(operations[i].file_path, []).append(i)
+        
+        predecessors: Dict[int, Set[int]] = {i: set() for i in active}
+        last_on_path: Dict[str, int] = {}
+        for i in active:
+            op = operations[i]
             for dep in op.dependencies:
-                if dep in in_degree:
-                    in_degree[op.file_path] += 1
+                predecessors[i].update(j for j in providers.get(dep, []) if j != i)
+            for path in filter(None, (op.file_path, op.target_path)):
+                if path in last_on_path:
+                    predecessors[i].add(last_on_path[path])
+                last_on_path[path] = i
         
-        # Topological sort using Kahn's algorithm
-        queue = [file_path for file_path, degree in in_degree.items() if degree == 0]
-        ordered = []
+        successors: Dict[int, List[int]] = {i: [] for i in active}
+        for i, preds in predecessors.items():
+            for j in preds:
+                successors[j].append(i)
+        in_degree = {i: len(preds) for i, preds in predecessors.items()}
         
-        while queue:
-            current = queue.pop(0)
-            ordered.append(op_map[current])
-            
-            # Reduce in-degree of neighbors
-            for op in operations:
-                if current in op.dependencies:
-                    in_degree[op.file_path] -= 1
-                    if in_degree[op.file_path] == 0:
-                        queue.append(op.file_path)
-        
-        return ordered
-    
-    def _create_backups(self, transaction: MultiFileTransaction) -> None:
-        """Create backups of existing files before modification."""
-        backup_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        transaction_backup_dir = self.backup_dir / f"{transaction.transaction_id}_{backup_timestamp}"
-        transaction_backup_dir.mkdir(exist_ok=True)
-        
-        for operation in transaction.operations:
-            if operation.operation_type in ["modify", "delete"]:
-                file_path = self.workspace_path / operation.file_path
-                if file_path.exists():
-                    backup_path = transaction_backup_dir / operation.file_path
-                    backup_path.parent.mkdir(parents=True, exist_ok=True)
-                    shutil.copy2(str(file_path), str(backup_path))
-                    transaction.backup_paths[operation.file_path] = str(backup_path)
+        levels: List[List[FileOperation]] = []
+        current = [i for i in active if in_degree[i] == 0]
+        placed = 0
+        while current:
+            levels.append([operations[i] for i in current])
+            placed += len(current)
+            upcoming = []
+            for i in current:
+                for k in successors[i]:
+                    in_degree[k] -= 1
+                    if in_degree[k] == 0:
+                        upcoming.append(k)
+            current = sorted(upcoming)
+        
+        if placed != len(active):
+            raise ValueError("Operations contain a dependency cycle")
+        return levels
+    
+    def _stage_level(self, level: List[FileOperation], transaction: MultiFileTransaction,
+                     pool: ThreadPoolExecutor) -> None:
+        """Stage the operations of one dependency level in parallel."""
+        if len(level) == 1:
+            futures = None
+            errors = [self._try_stage(level[0], transaction)]
+        else:
+            futures = [pool.submit(self._try_stage, operation, transaction) for operation in level]
+            errors = [future.result() for future in futures]
+        
+        for operation, error in zip(level, errors):
+            if error is None:
+                transaction.completed_operations.append(operation)
+            else:
+                transaction.failed_operations.append(operation)
+        
+        for operation, error in zip(level, errors):
+            if error is not None:
+                raise RuntimeError(f"Operation failed: {operation.file_path} - {str(error)}")
+    
+    def _try_stage(self, operation: FileOperation,
+                   transaction: MultiFileTransaction) -> Optional[Exception]:
+        """Stage one operation, returning the error instead of raising it."""
+        try:
+            self._execute_operation(operation, transaction)
+            return None
+        except Exception as e:
+            return e
     
     def _execute_operation(self, operation: FileOperation, 
                          transaction: MultiFileTransaction) -> None:
-        """Execute a single file operation."""
-        file_path = self.workspace_path / operation.file_path
+        """Stage a single file operation in the transaction journal."""
+        file_path = self._resolve_path(operation.file_path)
         
         if operation.operation_type == "create":
-            if file_path.exists():
+            if self._exists(file_path, transaction):
                 raise FileExistsError(f"File already exists: {operation.file_path}")
             
-            file_path.parent.mkdir(parents=True, exist_ok=True)
-            file_path.write_text(operation.content or "", encoding='utf-8')
+            self._stage_write(file_path, operation.content or "", transaction)
             
         elif operation.operation_type == "modify":
-            if not file_path.exists():
+            if not self._exists(file_path, transaction):
                 raise FileNotFoundError(f"File not found: {operation.file_path}")
             
-            file_path.write_text(operation.content or "", encoding='utf-8')
+            self._stage_write(file_path, operation.content or "", transaction)
             
         elif operation.operation_type == "delete":
-            if not file_path.exists():
+            if not self._exists(file_path, transaction):
                 raise FileNotFoundError(f"File not found: {operation.file_path}")
             
-            file_path.unlink()
+            self._set_entry(transaction, JournalEntry(target_path=str(file_path), action="delete"))
             
         elif operation.operation_type == "move":
-            if not file_path.exists():
+            if not self._exists(file_path, transaction):
                 raise FileNotFoundError(f"File not found: {operation.file_path}")
             
             if not operation.target_path:
                 raise ValueError("Move operation requires target_path")
             
-            target_path = self.workspace_path / operation.target_path
-            target_path.parent.mkdir(parents=True, exist_ok=True)
-            shutil.move(str(file_path), str(target_path))
+            target_path = self._resolve_path(operation.target_path)
+            entry = transaction.journal.get(str(file_path))
+            source = entry.temp_path if entry else str(file_path)
+            
+            # Link the current contents under a temp name; no data is copied
+            temp_path = self._new_temp_path(target_path, transaction)
+            os.unlink(temp_path)
+            try:
+                os.link(source, temp_path)
+            except OSError:
+                shutil.copy2(source, temp_path)
+            
+            self._set_entry(transaction, JournalEntry(target_path=str(target_path), action="write",
+                                                      temp_path=temp_path))
+            self._set_entry(transaction, JournalEntry(target_path=str(file_path), action="delete"))
             
         else:
             raise ValueError(f"Unknown operation type: {operation.operation_type}")
     
+    def _resolve_path(self, file_path: str) -> Path:
+        """Resolve a path and make sure it stays inside the workspace."""
+        workspace = self.workspace_path.resolve()
+        resolved = (workspace / file_path).resolve()
+        if resolved != workspace and workspace not in resolved.parents:
+            raise PermissionError(f"Path is outside the workspace: {file_path}")
+        return resolved
+    
+    def _exists(self, file_path: Path, transaction: MultiFileTransaction) -> bool:
+        """Whether a file exists once the journal so far is applied."""
+        entry = transaction.journal.get(str(file_path))
+        if entry is not None:
+            return entry.action == "write"
+        return file_path.exists()
+    
+    def _stage_write(self, file_path: Path, content: str,
+                     transaction: MultiFileTransaction) -> None:
+        """Write new contents to a temp file beside the target."""
+        self._make_parent_dirs(file_path, transaction)
+        temp_path = self._new_temp_path(file_path, transaction)
+        
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+            if self.durable:
+                f.flush()
+                os.fsync(f.fileno())
+        
+        if file_path.exists():
+            shutil.copymode(str(file_path), temp_path)
+        
+        self._set_entry(transaction, JournalEntry(target_path=str(file_path), action="write",
+                                                  temp_path=temp_path))
+    
+    def _new_temp_path(self, file_path: Path, transaction: MultiFileTransaction) -> str:
+        """Create an empty, uniquely named temp file in the target's directory."""
+        fd, temp_path = tempfile.mkstemp(
+            dir=str(file_path.parent),
+            prefix=f".{file_path.name}.",
+            suffix=f".{transaction.transaction_id}.txn"
+        )
+        os.close(fd)
+        return temp_path
+    
+    def _make_parent_dirs(self, file_path: Path, transaction: MultiFileTransaction) -> None:
+        """Create missing parent directories, remembering them for rollback."""
+        missing = []
+        parent = file_path.parent
+        while not parent.exists():
+            missing.append(parent)
+            parent = parent.parent
+        
+        for directory in reversed(missing):
+            try:
+                directory.mkdir()
+            except FileExistsError:
+                continue  # Created concurrently by another operation
+            with self._journal_lock:
+                transaction.created_dirs.append(str(directory))
+    
+    def _set_entry(self, transaction: MultiFileTransaction, entry: JournalEntry) -> None:
+        """Record the pending state of a path, discarding any superseded temp file."""
+        with self._journal_lock:
+            previous = transaction.journal.pop(entry.target_path, None)
+            transaction.journal[entry.target_path] = entry
+        
+        if previous and previous.temp_path and os.path.exists(previous.temp_path):
+            os.unlink(previous.temp_path)
+    
+    def _commit_journal(self, transaction: MultiFileTransaction) -> None:
+        """Apply all staged changes with atomic renames."""
+        touched_dirs: Set[str] = set()
+        
+        for entry in transaction.journal.values():
+            target = entry.target_path
+            touched_dirs.add(os.path.dirname(target))
+            
+            if os.path.exists(target):
+                # Keep the replaced file reachable (a hard link where supported) until commit ends
+                entry.original_path = f"{os.path.dirname(target)}/.{os.path.basename(target)}.{transaction.transaction_id}.orig"
+                if entry.action == "delete":
+                    os.replace(target, entry.original_path)
+                else:
+                    try:
+                        os.link(target, entry.original_path)
+                    except OSError:
+                        shutil.copy2(target, entry.original_path)
+            
+            if entry.action == "write":
+                os.replace(entry.temp_path, target)
+            entry.committed = True
+        
+        if self.durable:
+            for directory in touched_dirs:
+                self._fsync_directory(directory)
+        
+        for entry in transaction.journal.values():
+            if entry.original_path and os.path.exists(entry.original_path):
+                os.unlink(entry.original_path)
+    
     def _rollback_transaction(self, transaction: MultiFileTransaction) -> None:
-        """Rollback a failed transaction using backups."""
+        """Discard staged files and undo any changes already committed."""
         try:
-            # Restore backed up files
-            for file_path, backup_path in transaction.backup_paths.items():
-                target_path = self.workspace_path / file_path
-                if Path(backup_path).exists():
-                    target_path.parent.mkdir(parents=True, exist_ok=True)
-                    shutil.copy2(backup_path, str(target_path))
+            for entry in reversed(list(transaction.journal.values())):
+                if entry.committed:
+                    if entry.original_path and os.path.exists(entry.original_path):
+                        os.replace(entry.original_path, entry.target_path)
+                    elif entry.action == "write" and os.path.exists(entry.target_path):
+                        os.unlink(entry.target_path)
+                else:
+                    if entry.original_path and os.path.exists(entry.original_path):
+                        os.unlink(entry.original_path)
+                    if entry.temp_path and os.path.exists(entry.temp_path):
+                        os.unlink(entry.temp_path)
             
-            # Remove files created during the transaction
-            for operation in transaction.completed_operations:
-                if operation.operation_type == "create":
-                    file_path = self.workspace_path / operation.file_path
-                    if file_path.exists():
-                        file_path.unlink()
+            # Remove directories created for staged files, deepest first
+            for directory in sorted(transaction.created_dirs, key=len, reverse=True):
+                try:
+                    os.rmdir(directory)
+                except OSError:
+                    pass
             
         except Exception as e:
             print(f"Warning: Rollback failed for transaction {transaction.transaction_id}: {e}")
     
-    def _cleanup_backups(self, transaction: MultiFileTransaction) -> None:
-        """Clean up backup files after successful transaction."""
-        for backup_path in transaction.backup_paths.values():
-            try:
-                Path(backup_path).unlink()
-            except Exception:
-                pass  # Ignore cleanup errors
+    def _write_manifest(self, transaction: MultiFileTransaction, state: str) -> None:
+        """Atomically record the transaction's state and journal on disk."""
+        directories = {
+            str((self.workspace_path.resolve() / path).resolve().parent)
+            for op in transaction.operations
+            for path in filter(None, (op.file_path, op.target_path))
+            if op.operation_type != "skip"
+        }
+        manifest = {
+            "transaction_id": transaction.transaction_id,
+            "state": state,
+            "pid": os.getpid(),
+            "directories": sorted(directories),
+            "entries": [asdict(entry) for entry in transaction.journal.values()]
+        }
         
-        # Remove empty backup directories
+        manifest_path = self.journal_dir / f"{transaction.transaction_id}.json"
+        staging_path = manifest_path.with_suffix(".tmp")
+        with open(staging_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+            if self.durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(staging_path, manifest_path)
+    
+    def _remove_manifest(self, transaction: MultiFileTransaction) -> None:
+        """Delete the transaction manifest once it has committed or rolled back."""
+        manifest_path = self.journal_dir / f"{transaction.transaction_id}.json"
+        if manifest_path.exists():
+            manifest_path.unlink()
+    
+    @staticmethod
+    def _fsync_directory(directory: str) -> None:
+        """Flush directory entries so renames survive a crash."""
         try:
-            for backup_path in transaction.backup_paths.values():
-                backup_dir = Path(backup_path).parent
-                if backup_dir.exists() and not any(backup_dir.iterdir()):
-                    backup_dir.rmdir()
-        except Exception:
-            pass  # Ignore cleanup errors
+            fd = os.open(directory, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
     
     def get_transaction_status(self, transaction_id: str) -> Optional[MultiFileTransaction]:
         """Get the status of a transaction."""
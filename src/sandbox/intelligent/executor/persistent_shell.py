@@ -0,0 +1,266 @@
+"""
+Long-lived bash sessions for low-latency command execution.
+
+A PersistentShell keeps one bash process per executor session and feeds it
+commands over stdin. Each command is followed by a sentinel line carrying a
+per-command random token, the exit code and the shell's working directory,
+so output can be framed without restarting the shell. Working directory and
+exported variables persist between commands.
+"""
+
+import os
+import shlex
+import signal
+import selectors
+import subprocess
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+
+@dataclass
+class ShellResult:
+    """Result of a single command run in a persistent shell."""
+    output: str
+    error_output: str
+    exit_code: int
+    working_directory: str
+    timed_out: bool = False
+    interrupted: bool = False
+    shell_restarted: bool = False
+
+
+class PersistentShell:
+    """
+    A bash process that executes commands one at a time while keeping state.
+
+    Commands run in the shell itself (via ``eval``) so ``cd`` and ``export``
+    carry over to later commands. stdin of every command is /dev/null so a
+    command cannot consume the framing protocol. On timeout or interrupt the
+    foreground job receives SIGINT; if the shell does not produce its
+    sentinel within a grace period it is killed and transparently restarted,
+    which loses its state.
+    """
+
+    def __init__(self, cwd: str, env: Optional[Dict[str, str]] = None,
+                 shell_path: str = "/bin/bash", interrupt_grace: float = 2.0):
+        """
+        Initialize the shell (the process is started lazily).
+
+        Args:
+            cwd: Initial working directory
+            env: Environment for the shell process (default: os.environ)
+            shell_path: Path of the bash binary
+            interrupt_grace: Seconds to wait after SIGINT before killing the shell
+        """
+        self.initial_cwd = cwd
+        self.env = dict(env) if env is not None else os.environ.copy()
+        self.shell_path = shell_path
+        self.interrupt_grace = interrupt_grace
+        self.restart_count = 0
+        self._process: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+        self._interrupt_event = threading.Event()
+
+    @property
+    def is_alive(self) -> bool:
+        """Check whether the shell process is running."""
+        return self._process is not None and self._process.poll() is None
+
+    def start(self) -> None:
+        """Start the shell process if it is not already running."""
+        if self.is_alive:
+            return
+
+        self._process = subprocess.Popen(
+            [self.shell_path, "--noprofile", "--norc"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=self.initial_cwd,
+            env=self.env,
+            start_new_session=True
+        )
+        # Let SIGINT stop the foreground job without terminating the shell
+        self._write("trap ':' INT\n")
+
+    def run(self, command: str, working_dir: Optional[str] = None,
+            timeout: Optional[float] = None,
+            env_vars: Optional[Dict[str, str]] = None) -> ShellResult:
+        """
+        Run a command in the shell and wait for it to finish.
+
+        Args:
+            command: Shell command text
+            working_dir: Directory to cd into before running (persists afterwards)
+            timeout: Seconds before the command is interrupted (None: no limit)
+            env_vars: Variables set for this command only
+
+        Returns:
+            ShellResult with captured output and final shell state
+        """
+        with self._lock:
+            self._interrupt_event.clear()
+            restarted = False
+            if not self.is_alive:
+                restarted = self._process is not None
+                self.start()
+
+            token = f"__SANDBOX_DONE_{uuid.uuid4().hex}__"
+            self._write(self._frame(command, token, working_dir, env_vars))
+
+            result = self._collect(token, timeout)
+            result.shell_restarted = result.shell_restarted or restarted
+            return result
+
+    def interrupt(self) -> None:
+        """Interrupt the command currently running, if any."""
+        self._interrupt_event.set()
+
+    def close(self) -> None:
+        """Terminate the shell process."""
+        if self._process is None:
+            return
+
+        if self._process.poll() is None:
+            try:
+                self._process.stdin.write(b"exit\n")
+                self._process.stdin.flush()
+                self._process.wait(timeout=1)
+            except Exception:
+                self._kill()
+
+        for stream in (self._process.stdin, self._process.stdout, self._process.stderr):
+            try:
+                stream.close()
+            except Exception:
+                pass
+        self._process = None
+
+    def _frame(self, command: str, token: str, working_dir: Optional[str],
+               env_vars: Optional[Dict[str, str]]) -> str:
+        """Build the stdin payload for one command."""
+        assignments = ""
+        if env_vars:
+            assignments = " ".join(
+                f"{name}={shlex.quote(value)}" for name, value in env_vars.items()
+            ) + " "
+
+        prefix = f"cd -- {shlex.quote(working_dir)} && " if working_dir else ""
+        return (
+            f"{prefix}{assignments}eval {shlex.quote(command)} < /dev/null\n"
+            f"__sandbox_rc=$?; printf '\\n%s %d %s\\n' '{token}' \"$__sandbox_rc\" \"$PWD\"; "
+            f"printf '\\n%s\\n' '{token}' >&2\n"
+        )
+
+    def _collect(self, token: str, timeout: Optional[float]) -> ShellResult:
+        """Read stdout/stderr until both sentinels arrive, handling timeout and interrupts."""
+        marker = f"\n{token}".encode()
+        stdout_buf = bytearray()
+        stderr_buf = bytearray()
+        stdout_done = stderr_done = False
+        exit_code = -1
+        cwd = self.initial_cwd
+        timed_out = interrupted = False
+        kill_deadline: Optional[float] = None
+        deadline = time.monotonic() + timeout if timeout is not None else None
+
+        selector = selectors.DefaultSelector()
+        selector.register(self._process.stdout, selectors.EVENT_READ, "stdout")
+        selector.register(self._process.stderr, selectors.EVENT_READ, "stderr")
+
+        try:
+            while not (stdout_done and stderr_done):
+                now = time.monotonic()
+
+                # Timeouts and interrupts: SIGINT first, then kill after the grace period
+                if kill_deadline is None:
+                    if deadline is not None and now >= deadline:
+                        timed_out = True
+                    elif self._interrupt_event.is_set():
+                        interrupted = True
+                    if timed_out or interrupted:
+                        self._signal_group(signal.SIGINT)
+                        kill_deadline = now + self.interrupt_grace
+                elif now >= kill_deadline:
+                    self._kill()
+                    return self._lost_shell_result(stdout_buf, stderr_buf, timed_out, interrupted)
+
+                wait_for = 0.1
+                if kill_deadline is None and deadline is not None:
+                    wait_for = min(wait_for, max(0.0, deadline - now))
+
+                for key, _ in selector.select(wait_for):
+                    chunk = os.read(key.fileobj.fileno(), 65536)
+                    if not chunk:
+                        # Shell exited (e.g. the command ran `exit`)
+                        self._process.wait()
+                        return self._lost_shell_result(stdout_buf, stderr_buf,
+                                                       timed_out, interrupted)
+
+                    if key.data == "stdout":
+                        stdout_buf.extend(chunk)
+                        index = stdout_buf.find(marker)
+                        if index != -1 and stdout_buf.find(b"\n", index + len(marker)) != -1:
+                            end = stdout_buf.find(b"\n", index + len(marker))
+                            trailer = stdout_buf[index + len(marker):end].decode(errors="replace")
+                            parts = trailer.strip().split(" ", 1)
+                            exit_code = int(parts[0])
+                            cwd = parts[1] if len(parts) > 1 else cwd
+                            del stdout_buf[index:]
+                            stdout_done = True
+                    else:
+                        stderr_buf.extend(chunk)
+                        index = stderr_buf.find(marker)
+                        if index != -1 and stderr_buf.find(b"\n", index + len(marker)) != -1:
+                            del stderr_buf[index:]
+                            stderr_done = True
+        finally:
+            selector.close()
+
+        return ShellResult(
+            output=stdout_buf.decode(errors="replace"),
+            error_output=stderr_buf.decode(errors="replace"),
+            exit_code=exit_code,
+            working_directory=cwd,
+            timed_out=timed_out,
+            interrupted=interrupted
+        )
+
+    def _lost_shell_result(self, stdout_buf: bytearray, stderr_buf: bytearray,
+                           timed_out: bool, interrupted: bool) -> ShellResult:
+        """Build a result for a command whose shell died; the next run restarts it."""
+        exit_code = self._process.returncode if self._process.returncode is not None else -1
+        self.close()
+        self.restart_count += 1
+        return ShellResult(
+            output=stdout_buf.decode(errors="replace"),
+            error_output=stderr_buf.decode(errors="replace"),
+            exit_code=-1 if (timed_out or interrupted) else exit_code,
+            working_directory=self.initial_cwd,
+            timed_out=timed_out,
+            interrupted=interrupted,
+            shell_restarted=True
+        )
+
+    def _write(self, data: str) -> None:
+        """Write to the shell's stdin."""
+        self._process.stdin.write(data.encode())
+        self._process.stdin.flush()
+
+    def _signal_group(self, sig: int) -> None:
+        """Send a signal to the shell's process group."""
+        try:
+            os.killpg(self._process.pid, sig)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    def _kill(self) -> None:
+        """Kill the shell and everything it started."""
+        self._signal_group(signal.SIGKILL)
+        try:
+            self._process.wait(timeout=5)
+        except Exception:
+            pass
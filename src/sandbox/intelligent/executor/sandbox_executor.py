@@ -9,7 +9,7 @@ import uuid
 import threading
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Dict, Any, Union
+from typing import List, Optional, Dict, Any, Union, IO
 
 try:
     import psutil
@@ -19,7 +19,11 @@ except ImportError:
 from ..types import CommandInfo, FileChange
 from ...intelligent.types import ActionType
 from ..logger import create_logger, ActionLoggerInterface
+from ..logger.export import write_chunks
+from ..workspace.security import DiskQuotaManager
+from ..workspace.env_cache import EnvironmentCache
 from .interfaces import SandboxExecutorInterface
+from .persistent_shell import PersistentShell
 
 
 class ResourceMonitor:
@@ -221,7 +225,11 @@ class SandboxExecutor(SandboxExecutorInterface):
     def __init__(self, workspace_path: str, isolation_enabled: bool = True,
                  logger: Optional[ActionLoggerInterface] = None, session_id: Optional[str] = None,
                  task_id: Optional[str] = None, enable_resource_monitoring: bool = True,
-                 resource_thresholds: Optional[Dict[str, Union[float, int]]] = None):
+                 resource_thresholds: Optional[Dict[str, Union[float, int]]] = None,
+                 disk_quota: Optional[DiskQuotaManager] = None,
+                 quota_workspace_id: Optional[str] = None,
+                 persistent_shell: bool = False,
+                 package_cache: Optional[EnvironmentCache] = None):
         """
         Initialize the SandboxExecutor with logging integration.
         
@@ -231,6 +239,13 @@ class SandboxExecutor(SandboxExecutorInterface):
             logger: Action logger instance (creates database logger if None)
             session_id: Session identifier for logging
             task_id: Task identifier for logging
+            disk_quota: Disk quota manager charged for writes through this executor
+            quota_workspace_id: Accounting key in disk_quota (default: session_id)
+            persistent_shell: Run commands in one long-lived bash session that keeps
+                cwd and exported variables between calls, instead of a new shell per call.
+                The disk quota is then only a soft per-file limit that commands can lift
+            package_cache: Host-level package cache that install_package points pip,
+                npm, yarn and go at, so downloads are shared across sandboxes
         """
         self.workspace_path = Path(workspace_path)
         self.isolation_enabled = isolation_enabled
@@ -238,6 +253,11 @@ class SandboxExecutor(SandboxExecutorInterface):
         self.task_id = task_id
         self.enable_resource_monitoring = enable_resource_monitoring
         self.resource_thresholds = resource_thresholds
+        self.disk_quota = disk_quota
+        self.quota_workspace_id = quota_workspace_id or self.session_id
+        self.persistent_shell = persistent_shell
+        self.package_cache = package_cache
+        self._shell: Optional[PersistentShell] = None
         
         # Initialize logger - use database logger by default for persistent tracking
         if logger is None:
@@ -260,6 +280,9 @@ class SandboxExecutor(SandboxExecutorInterface):
         # Ensure workspace directory exists
         self.workspace_path.mkdir(parents=True, exist_ok=True)
         
+        if self.disk_quota and not self.disk_quota.is_registered(self.quota_workspace_id):
+            self.disk_quota.register_workspace(self.quota_workspace_id, str(self.workspace_path))
+        
         # Initialize command execution environment
         self._setup_environment()
     
@@ -346,6 +369,13 @@ class SandboxExecutor(SandboxExecutorInterface):
                 
                 raise PermissionError(error_msg)
         
+        if self.persistent_shell:
+            command_info = self._execute_in_persistent_shell(
+                command, work_dir if working_dir else None, timeout, env_vars, start_time
+            )
+            self._log_command(command_info)
+            return command_info
+        
         # Prepare environment variables
         env = os.environ.copy()
         if env_vars:
@@ -358,11 +388,17 @@ class SandboxExecutor(SandboxExecutorInterface):
             'SANDBOX_TMP': str(self.workspace_path / ".sandbox" / "tmp")
         })
         
+        # Cap any single file the command writes to the remaining disk quota
+        shell_command = command
+        fsize_ulimit = self.disk_quota.fsize_ulimit(self.quota_workspace_id) if self.disk_quota else None
+        if fsize_ulimit:
+            shell_command = f"{fsize_ulimit}; {command}"
+        
         try:
             # Execute the command with full output capture
             if timeout is not None:
                 result = subprocess.run(
-                    command,
+                    shell_command,
                     shell=True,
                     cwd=str(work_dir),
                     capture_output=True,
@@ -373,7 +409,7 @@ class SandboxExecutor(SandboxExecutorInterface):
             else:
                 # No timeout - run without timeout parameter
                 result = subprocess.run(
-                    command,
+                    shell_command,
                     shell=True,
                     cwd=str(work_dir),
                     capture_output=True,
@@ -410,6 +446,15 @@ class SandboxExecutor(SandboxExecutorInterface):
                 duration=time.time() - start_time
             )
         
+        self._log_command(command_info)
+        return command_info
+    
+    def _log_command(self, command_info: CommandInfo) -> None:
+        """Record a finished command for quota reconciliation and in the action log."""
+        # Shell commands write outside the executor APIs; re-measure on next reconciliation
+        if self.disk_quota:
+            self.disk_quota.mark_dirty(self.quota_workspace_id)
+        
         # Log the command execution using DatabaseActionLogger.log_command()
         kwargs = {
             "command": command_info.command,
@@ -423,8 +468,99 @@ class SandboxExecutor(SandboxExecutorInterface):
         if self.task_id:
             kwargs["task_id"] = self.task_id
         self.logger.log_command(**kwargs)
+    
+    def _get_shell(self) -> PersistentShell:
+        """Return the session's persistent shell, creating it on first use."""
+        if self._shell is None:
+            env = os.environ.copy()
+            env.update({
+                'SANDBOX_WORKSPACE': str(self.workspace_path),
+                'SANDBOX_SESSION_ID': self.session_id,
+                'SANDBOX_TMP': str(self.workspace_path / ".sandbox" / "tmp")
+            })
+            self._shell = PersistentShell(str(self.workspace_path), env=env)
+        return self._shell
+    
+    def _execute_in_persistent_shell(self, command: str, work_dir: Optional[Path],
+                                     timeout: Optional[int], env_vars: Optional[Dict[str, str]],
+                                     start_time: float) -> CommandInfo:
+        """
+        Run a command in the session's persistent shell.
         
-        return command_info
+        Without an explicit working directory the command runs wherever the
+        previous command left the shell. With isolation enabled a shell that
+        has wandered outside the workspace is moved back to its root first.
+        
+        The disk quota is not a hard boundary here: the per-file cap is the
+        shell's soft ulimit, because a hard limit could never be raised again
+        once space is freed, so a command can lift it with ulimit -S. Commands
+        are rejected outright once the quota is used up.
+        """
+        run_dir = str(work_dir) if work_dir else None
+        
+        shell_command = command
+        if self.disk_quota:
+            if self.disk_quota.remaining_bytes(self.quota_workspace_id) == 0:
+                return CommandInfo(
+                    command=command,
+                    working_directory=run_dir or str(self.workspace_path),
+                    output="",
+                    error_output=f"Disk quota exhausted for workspace {self.quota_workspace_id}; command not run",
+                    exit_code=-1,
+                    duration=time.time() - start_time
+                )
+            fsize_ulimit = self.disk_quota.fsize_ulimit(self.quota_workspace_id, block_size=1024, soft=True)
+            if fsize_ulimit:
+                shell_command = f"{fsize_ulimit}\n{command}"
+        
+        shell = self._get_shell()
+        
+        try:
+            result = shell.run(shell_command, working_dir=run_dir, timeout=timeout, env_vars=env_vars)
+            
+            if self.isolation_enabled:
+                try:
+                    Path(result.working_directory).resolve().relative_to(self.workspace_path.resolve())
+                except ValueError:
+                    shell.run(":", working_dir=str(self.workspace_path))
+            
+            error_output = result.error_output
+            if result.timed_out:
+                error_output += f"Command timed out after {timeout} seconds"
+            elif result.interrupted:
+                error_output += "Command interrupted"
+            if result.shell_restarted:
+                error_output += "\n[persistent shell restarted; cwd and environment were reset]"
+            
+            return CommandInfo(
+                command=command,
+                working_directory=result.working_directory,
+                output=result.output,
+                error_output=error_output,
+                exit_code=-1 if result.timed_out else result.exit_code,
+                duration=time.time() - start_time
+            )
+        except Exception as e:
+            return CommandInfo(
+                command=command,
+                working_directory=run_dir or str(self.workspace_path),
+                output="",
+                error_output=f"Command execution failed: {str(e)}",
+                exit_code=-1,
+                duration=time.time() - start_time
+            )
+    
+    def interrupt_command(self) -> bool:
+        """
+        Interrupt the command currently running in the persistent shell.
+        
+        Returns:
+            True if an interrupt was sent
+        """
+        if self._shell is None:
+            return False
+        self._shell.interrupt()
+        return True
     
     def create_file(self, file_path: str, content: str) -> bool:
         """
@@ -447,7 +583,7 @@ class SandboxExecutor(SandboxExecutorInterface):
             full_path.parent.mkdir(parents=True, exist_ok=True)
             
             # Write the file
-            full_path.write_text(content, encoding='utf-8')
+            self._write_with_quota(full_path, content)
             
             # Log the file creation
             kwargs = {
@@ -505,7 +641,7 @@ class SandboxExecutor(SandboxExecutorInterface):
                 before_content = full_path.read_text(encoding='utf-8')
             
             # Write the new content
-            full_path.write_text(content, encoding='utf-8')
+            self._write_with_quota(full_path, content)
             
             # Log the file modification
             kwargs = {
@@ -563,7 +699,10 @@ class SandboxExecutor(SandboxExecutorInterface):
             
             # Delete the file
             if full_path.exists():
+                file_size = full_path.stat().st_size
                 full_path.unlink()
+                if self.disk_quota:
+                    self.disk_quota.record_delete(self.quota_workspace_id, file_size)
             
             # Log the file deletion
             kwargs = {
@@ -648,8 +787,10 @@ class SandboxExecutor(SandboxExecutorInterface):
             self.logger.log_error(**kwargs)
             return False
         
-        # Execute the install command
-        result = self.execute_command(command)
+        # Execute the install command, reusing downloads and built wheels from the shared cache
+        if self.package_cache is None:
+            self.package_cache = EnvironmentCache()
+        result = self.execute_command(command, env_vars=self.package_cache.package_manager_env())
         success = result.exit_code == 0
         
         # Log the package installation result
@@ -700,6 +841,36 @@ class SandboxExecutor(SandboxExecutorInterface):
         # Default to pip for Python environments
         return "pip"
     
+    def _write_with_quota(self, full_path: Path, content: str) -> None:
+        """
+        Write text content, charging it against the disk quota first if one is configured.
+        
+        Raises:
+            DiskQuotaExceededError: If the write would exceed the hard quota
+        """
+        if not self.disk_quota:
+            full_path.write_text(content, encoding='utf-8')
+            return
+        
+        data = content.encode('utf-8')
+        delta = self.disk_quota.charge_write(self.quota_workspace_id, str(full_path), len(data))
+        try:
+            full_path.write_bytes(data)
+        except Exception:
+            self.disk_quota.refund(self.quota_workspace_id, delta)
+            raise
+    
+    def get_disk_usage(self) -> Optional[Dict[str, Any]]:
+        """
+        Get tracked disk usage for this workspace.
+        
+        Returns:
+            Dictionary with usage and quota information, or None if no quota is configured
+        """
+        if self.disk_quota:
+            return self.disk_quota.get_usage(self.quota_workspace_id)
+        return None
+    
     def _resolve_path(self, file_path: str) -> Path:
         """
         Resolve a file path within the workspace with security validation.
@@ -843,19 +1014,37 @@ class SandboxExecutor(SandboxExecutorInterface):
         """
         Export the execution log for this session.
 
+        Loggers that support streaming are read page by page; use
+        export_execution_log_to() to write a large log without holding it
+        in memory.
+
         Args:
-            format: Export format ("json" or "csv")
+            format: Export format ("json", "ndjson" or "csv")
 
         Returns:
             Formatted log data as string
         """
-        if hasattr(self.logger, 'export_logs'):
-            from ..logger.models import LogQuery
-            query: Any = LogQuery(session_id=self.session_id)
+        from ..logger.models import LogQuery
+        query: Any = LogQuery(session_id=self.session_id)
+        if hasattr(self.logger, 'stream_logs'):
+            return "".join(self.logger.stream_logs(query, format))
+        elif hasattr(self.logger, 'export_logs'):
             return self.logger.export_logs(query, format)
         else:
             return f"Log export not available with current logger type"
 
+    def export_execution_log_to(self, destination: Union[str, Path, IO[str]], format: str = "ndjson") -> int:
+        """
+        Stream the execution log for this session to a file path or open text stream.
+
+        Returns:
+            Number of characters written
+        """
+        if hasattr(self.logger, 'stream_logs'):
+            from ..logger.models import LogQuery
+            return write_chunks(self.logger.stream_logs(LogQuery(session_id=self.session_id), format), destination)
+        return write_chunks([self.export_execution_log(format)], destination)
+
     def get_resource_status(self) -> Optional[Dict[str, Any]]:
         """
         Get current resource usage status.
@@ -873,6 +1062,11 @@ class SandboxExecutor(SandboxExecutorInterface):
             # Stop resource monitoring
             if self.resource_monitor:
                 self.resource_monitor.stop_monitoring()
+            
+            # Stop the persistent shell
+            if self._shell:
+                self._shell.close()
+                self._shell = None
 
             # Clean up temporary files
             tmp_dir = self.workspace_path / ".sandbox" / "tmp"
@@ -896,6 +1090,10 @@ class SandboxExecutor(SandboxExecutorInterface):
                 kwargs["task_id"] = self.task_id
             self.logger.log_action(**kwargs)
 
+            # Write-behind loggers may still hold queued records for this session
+            if hasattr(self.logger, 'flush'):
+                self.logger.flush()
+
         except Exception as e:
             kwargs = {
                 "error_type": type(e).__name__,
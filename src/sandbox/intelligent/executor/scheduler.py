@@ -0,0 +1,213 @@
+"""
+Dependency-aware parallel scheduling of plan tasks.
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Callable, Deque, Dict, List, Optional, Set
+
+from ..planner.models import Task
+from ..types import TaskStatus, ErrorInfo
+from .models import TaskResult
+
+
+class FailurePolicy(Enum):
+    """How the scheduler reacts when a task fails."""
+    FAIL_FAST = "fail_fast"  # Stop dispatching new tasks after the first failure
+    CONTINUE_INDEPENDENT = "continue_independent"  # Skip only dependents of failed tasks
+
+
+@dataclass
+class ScheduleOutcome:
+    """Summary of a scheduler run."""
+    completed: List[str] = field(default_factory=list)
+    failed: List[str] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)  # Not run because a dependency failed
+    blocked: List[str] = field(default_factory=list)  # Not run because dependencies can never be met
+    max_parallelism: int = 0
+
+    @property
+    def success(self) -> bool:
+        """True if every runnable task completed."""
+        return not (self.failed or self.skipped or self.blocked)
+
+
+class DAGScheduler:
+    """
+    Runs plan tasks on a bounded worker pool in dependency order.
+
+    In-degrees and dependents are computed once up front; when a task
+    finishes only its direct dependents are updated, and any task whose
+    in-degree drops to zero is dispatched immediately. Tasks can declare a
+    resource class via ``task.metadata["resource_class"]``; each class may
+    have its own concurrency limit on top of the global worker count.
+    """
+
+    DEFAULT_RESOURCE_CLASS = "default"
+
+    def __init__(self, max_workers: int = 4,
+                 failure_policy: FailurePolicy = FailurePolicy.FAIL_FAST,
+                 resource_limits: Optional[Dict[str, int]] = None):
+        """
+        Initialize the scheduler.
+
+        Args:
+            max_workers: Maximum number of tasks running at once
+            failure_policy: Behaviour when a task fails
+            resource_limits: Per resource class concurrency limits
+        """
+        self.max_workers = max(1, max_workers)
+        self.failure_policy = failure_policy
+        self.resource_limits = resource_limits or {}
+
+    def run(self, tasks: List[Task], execute: Callable[[Task], TaskResult],
+            on_result: Optional[Callable[[Task, TaskResult], None]] = None) -> ScheduleOutcome:
+        """
+        Execute tasks respecting their dependencies.
+
+        Task status is updated as tasks are dispatched and finish. on_result
+        is called on the calling thread, in completion order.
+
+        Args:
+            tasks: Tasks to schedule (already completed tasks are not re-run)
+            execute: Function that runs a single task and returns its result
+            on_result: Optional callback invoked with each finished task and result
+
+        Returns:
+            ScheduleOutcome describing what ran
+        """
+        outcome = ScheduleOutcome()
+        tasks_by_id: Dict[str, Task] = {task.id: task for task in tasks}
+        in_degree: Dict[str, int] = {}
+        dependents: Dict[str, List[str]] = {task.id: [] for task in tasks}
+        ready: Deque[Task] = deque()
+
+        for task in tasks:
+            if task.status == TaskStatus.COMPLETED:
+                continue
+
+            # Unknown dependencies are ignored; completed ones are already satisfied
+            pending = [
+                dep_id for dep_id in task.dependencies
+                if dep_id in tasks_by_id and tasks_by_id[dep_id].status != TaskStatus.COMPLETED
+            ]
+            in_degree[task.id] = len(pending)
+            for dep_id in pending:
+                dependents[dep_id].append(task.id)
+
+            if not pending and task.status == TaskStatus.NOT_STARTED:
+                ready.append(task)
+
+        running: Dict[Future, Task] = {}
+        running_by_class: Dict[str, int] = {}
+        deferred: Deque[Task] = deque()
+        stop_dispatch = False
+
+        with ThreadPoolExecutor(max_workers=self.max_workers,
+                                thread_name_prefix="PlanTask") as pool:
+            while ready or running:
+                # Dispatch as many ready tasks as worker and class capacity allow
+                while ready and not stop_dispatch and len(running) < self.max_workers:
+                    task = ready.popleft()
+                    resource_class = self._resource_class(task)
+                    if not self._has_capacity(resource_class, running_by_class):
+                        deferred.append(task)
+                        continue
+
+                    task.status = TaskStatus.IN_PROGRESS
+                    running_by_class[resource_class] = running_by_class.get(resource_class, 0) + 1
+                    running[pool.submit(execute, task)] = task
+                ready.extendleft(reversed(deferred))
+                deferred.clear()
+                outcome.max_parallelism = max(outcome.max_parallelism, len(running))
+
+                if not running:
+                    break
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = running.pop(future)
+                    resource_class = self._resource_class(task)
+                    running_by_class[resource_class] -= 1
+
+                    task_result = self._result_of(future, task)
+                    if on_result:
+                        on_result(task, task_result)
+
+                    if task_result.success:
+                        task.status = TaskStatus.COMPLETED
+                        outcome.completed.append(task.id)
+                        for dependent_id in dependents[task.id]:
+                            in_degree[dependent_id] -= 1
+                            dependent = tasks_by_id[dependent_id]
+                            if in_degree[dependent_id] == 0 and dependent.status == TaskStatus.NOT_STARTED:
+                                ready.append(dependent)
+                    else:
+                        task.status = TaskStatus.ERROR
+                        task.error_info = task_result.error_info
+                        outcome.failed.append(task.id)
+
+                        if self.failure_policy == FailurePolicy.FAIL_FAST:
+                            stop_dispatch = True
+                        else:
+                            outcome.skipped.extend(
+                                self._collect_dependents(task.id, dependents, tasks_by_id)
+                            )
+
+                if stop_dispatch:
+                    ready.clear()
+
+        # Anything left untouched either follows a fail-fast stop or can never run
+        accounted: Set[str] = set(outcome.completed) | set(outcome.failed) | set(outcome.skipped)
+        for task_id in in_degree:
+            if task_id in accounted:
+                continue
+            if stop_dispatch:
+                outcome.skipped.append(task_id)
+            else:
+                outcome.blocked.append(task_id)
+
+        return outcome
+
+    def _resource_class(self, task: Task) -> str:
+        """Return the resource class a task belongs to."""
+        return task.metadata.get("resource_class", self.DEFAULT_RESOURCE_CLASS)
+
+    def _has_capacity(self, resource_class: str, running_by_class: Dict[str, int]) -> bool:
+        """Check whether another task of the given class may start."""
+        limit = self.resource_limits.get(resource_class)
+        return limit is None or running_by_class.get(resource_class, 0) < limit
+
+    @staticmethod
+    def _result_of(future: Future, task: Task) -> TaskResult:
+        """Unwrap a task future, converting unexpected exceptions into a failed result."""
+        try:
+            return future.result()
+        except Exception as e:
+            return TaskResult(
+                task_id=task.id,
+                success=False,
+                duration=0.0,
+                error_info=ErrorInfo(error_type=type(e).__name__, message=str(e))
+            )
+
+    @staticmethod
+    def _collect_dependents(task_id: str, dependents: Dict[str, List[str]],
+                            tasks_by_id: Dict[str, Task]) -> List[str]:
+        """Return all not-yet-started transitive dependents of a task."""
+        collected: List[str] = []
+        seen: Set[str] = set()
+        stack = list(dependents[task_id])
+
+        while stack:
+            dependent_id = stack.pop()
+            if dependent_id in seen:
+                continue
+            seen.add(dependent_id)
+            if tasks_by_id[dependent_id].status == TaskStatus.NOT_STARTED:
+                collected.append(dependent_id)
+            stack.extend(dependents[dependent_id])
+
+        return collected
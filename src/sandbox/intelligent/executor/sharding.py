@@ -0,0 +1,160 @@
+"""
+Sharded test execution support.
+
+Splits test files across shards balanced by historical durations, and reads
+per-test results from the JUnit XML reports the shards write, so results are
+merged from structured data rather than scraped from console output.
+"""
+
+import json
+import os
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from pathlib import Path
+from statistics import median
+from typing import Dict, Iterable, List, Optional
+
+
+@dataclass
+class TestCaseResult:
+    """Outcome of a single test case from a JUnit XML report."""
+    __test__ = False
+
+    name: str
+    classname: str
+    duration: float
+    outcome: str  # passed, failed, error, skipped
+    message: str = ""
+
+
+@dataclass
+class ShardResult:
+    """Result of one shard of a sharded test run."""
+    index: int
+    test_files: List[str]
+    command: str
+    exit_code: int
+    duration: float
+    output: str
+    error_output: str
+    test_cases: List[TestCaseResult] = field(default_factory=list)
+    report_found: bool = False
+
+
+class TestDurationStore:
+    """Per-project record of how long each test file takes, persisted as JSON."""
+    __test__ = False
+
+    def __init__(self, path: str, smoothing: float = 0.5):
+        """
+        Initialize the store.
+
+        Args:
+            path: JSON file holding the durations
+            smoothing: Weight of a new measurement against the stored value
+        """
+        self.path = Path(path)
+        self.smoothing = smoothing
+        self.durations: Dict[str, float] = {}
+
+        if self.path.exists():
+            try:
+                self.durations = {k: float(v) for k, v in json.loads(self.path.read_text()).items()}
+            except (OSError, ValueError, AttributeError):
+                self.durations = {}
+
+    def estimate(self, test_file: str) -> float:
+        """Expected duration of a test file; unknown files get the median."""
+        if test_file in self.durations:
+            return self.durations[test_file]
+        return median(self.durations.values()) if self.durations else 1.0
+
+    def update(self, measured: Dict[str, float]) -> None:
+        """Blend new measurements into the stored durations and save them."""
+        for test_file, seconds in measured.items():
+            previous = self.durations.get(test_file)
+            if previous is None:
+                self.durations[test_file] = seconds
+            else:
+                self.durations[test_file] = (1 - self.smoothing) * previous + self.smoothing * seconds
+        self.save()
+
+    def save(self) -> None:
+        """Write the durations atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_suffix(".tmp")
+        temp_path.write_text(json.dumps(self.durations, indent=2, sort_keys=True))
+        os.replace(temp_path, self.path)
+
+
+def plan_shards(test_files: Iterable[str], durations: TestDurationStore,
+                shard_count: int) -> List[List[str]]:
+    """
+    Split test files into shards with roughly equal expected durations.
+
+    Uses the longest-processing-time-first heuristic: files are assigned,
+    slowest first, to whichever shard currently has the least work.
+    Empty shards are dropped.
+    """
+    files = sorted(set(test_files), key=lambda f: (-durations.estimate(f), f))
+    shard_count = max(1, min(shard_count, len(files)))
+
+    shards: List[List[str]] = [[] for _ in range(shard_count)]
+    loads = [0.0] * shard_count
+    for test_file in files:
+        lightest = loads.index(min(loads))
+        shards[lightest].append(test_file)
+        loads[lightest] += durations.estimate(test_file)
+
+    return [sorted(shard) for shard in shards if shard]
+
+
+def parse_junit_xml(report_path: str) -> List[TestCaseResult]:
+    """Read the test cases from a JUnit XML report."""
+    root = ET.parse(report_path).getroot()
+    results = []
+
+    for case in root.iter("testcase"):
+        outcome, message = "passed", ""
+        for child in case:
+            if child.tag in ("failure", "error", "skipped"):
+                outcome = "failed" if child.tag == "failure" else child.tag
+                message = child.get("message", "")
+                break
+
+        results.append(TestCaseResult(
+            name=case.get("name", ""),
+            classname=case.get("classname", ""),
+            duration=float(case.get("time", 0) or 0),
+            outcome=outcome,
+            message=message
+        ))
+
+    return results
+
+
+def attribute_to_files(test_cases: List[TestCaseResult],
+                       test_files: List[str]) -> Dict[str, float]:
+    """
+    Sum test case durations per test file.
+
+    pytest's JUnit classnames are dotted module paths, optionally followed by
+    a class name, so each case is matched to the file with the longest
+    module-path prefix.
+    """
+    modules = sorted(
+        ((path[:-len(".py")].replace("/", ".").replace(os.sep, "."), path) for path in test_files),
+        key=lambda item: -len(item[0])
+    )
+    totals = {path: 0.0 for path in test_files}
+
+    for case in test_cases:
+        owner: Optional[str] = None
+        for module, path in modules:
+            if case.classname == module or case.classname.startswith(module + "."):
+                owner = path
+                break
+        if owner is not None:
+            totals[owner] += case.duration
+
+    return totals
@@ -0,0 +1,142 @@
+"""
+Unit tests for the build and install action cache.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from ..logger import create_logger
+from .action_cache import ActionCache
+from .sandbox_executor import SandboxExecutor
+from .toolchain_support import DevelopmentToolchainSupport
+
+
+class TestActionCache(unittest.TestCase):
+    """Test cases for ActionCache."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.workspace = Path(self.temp_dir) / "workspace"
+        self.workspace.mkdir()
+        (self.workspace / "main.c").write_text("int main() { return 0; }\n")
+        self.cache = ActionCache(str(Path(self.temp_dir) / "cache"))
+
+    def tearDown(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_fingerprint_tracks_inputs(self):
+        """Test that the key changes with sources but not with build outputs."""
+        key = self.cache.fingerprint(str(self.workspace), "make")
+
+        (self.workspace / "build").mkdir()
+        (self.workspace / "build" / "main.o").write_bytes(b"\x7fELF")
+        self.assertEqual(self.cache.fingerprint(str(self.workspace), "make"), key)
+        self.assertNotEqual(self.cache.fingerprint(str(self.workspace), "make all"), key)
+
+        (self.workspace / "main.c").write_text("int main() { return 1; }\n")
+        self.assertNotEqual(self.cache.fingerprint(str(self.workspace), "make"), key)
+
+    def test_store_and_restore_outputs(self):
+        """Test that stored outputs, including symlinks, are restored."""
+        before = self.cache.snapshot(str(self.workspace))
+        (self.workspace / "build").mkdir()
+        (self.workspace / "build" / "app").write_text("binary")
+        os.chmod(self.workspace / "build" / "app", 0o755)
+        os.symlink("app", self.workspace / "build" / "latest")
+        outputs = ActionCache.changed_files(before, self.cache.snapshot(str(self.workspace)))
+
+        self.cache.store(["key"], str(self.workspace), outputs, command="make", exit_code=0,
+                         output="done", error_output="", duration=1.0)
+        shutil.rmtree(self.workspace / "build")
+
+        entry = self.cache.lookup("key")
+        restored = self.cache.restore(entry, str(self.workspace))
+
+        self.assertEqual(sorted(restored), ["build/app", "build/latest"])
+        self.assertEqual((self.workspace / "build" / "app").read_text(), "binary")
+        self.assertEqual(os.stat(self.workspace / "build" / "app").st_mode & 0o777, 0o755)
+        self.assertEqual(os.readlink(self.workspace / "build" / "latest"), "app")
+        self.assertEqual(entry.output, "done")
+
+    def test_prune_evicts_least_recently_used(self):
+        """Test that pruning keeps the store within its size budget."""
+        self.cache.max_size_bytes = 150
+        for name in ("old", "new"):
+            (self.workspace / f"{name}.bin").write_bytes(name.encode() * 40)
+            self.cache.store([name], str(self.workspace), [f"{name}.bin"], command=name,
+                             exit_code=0, output="", error_output="", duration=0.0)
+            os.utime(self.cache.actions_dir / f"{name}.json",
+                     (1000 if name == "old" else 2000,) * 2)
+        self.cache.prune()
+
+        self.assertIsNone(self.cache.lookup("old"))
+        self.assertIsNotNone(self.cache.lookup("new"))
+
+
+class TestCachedToolchainActions(unittest.TestCase):
+    """Test cases for cached builds and installs in DevelopmentToolchainSupport."""
+
+    def setUp(self):
+        """Create a workspace whose build and install write files."""
+        self.temp_dir = tempfile.mkdtemp()
+        workspace = Path(self.temp_dir)
+        (workspace / "Makefile").write_text("all:\n\ttrue\n")
+        (workspace / "main.c").write_text("int main() { return 0; }\n")
+        (workspace / "package.json").write_text('{"name": "demo"}\n')
+
+        self.executor = SandboxExecutor(self.temp_dir, logger=create_logger("memory"),
+                                        enable_resource_monitoring=False)
+        self.toolchain = DevelopmentToolchainSupport(self.executor)
+        self.build_command = "mkdir -p build && cp main.c build/app.so && echo compiled"
+        self.install_command = "mkdir -p node_modules/demo && cp package.json node_modules/demo/"
+
+    def tearDown(self):
+        """Clean up test environment."""
+        self.executor.cleanup_session()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_unchanged_build_is_restored_from_cache(self):
+        """Test that a repeated build restores its artifacts without running."""
+        first = self.toolchain.build_project(self.build_command)
+        self.assertFalse(first.cache_hit)
+        self.assertEqual(len(first.artifacts_created), 1)
+
+        shutil.rmtree(Path(self.temp_dir) / "build")
+        second = self.toolchain.build_project(self.build_command)
+
+        self.assertTrue(second.success)
+        self.assertTrue(second.cache_hit)
+        self.assertEqual(second.output, first.output)
+        self.assertEqual(len(second.artifacts_created), 1)
+        self.assertTrue((Path(self.temp_dir) / "build" / "app.so").exists())
+
+    def test_source_change_invalidates_build(self):
+        """Test that editing a source file forces a real build."""
+        self.toolchain.build_project(self.build_command)
+        (Path(self.temp_dir) / "main.c").write_text("int main() { return 2; }\n")
+
+        result = self.toolchain.build_project(self.build_command)
+
+        self.assertFalse(result.cache_hit)
+        self.assertIn("return 2", (Path(self.temp_dir) / "build" / "app.so").read_text())
+
+    def test_install_keyed_on_manifests(self):
+        """Test that installs only rerun when dependency manifests change."""
+        self.toolchain.install_dependencies(self.install_command)
+        (Path(self.temp_dir) / "main.c").write_text("changed sources do not matter\n")
+
+        self.toolchain.install_dependencies(self.install_command)
+        self.assertEqual(self.toolchain.action_cache.stats["hits"], 1)
+
+        (Path(self.temp_dir) / "package.json").write_text('{"name": "demo", "version": "2"}\n')
+        self.toolchain.install_dependencies(self.install_command)
+        self.assertEqual(self.toolchain.action_cache.stats["hits"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,6 +4,8 @@ Unit tests for the execution engine.
 
 import os
 import tempfile
+import threading
+import time
 import unittest
 from pathlib import Path
 from unittest.mock import Mock, patch
@@ -12,8 +14,11 @@ from datetime import datetime
 from ..types import TaskStatus, ErrorInfo
 from ..planner.models import Task, TaskPlan, Subtask, CodebaseContext
 from ..analyzer.models import CodebaseAnalysis, CodebaseStructure, DependencyGraph, CodeMetrics
+from ..workspace.security import SecurityPolicy, DiskQuotaManager, DiskQuotaExceededError
 from .engine import ExecutionEngine, SandboxCommandExecutor
-from .models import SandboxExecutor, RetryContext
+from .models import SandboxExecutor, RetryContext, TaskResult
+from .scheduler import DAGScheduler, FailurePolicy
+from .sandbox_executor import SandboxExecutor as LoggingSandboxExecutor
 
 
 class TestSandboxCommandExecutor(unittest.TestCase):
@@ -182,6 +187,146 @@ class TestSandboxCommandExecutor(unittest.TestCase):
         except PermissionError:
             self.fail("PermissionError raised when isolation is disabled")
 
+    def test_quota_workspace_without_manager(self):
+        """Test that a quota workspace id without a quota manager is ignored."""
+        executor = SandboxCommandExecutor(self.temp_dir, quota_workspace_id="ws")
+
+        self.assertTrue(executor.create_file("a.txt", "content"))
+        self.assertTrue(executor.delete_file("a.txt"))
+        self.assertEqual(executor.execute_command("echo ok").exit_code, 0)
+
+
+class TestSandboxExecutorDiskQuota(unittest.TestCase):
+    """Test cases for disk quota accounting in SandboxExecutor."""
+    
+    def setUp(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.quota = DiskQuotaManager(SecurityPolicy())
+        self.quota.register_workspace("ws", self.temp_dir, hard_limit_bytes=1000,
+                                      soft_limit_bytes=500)
+        self.executor = LoggingSandboxExecutor(
+            self.temp_dir, logger=Mock(), enable_resource_monitoring=False,
+            disk_quota=self.quota, quota_workspace_id="ws"
+        )
+    
+    def tearDown(self):
+        """Clean up test environment."""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_writes_are_accounted_incrementally(self):
+        """Test that create, modify and delete update usage without a rescan."""
+        self.assertTrue(self.executor.create_file("a.txt", "x" * 300))
+        self.assertEqual(self.quota.get_usage("ws")["used_bytes"], 300)
+        
+        self.assertTrue(self.executor.modify_file("a.txt", "x" * 100))
+        self.assertEqual(self.quota.get_usage("ws")["used_bytes"], 100)
+        
+        self.assertTrue(self.executor.delete_file("a.txt"))
+        self.assertEqual(self.quota.get_usage("ws")["used_bytes"], 0)
+    
+    def test_hard_quota_rejects_write(self):
+        """Test that a write beyond the hard quota is rejected before hitting disk."""
+        self.executor.create_file("a.txt", "x" * 600)
+        self.assertTrue(self.quota.get_usage("ws")["soft_limit_exceeded"])
+        
+        with self.assertRaises(DiskQuotaExceededError):
+            self.executor.create_file("b.txt", "x" * 600)
+        
+        self.assertFalse(Path(self.temp_dir, "b.txt").exists())
+        self.assertEqual(self.quota.get_usage("ws")["used_bytes"], 600)
+    
+    def test_reconcile_picks_up_command_writes(self):
+        """Test that shell command writes are corrected by reconciliation."""
+        self.executor.execute_command("printf '%0200d' 0 > out.txt")
+        self.assertTrue(self.quota.get_usage("ws")["pending_reconciliation"])
+        
+        self.assertEqual(self.quota.reconcile_all(), 1)
+        usage = self.quota.get_usage("ws")
+        self.assertEqual(usage["used_bytes"], 200)
+        self.assertFalse(usage["pending_reconciliation"])
+
+    @unittest.skipUnless(os.name == 'posix', "ulimit requires a POSIX shell")
+    def test_command_writes_are_capped_to_remaining_quota(self):
+        """Test that a command cannot write a file larger than the remaining quota."""
+        result = self.executor.execute_command("head -c 5000 /dev/zero > big.bin")
+
+        self.assertNotEqual(result.exit_code, 0)
+        self.assertLessEqual(Path(self.temp_dir, "big.bin").stat().st_size, 1000)
+        self.assertEqual(result.command, "head -c 5000 /dev/zero > big.bin")
+
+
+class TestSandboxExecutorPersistentShell(unittest.TestCase):
+    """Test cases for persistent shell mode in SandboxExecutor."""
+    
+    def setUp(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.executor = LoggingSandboxExecutor(
+            self.temp_dir, logger=Mock(), enable_resource_monitoring=False,
+            persistent_shell=True
+        )
+    
+    def tearDown(self):
+        """Clean up test environment."""
+        import shutil
+        self.executor.cleanup_session()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_cwd_and_exports_persist(self):
+        """Test that cd and export carry over between commands."""
+        result = self.executor.execute_command("mkdir -p sub && cd sub && export FOO=bar")
+        self.assertEqual(result.exit_code, 0)
+        
+        result = self.executor.execute_command("echo $FOO; pwd")
+        self.assertEqual(result.output.split(), ["bar", str(Path(self.temp_dir, "sub"))])
+        self.assertEqual(result.working_directory, str(Path(self.temp_dir, "sub")))
+    
+    def test_output_framing(self):
+        """Test that stdout, stderr and exit code are separated per command."""
+        result = self.executor.execute_command("printf 'no newline'; echo oops >&2; exit_code() { return 3; }; exit_code")
+        
+        self.assertEqual(result.output, "no newline")
+        self.assertEqual(result.error_output, "oops\n")
+        self.assertEqual(result.exit_code, 3)
+    
+    def test_timeout_interrupts_without_losing_state(self):
+        """Test that a timed out command is interrupted and the shell survives."""
+        self.executor.execute_command("export KEEP=1")
+        
+        result = self.executor.execute_command("sleep 10", timeout=1)
+        self.assertEqual(result.exit_code, -1)
+        self.assertIn("timed out", result.error_output.lower())
+        
+        result = self.executor.execute_command("echo $KEEP")
+        self.assertEqual(result.output, "1\n")
+    
+    def test_shell_exit_restarts(self):
+        """Test that a command exiting the shell is reported and the shell restarts."""
+        result = self.executor.execute_command("exit 4")
+        self.assertEqual(result.exit_code, 4)
+        
+        result = self.executor.execute_command("echo alive")
+        self.assertEqual(result.output, "alive\n")
+
+    def test_exhausted_quota_rejects_command(self):
+        """Test that no command runs in the shell once the disk quota is used up."""
+        quota = DiskQuotaManager(SecurityPolicy())
+        quota.register_workspace("ws", self.temp_dir, hard_limit_bytes=100, soft_limit_bytes=100)
+        self.executor.disk_quota = quota
+        self.executor.quota_workspace_id = "ws"
+
+        result = self.executor.execute_command("head -c 5000 /dev/zero > big.bin")
+        self.assertLessEqual(Path(self.temp_dir, "big.bin").stat().st_size, 100)
+
+        self.executor.create_file("full.txt", "x" * 100)
+        result = self.executor.execute_command("touch ran.txt")
+
+        self.assertEqual(result.exit_code, -1)
+        self.assertIn("quota", result.error_output)
+        self.assertFalse(Path(self.temp_dir, "ran.txt").exists())
+
 
 class TestExecutionEngine(unittest.TestCase):
     """Test cases for ExecutionEngine."""
@@ -297,6 +442,33 @@ class TestExecutionEngine(unittest.TestCase):
         self.assertEqual(task1.status, TaskStatus.COMPLETED)
         self.assertEqual(task2.status, TaskStatus.COMPLETED)
     
+    def test_execute_plan_enforces_disk_quota(self):
+        """Test that plan writes over the workspace quota are rejected without reconciliation."""
+        quota = DiskQuotaManager(SecurityPolicy())
+        quota.register_workspace("ws", self.temp_dir, hard_limit_bytes=40, soft_limit_bytes=40)
+        quota.reconcile = Mock(side_effect=AssertionError("write was not charged incrementally"))
+        engine = ExecutionEngine(disk_quota=quota)
+        
+        structure = CodebaseStructure(root_path=self.temp_dir, languages=["python"], frameworks=[])
+        analysis = CodebaseAnalysis(
+            structure=structure,
+            dependencies=DependencyGraph(),
+            patterns=[],
+            metrics=CodeMetrics(),
+            summary="Test analysis",
+            analysis_timestamp=datetime.now()
+        )
+        task = Task(id="big", description="Create a file", status=TaskStatus.NOT_STARTED)
+        plan = TaskPlan(id="quota_plan", description="Quota plan", tasks=[task],
+                        codebase_context=CodebaseContext(analysis=analysis))
+        
+        result = engine.execute_plan(plan)
+        
+        self.assertFalse(result.success)
+        self.assertFalse(Path(self.temp_dir, "task_big_output.txt").exists())
+        self.assertEqual(quota.get_usage("ws")["used_bytes"], 0)
+        quota.reconcile.assert_not_called()
+    
     def test_execute_plan_with_dependency_failure(self):
         """Test execution stops when a dependency fails."""
         structure = CodebaseStructure(
@@ -498,5 +670,101 @@ class TestExecutionEngine(unittest.TestCase):
         self.assertEqual(history[-1].plan_id, "history_plan")
 
 
+
+class TestDAGScheduler(unittest.TestCase):
+    """Test cases for DAGScheduler."""
+    
+    def _run(self, tasks, scheduler, failing=(), delay=0.0):
+        """Run tasks with a fake executor, returning the outcome and peak concurrency."""
+        lock = threading.Lock()
+        state = {"active": 0, "peak": 0}
+        
+        def execute(task):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(delay)
+            with lock:
+                state["active"] -= 1
+            return TaskResult(task_id=task.id, success=task.id not in failing, duration=delay)
+        
+        return scheduler.run(tasks, execute), state["peak"]
+    
+    def test_independent_branches_run_concurrently(self):
+        """Test that lint/test/build branches overlap instead of running serially."""
+        tasks = [
+            Task(id="setup", description="setup"),
+            Task(id="lint", description="lint", dependencies=["setup"]),
+            Task(id="test", description="test", dependencies=["setup"]),
+            Task(id="build", description="build", dependencies=["setup"]),
+            Task(id="package", description="package", dependencies=["lint", "test", "build"]),
+        ]
+        
+        start = time.time()
+        outcome, peak = self._run(tasks, DAGScheduler(max_workers=4), delay=0.2)
+        elapsed = time.time() - start
+        
+        self.assertTrue(outcome.success)
+        self.assertEqual(outcome.completed[0], "setup")
+        self.assertEqual(outcome.completed[-1], "package")
+        self.assertEqual(peak, 3)
+        self.assertLess(elapsed, 0.2 * 5)
+        self.assertTrue(all(t.status == TaskStatus.COMPLETED for t in tasks))
+    
+    def test_fail_fast_stops_dispatch(self):
+        """Test that fail-fast skips everything not yet started."""
+        tasks = [
+            Task(id="a", description="a"),
+            Task(id="b", description="b", dependencies=["a"]),
+            Task(id="c", description="c", dependencies=["a"]),
+        ]
+        
+        outcome, _ = self._run(tasks, DAGScheduler(max_workers=2), failing={"a"})
+        
+        self.assertEqual(outcome.failed, ["a"])
+        self.assertEqual(sorted(outcome.skipped), ["b", "c"])
+        self.assertEqual(tasks[1].status, TaskStatus.NOT_STARTED)
+    
+    def test_continue_independent_runs_unaffected_tasks(self):
+        """Test that only dependents of a failed task are skipped."""
+        tasks = [
+            Task(id="a", description="a"),
+            Task(id="b", description="b", dependencies=["a"]),
+            Task(id="c", description="c"),
+            Task(id="d", description="d", dependencies=["c"]),
+        ]
+        scheduler = DAGScheduler(max_workers=2,
+                                 failure_policy=FailurePolicy.CONTINUE_INDEPENDENT)
+        
+        outcome, _ = self._run(tasks, scheduler, failing={"a"})
+        
+        self.assertEqual(outcome.failed, ["a"])
+        self.assertEqual(outcome.skipped, ["b"])
+        self.assertEqual(sorted(outcome.completed), ["c", "d"])
+    
+    def test_resource_class_limit(self):
+        """Test that a resource class limit caps concurrency within that class."""
+        tasks = [Task(id=f"build_{i}", description="build", metadata={"resource_class": "build"})
+                 for i in range(3)]
+        scheduler = DAGScheduler(max_workers=4, resource_limits={"build": 1})
+        
+        outcome, peak = self._run(tasks, scheduler, delay=0.05)
+        
+        self.assertTrue(outcome.success)
+        self.assertEqual(peak, 1)
+    
+    def test_cycle_is_reported_as_blocked(self):
+        """Test that tasks in a dependency cycle are reported as blocked."""
+        tasks = [
+            Task(id="x", description="x", dependencies=["y"]),
+            Task(id="y", description="y", dependencies=["x"]),
+        ]
+        
+        outcome, _ = self._run(tasks, DAGScheduler())
+        
+        self.assertFalse(outcome.success)
+        self.assertEqual(sorted(outcome.blocked), ["x", "y"])
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,183 @@
+"""
+Unit tests for test impact analysis and affected-test runs.
+"""
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from ..logger import create_logger
+from .impact_analysis import TestImpactAnalyzer
+from .sandbox_executor import SandboxExecutor
+from .toolchain_support import DevelopmentToolchainSupport
+
+
+class TestTestImpactAnalyzer(unittest.TestCase):
+    """Test cases for TestImpactAnalyzer."""
+
+    def setUp(self):
+        """Create a small project with a src layout."""
+        self.temp_dir = tempfile.mkdtemp()
+        self._write("src/app/__init__.py", "")
+        self._write("src/app/models.py", "class User:\n    pass\n")
+        self._write("src/app/service.py", "from .models import User\n")
+        self._write("src/app/utils.py", "def helper():\n    return 1\n")
+        self._write("tests/test_models.py", "from app.models import User\n")
+        self._write("tests/test_service.py", "from app import service\n")
+        self._write("tests/test_utils.py", "import app.utils\n")
+        self.analyzer = TestImpactAnalyzer(self.temp_dir)
+
+    def tearDown(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _write(self, path, content):
+        full_path = Path(self.temp_dir) / path
+        full_path.parent.mkdir(parents=True, exist_ok=True)
+        full_path.write_text(content)
+
+    def test_transitive_importers_are_selected(self):
+        """Test that tests importing a changed module indirectly are selected."""
+        selection = self.analyzer.select_tests([str(Path(self.temp_dir) / "src/app/models.py")])
+
+        self.assertFalse(selection.full_run_required)
+        self.assertEqual(selection.selected_tests,
+                         ["tests/test_models.py", "tests/test_service.py"])
+
+    def test_changed_test_file_is_selected(self):
+        """Test that a changed test file selects itself."""
+        selection = self.analyzer.select_tests(["tests/test_utils.py"])
+
+        self.assertEqual(selection.selected_tests, ["tests/test_utils.py"])
+
+    def test_package_init_affects_all_importers(self):
+        """Test that changing a package __init__ selects everything under it."""
+        selection = self.analyzer.select_tests(["src/app/__init__.py"])
+
+        self.assertEqual(len(selection.selected_tests), 3)
+
+    def test_untraceable_changes_require_full_run(self):
+        """Test fallback to a full run for files outside the import graph."""
+        for changed in (["tests/conftest.py"], ["data/fixture.json"], ["/elsewhere/module.py"]):
+            with self.subTest(changed=changed):
+                self.assertTrue(self.analyzer.select_tests(changed).full_run_required)
+
+    def test_graph_picks_up_new_imports(self):
+        """Test that edited files are re-parsed on the next selection."""
+        self.analyzer.select_tests(["src/app/utils.py"])
+        self._write("src/app/models.py", "from .utils import helper\n\nclass User:\n    pass\n")
+
+        selection = self.analyzer.select_tests(["src/app/utils.py"])
+
+        self.assertEqual(selection.selected_tests,
+                         ["tests/test_models.py", "tests/test_service.py", "tests/test_utils.py"])
+
+
+class TestAffectedTestRuns(unittest.TestCase):
+    """Test cases for DevelopmentToolchainSupport.run_tests(affected_only=True)."""
+
+    def setUp(self):
+        """Create a Python project with two independent test modules."""
+        self.temp_dir = tempfile.mkdtemp()
+        workspace = Path(self.temp_dir)
+        (workspace / "setup.py").write_text("from setuptools import setup\nsetup(name='demo')\n")
+        (workspace / "alpha.py").write_text("VALUE = 1\n")
+        (workspace / "beta.py").write_text("VALUE = 2\n")
+        (workspace / "test_alpha.py").write_text(
+            "import alpha\n\ndef test_alpha():\n    assert alpha.VALUE == 1\n")
+        (workspace / "test_beta.py").write_text(
+            "import beta\n\ndef test_beta():\n    assert beta.VALUE == 2\n")
+
+        self.executor = SandboxExecutor(self.temp_dir, logger=create_logger("memory"),
+                                        enable_resource_monitoring=False)
+        self.toolchain = DevelopmentToolchainSupport(self.executor)
+        self.test_command = "python -m pytest -p no:cacheprovider -o addopts="
+
+    def tearDown(self):
+        """Clean up test environment."""
+        self.executor.cleanup_session()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_runs_only_tests_affected_by_logged_changes(self):
+        """Test that file changes from the executor log drive test selection."""
+        self.executor.modify_file("beta.py", "VALUE = 2\n\n")
+
+        result = self.toolchain.run_tests(self.test_command, coverage=False, affected_only=True)
+
+        self.assertTrue(result.success)
+        self.assertEqual(result.selection.selected_tests, ["test_beta.py"])
+        self.assertIn("test_beta.py", result.output)
+        self.assertNotIn("test_alpha.py", result.output)
+
+    def test_no_affected_tests_skips_run(self):
+        """Test that a run with no new changes executes nothing."""
+        self.toolchain.run_tests(self.test_command, coverage=False, affected_only=True)
+
+        result = self.toolchain.run_tests(self.test_command, coverage=False, affected_only=True)
+
+        self.assertTrue(result.success)
+        self.assertEqual(result.tests_run, 0)
+        self.assertEqual(result.selection.selected_tests, [])
+
+    def test_failed_tests_are_reselected_until_they_pass(self):
+        """Test that a failing run does not advance the changed-since marker."""
+        self.executor.modify_file("beta.py", "VALUE = 3\n")
+        failed = self.toolchain.run_tests(self.test_command, coverage=False, affected_only=True)
+        self.assertFalse(failed.success)
+        self.assertEqual(failed.selection.selected_tests, ["test_beta.py"])
+
+        # An unrelated change must not hide the still-failing test
+        self.executor.modify_file("alpha.py", "VALUE = 1\n\n")
+        still_failing = self.toolchain.run_tests(self.test_command, coverage=False, affected_only=True)
+        self.assertFalse(still_failing.success)
+        self.assertEqual(still_failing.selection.selected_tests, ["test_alpha.py", "test_beta.py"])
+
+        self.executor.modify_file("beta.py", "VALUE = 2\n")
+        fixed = self.toolchain.run_tests(self.test_command, coverage=False, affected_only=True)
+        self.assertTrue(fixed.success)
+        self.assertEqual(fixed.tests_passed, 2)
+
+        unchanged = self.toolchain.run_tests(self.test_command, coverage=False, affected_only=True)
+        self.assertEqual(unchanged.tests_run, 0)
+
+    def test_untraceable_change_falls_back_to_full_run(self):
+        """Test the full-suite fallback for changes outside the import graph."""
+        self.executor.create_file("conftest.py", "")
+
+        result = self.toolchain.run_tests(self.test_command, coverage=False, affected_only=True)
+
+        self.assertTrue(result.success)
+        self.assertIsNone(result.selection)
+        self.assertIn("test_alpha.py", result.output)
+        self.assertIn("test_beta.py", result.output)
+
+    def test_selected_paths_follow_working_directory(self):
+        """Test that selected files are rebased onto the toolchain working directory."""
+        self.toolchain.toolchain_config.working_directory = str(Path(self.temp_dir, "tests"))
+
+        self.assertEqual(
+            self.toolchain._restrict_test_command("pytest -q", ["tests/unit/test_a.py", "test_b.py"]),
+            "pytest -q unit/test_a.py ../test_b.py")
+        self.assertEqual(
+            self.toolchain._restrict_test_command("python -m unittest", ["tests/unit/test_a.py"]),
+            "python -m unittest unit.test_a")
+        # Modules outside the working directory cannot be imported by name
+        self.assertIsNone(self.toolchain._restrict_test_command("python -m unittest", ["test_b.py"]))
+
+    def test_unittest_discover_options_fall_back_to_full_run(self):
+        """Test that discover is only dropped when it has no options to carry over."""
+        self.assertEqual(
+            self.toolchain._restrict_test_command("python -m unittest discover", ["pkg/test_a.py"]),
+            "python -m unittest pkg.test_a")
+        self.assertIsNone(
+            self.toolchain._restrict_test_command("python -m unittest discover -s tests", ["tests/test_a.py"]))
+
+        self.executor.modify_file("beta.py", "VALUE = 2\n\n")
+        result = self.toolchain.run_tests("python -m unittest discover -s . -p 'test_*.py'",
+                                          coverage=False, affected_only=True)
+        self.assertIsNone(result.selection)
+
+
+if __name__ == '__main__':
+    unittest.main()
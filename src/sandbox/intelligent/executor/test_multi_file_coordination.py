@@ -251,6 +251,124 @@ class TestMultiFileCoordinator(unittest.TestCase):
         self.assertEqual(execution_order[1], "b.txt")  # Depends on a.txt
         self.assertEqual(execution_order[2], "c.txt")  # Depends on a.txt and b.txt
     
+    def test_independent_operations_share_a_level(self):
+        """Test grouping of independent operations into parallel levels."""
+        operations = [
+            FileOperation(operation_type="create", file_path="a.txt", content="A"),
+            FileOperation(operation_type="create", file_path="b.txt", content="B"),
+            FileOperation(operation_type="create", file_path="c.txt", content="C",
+                          dependencies=["a.txt", "b.txt"]),
+            FileOperation(operation_type="modify", file_path="d.txt", content="D",
+                          dependencies=["b.txt"])
+        ]
+        
+        levels = self.coordinator._group_operations_by_level(operations)
+        
+        self.assertEqual([[op.file_path for op in level] for level in levels],
+                         [["a.txt", "b.txt"], ["c.txt", "d.txt"]])
+    
+    def test_failed_staging_leaves_workspace_untouched(self):
+        """Test that a failure while staging changes nothing on disk."""
+        existing = Path(self.temp_dir) / "existing.txt"
+        existing.write_text("Original")
+        
+        operations = [
+            FileOperation(operation_type="modify", file_path="existing.txt", content="Changed"),
+            FileOperation(operation_type="create", file_path="nested/new.txt", content="New"),
+            FileOperation(operation_type="delete", file_path="missing.txt",
+                          dependencies=["existing.txt"])
+        ]
+        
+        self.coordinator.create_transaction("staging_tx", operations)
+        with self.assertRaises(RuntimeError):
+            self.coordinator.execute_transaction("staging_tx")
+        
+        self.assertEqual(existing.read_text(), "Original")
+        self.assertEqual(sorted(os.listdir(self.temp_dir)), [".sandbox_journal", "existing.txt"])
+        self.assertEqual(os.listdir(self.coordinator.journal_dir), [])
+    
+    def test_move_operation(self):
+        """Test moving a file modified earlier in the same transaction."""
+        source = Path(self.temp_dir) / "old.txt"
+        source.write_text("Original")
+        
+        operations = [
+            FileOperation(operation_type="modify", file_path="old.txt", content="Updated"),
+            FileOperation(operation_type="move", file_path="old.txt", target_path="new.txt")
+        ]
+        
+        self.coordinator.create_transaction("move_tx", operations)
+        self.assertTrue(self.coordinator.execute_transaction("move_tx"))
+        
+        self.assertFalse(source.exists())
+        self.assertEqual((Path(self.temp_dir) / "new.txt").read_text(), "Updated")
+    
+    def test_commit_without_hard_links(self):
+        """Test that transactions work on filesystems that do not support hard links."""
+        target = Path(self.temp_dir) / "file.txt"
+        target.write_text("Original")
+        (Path(self.temp_dir) / "old.txt").write_text("Moved")
+        
+        operations = [
+            FileOperation(operation_type="modify", file_path="file.txt", content="New"),
+            FileOperation(operation_type="move", file_path="old.txt", target_path="new.txt")
+        ]
+        self.coordinator.create_transaction("nolink_tx", operations)
+        
+        with patch("os.link", side_effect=OSError(1, "Operation not permitted")):
+            self.assertTrue(self.coordinator.execute_transaction("nolink_tx"))
+        
+        self.assertEqual(target.read_text(), "New")
+        self.assertEqual((Path(self.temp_dir) / "new.txt").read_text(), "Moved")
+        self.assertEqual(sorted(os.listdir(self.temp_dir)), [".sandbox_journal", "file.txt", "new.txt"])
+    
+    def test_recovery_rolls_committing_transaction_forward(self):
+        """Test recovery of a transaction interrupted during commit."""
+        target = Path(self.temp_dir) / "file.txt"
+        target.write_text("Original")
+        
+        operations = [FileOperation(operation_type="modify", file_path="file.txt", content="New")]
+        self.coordinator.create_transaction("crash_tx", operations)
+        
+        with patch.object(self.coordinator, "_commit_journal", side_effect=SystemExit):
+            with patch.object(self.coordinator, "_remove_manifest"):
+                with self.assertRaises(SystemExit):
+                    self.coordinator.execute_transaction("crash_tx")
+        
+        self.assertEqual(target.read_text(), "Original")
+        
+        # Constructors only recover once per workspace and process
+        MultiFileCoordinator(self.temp_dir)
+        self.assertEqual(target.read_text(), "Original")
+        
+        recovered = MultiFileCoordinator(self.temp_dir).recover_incomplete_transactions()
+        self.assertEqual(recovered, ["crash_tx"])
+        self.assertEqual(target.read_text(), "New")
+        self.assertEqual(sorted(os.listdir(self.temp_dir)), [".sandbox_journal", "file.txt"])
+        self.assertEqual(os.listdir(self.coordinator.journal_dir), [])
+    
+    def test_recovery_skips_running_transactions(self):
+        """Test that recovery leaves a live transaction's staged files alone."""
+        target = Path(self.temp_dir) / "a.txt"
+        target.write_text("Original")
+        
+        operations = [FileOperation(operation_type="modify", file_path="a.txt", content="New")]
+        self.coordinator.create_transaction("t1", operations)
+        
+        commit = self.coordinator._commit_journal
+        recovered = []
+        
+        def recover_then_commit(transaction):
+            recovered.extend(MultiFileCoordinator(self.temp_dir).recover_incomplete_transactions())
+            commit(transaction)
+        
+        with patch.object(self.coordinator, "_commit_journal", side_effect=recover_then_commit):
+            self.assertTrue(self.coordinator.execute_transaction("t1"))
+        
+        self.assertEqual(recovered, [])
+        self.assertEqual(target.read_text(), "New")
+        self.assertEqual(os.listdir(self.coordinator.journal_dir), [])
+    
     def test_conflict_resolution(self):
         """Test conflict resolution mechanisms."""
         operations = [
@@ -0,0 +1,129 @@
+"""
+Unit tests for sharded test execution.
+"""
+
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from ..logger import create_logger
+from .sandbox_executor import SandboxExecutor
+from .sharding import TestDurationStore, attribute_to_files, parse_junit_xml, plan_shards
+from .toolchain_support import DevelopmentToolchainSupport
+
+
+JUNIT_REPORT = """<?xml version="1.0" encoding="utf-8"?>
+<testsuites><testsuite name="pytest" tests="4">
+<testcase classname="tests.test_a" name="test_one" time="1.5" />
+<testcase classname="tests.test_a.TestGroup" name="test_two" time="0.5">
+<failure message="assert 1 == 2">trace</failure></testcase>
+<testcase classname="tests.test_b" name="test_three" time="0.25">
+<skipped message="not today" /></testcase>
+<testcase classname="tests.test_b" name="test_four" time="0.75">
+<error message="fixture broke">trace</error></testcase>
+</testsuite></testsuites>
+"""
+
+
+class TestShardPlanning(unittest.TestCase):
+    """Test cases for duration-balanced shard planning."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.store = TestDurationStore(str(Path(self.temp_dir) / "durations.json"))
+
+    def tearDown(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_shards_are_balanced_by_duration(self):
+        """Test longest-first assignment to the least loaded shard."""
+        self.store.update({"slow.py": 10.0, "a.py": 4.0, "b.py": 3.0, "c.py": 3.0})
+
+        shards = plan_shards(["a.py", "b.py", "c.py", "slow.py"], self.store, 2)
+
+        self.assertEqual(shards, [["slow.py"], ["a.py", "b.py", "c.py"]])
+
+    def test_shard_count_capped_by_files(self):
+        """Test that no empty shards are planned."""
+        shards = plan_shards(["a.py", "b.py"], self.store, 8)
+
+        self.assertEqual(len(shards), 2)
+
+    def test_durations_persist_and_smooth(self):
+        """Test that measurements are saved and blended with history."""
+        self.store.update({"a.py": 2.0})
+        self.store.update({"a.py": 4.0})
+
+        reloaded = TestDurationStore(str(Path(self.temp_dir) / "durations.json"))
+        self.assertEqual(reloaded.estimate("a.py"), 3.0)
+        self.assertEqual(reloaded.estimate("unknown.py"), 3.0)  # Median of known files
+
+    def test_parse_junit_report(self):
+        """Test reading outcomes and attributing durations to files."""
+        report_path = Path(self.temp_dir) / "report.xml"
+        report_path.write_text(JUNIT_REPORT)
+
+        cases = parse_junit_xml(str(report_path))
+
+        self.assertEqual([case.outcome for case in cases], ["passed", "failed", "skipped", "error"])
+        self.assertEqual(cases[1].message, "assert 1 == 2")
+        self.assertEqual(attribute_to_files(cases, ["tests/test_a.py", "tests/test_b.py"]),
+                         {"tests/test_a.py": 2.0, "tests/test_b.py": 1.0})
+
+
+class TestShardedRuns(unittest.TestCase):
+    """Test cases for DevelopmentToolchainSupport.run_tests_sharded."""
+
+    def setUp(self):
+        """Create a Python project with three test modules."""
+        self.temp_dir = tempfile.mkdtemp()
+        workspace = Path(self.temp_dir)
+        (workspace / "setup.py").write_text("from setuptools import setup\nsetup(name='demo')\n")
+        for name in ("alpha", "beta", "gamma"):
+            (workspace / f"test_{name}.py").write_text(
+                f"def test_{name}_one():\n    assert True\n\n"
+                f"def test_{name}_two():\n    assert True\n"
+            )
+        (workspace / "test_failing.py").write_text("def test_fails():\n    assert False\n")
+
+        self.executor = SandboxExecutor(self.temp_dir, logger=create_logger("memory"),
+                                        enable_resource_monitoring=False)
+        self.toolchain = DevelopmentToolchainSupport(self.executor)
+        self.test_command = "python -m pytest -p no:cacheprovider -o addopts="
+
+    def tearDown(self):
+        """Clean up test environment."""
+        self.executor.cleanup_session()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_sharded_run_merges_reports(self):
+        """Test that shard reports are merged and durations recorded."""
+        result = self.toolchain.run_tests_sharded(self.test_command, shards=2)
+
+        self.assertFalse(result.success)
+        self.assertEqual(len(result.shards), 2)
+        self.assertTrue(all(shard.report_found for shard in result.shards))
+        self.assertEqual(sorted(f for shard in result.shards for f in shard.test_files),
+                         ["test_alpha.py", "test_beta.py", "test_failing.py", "test_gamma.py"])
+        self.assertEqual(result.tests_run, 7)
+        self.assertEqual(result.tests_passed, 6)
+        self.assertEqual(result.tests_failed, 1)
+
+        durations = json.loads((Path(self.temp_dir) / ".sandbox" / "test_durations.json").read_text())
+        self.assertEqual(sorted(durations), sorted(f for shard in result.shards for f in shard.test_files))
+
+    def test_unsharded_run_uses_junit_report(self):
+        """Test that plain pytest runs count results from the JUnit report."""
+        result = self.toolchain.run_tests(self.test_command, coverage=False)
+
+        self.assertEqual(result.tests_run, 7)
+        self.assertEqual(result.tests_failed, 1)
+        self.assertEqual(list((Path(self.temp_dir) / ".sandbox" / "tmp" / "test-reports").iterdir()), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
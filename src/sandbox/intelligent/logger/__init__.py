@@ -7,22 +7,27 @@ Handles comprehensive logging of all sandbox activities and execution history.
 from .interfaces import ActionLoggerInterface
 from .logger import ActionLogger
 from .database import DatabaseActionLogger
+from .partitioned import PartitionedActionLogger
 from .models import Action, LogQuery, LogSummary
 from .history import ExecutionHistoryTracker, VerifiedOutcome, OutcomeStatus
+from .version_store import DeltaVersionStore, FileVersionHistory
 
 def create_logger(storage_type: str = "memory", db_path: str = None) -> ActionLoggerInterface:
     """
     Factory function to create appropriate logger instance.
     
     Args:
-        storage_type: Type of storage ("memory" or "database")
-        db_path: Path to database file (for database storage)
+        storage_type: Type of storage ("memory", "database" or "partitioned")
+        db_path: Path to database file (for database storage), or the
+            directory of partition files (for partitioned storage)
         
     Returns:
         ActionLoggerInterface implementation
     """
     if storage_type == "database":
         return DatabaseActionLogger(db_path)
+    elif storage_type == "partitioned":
+        return PartitionedActionLogger(db_path)
     elif storage_type == "memory":
         return ActionLogger()
     else:
@@ -32,11 +37,14 @@ __all__ = [
     'ActionLoggerInterface',
     'ActionLogger',
     'DatabaseActionLogger',
+    'PartitionedActionLogger',
     'Action',
     'LogQuery',
     'LogSummary',
     'ExecutionHistoryTracker',
     'VerifiedOutcome',
     'OutcomeStatus',
+    'DeltaVersionStore',
+    'FileVersionHistory',
     'create_logger'
 ]
\ No newline at end of file
@@ -5,34 +5,251 @@ Database storage implementation for action logging with efficient indexing and r
 import sqlite3
 import json
 import uuid
+import queue
+import logging
+import threading
+import time
+import weakref
+from dataclasses import replace
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple, Iterator, Callable, Union, IO, AsyncIterator
 from contextlib import contextmanager
 from pathlib import Path
 
 from ..types import ActionType, FileChange, CommandInfo, ErrorInfo
 from .models import Action, LogQuery, LogSummary
+from .version_store import DeltaVersionStore
+from .export import iter_export, write_chunks, aiter_chunks
+
+
+logger = logging.getLogger(__name__)
+
+# A pending write is the list of (sql, params) statements for one logged action,
+# or a callable that performs the writes itself on the writer's connection
+Statements = Union[List[Tuple[str, tuple]], Callable[[sqlite3.Connection], None]]
+
+# Queue marker asking the writer to commit what it has gathered without waiting
+_FLUSH = object()
+
+
+class _BatchWriter:
+    """
+    Applies queued log writes to a single long-lived connection.
+
+    With a background thread, records are queued and committed in batched
+    transactions once batch_size records are pending or flush_interval has
+    passed since the first one arrived. The queue is bounded: when the
+    writer falls behind, producers block until there is room again. Without
+    a background thread every submit is committed inline.
+    """
+
+    def __init__(self, connection: sqlite3.Connection, background: bool = True,
+                 batch_size: int = 256, flush_interval: float = 0.05,
+                 max_queue_size: int = 10000):
+        self.connection = connection
+        self.lock = threading.RLock()
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.stats = {
+            "records_written": 0,
+            "batches_committed": 0,
+            "failed_records": 0,
+            "max_queue_depth": 0,
+            "producer_waits": 0,
+        }
+        self._closed = False
+        # Records are committed in submission order, so two counters are enough for flush()
+        self._submitted = 0
+        self._completed = 0
+        self._progress = threading.Condition()
+        # Set if the writer thread exits unexpectedly; later records are written inline
+        self._dead = False
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, max_queue_size))
+        self._thread: Optional[threading.Thread] = None
+
+        if background:
+            self._thread = threading.Thread(target=self._run, name="ActionLogWriter", daemon=True)
+            self._thread.start()
+
+    def submit(self, statements: Statements) -> None:
+        """Queue one record (or write it inline when there is no writer thread)."""
+        if self._thread is None or self._closed or self._dead:
+            self._commit([statements])
+            return
+
+        with self._progress:
+            self._submitted += 1
+        try:
+            self._queue.put_nowait(statements)
+        except queue.Full:
+            # Backpressure: wait for the writer instead of growing without bound
+            self.stats["producer_waits"] += 1
+            self._queue.put(statements)
+        self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], self._queue.qsize())
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until every record submitted before this call is committed.
+
+        Returns:
+            True if the records were committed within the timeout
+
+        Raises:
+            RuntimeError: If the writer thread died with records still queued
+        """
+        with self._progress:
+            target = self._submitted
+            if self._completed >= target:
+                return True
+        if self._thread is not None and not self._closed and not self._dead:
+            self._queue.put(_FLUSH)
+        with self._progress:
+            done = self._progress.wait_for(lambda: self._completed >= target or self._dead, timeout)
+            if self._completed < target and self._dead:
+                raise RuntimeError("Action log writer thread died; queued records were lost")
+            return done
+
+    def close(self) -> None:
+        """Drain the queue, stop the writer thread and close the connection."""
+        if self._closed:
+            return
+        self._closed = True
+
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+        with self.lock:
+            self.connection.close()
+
+    def _run(self) -> None:
+        """Writer loop; marks the writer dead and wakes flush() if it ever fails."""
+        try:
+            self._write_batches()
+        except BaseException:
+            logger.exception("Action log writer thread died")
+            with self._progress:
+                self._dead = True
+                self._progress.notify_all()
+
+    def _write_batches(self) -> None:
+        """Gather a batch by size or age, then commit it."""
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            batch: List[Statements] = []
+            deadline = time.monotonic() + self.flush_interval
+
+            while True:
+                if item is None:
+                    stop = True
+                    break
+                if item is _FLUSH:
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            if batch:
+                try:
+                    self._commit(batch)
+                finally:
+                    with self._progress:
+                        self._completed += len(batch)
+                        self._progress.notify_all()
+
+    def _commit(self, batch: List[Statements]) -> None:
+        """Write a batch in one transaction, isolating bad records on failure."""
+        with self.lock:
+            try:
+                with self.connection:
+                    for statements in batch:
+                        if callable(statements):
+                            statements(self.connection)
+                            continue
+                        for sql, params in statements:
+                            self.connection.execute(sql, params)
+                self.stats["records_written"] += len(batch)
+                self.stats["batches_committed"] += 1
+                return
+            except Exception:
+                # Callables can fail with anything, not just sqlite3.Error
+                if len(batch) == 1:
+                    self.stats["failed_records"] += 1
+                    logger.exception("Failed to write action log record")
+                    return
+
+            # Retry record by record so one bad row does not drop the batch
+            for statements in batch:
+                self._commit([statements])
 
 
 class DatabaseActionLogger:
     """
     Database-backed action logger with efficient storage and retrieval.
     Uses SQLite with proper indexing for fast queries.
+
+    Writes go through one long-lived WAL connection. By default they are
+    write-behind: log_* calls queue the record and return immediately, and
+    a background thread commits records in batched transactions. Query
+    methods call flush() first, so reads always see earlier writes.
     """
+
+    # Seconds a query waits for pending writes before reading without them
+    READ_FLUSH_TIMEOUT = 30.0
     
-    def __init__(self, db_path: str = None):
+    def __init__(self, db_path: str = None, write_behind: bool = True,
+                 batch_size: int = 256, flush_interval: float = 0.05,
+                 max_queue_size: int = 10000):
         """
         Initialize the database logger.
         
         Args:
             db_path: Path to the SQLite database file. If None, uses in-memory database.
+            write_behind: Queue writes for a background writer thread instead of
+                committing each record on the caller's thread
+            batch_size: Maximum number of records committed in one transaction
+            flush_interval: Maximum seconds a queued record waits before commit
+            max_queue_size: Queued records allowed before log_* calls block
         """
         self.db_path = db_path or ":memory:"
+        self.write_behind = write_behind
+        self._is_memory = self.db_path == ":memory:"
+
+        writer_conn = self._open_connection()
+        if not self._is_memory:
+            # WAL lets readers run during batch commits, and makes synchronous=NORMAL
+            # crash-safe so commits no longer fsync every record
+            writer_conn.execute("PRAGMA journal_mode=WAL")
+            writer_conn.execute("PRAGMA synchronous=NORMAL")
+
+        self._writer = _BatchWriter(
+            writer_conn,
+            background=write_behind,
+            batch_size=batch_size,
+            flush_interval=flush_interval,
+            max_queue_size=max_queue_size
+        )
+        self._finalizer = weakref.finalize(self, self._writer.close)
+        self._versions = DeltaVersionStore()
         self._init_database()
+
+    def _open_connection(self) -> sqlite3.Connection:
+        """Open a connection configured for concurrent logging."""
+        conn = sqlite3.connect(self.db_path, timeout=30.0, check_same_thread=False)
+        conn.row_factory = sqlite3.Row  # Enable column access by name
+        return conn
     
     def _init_database(self):
         """Initialize the database schema with proper indexing."""
-        with self._get_connection() as conn:
+        with self._writer.lock:
+            conn = self._writer.connection
             cursor = conn.cursor()
             
             # Create main actions table
@@ -55,8 +272,10 @@ class DatabaseActionLogger:
                     action_id TEXT NOT NULL,
                     file_path TEXT NOT NULL,
                     change_type TEXT NOT NULL,
-                    before_content TEXT,
+                    before_content TEXT,  -- Only set by older databases
                     after_content TEXT,
+                    before_version_id INTEGER,  -- Content lives in file_versions
+                    after_version_id INTEGER,
                     timestamp TEXT NOT NULL,
                     FOREIGN KEY (action_id) REFERENCES actions (id)
                 )
@@ -92,12 +311,23 @@ class DatabaseActionLogger:
                 )
             """)
             
+            # Databases created before version storage lack the reference columns
+            file_change_columns = {row[1] for row in cursor.execute("PRAGMA table_info(file_changes)")}
+            for column in ("before_version_id", "after_version_id"):
+                if column not in file_change_columns:
+                    cursor.execute(f"ALTER TABLE file_changes ADD COLUMN {column} INTEGER")
+
+            self._versions.create_schema(conn)
+
             # Create indexes for fast queries
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_actions_timestamp ON actions (timestamp)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_actions_session_id ON actions (session_id)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_actions_task_id ON actions (task_id)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_actions_type ON actions (action_type)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_actions_session_timestamp ON actions (session_id, timestamp, id)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_file_changes_action_id ON file_changes (action_id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_file_changes_before_version ON file_changes (before_version_id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_file_changes_after_version ON file_changes (after_version_id)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_command_info_action_id ON command_info (action_id)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_error_info_action_id ON error_info (action_id)")
             
@@ -105,39 +335,77 @@ class DatabaseActionLogger:
     
     @contextmanager
     def _get_connection(self):
-        """Get a database connection with proper error handling."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Enable column access by name
+        """
+        Get a connection for queries and maintenance.
+
+        Pending writes are flushed first. File databases get a short-lived
+        reader connection, which WAL lets run alongside the writer; the
+        in-memory database shares the writer's connection under its lock.
+        The flush is bounded so a stalled writer cannot hang every query.
+        """
+        if not self.flush(timeout=self.READ_FLUSH_TIMEOUT):
+            logger.warning("Pending action log writes not committed after %ss; "
+                           "reading without them", self.READ_FLUSH_TIMEOUT)
+
+        if self._is_memory:
+            with self._writer.lock:
+                yield self._writer.connection
+            return
+
+        conn = self._open_connection()
         try:
             yield conn
         finally:
             conn.close()
     
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until all previously logged records are committed.
+
+        Args:
+            timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            True if all earlier records were committed in time
+        """
+        return self._writer.flush(timeout)
+
+    def close(self) -> None:
+        """Commit pending records and release the database connection."""
+        self._finalizer()
+
+    def get_write_stats(self) -> Dict[str, Any]:
+        """Get write-path statistics (batching and backpressure)."""
+        stats = dict(self._writer.stats)
+        stats["write_behind"] = self.write_behind
+        stats["queue_depth"] = self._writer._queue.qsize()
+        return stats
+
     def log_action(self, action_type: ActionType, description: str,
                   details: dict = None, session_id: str = None,
-                  task_id: str = None) -> str:
-        """Log a general action to the database."""
+                  task_id: str = None, timestamp: Optional[datetime] = None) -> str:
+        """Log a general action to the database (timestamp defaults to now)."""
         action_id = str(uuid.uuid4())
-        timestamp = datetime.now().isoformat()
+        timestamp = (timestamp or datetime.now()).isoformat()
         
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
+        self._writer.submit([(
+            """
                 INSERT INTO actions (id, timestamp, action_type, description, details, session_id, task_id)
                 VALUES (?, ?, ?, ?, ?, ?, ?)
             """, (
                 action_id, timestamp, action_type.value, description,
                 json.dumps(details) if details else None,
                 session_id, task_id
-            ))
-            conn.commit()
+            )
+        )])
         
         return action_id
     
     def log_file_change(self, file_path: str, change_type: str,
                        before_content: str = None, after_content: str = None,
-                       session_id: str = None, task_id: str = None) -> str:
-        """Log a file change operation to the database."""
+                       session_id: str = None, task_id: str = None,
+                       timestamp: Optional[datetime] = None) -> str:
+        """Log a file change operation to the database (timestamp defaults to now)."""
         # Determine action type based on change type
         action_type_map = {
             "create": ActionType.FILE_CREATE,
@@ -147,149 +415,218 @@ class DatabaseActionLogger:
         action_type = action_type_map.get(change_type, ActionType.FILE_MODIFY)
         
         action_id = str(uuid.uuid4())
-        timestamp = datetime.now().isoformat()
+        timestamp = (timestamp or datetime.now()).isoformat()
         
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
+        description = f"{change_type.title()} file: {file_path}"
+        versions = self._versions
             
-            # Insert main action
-            cursor.execute("""
+        def write(conn: sqlite3.Connection) -> None:
+            # Contents go to the delta store; diffing runs on the writer thread
+            before_id = versions.put(conn, file_path, before_content, timestamp) if before_content is not None else None
+            after_id = versions.put(conn, file_path, after_content, timestamp) if after_content is not None else None
+
+            conn.execute("""
                 INSERT INTO actions (id, timestamp, action_type, description, session_id, task_id)
                 VALUES (?, ?, ?, ?, ?, ?)
-            """, (
-                action_id, timestamp, action_type.value,
-                f"{change_type.title()} file: {file_path}",
-                session_id, task_id
-            ))
-            
-            # Insert file change details
-            cursor.execute("""
-                INSERT INTO file_changes (action_id, file_path, change_type, before_content, after_content, timestamp)
+            """, (action_id, timestamp, action_type.value, description, session_id, task_id))
+            conn.execute("""
+                INSERT INTO file_changes (action_id, file_path, change_type, before_version_id, after_version_id, timestamp)
                 VALUES (?, ?, ?, ?, ?, ?)
-            """, (action_id, file_path, change_type, before_content, after_content, timestamp))
+            """, (action_id, file_path, change_type, before_id, after_id, timestamp))
             
-            conn.commit()
+        self._writer.submit(write)
         
         return action_id
     
     def log_command(self, command: str, working_directory: str,
                    output: str, error_output: str, exit_code: int,
                    duration: float, session_id: str = None,
-                   task_id: str = None) -> str:
-        """Log a command execution to the database."""
+                   task_id: str = None, timestamp: Optional[datetime] = None) -> str:
+        """Log a command execution to the database (timestamp defaults to now)."""
         action_id = str(uuid.uuid4())
-        timestamp = datetime.now().isoformat()
+        timestamp = (timestamp or datetime.now()).isoformat()
         
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Insert main action
-            cursor.execute("""
+        self._writer.submit([
+            # Main action
+            ("""
                 INSERT INTO actions (id, timestamp, action_type, description, session_id, task_id)
                 VALUES (?, ?, ?, ?, ?, ?)
             """, (
                 action_id, timestamp, ActionType.COMMAND_EXECUTE.value,
                 f"Execute command: {command}",
                 session_id, task_id
-            ))
-            
-            # Insert command details
-            cursor.execute("""
+            )),
+            # Command details
+            ("""
                 INSERT INTO command_info (action_id, command, working_directory, output, error_output, exit_code, duration, timestamp)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (action_id, command, working_directory, output, error_output, exit_code, duration, timestamp))
-            
-            conn.commit()
+            """, (action_id, command, working_directory, output, error_output, exit_code, duration, timestamp)),
+        ])
         
         return action_id
     
     def log_error(self, error_type: str, message: str, stack_trace: str = None,
                  context: dict = None, session_id: str = None,
-                 task_id: str = None) -> str:
-        """Log an error to the database."""
+                 task_id: str = None, timestamp: Optional[datetime] = None) -> str:
+        """Log an error to the database (timestamp defaults to now)."""
         action_id = str(uuid.uuid4())
-        timestamp = datetime.now().isoformat()
+        timestamp = (timestamp or datetime.now()).isoformat()
         
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Insert main action
-            cursor.execute("""
+        self._writer.submit([
+            # Main action
+            ("""
                 INSERT INTO actions (id, timestamp, action_type, description, session_id, task_id)
                 VALUES (?, ?, ?, ?, ?, ?)
             """, (
                 action_id, timestamp, ActionType.TASK_ERROR.value,
                 f"Error: {message}",
                 session_id, task_id
-            ))
-            
-            # Insert error details
-            cursor.execute("""
+            )),
+            # Error details
+            ("""
                 INSERT INTO error_info (action_id, error_type, message, stack_trace, context, timestamp)
                 VALUES (?, ?, ?, ?, ?, ?)
             """, (action_id, error_type, message, stack_trace, 
-                  json.dumps(context) if context else None, timestamp))
-            
-            conn.commit()
+                  json.dumps(context) if context else None, timestamp)),
+        ])
         
         return action_id
     
+    # Bound parameters per IN (...) clause; below SQLite's historical 999 limit
+    _IN_CHUNK_SIZE = 500
+
     def get_actions(self, query: LogQuery) -> List[Action]:
-        """Retrieve actions from database based on query parameters."""
+        """
+        Retrieve actions from database based on query parameters.
+
+        Actions are ordered by (timestamp, id). Related file changes, command
+        info and error info for the whole page are loaded with one IN (...)
+        query per table rather than per action; set query.include_details to
+        False to skip them entirely.
+        """
         with self._get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Build the SQL query dynamically based on filters
-            sql_parts = ["SELECT * FROM actions WHERE 1=1"]
-            params = []
-            
-            if query.session_id:
-                sql_parts.append("AND session_id = ?")
-                params.append(query.session_id)
-            
-            if query.task_id:
-                sql_parts.append("AND task_id = ?")
-                params.append(query.task_id)
-            
-            if query.action_types:
-                placeholders = ",".join("?" * len(query.action_types))
-                sql_parts.append(f"AND action_type IN ({placeholders})")
-                params.extend([at.value for at in query.action_types])
-            
-            if query.start_time:
-                sql_parts.append("AND timestamp >= ?")
-                params.append(query.start_time.isoformat())
-            
-            if query.end_time:
-                sql_parts.append("AND timestamp <= ?")
-                params.append(query.end_time.isoformat())
+            sql, params = self._build_actions_sql(query)
+            actions = [self._row_to_action(row) for row in conn.execute(sql, params)]
             
-            # Add ordering and pagination
-            sql_parts.append("ORDER BY timestamp ASC")
-            
-            if query.limit:
-                sql_parts.append("LIMIT ?")
-                params.append(query.limit)
-            
-            if query.offset:
-                sql_parts.append("OFFSET ?")
-                params.append(query.offset)
-            
-            sql = " ".join(sql_parts)
-            cursor.execute(sql, params)
-            
-            actions = []
-            for row in cursor.fetchall():
-                action = self._row_to_action(row)
-                
-                # Load related data
-                action.file_changes = self._get_file_changes(action.id)
-                action.command_info = self._get_command_info(action.id)
-                action.error_info = self._get_error_info(action.id)
-                
-                actions.append(action)
+            if query.include_details:
+                self._load_details(conn, actions)
             
             return actions
+
+    def iter_actions(self, query: LogQuery, page_size: int = 500) -> Iterator[Action]:
+        """
+        Iterate over matching actions page by page using keyset pagination.
+
+        Each page continues from the (timestamp, id) of the previous page's
+        last action, so deep pages cost the same as the first one.
+
+        Args:
+            query: Filters; limit caps the total number of actions yielded
+            page_size: Number of actions fetched per query
+        """
+        remaining = query.limit
+        page_query = replace(query, offset=0)
+
+        # Honour an explicit offset once, on the first page
+        if query.offset:
+            skipped = self.get_actions(replace(query, limit=query.offset, offset=0,
+                                                   include_details=False))
+            if len(skipped) < query.offset:
+                return
+            page_query.after = (skipped[-1].timestamp, skipped[-1].id)
+
+        while remaining is None or remaining > 0:
+            page_query.limit = page_size if remaining is None else min(page_size, remaining)
+            page = self.get_actions(page_query)
+            if not page:
+                return
+
+            yield from page
+
+            if remaining is not None:
+                remaining -= len(page)
+            if len(page) < page_query.limit:
+                return
+            page_query.after = (page[-1].timestamp, page[-1].id)
+
+    def _build_actions_sql(self, query: LogQuery) -> Tuple[str, list]:
+        """Build the SELECT for actions matching a query."""
+        sql_parts = ["SELECT * FROM actions WHERE 1=1"]
+        params = []
+
+        if query.session_id:
+            sql_parts.append("AND session_id = ?")
+            params.append(query.session_id)
+
+        if query.task_id:
+            sql_parts.append("AND task_id = ?")
+            params.append(query.task_id)
+
+        if query.action_types:
+            placeholders = ",".join("?" * len(query.action_types))
+            sql_parts.append(f"AND action_type IN ({placeholders})")
+            params.extend([at.value for at in query.action_types])
+
+        if query.start_time:
+            sql_parts.append("AND timestamp >= ?")
+            params.append(query.start_time.isoformat())
+
+        if query.end_time:
+            sql_parts.append("AND timestamp <= ?")
+            params.append(query.end_time.isoformat())
+
+        if query.after:
+            after_timestamp, after_id = query.after
+            sql_parts.append("AND (timestamp > ? OR (timestamp = ? AND id > ?))")
+            params.extend([after_timestamp.isoformat(), after_timestamp.isoformat(), after_id])
+
+        # Add ordering and pagination
+        sql_parts.append("ORDER BY timestamp ASC, id ASC")
+
+        if query.limit:
+            sql_parts.append("LIMIT ?")
+            params.append(query.limit)
+
+        if query.offset:
+            if not query.limit:
+                sql_parts.append("LIMIT -1")
+            sql_parts.append("OFFSET ?")
+            params.append(query.offset)
+
+        return " ".join(sql_parts), params
+
+    def _load_details(self, conn: sqlite3.Connection, actions: List[Action]) -> None:
+        """Attach file changes, command info and error info to a page of actions."""
+        if not actions:
+            return
+
+        actions_by_id = {action.id: action for action in actions}
+        action_ids = list(actions_by_id)
+
+        rows = list(self._select_by_action_ids(conn, "file_changes", action_ids))
+        for row, file_change in zip(rows, self._rows_to_file_changes(conn, rows)):
+            actions_by_id[row['action_id']].file_changes.append(file_change)
+
+        for row in self._select_by_action_ids(conn, "command_info", action_ids):
+            action = actions_by_id[row['action_id']]
+            if action.command_info is None:
+                action.command_info = self._row_to_command_info(row)
+
+        for row in self._select_by_action_ids(conn, "error_info", action_ids):
+            action = actions_by_id[row['action_id']]
+            if action.error_info is None:
+                action.error_info = self._row_to_error_info(row)
+
+    def _select_by_action_ids(self, conn: sqlite3.Connection, table: str,
+                              action_ids: List[str]) -> Iterator[sqlite3.Row]:
+        """Yield rows of a detail table for the given actions, in insertion order."""
+        for start in range(0, len(action_ids), self._IN_CHUNK_SIZE):
+            chunk = action_ids[start:start + self._IN_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            yield from conn.execute(
+                f"SELECT * FROM {table} WHERE action_id IN ({placeholders}) ORDER BY id",
+                chunk
+            )
     
     def _row_to_action(self, row) -> Action:
         """Convert a database row to an Action object."""
@@ -303,67 +640,73 @@ class DatabaseActionLogger:
             task_id=row['task_id']
         )
     
+    def _rows_to_file_changes(self, conn: sqlite3.Connection, rows: List[sqlite3.Row]) -> List[FileChange]:
+        """Convert file_changes rows to FileChanges, rebuilding their stored contents together."""
+        contents = self._versions.get_many(conn, (
+            row[column] for row in rows for column in ('before_version_id', 'after_version_id')
+        ))
+        return [self._row_to_file_change(row, contents) for row in rows]
+
+    @staticmethod
+    def _row_to_file_change(row, contents: Dict[int, str]) -> FileChange:
+        """Convert a file_changes row to a FileChange using already rebuilt contents."""
+        before_content = row['before_content']
+        if row['before_version_id'] is not None:
+            before_content = contents.get(row['before_version_id'])
+
+        after_content = row['after_content']
+        if row['after_version_id'] is not None:
+            after_content = contents.get(row['after_version_id'])
+
+        return FileChange(
+            file_path=row['file_path'],
+            change_type=row['change_type'],
+            before_content=before_content,
+            after_content=after_content,
+            timestamp=datetime.fromisoformat(row['timestamp'])
+        )
+
+    @staticmethod
+    def _row_to_command_info(row) -> CommandInfo:
+        """Convert a command_info row to a CommandInfo."""
+        return CommandInfo(
+            command=row['command'],
+            working_directory=row['working_directory'],
+            output=row['output'],
+            error_output=row['error_output'],
+            exit_code=row['exit_code'],
+            duration=row['duration'],
+            timestamp=datetime.fromisoformat(row['timestamp'])
+        )
+
+    @staticmethod
+    def _row_to_error_info(row) -> ErrorInfo:
+        """Convert an error_info row to an ErrorInfo."""
+        return ErrorInfo(
+            error_type=row['error_type'],
+            message=row['message'],
+            stack_trace=row['stack_trace'],
+            context=json.loads(row['context']) if row['context'] else {},
+            timestamp=datetime.fromisoformat(row['timestamp'])
+        )
+
     def _get_file_changes(self, action_id: str) -> List[FileChange]:
         """Get file changes for an action."""
         with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT * FROM file_changes WHERE action_id = ?
-            """, (action_id,))
-            
-            file_changes = []
-            for row in cursor.fetchall():
-                file_changes.append(FileChange(
-                    file_path=row['file_path'],
-                    change_type=row['change_type'],
-                    before_content=row['before_content'],
-                    after_content=row['after_content'],
-                    timestamp=datetime.fromisoformat(row['timestamp'])
-                ))
-            
-            return file_changes
+            rows = list(self._select_by_action_ids(conn, "file_changes", [action_id]))
+            return self._rows_to_file_changes(conn, rows)
     
     def _get_command_info(self, action_id: str) -> Optional[CommandInfo]:
         """Get command info for an action."""
         with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT * FROM command_info WHERE action_id = ?
-            """, (action_id,))
-            
-            row = cursor.fetchone()
-            if row:
-                return CommandInfo(
-                    command=row['command'],
-                    working_directory=row['working_directory'],
-                    output=row['output'],
-                    error_output=row['error_output'],
-                    exit_code=row['exit_code'],
-                    duration=row['duration'],
-                    timestamp=datetime.fromisoformat(row['timestamp'])
-                )
-            
-            return None
+            row = next(self._select_by_action_ids(conn, "command_info", [action_id]), None)
+            return self._row_to_command_info(row) if row else None
     
     def _get_error_info(self, action_id: str) -> Optional[ErrorInfo]:
         """Get error info for an action."""
         with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT * FROM error_info WHERE action_id = ?
-            """, (action_id,))
-            
-            row = cursor.fetchone()
-            if row:
-                return ErrorInfo(
-                    error_type=row['error_type'],
-                    message=row['message'],
-                    stack_trace=row['stack_trace'],
-                    context=json.loads(row['context']) if row['context'] else {},
-                    timestamp=datetime.fromisoformat(row['timestamp'])
-                )
-            
-            return None
+            row = next(self._select_by_action_ids(conn, "error_info", [action_id]), None)
+            return self._row_to_error_info(row) if row else None
     
     def get_execution_history(self, session_id: str) -> List[Action]:
         """Get the complete execution history for a session."""
@@ -371,8 +714,9 @@ class DatabaseActionLogger:
         return self.get_actions(query)
     
     def get_log_summary(self, session_id: str = None,
-                       task_id: str = None) -> LogSummary:
-        """Get a summary of logged actions with aggregated statistics."""
+                       task_id: str = None, start_time: Optional[datetime] = None,
+                       end_time: Optional[datetime] = None) -> LogSummary:
+        """Get a summary of logged actions, optionally within a time range."""
         with self._get_connection() as conn:
             cursor = conn.cursor()
             
@@ -387,17 +731,25 @@ class DatabaseActionLogger:
             if task_id:
                 where_parts.append("task_id = ?")
                 params.append(task_id)
+
+            if start_time:
+                where_parts.append("a.timestamp >= ?")
+                params.append(start_time.isoformat())
+
+            if end_time:
+                where_parts.append("a.timestamp <= ?")
+                params.append(end_time.isoformat())
             
             where_clause = " AND ".join(where_parts)
             
             # Get total action count
-            cursor.execute(f"SELECT COUNT(*) FROM actions WHERE {where_clause}", params)
+            cursor.execute(f"SELECT COUNT(*) FROM actions a WHERE {where_clause}", params)
             total_actions = cursor.fetchone()[0]
             
             # Get action counts by type
             cursor.execute(f"""
                 SELECT action_type, COUNT(*) 
-                FROM actions 
+                FROM actions a
                 WHERE {where_clause}
                 GROUP BY action_type
             """, params)
@@ -436,7 +788,7 @@ class DatabaseActionLogger:
             # Get time range
             cursor.execute(f"""
                 SELECT MIN(timestamp), MAX(timestamp) 
-                FROM actions 
+                FROM actions a
                 WHERE {where_clause}
             """, params)
             time_range_row = cursor.fetchone()
@@ -457,143 +809,101 @@ class DatabaseActionLogger:
             )
     
     def export_logs(self, query: LogQuery, format: str = "json") -> str:
-        """Export logs in the specified format."""
-        actions = self.get_actions(query)
+        """
+        Export logs in the specified format.
         
-        if format.lower() == "json":
-            # Convert actions to dictionaries for JSON serialization
-            actions_data = []
-            for action in actions:
-                action_dict = {
-                    "id": action.id,
-                    "timestamp": action.timestamp.isoformat(),
-                    "action_type": action.action_type.value,
-                    "description": action.description,
-                    "details": action.details,
-                    "session_id": action.session_id,
-                    "task_id": action.task_id
-                }
-                
-                if action.file_changes:
-                    action_dict["file_changes"] = [
-                        {
-                            "file_path": fc.file_path,
-                            "change_type": fc.change_type,
-                            "before_content": fc.before_content,
-                            "after_content": fc.after_content,
-                            "timestamp": fc.timestamp.isoformat()
-                        }
-                        for fc in action.file_changes
-                    ]
-                
-                if action.command_info:
-                    action_dict["command_info"] = {
-                        "command": action.command_info.command,
-                        "working_directory": action.command_info.working_directory,
-                        "output": action.command_info.output,
-                        "error_output": action.command_info.error_output,
-                        "exit_code": action.command_info.exit_code,
-                        "duration": action.command_info.duration,
-                        "timestamp": action.command_info.timestamp.isoformat()
-                    }
-                
-                if action.error_info:
-                    action_dict["error_info"] = {
-                        "error_type": action.error_info.error_type,
-                        "message": action.error_info.message,
-                        "stack_trace": action.error_info.stack_trace,
-                        "context": action.error_info.context,
-                        "timestamp": action.error_info.timestamp.isoformat()
-                    }
-                
-                actions_data.append(action_dict)
+        Actions are read page by page, but the result is still one string;
+        use stream_logs() or export_logs_to() for large exports.
+        """
+        return "".join(self.stream_logs(query, format))
             
-            return json.dumps(actions_data, indent=2)
-        
-        elif format.lower() == "csv":
-            import csv
-            import io
-            
-            output = io.StringIO()
-            writer = csv.writer(output)
-            
-            # Write header
-            writer.writerow([
-                "id", "timestamp", "action_type", "description", "session_id", "task_id",
-                "file_path", "change_type", "command", "exit_code", "error_type", "error_message"
-            ])
-            
-            # Write data rows
-            for action in actions:
-                base_row = [
-                    action.id, action.timestamp.isoformat(), action.action_type.value,
-                    action.description, action.session_id, action.task_id
-                ]
+    def stream_logs(self, query: LogQuery, format: str = "ndjson",
+                    page_size: int = 500) -> Iterator[str]:
+        """
+        Export logs incrementally as text chunks.
+            
+        Actions are read in keyset-paginated pages, so memory use is bounded
+        by page_size however many actions match, and no read transaction is
+        held open between pages.
+            
+        Args:
+            query: Filters for the exported actions
+            format: "ndjson", "json" or "csv"
+            page_size: Actions loaded per database query
+        """
+        return iter_export(self.iter_actions(query, page_size), format)
                 
-                if action.file_changes:
-                    for fc in action.file_changes:
-                        row = base_row + [fc.file_path, fc.change_type, "", "", "", ""]
-                        writer.writerow(row)
-                elif action.command_info:
-                    row = base_row + ["", "", action.command_info.command, 
-                                    action.command_info.exit_code, "", ""]
-                    writer.writerow(row)
-                elif action.error_info:
-                    row = base_row + ["", "", "", "", action.error_info.error_type, 
-                                    action.error_info.message]
-                    writer.writerow(row)
-                else:
-                    row = base_row + ["", "", "", "", "", ""]
-                    writer.writerow(row)
-            
-            return output.getvalue()
+    def export_logs_to(self, query: LogQuery, destination: Union[str, Path, IO[str]],
+                       format: str = "ndjson") -> int:
+        """
+        Stream an export to a file path or open text stream.
+            
+        Returns:
+            Number of characters written
+        """
+        return write_chunks(self.stream_logs(query, format), destination)
         
-        else:
-            raise ValueError(f"Unsupported export format: {format}")
+    def aexport_logs(self, query: LogQuery, format: str = "ndjson") -> AsyncIterator[str]:
+        """Stream an export to async code without blocking the event loop."""
+        return aiter_chunks(self.stream_logs(query, format))
     
     def clear_logs(self, session_id: str = None, before_date: str = None) -> int:
-        """Clear logs based on criteria."""
-        with self._get_connection() as conn:
+        """Clear logs based on criteria, along with file versions only they referred to."""
+        # Hold the writer lock so no new delta is based on a version deleted here
+        with self._get_connection() as conn, self._writer.lock:
             cursor = conn.cursor()
             
-            # Count logs to be deleted
-            count_sql_parts = ["SELECT COUNT(*) FROM actions WHERE 1=1"]
+            where_parts = ["1=1"]
             params = []
             
             if session_id:
-                count_sql_parts.append("AND session_id = ?")
+                where_parts.append("session_id = ?")
                 params.append(session_id)
             
             if before_date:
-                count_sql_parts.append("AND timestamp < ?")
+                where_parts.append("timestamp < ?")
                 params.append(before_date)
             
-            count_sql = " ".join(count_sql_parts)
-            cursor.execute(count_sql, params)
+            where_clause = " AND ".join(where_parts)
+            
+            # Count logs to be deleted
+            cursor.execute(f"SELECT COUNT(*) FROM actions WHERE {where_clause}", params)
             count_to_delete = cursor.fetchone()[0]
+
+            cursor.execute(f"""
+                SELECT before_version_id, after_version_id FROM file_changes
+                WHERE action_id IN (SELECT id FROM actions WHERE {where_clause})
+            """, params)
+            version_ids = {version_id for row in cursor.fetchall() for version_id in row if version_id is not None}
             
             # Delete related records first (foreign key constraints)
-            delete_sql_parts = ["DELETE FROM actions WHERE 1=1"]
-            delete_params = []
-            
-            if session_id:
-                delete_sql_parts.append("AND session_id = ?")
-                delete_params.append(session_id)
-            
-            if before_date:
-                delete_sql_parts.append("AND timestamp < ?")
-                delete_params.append(before_date)
-            
-            delete_sql = " ".join(delete_sql_parts)
-            
-            # SQLite will handle cascading deletes if we set up foreign keys properly
-            cursor.execute("PRAGMA foreign_keys = ON")
-            cursor.execute(delete_sql, delete_params)
+            for table in ("file_changes", "command_info", "error_info"):
+                cursor.execute(
+                    f"DELETE FROM {table} WHERE action_id IN (SELECT id FROM actions WHERE {where_clause})",
+                    params
+                )
+            cursor.execute(f"DELETE FROM actions WHERE {where_clause}", params)
+
+            # Versions can be shared by consecutive changes, so keep any still referenced
+            self._versions.delete(conn, version_ids - self._referenced_versions(conn, version_ids))
             
             conn.commit()
             
             return count_to_delete
     
+    def _referenced_versions(self, conn: sqlite3.Connection, version_ids: set) -> set:
+        """Return the subset of version ids some file change still refers to."""
+        referenced = set()
+        ids = sorted(version_ids)
+        for start in range(0, len(ids), self._IN_CHUNK_SIZE):
+            chunk = ids[start:start + self._IN_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            for column in ("before_version_id", "after_version_id"):
+                referenced.update(row[0] for row in conn.execute(
+                    f"SELECT DISTINCT {column} FROM file_changes WHERE {column} IN ({placeholders})", chunk
+                ))
+        return referenced
+
     def get_database_stats(self) -> Dict[str, Any]:
         """Get database statistics for performance monitoring."""
         with self._get_connection() as conn:
@@ -619,4 +929,7 @@ class DatabaseActionLogger:
             cursor.execute("PRAGMA index_list(actions)")
             stats["indexes_count"] = len(cursor.fetchall())
             
+            # File content storage (logical size versus compressed bytes)
+            stats["file_content_storage"] = self._versions.get_stats(conn)
+            
             return stats
\ No newline at end of file
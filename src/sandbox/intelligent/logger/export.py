@@ -0,0 +1,174 @@
+"""
+Streaming exporters for logged actions.
+
+Exporters turn an iterable of actions into an iterator of text chunks, one
+action at a time, so an export never holds more than the current page of
+actions in memory. Chunks can be written to a file with write_chunks() or
+consumed from async code with aiter_chunks().
+"""
+
+import asyncio
+import csv
+import io
+import json
+from itertools import islice
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, IO, Iterable, Iterator, List, Union
+
+from .models import Action
+
+
+CSV_HEADER = [
+    "id", "timestamp", "action_type", "description", "session_id", "task_id",
+    "file_path", "change_type", "command", "exit_code", "error_type", "error_message"
+]
+
+STREAM_FORMATS = ("ndjson", "json", "csv")
+
+
+def action_to_dict(action: Action) -> Dict[str, Any]:
+    """Convert an action and its details to a JSON-serializable dictionary."""
+    action_dict = {
+        "id": action.id,
+        "timestamp": action.timestamp.isoformat(),
+        "action_type": action.action_type.value,
+        "description": action.description,
+        "details": action.details,
+        "session_id": action.session_id,
+        "task_id": action.task_id
+    }
+
+    if action.file_changes:
+        action_dict["file_changes"] = [
+            {
+                "file_path": fc.file_path,
+                "change_type": fc.change_type,
+                "before_content": fc.before_content,
+                "after_content": fc.after_content,
+                "timestamp": fc.timestamp.isoformat()
+            }
+            for fc in action.file_changes
+        ]
+
+    if action.command_info:
+        action_dict["command_info"] = {
+            "command": action.command_info.command,
+            "working_directory": action.command_info.working_directory,
+            "output": action.command_info.output,
+            "error_output": action.command_info.error_output,
+            "exit_code": action.command_info.exit_code,
+            "duration": action.command_info.duration,
+            "timestamp": action.command_info.timestamp.isoformat()
+        }
+
+    if action.error_info:
+        action_dict["error_info"] = {
+            "error_type": action.error_info.error_type,
+            "message": action.error_info.message,
+            "stack_trace": action.error_info.stack_trace,
+            "context": action.error_info.context,
+            "timestamp": action.error_info.timestamp.isoformat()
+        }
+
+    return action_dict
+
+
+def action_to_csv_rows(action: Action) -> List[list]:
+    """Flatten an action into CSV rows (one per file change)."""
+    base_row = [
+        action.id, action.timestamp.isoformat(), action.action_type.value,
+        action.description, action.session_id, action.task_id
+    ]
+
+    if action.file_changes:
+        return [base_row + [fc.file_path, fc.change_type, "", "", "", ""] for fc in action.file_changes]
+    if action.command_info:
+        return [base_row + ["", "", action.command_info.command, action.command_info.exit_code, "", ""]]
+    if action.error_info:
+        return [base_row + ["", "", "", "", action.error_info.error_type, action.error_info.message]]
+    return [base_row + ["", "", "", "", "", ""]]
+
+
+def iter_export(actions: Iterable[Action], format: str = "ndjson") -> Iterator[str]:
+    """
+    Serialize actions incrementally.
+
+    Args:
+        actions: Actions to export (typically a lazily paged iterator)
+        format: "ndjson" (one JSON object per line), "json" (a JSON array laid out
+            exactly as json.dumps(actions, indent=2) would) or "csv"
+
+    Yields:
+        Text chunks that concatenate to the full export
+    """
+    format = format.lower()
+
+    if format == "ndjson":
+        for action in actions:
+            yield json.dumps(action_to_dict(action)) + "\n"
+
+    elif format == "json":
+        yield "["
+        first = True
+        for action in actions:
+            # Strings never contain raw newlines, so this only indents the layout
+            text = json.dumps(action_to_dict(action), indent=2).replace("\n", "\n  ")
+            yield ("\n  " if first else ",\n  ") + text
+            first = False
+        yield "]" if first else "\n]"
+
+    elif format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(CSV_HEADER)
+        yield _drain(buffer)
+        for action in actions:
+            writer.writerows(action_to_csv_rows(action))
+            yield _drain(buffer)
+
+    else:
+        raise ValueError(f"Unsupported export format: {format}")
+
+
+def write_chunks(chunks: Iterable[str], destination: Union[str, Path, IO[str]]) -> int:
+    """
+    Write text chunks to a path or an open text stream.
+
+    Returns:
+        Number of characters written
+    """
+    if isinstance(destination, (str, Path)):
+        with open(destination, "w", encoding="utf-8", newline="") as stream:
+            return write_chunks(chunks, stream)
+
+    written = 0
+    for chunk in chunks:
+        destination.write(chunk)
+        written += len(chunk)
+    return written
+
+
+async def aiter_chunks(chunks: Iterable[str], batch_size: int = 64) -> AsyncIterator[str]:
+    """
+    Consume a blocking chunk iterator from async code.
+
+    Chunks are produced on the default executor in small batches so database
+    paging and serialization never block the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    iterator = iter(chunks)
+
+    while True:
+        batch = await loop.run_in_executor(None, lambda: list(islice(iterator, batch_size)))
+        if not batch:
+            return
+        for chunk in batch:
+            yield chunk
+
+
+def _drain(buffer: io.StringIO) -> str:
+    """Return and clear the contents of a StringIO buffer."""
+    text = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return text
@@ -4,13 +4,15 @@ Execution history tracking and summary generation with verified outcomes.
 
 import json
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional, Tuple
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Iterator, AsyncIterator, IO, Set, Union
 from dataclasses import dataclass, field
 from enum import Enum
 
 from ..types import ActionType, TaskStatus
 from .interfaces import ActionLoggerInterface
 from .models import Action, LogQuery, LogSummary
+from .export import action_to_dict, write_chunks, aiter_chunks
 
 
 class OutcomeStatus(Enum):
@@ -65,6 +67,25 @@ class SessionExecutionHistory:
     recommendations: List[str] = field(default_factory=list)
 
 
+@dataclass
+class _TaskTally:
+    """Running per-task totals for streaming history exports."""
+    description: str
+    start_time: datetime
+    end_time: datetime
+    actions_count: int = 0
+    files_modified: Set[str] = field(default_factory=set)
+    commands_executed: int = 0
+    successful_commands: int = 0
+    errors_encountered: int = 0
+    outcomes_total: int = 0
+    outcomes_successful: int = 0
+
+    @property
+    def success_rate(self) -> float:
+        return self.outcomes_successful / self.outcomes_total if self.outcomes_total > 0 else 0.0
+
+
 class ExecutionHistoryTracker:
     """
     Tracks execution history and generates comprehensive summaries with verified outcomes.
@@ -246,12 +267,7 @@ class ExecutionHistoryTracker:
         success_rate = successful_outcomes / total_outcomes if total_outcomes > 0 else 0.0
         
         # Determine overall task status
-        if not errors_encountered and success_rate > 0.8:
-            task_status = TaskStatus.COMPLETED
-        elif errors_encountered:
-            task_status = TaskStatus.ERROR
-        else:
-            task_status = TaskStatus.IN_PROGRESS
+        task_status = self._task_status(bool(errors_encountered), success_rate)
         
         # Find task description from first action
         task_description = actions[0].description if actions else f"Task {task_id}"
@@ -341,13 +357,9 @@ class ExecutionHistoryTracker:
                 remaining_issues.append(f"Failed: {outcome.description}")
         
         # Generate recommendations
-        recommendations = []
-        if overall_success_rate < 0.7:
-            recommendations.append("Consider reviewing error handling and retry mechanisms")
-        if any(task.status == TaskStatus.ERROR for task in task_summaries):
-            recommendations.append("Address remaining errors before proceeding with new tasks")
-        if any(len(task.files_modified) > 10 for task in task_summaries):
-            recommendations.append("Consider breaking down large file modification tasks")
+        recommendations = self._recommendations(
+            overall_success_rate, [(task.status, len(task.files_modified)) for task in task_summaries]
+        )
         
         return SessionExecutionHistory(
             session_id=session_id,
@@ -358,7 +370,7 @@ class ExecutionHistoryTracker:
             task_summaries=task_summaries,
             overall_success_rate=overall_success_rate,
             key_achievements=key_achievements[:10],  # Limit to top 10
-            remaining_issues=list(set(remaining_issues))[:10],  # Limit and deduplicate
+            remaining_issues=list(dict.fromkeys(remaining_issues))[:10],  # Limit and deduplicate
             recommendations=recommendations
         )
     
@@ -451,6 +463,249 @@ class ExecutionHistoryTracker:
         else:
             raise ValueError(f"Unsupported export format: {format}")
     
+    def stream_execution_history(self, session_id: str, format: str = "markdown") -> Iterator[str]:
+        """
+        Export a session's execution history incrementally.
+
+        Unlike export_execution_history(), actions are read once, in order,
+        and written out as they are read; only running per-task totals and
+        the first few issues are kept, and the aggregate summary (the same
+        sections as the markdown summary) follows the timeline at the end.
+
+        Args:
+            session_id: Session to export
+            format: "markdown" or "ndjson"
+
+        Yields:
+            Text chunks that concatenate to the full export
+        """
+        format = format.lower()
+        if format not in ("markdown", "ndjson"):
+            raise ValueError(f"Unsupported export format: {format}")
+
+        actions = iter(self._iter_session_actions(session_id))
+        first_action = next(actions, None)
+        if first_action is None:
+            raise ValueError(f"No actions found for session {session_id}")
+
+        tallies: Dict[str, _TaskTally] = {}
+        remaining_issues: Dict[str, None] = {}  # Insertion-ordered set
+        total_actions = 0
+        start_time = end_time = first_action.timestamp
+
+        if format == "markdown":
+            yield (
+                f"# Execution History for Session {session_id}\n\n"
+                "## Timeline\n\n"
+                "| Time | Task | Action | Description | Result |\n"
+                "|---|---|---|---|---|\n"
+            )
+
+        for action in self._chain_first(first_action, actions):
+            outcomes = self._collect_outcomes(action)
+            self._tally_action(tallies, action, outcomes)
+            if len(remaining_issues) < 10:
+                if action.error_info:
+                    remaining_issues.setdefault(action.error_info.message)
+                for outcome in outcomes:
+                    if outcome.status == OutcomeStatus.FAILURE:
+                        remaining_issues.setdefault(f"Failed: {outcome.description}")
+            total_actions += 1
+            start_time = min(start_time, action.timestamp)
+            end_time = max(end_time, action.timestamp)
+
+            if format == "markdown":
+                result = ", ".join(sorted({outcome.status.value for outcome in outcomes}))
+                yield "| " + " | ".join(self._markdown_cell(value) for value in (
+                    action.timestamp.isoformat(), action.task_id or "unknown",
+                    action.action_type.value, action.description, result
+                )) + " |\n"
+            else:
+                record = action_to_dict(action)
+                record["record_type"] = "action"
+                record["verified_outcomes"] = [
+                    {"outcome_type": o.outcome_type, "status": o.status.value, "description": o.description}
+                    for o in outcomes
+                ]
+                yield json.dumps(record) + "\n"
+
+        outcomes_total = sum(tally.outcomes_total for tally in tallies.values())
+        outcomes_successful = sum(tally.outcomes_successful for tally in tallies.values())
+        overall_success_rate = outcomes_successful / outcomes_total if outcomes_total > 0 else 0.0
+        duration = end_time - start_time
+
+        if format == "markdown":
+            lines = [
+                "",
+                "## Overview",
+                f"- **Duration**: {duration}",
+                f"- **Total Actions**: {total_actions}",
+                f"- **Total Tasks**: {len(tallies)}",
+                f"- **Success Rate**: {round(overall_success_rate * 100, 2)}%",
+                "",
+                "## Task Results",
+                ""
+            ]
+            for tally in tallies.values():
+                status = self._task_status(tally.errors_encountered > 0, tally.success_rate)
+                lines.extend([
+                    f"### {tally.description}",
+                    f"- **Status**: {status.value}",
+                    f"- **Success Rate**: {round(tally.success_rate * 100, 2)}%",
+                    f"- **Actions**: {tally.actions_count}",
+                    f"- **Files Modified**: {len(tally.files_modified)}",
+                    f"- **Commands Executed**: {tally.commands_executed}",
+                    f"- **Errors Encountered**: {tally.errors_encountered}",
+                    ""
+                ])
+
+            achievements = []
+            for tally in tallies.values():
+                if self._task_status(tally.errors_encountered > 0, tally.success_rate) == TaskStatus.COMPLETED:
+                    achievements.append(f"Successfully completed {tally.description}")
+                if tally.files_modified:
+                    achievements.append(f"Modified {len(tally.files_modified)} files in {tally.description}")
+                if tally.commands_executed and tally.successful_commands:
+                    achievements.append(f"Successfully executed {tally.successful_commands} commands")
+            recommendations = self._recommendations(overall_success_rate, [
+                (self._task_status(tally.errors_encountered > 0, tally.success_rate), len(tally.files_modified))
+                for tally in tallies.values()
+            ])
+            lines.extend(self._markdown_list_sections(
+                achievements[:10], list(remaining_issues)[:10], recommendations
+            ))
+            yield "\n".join(lines)
+        else:
+            for task_id, tally in tallies.items():
+                yield json.dumps({
+                    "record_type": "task_summary",
+                    "task_id": task_id,
+                    "description": tally.description,
+                    "status": self._task_status(tally.errors_encountered > 0, tally.success_rate).value,
+                    "start_time": tally.start_time.isoformat(),
+                    "end_time": tally.end_time.isoformat(),
+                    "actions_count": tally.actions_count,
+                    "files_modified": sorted(tally.files_modified),
+                    "commands_executed": tally.commands_executed,
+                    "errors_encountered": tally.errors_encountered,
+                    "success_rate": round(tally.success_rate * 100, 2)
+                }) + "\n"
+            yield json.dumps({
+                "record_type": "session_summary",
+                "session_id": session_id,
+                "start_time": start_time.isoformat(),
+                "end_time": end_time.isoformat(),
+                "duration_seconds": duration.total_seconds(),
+                "total_actions": total_actions,
+                "total_tasks": len(tallies),
+                "overall_success_rate": round(overall_success_rate * 100, 2)
+            }) + "\n"
+
+    def export_execution_history_to(self, session_id: str, destination: Union[str, Path, IO[str]],
+                                    format: str = "markdown") -> int:
+        """
+        Stream a session's execution history to a file path or open text stream.
+
+        Returns:
+            Number of characters written
+        """
+        return write_chunks(self.stream_execution_history(session_id, format), destination)
+
+    def aexport_execution_history(self, session_id: str, format: str = "markdown") -> AsyncIterator[str]:
+        """Stream a session's execution history to async code without blocking the event loop."""
+        return aiter_chunks(self.stream_execution_history(session_id, format))
+
+    def _iter_session_actions(self, session_id: str) -> Iterable[Action]:
+        """Iterate over a session's actions, page by page when the logger supports it."""
+        query = LogQuery(session_id=session_id)
+        if hasattr(self.logger, "iter_actions"):
+            return self.logger.iter_actions(query)
+        return self.logger.get_actions(query)
+
+    @staticmethod
+    def _chain_first(first: Action, rest: Iterator[Action]) -> Iterator[Action]:
+        """Yield an already-consumed first action followed by the rest."""
+        yield first
+        yield from rest
+
+    def _collect_outcomes(self, action: Action) -> List[VerifiedOutcome]:
+        """Verified outcomes for one action, including custom ones."""
+        outcomes = (
+            self.verify_file_operation_outcome(action)
+            + self.verify_command_execution_outcome(action)
+            + self.verify_error_resolution_outcome(action)
+        )
+        outcomes.extend(self._verified_outcomes.get(action.id, []))
+        return outcomes
+
+    @staticmethod
+    def _tally_action(tallies: Dict[str, _TaskTally], action: Action,
+                      outcomes: List[VerifiedOutcome]) -> None:
+        """Fold one action into the running per-task totals."""
+        task_id = action.task_id or "unknown"
+        tally = tallies.get(task_id)
+        if tally is None:
+            tally = tallies[task_id] = _TaskTally(
+                description=action.description,
+                start_time=action.timestamp,
+                end_time=action.timestamp
+            )
+
+        tally.actions_count += 1
+        tally.start_time = min(tally.start_time, action.timestamp)
+        tally.end_time = max(tally.end_time, action.timestamp)
+        tally.files_modified.update(fc.file_path for fc in action.file_changes)
+        if action.command_info:
+            tally.commands_executed += 1
+        if action.error_info:
+            tally.errors_encountered += 1
+        tally.successful_commands += sum(
+            1 for o in outcomes if o.outcome_type == "command_executed" and o.status == OutcomeStatus.SUCCESS
+        )
+        tally.outcomes_total += len(outcomes)
+        tally.outcomes_successful += sum(1 for o in outcomes if o.status == OutcomeStatus.SUCCESS)
+
+    @staticmethod
+    def _task_status(has_errors: bool, success_rate: float) -> TaskStatus:
+        """Derive a task's status from its errors and outcome success rate."""
+        if not has_errors and success_rate > 0.8:
+            return TaskStatus.COMPLETED
+        if has_errors:
+            return TaskStatus.ERROR
+        return TaskStatus.IN_PROGRESS
+
+    @staticmethod
+    def _recommendations(overall_success_rate: float, tasks: List[Tuple[TaskStatus, int]]) -> List[str]:
+        """Recommendations from the overall success rate and each task's (status, files modified)."""
+        recommendations = []
+        if overall_success_rate < 0.7:
+            recommendations.append("Consider reviewing error handling and retry mechanisms")
+        if any(status == TaskStatus.ERROR for status, _ in tasks):
+            recommendations.append("Address remaining errors before proceeding with new tasks")
+        if any(files_modified > 10 for _, files_modified in tasks):
+            recommendations.append("Consider breaking down large file modification tasks")
+        return recommendations
+
+    @staticmethod
+    def _markdown_list_sections(achievements: List[str], remaining_issues: List[str],
+                                recommendations: List[str]) -> List[str]:
+        """Markdown lines for the achievements, issues and recommendations sections."""
+        md_lines = []
+        for title, items in (("Key Achievements", achievements), ("Remaining Issues", remaining_issues)):
+            if items:
+                md_lines.extend([f"## {title}", ""])
+                md_lines.extend(f"- {item}" for item in items)
+                md_lines.append("")
+        if recommendations:
+            md_lines.extend(["## Recommendations", ""])
+            md_lines.extend(f"- {recommendation}" for recommendation in recommendations)
+        return md_lines
+
+    @staticmethod
+    def _markdown_cell(value: str) -> str:
+        """Escape a value for a single markdown table cell."""
+        return str(value).replace("|", "\\|").replace("\r", " ").replace("\n", " ")
+
     def _generate_markdown_summary(self, summary: Dict[str, Any]) -> str:
         """Generate a markdown-formatted execution summary."""
         md_lines = [
@@ -476,30 +731,8 @@ class ExecutionHistoryTracker:
                 ""
             ])
         
-        if summary['achievements']:
-            md_lines.extend([
-                "## Key Achievements",
-                ""
-            ])
-            for achievement in summary['achievements']:
-                md_lines.append(f"- {achievement}")
-            md_lines.append("")
-        
-        if summary['remaining_issues']:
-            md_lines.extend([
-                "## Remaining Issues",
-                ""
-            ])
-            for issue in summary['remaining_issues']:
-                md_lines.append(f"- {issue}")
-            md_lines.append("")
-        
-        if summary['recommendations']:
-            md_lines.extend([
-                "## Recommendations",
-                ""
-            ])
-            for recommendation in summary['recommendations']:
-                md_lines.append(f"- {recommendation}")
+        md_lines.extend(self._markdown_list_sections(
+            summary['achievements'], summary['remaining_issues'], summary['recommendations']
+        ))
         
         return "\n".join(md_lines)
\ No newline at end of file
@@ -157,8 +157,11 @@ class ActionLogger(ActionLoggerInterface):
         if query.end_time:
             filtered_actions = [a for a in filtered_actions if a.timestamp <= query.end_time]
         
-        # Sort by timestamp
-        filtered_actions.sort(key=lambda a: a.timestamp)
+        # Sort by timestamp, then id for a stable keyset order
+        filtered_actions = sorted(filtered_actions, key=lambda a: (a.timestamp, a.id))
+        
+        if query.after:
+            filtered_actions = [a for a in filtered_actions if (a.timestamp, a.id) > query.after]
         
         # Apply offset and limit
         if query.offset:
@@ -4,7 +4,7 @@ Data models for action logging.
 
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from ..types import ActionType, FileChange, CommandInfo, ErrorInfo
 
 
@@ -37,6 +37,10 @@ class LogQuery:
     end_time: Optional[datetime] = None
     limit: Optional[int] = None
     offset: int = 0
+    # Keyset pagination: only actions ordered after this (timestamp, id) position
+    after: Optional[Tuple[datetime, str]] = None
+    # Load file changes, command info and error info along with each action
+    include_details: bool = True
 
 
 @dataclass
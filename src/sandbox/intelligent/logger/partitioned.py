@@ -0,0 +1,698 @@
+"""
+Time-partitioned action log storage with retention and archival.
+
+Actions are stored in one SQLite database per day or week inside a
+directory. Partitions are opened on demand, so queries only touch the
+partitions their time range overlaps, and retention drops whole partition
+files instead of running large DELETE statements. Partitions past the
+archive age are compacted (VACUUM) and gzip-compressed into read-only
+files, with their action count recorded in a small metadata file beside
+them; they are decompressed to a scratch directory when a query needs them.
+Maintenance triggered by a partition rollover runs on a background thread,
+and compaction, compression and decompression happen outside the logger's
+lock.
+"""
+
+import gzip
+import json
+import logging
+import os
+import re
+import shutil
+import sqlite3
+import stat
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, IO, Iterator, List, Optional, Set, Union
+
+from ..types import ActionType
+from .database import DatabaseActionLogger
+from .export import iter_export, write_chunks, aiter_chunks
+from .models import Action, LogQuery, LogSummary
+
+
+logger = logging.getLogger(__name__)
+
+_PARTITION_PATTERN = re.compile(r"^actions-(\d{4}-\d{2}-\d{2})\.db(\.gz)?$")
+
+
+@dataclass
+class LogPartition:
+    """One partition file covering [start, end)."""
+    start: datetime
+    end: datetime
+    path: Path
+    archived: bool = False
+
+    @property
+    def key(self) -> str:
+        return self.start.strftime("%Y-%m-%d")
+
+
+class PartitionedActionLogger:
+    """
+    Action logger that spreads actions over time-partitioned database files.
+
+    Offers the same logging and query API as DatabaseActionLogger. Queries
+    visit the partitions overlapping the LogQuery time range in
+    chronological order, which preserves the global (timestamp, id) order.
+
+    At most max_open_partitions partition loggers stay open; the least
+    recently used one is closed to make room. A partition is pinned while
+    a write or a query is using it, and the partition receiving writes is
+    never evicted, so eviction cannot close a logger that is in use.
+    Retention and archival skip pinned partitions and retry them on the
+    next maintenance run; a partition being archived cannot be pinned
+    until its archive is written.
+    """
+
+    PERIODS = ("day", "week")
+
+    def __init__(self, directory: str, period: str = "day",
+                 retention_days: Optional[int] = None,
+                 archive_after_days: Optional[int] = 7,
+                 max_open_partitions: int = 8):
+        """
+        Initialize the partitioned logger.
+
+        Args:
+            directory: Directory holding the partition files
+            period: Partition size, "day" or "week" (weeks start on Monday)
+            retention_days: Drop partitions that ended more than this many days ago
+                (None keeps everything)
+            archive_after_days: Compress partitions that ended more than this many
+                days ago (None disables archival)
+            max_open_partitions: Partitions kept open at once; older unpinned ones are closed
+        """
+        if period not in self.PERIODS:
+            raise ValueError(f"Unsupported partition period: {period}")
+
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.period = period
+        self.retention_days = retention_days
+        self.archive_after_days = archive_after_days
+        self.max_open_partitions = max(2, max_open_partitions)
+
+        self._lock = threading.RLock()
+        self._open: "OrderedDict[str, DatabaseActionLogger]" = OrderedDict()
+        self._pins: Dict[str, int] = {}  # partition key -> uses in progress
+        self._retiring: Set[str] = set()  # partition keys being compressed or extracted
+        self._retired = threading.Condition(self._lock)
+        self._scratch_dir: Optional[Path] = None
+        self._current_key: Optional[str] = None
+        self._maintenance_thread: Optional[threading.Thread] = None
+        self._maintenance_due: Optional[datetime] = None
+
+    # Writing
+
+    def log_action(self, action_type: ActionType, description: str,
+                   details: dict = None, session_id: str = None,
+                   task_id: str = None) -> str:
+        """Log a general action to the current partition."""
+        now = datetime.now()
+        with self._writer_for(now) as partition_logger:
+            return partition_logger.log_action(
+                action_type, description, details, session_id, task_id, timestamp=now
+            )
+
+    def log_file_change(self, file_path: str, change_type: str,
+                        before_content: str = None, after_content: str = None,
+                        session_id: str = None, task_id: str = None) -> str:
+        """Log a file change to the current partition."""
+        now = datetime.now()
+        with self._writer_for(now) as partition_logger:
+            return partition_logger.log_file_change(
+                file_path, change_type, before_content, after_content,
+                session_id, task_id, timestamp=now
+            )
+
+    def log_command(self, command: str, working_directory: str,
+                    output: str, error_output: str, exit_code: int,
+                    duration: float, session_id: str = None,
+                    task_id: str = None) -> str:
+        """Log a command execution to the current partition."""
+        now = datetime.now()
+        with self._writer_for(now) as partition_logger:
+            return partition_logger.log_command(
+                command, working_directory, output, error_output, exit_code,
+                duration, session_id, task_id, timestamp=now
+            )
+
+    def log_error(self, error_type: str, message: str, stack_trace: str = None,
+                  context: dict = None, session_id: str = None,
+                  task_id: str = None) -> str:
+        """Log an error to the current partition."""
+        now = datetime.now()
+        with self._writer_for(now) as partition_logger:
+            return partition_logger.log_error(
+                error_type, message, stack_trace, context, session_id, task_id, timestamp=now
+            )
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until records queued in every open partition are committed."""
+        with self._lock:
+            loggers = list(self._open.values())
+        return all(partition_logger.flush(timeout) for partition_logger in loggers)
+
+    def close(self) -> None:
+        """Close all open partitions and remove decompressed archive copies."""
+        self.wait_for_maintenance()
+        with self._lock:
+            while self._open:
+                _, partition_logger = self._open.popitem(last=False)
+                partition_logger.close()
+            if self._scratch_dir is not None:
+                shutil.rmtree(self._scratch_dir, ignore_errors=True)
+                self._scratch_dir = None
+
+    # Querying
+
+    def get_actions(self, query: LogQuery) -> List[Action]:
+        """Retrieve actions across partitions based on query parameters."""
+        return list(self.iter_actions(query))
+
+    def iter_actions(self, query: LogQuery, page_size: int = 500) -> Iterator[Action]:
+        """
+        Iterate over matching actions across partitions in (timestamp, id) order.
+
+        query.limit and query.offset apply to the combined result.
+        """
+        to_skip = query.offset or 0
+        remaining = query.limit
+        partition_query = replace(query, limit=None, offset=0)
+
+        for partition in self._partitions_for(query):
+            if remaining is not None and remaining <= 0:
+                return
+
+            with self._pinned(partition) as partition_logger:
+                if partition_logger is None:
+                    continue
+                for action in partition_logger.iter_actions(partition_query, page_size):
+                    if to_skip:
+                        to_skip -= 1
+                        continue
+                    yield action
+                    if remaining is not None:
+                        remaining -= 1
+                        if remaining <= 0:
+                            return
+
+    def get_execution_history(self, session_id: str) -> List[Action]:
+        """Get the complete execution history for a session."""
+        return self.get_actions(LogQuery(session_id=session_id))
+
+    def get_log_summary(self, session_id: str = None,
+                        task_id: str = None, start_time: Optional[datetime] = None,
+                        end_time: Optional[datetime] = None) -> LogSummary:
+        """
+        Get a summary of logged actions aggregated over partitions.
+
+        Only partitions overlapping [start_time, end_time] are opened.
+        Without a start_time the summary covers the partitions that are not
+        archived yet, so routine summaries never decompress archives; pass
+        an explicit start_time to include archived history.
+        """
+        summary = LogSummary(total_actions=0)
+
+        for partition in self._partitions_for(LogQuery(start_time=start_time, end_time=end_time)):
+            if start_time is None and partition.archived:
+                continue
+            with self._pinned(partition) as partition_logger:
+                if partition_logger is None:
+                    continue
+                part = partition_logger.get_log_summary(session_id, task_id, start_time, end_time)
+            summary.total_actions += part.total_actions
+            summary.files_modified += part.files_modified
+            summary.commands_executed += part.commands_executed
+            summary.errors_encountered += part.errors_encountered
+            for action_type, count in part.actions_by_type.items():
+                summary.actions_by_type[action_type] = summary.actions_by_type.get(action_type, 0) + count
+            if part.time_range:
+                if summary.time_range is None:
+                    summary.time_range = part.time_range
+                else:
+                    summary.time_range = (
+                        min(summary.time_range[0], part.time_range[0]),
+                        max(summary.time_range[1], part.time_range[1])
+                    )
+
+        return summary
+
+    def export_logs(self, query: LogQuery, format: str = "json") -> str:
+        """Export logs in the specified format (the result is one string)."""
+        return "".join(self.stream_logs(query, format))
+
+    def stream_logs(self, query: LogQuery, format: str = "ndjson",
+                    page_size: int = 500) -> Iterator[str]:
+        """Export logs incrementally as text chunks."""
+        return iter_export(self.iter_actions(query, page_size), format)
+
+    def export_logs_to(self, query: LogQuery, destination: Union[str, Path, IO[str]],
+                       format: str = "ndjson") -> int:
+        """Stream an export to a file path or open text stream."""
+        return write_chunks(self.stream_logs(query, format), destination)
+
+    def aexport_logs(self, query: LogQuery, format: str = "ndjson") -> AsyncIterator[str]:
+        """Stream an export to async code without blocking the event loop."""
+        return aiter_chunks(self.stream_logs(query, format))
+
+    # Retention and archival
+
+    def clear_logs(self, session_id: str = None, before_date: str = None) -> int:
+        """
+        Clear logs based on criteria.
+
+        Partitions that lie entirely before before_date are dropped as files
+        (when no session filter is given); only the partition containing the
+        cutoff is cleared row by row, as is any partition a query is still
+        reading. Archived partitions are rewritten.
+        """
+        cutoff = datetime.fromisoformat(before_date) if before_date else None
+        removed = 0
+
+        for partition in self.list_partitions():
+            if cutoff and partition.start >= cutoff:
+                continue
+
+            if session_id is None and (cutoff is None or partition.end <= cutoff):
+                count = self._count_actions(partition)
+                if self._drop_partition(partition):
+                    removed += count
+                    continue
+
+            with self._pinned(partition) as partition_logger:
+                if partition_logger is None:
+                    continue
+                removed += partition_logger.clear_logs(session_id, before_date)
+                extracted = self._is_extracted(partition_logger)
+            if extracted:
+                self._rearchive(partition)
+
+        return removed
+
+    def apply_retention(self, now: Optional[datetime] = None) -> int:
+        """
+        Drop partitions older than the retention period.
+
+        Returns:
+            Number of partitions dropped (partitions in use are left for the next run)
+        """
+        if self.retention_days is None:
+            return 0
+
+        cutoff = (now or datetime.now()) - timedelta(days=self.retention_days)
+        dropped = 0
+        for partition in self.list_partitions():
+            if partition.end <= cutoff and self._drop_partition(partition):
+                dropped += 1
+        return dropped
+
+    def archive_partitions(self, now: Optional[datetime] = None) -> int:
+        """
+        Compact and compress partitions older than the archive age.
+
+        Returns:
+            Number of partitions archived (partitions in use are left for the next run)
+        """
+        if self.archive_after_days is None:
+            return 0
+
+        cutoff = (now or datetime.now()) - timedelta(days=self.archive_after_days)
+        archived = 0
+        for partition in self.list_partitions():
+            if not partition.archived and partition.end <= cutoff and self._archive(partition):
+                archived += 1
+        return archived
+
+    def run_maintenance(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """Apply retention, then archive old partitions."""
+        return {
+            "partitions_dropped": self.apply_retention(now),
+            "partitions_archived": self.archive_partitions(now),
+        }
+
+    def wait_for_maintenance(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for background maintenance started by a partition rollover.
+
+        Returns:
+            True if no maintenance is running any more
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                thread = self._maintenance_thread
+            if thread is None:
+                return True
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+            if thread.is_alive():
+                return False
+
+    def list_partitions(self) -> List[LogPartition]:
+        """All partitions on disk, oldest first."""
+        partitions: Dict[str, LogPartition] = {}
+        for entry in self.directory.iterdir():
+            match = _PARTITION_PATTERN.match(entry.name)
+            if not match:
+                continue
+            archived = bool(match.group(2))
+            # An archive run interrupted before removing the live file leaves both
+            if match.group(1) in partitions and archived:
+                continue
+            start = datetime.strptime(match.group(1), "%Y-%m-%d")
+            partitions[match.group(1)] = LogPartition(
+                start=start,
+                end=start + self._period_length(),
+                path=entry,
+                archived=archived
+            )
+        return sorted(partitions.values(), key=lambda partition: partition.start)
+
+    def get_database_stats(self) -> Dict[str, Any]:
+        """Storage statistics per partition."""
+        partitions = self.list_partitions()
+        return {
+            "period": self.period,
+            "partitions": len(partitions),
+            "archived_partitions": sum(1 for partition in partitions if partition.archived),
+            "open_partitions": len(self._open),
+            "total_size_bytes": sum(partition.path.stat().st_size for partition in partitions),
+            "partition_files": [
+                {
+                    "partition": partition.key,
+                    "archived": partition.archived,
+                    "size_bytes": partition.path.stat().st_size
+                }
+                for partition in partitions
+            ]
+        }
+
+    # Internals
+
+    def _period_length(self) -> timedelta:
+        return timedelta(days=7) if self.period == "week" else timedelta(days=1)
+
+    def _partition_start(self, moment: datetime) -> datetime:
+        start = datetime(moment.year, moment.month, moment.day)
+        if self.period == "week":
+            start -= timedelta(days=start.weekday())
+        return start
+
+    def _partitions_for(self, query: LogQuery) -> List[LogPartition]:
+        """Partitions that can hold actions matching the query's time range."""
+        lower = query.start_time
+        if query.after and (lower is None or query.after[0] > lower):
+            lower = query.after[0]
+
+        return [
+            partition for partition in self.list_partitions()
+            if (lower is None or partition.end > lower)
+            and (query.end_time is None or partition.start <= query.end_time)
+        ]
+
+    @contextmanager
+    def _writer_for(self, now: datetime) -> Iterator[DatabaseActionLogger]:
+        """Pin and yield the logger for the partition that receives writes at this moment."""
+        start = self._partition_start(now)
+        key = start.strftime("%Y-%m-%d")
+
+        with self._lock:
+            rolled_over = self._current_key is not None and key != self._current_key
+            self._current_key = key
+            partition = LogPartition(start=start, end=start + self._period_length(),
+                                     path=self.directory / f"actions-{key}.db")
+
+        try:
+            with self._pinned(partition, create=True) as partition_logger:
+                yield partition_logger
+        finally:
+            # A new partition is a natural point to retire old ones
+            if rolled_over:
+                self._schedule_maintenance(now)
+
+    def _schedule_maintenance(self, now: datetime) -> None:
+        """Run maintenance on a background thread so the logging caller never waits for it."""
+        with self._lock:
+            self._maintenance_due = now
+            if self._maintenance_thread is not None:
+                return  # The running thread picks up the new time before it exits
+            thread = threading.Thread(target=self._maintenance_loop,
+                                      name="ActionLogMaintenance", daemon=True)
+            self._maintenance_thread = thread
+        thread.start()
+
+    def _maintenance_loop(self) -> None:
+        while True:
+            with self._lock:
+                now, self._maintenance_due = self._maintenance_due, None
+                if now is None:
+                    self._maintenance_thread = None
+                    return
+            try:
+                self.run_maintenance(now)
+            except Exception:
+                logger.exception("Action log partition maintenance failed")
+
+    @contextmanager
+    def _pinned(self, partition: LogPartition,
+                create: bool = False) -> Iterator[Optional[DatabaseActionLogger]]:
+        """
+        Open a partition and keep it from being evicted until the block exits.
+
+        Waits while the partition is being archived or extracted, and
+        decompresses archived partitions without holding the lock. Yields
+        None if the partition no longer exists (unless create is set, for
+        writes).
+        """
+        while True:
+            with self._lock:
+                while partition.key in self._retiring:
+                    self._retired.wait()
+                if partition.key not in self._open and not create:
+                    partition = self._resolve(partition)
+                if partition is None:
+                    partition_logger = None
+                    break
+                if (not partition.archived or partition.key in self._open
+                        or self._extracted_path(partition).exists()):
+                    partition_logger = self._logger_for(partition)
+                    self._pins[partition.key] = self._pins.get(partition.key, 0) + 1
+                    break
+                self._retiring.add(partition.key)
+
+            try:
+                self._extract(partition)
+            finally:
+                with self._lock:
+                    self._retiring.discard(partition.key)
+                    self._retired.notify_all()
+
+        if partition_logger is None:
+            yield None
+            return
+        try:
+            yield partition_logger
+        finally:
+            with self._lock:
+                self._pins[partition.key] -= 1
+                if not self._pins[partition.key]:
+                    del self._pins[partition.key]
+                self._evict()
+
+    def _resolve(self, partition: LogPartition) -> Optional[LogPartition]:
+        """Re-check a partition listed earlier; maintenance may have archived or dropped it since."""
+        if partition.path.exists():
+            return partition
+        if not partition.archived:
+            archive_path = partition.path.with_name(partition.path.name + ".gz")
+            if archive_path.exists():
+                return replace(partition, path=archive_path, archived=True)
+        return None
+
+    def _logger_for(self, partition: LogPartition) -> DatabaseActionLogger:
+        """Open (or reuse) the logger for a partition, closing the least recently used."""
+        with self._lock:
+            partition_logger = self._open.get(partition.key)
+            if partition_logger is not None:
+                self._open.move_to_end(partition.key)
+                return partition_logger
+
+            if partition.archived:
+                # _pinned has already extracted it outside the lock
+                partition_logger = DatabaseActionLogger(str(self._extracted_path(partition)), write_behind=False)
+            else:
+                partition_logger = DatabaseActionLogger(str(partition.path))
+
+            self._open[partition.key] = partition_logger
+            self._evict(keep=partition.key)
+            return partition_logger
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        """Close least recently used partitions until at most max_open_partitions are open."""
+        with self._lock:
+            # Pinned partitions and the write partition may keep the count above the limit for a while
+            candidates = [
+                key for key in self._open
+                if key != keep and key != self._current_key and key not in self._pins
+            ]
+            for evicted_key in candidates[:max(0, len(self._open) - self.max_open_partitions)]:
+                self._open.pop(evicted_key).close()
+                self._discard_extracted(evicted_key)
+
+    def _close_partition(self, partition: LogPartition) -> bool:
+        """Close a partition's logger if it is open; False if it is pinned."""
+        with self._lock:
+            if partition.key in self._pins:
+                return False
+            partition_logger = self._open.pop(partition.key, None)
+            if partition_logger is not None:
+                partition_logger.close()
+            self._discard_extracted(partition.key)
+            return True
+
+    def _count_actions(self, partition: LogPartition) -> int:
+        """Actions in a partition; archives use the count recorded when they were written."""
+        if partition.archived:
+            try:
+                return json.loads(self._meta_path(partition.key).read_text())["action_count"]
+            except (OSError, ValueError, KeyError):
+                pass  # Archived before counts were recorded
+        with self._pinned(partition) as partition_logger:
+            return partition_logger.get_log_summary().total_actions if partition_logger else 0
+
+    def _drop_partition(self, partition: LogPartition) -> bool:
+        """Delete a partition and its SQLite side files; False if it is in use."""
+        with self._lock:
+            if partition.key in self._retiring or not self._close_partition(partition):
+                return False
+            self._remove_database(partition.path)
+            if partition.archived:
+                self._meta_path(partition.key).unlink(missing_ok=True)
+            return True
+
+    def _archive(self, partition: LogPartition) -> bool:
+        """Compact a live partition into a read-only gzip file and remove the original."""
+        with self._lock:
+            if (partition.key in self._retiring or partition.key == self._current_key
+                    or not partition.path.exists() or not self._close_partition(partition)):
+                return False
+            self._retiring.add(partition.key)
+
+        # New pins wait on _retiring, so nothing reopens the file while it is compressed
+        try:
+            archive_path = partition.path.with_name(partition.path.name + ".gz")
+            action_count = self._compress_compacted(partition.path, archive_path)
+            self._write_meta(partition.key, action_count)
+            self._remove_database(partition.path)
+        finally:
+            with self._lock:
+                self._retiring.discard(partition.key)
+                self._retired.notify_all()
+        return True
+
+    def _rearchive(self, partition: LogPartition) -> None:
+        """Write a modified, extracted archive back to its compressed file."""
+        with self._lock:
+            while partition.key in self._retiring:
+                self._retired.wait()
+            self._retiring.add(partition.key)
+
+        try:
+            archive_path = self.directory / f"actions-{partition.key}.db.gz"
+            action_count = self._compress_compacted(self._extracted_path(partition), archive_path)
+            self._write_meta(partition.key, action_count)
+        finally:
+            with self._lock:
+                self._retiring.discard(partition.key)
+                # A query still reading the extracted copy keeps it until the next eviction
+                self._close_partition(partition)
+                self._retired.notify_all()
+
+    def _is_extracted(self, partition_logger: DatabaseActionLogger) -> bool:
+        """Whether a logger reads a decompressed copy of an archived partition."""
+        return self._scratch_dir is not None and Path(partition_logger.db_path).parent == self._scratch_dir
+
+    @staticmethod
+    def _remove_database(path: Path) -> None:
+        for suffix in ("", "-wal", "-shm"):
+            side_file = Path(f"{path}{suffix}")
+            if side_file.exists():
+                side_file.unlink()
+
+    def _meta_path(self, key: str) -> Path:
+        return self.directory / f"actions-{key}.meta.json"
+
+    def _write_meta(self, key: str, action_count: int) -> None:
+        """Record an archive's action count so dropping it needs no decompression."""
+        meta_path = self._meta_path(key)
+        staging_path = meta_path.with_name(meta_path.name + ".partial")
+        staging_path.write_text(json.dumps({"action_count": action_count}))
+        os.replace(staging_path, meta_path)
+
+    @staticmethod
+    def _compress_compacted(source: Path, archive_path: Path) -> int:
+        """
+        VACUUM a database into a compact copy and gzip it to archive_path.
+
+        Returns:
+            Number of actions in the archived database
+        """
+        compact_path = archive_path.with_name(archive_path.name + ".tmp")
+        if compact_path.exists():
+            compact_path.unlink()
+
+        conn = sqlite3.connect(str(source))
+        try:
+            action_count = conn.execute("SELECT COUNT(*) FROM actions").fetchone()[0]
+            conn.execute("VACUUM INTO ?", (str(compact_path),))
+        finally:
+            conn.close()
+
+        staging_path = archive_path.with_name(archive_path.name + ".partial")
+        with open(compact_path, "rb") as src, gzip.open(staging_path, "wb") as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        compact_path.unlink()
+
+        os.replace(staging_path, archive_path)
+        archive_path.chmod(stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+        return action_count
+
+    def _extract(self, partition: LogPartition) -> Path:
+        """
+        Decompress an archived partition into the scratch directory.
+
+        The copy only appears under its final name once fully written, so a
+        failed extraction never leaves a truncated database behind.
+        """
+        extracted = self._extracted_path(partition)
+        staging_path = extracted.with_name(extracted.name + ".partial")
+        try:
+            with gzip.open(partition.path, "rb") as src, open(staging_path, "wb") as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+            os.replace(staging_path, extracted)
+        finally:
+            if staging_path.exists():
+                staging_path.unlink()
+        return extracted
+
+    def _extracted_path(self, partition: LogPartition) -> Path:
+        if self._scratch_dir is None:
+            self._scratch_dir = Path(tempfile.mkdtemp(prefix="action_log_archive_"))
+        return self._scratch_dir / f"actions-{partition.key}.db"
+
+    def _discard_extracted(self, key: str) -> None:
+        """Remove the decompressed copy of an archived partition, if any."""
+        if self._scratch_dir is None:
+            return
+        for suffix in ("", "-wal", "-shm"):
+            side_file = self._scratch_dir / f"actions-{key}.db{suffix}"
+            if side_file.exists():
+                side_file.unlink()
@@ -0,0 +1,224 @@
+"""
+Unit tests for the database action logger.
+"""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+import unittest
+from datetime import datetime, timedelta
+
+from ..types import ActionType
+from .database import DatabaseActionLogger
+from .logger import ActionLogger
+from .models import LogQuery
+
+
+class TestWriteBehind(unittest.TestCase):
+    """Test cases for write-behind batching in DatabaseActionLogger."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "actions.db")
+
+    def tearDown(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _committed_count(self) -> int:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute("SELECT COUNT(*) FROM actions").fetchone()[0]
+        finally:
+            conn.close()
+
+    def test_close_flushes_pending_records(self):
+        """Test that records still queued when the logger is closed are committed."""
+        db_logger = DatabaseActionLogger(self.db_path, batch_size=1000, flush_interval=60)
+        for i in range(50):
+            db_logger.log_action(ActionType.TASK_START, f"action {i}", session_id="s")
+        db_logger.close()
+
+        self.assertEqual(self._committed_count(), 50)
+        reopened = DatabaseActionLogger(self.db_path)
+        try:
+            self.assertEqual(len(reopened.get_actions(LogQuery(session_id="s"))), 50)
+        finally:
+            reopened.close()
+
+    def test_batch_size_triggers_commit(self):
+        """Test that a full batch is committed without waiting for the flush interval."""
+        db_logger = DatabaseActionLogger(self.db_path, batch_size=5, flush_interval=60)
+        try:
+            for i in range(5):
+                db_logger.log_action(ActionType.TASK_START, f"action {i}")
+
+            deadline = time.monotonic() + 5
+            while db_logger.get_write_stats()["batches_committed"] < 1 and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+            stats = db_logger.get_write_stats()
+            self.assertEqual(stats["batches_committed"], 1)
+            self.assertEqual(stats["records_written"], 5)
+            self.assertEqual(self._committed_count(), 5)
+        finally:
+            db_logger.close()
+
+    def test_reads_see_earlier_writes(self):
+        """Test that queries flush queued records first."""
+        db_logger = DatabaseActionLogger(self.db_path, batch_size=1000, flush_interval=60)
+        try:
+            action_id = db_logger.log_command("echo hi", "/tmp", "hi\n", "", 0, 0.01, session_id="s")
+            self.assertEqual(self._committed_count(), 0)
+
+            actions = db_logger.get_actions(LogQuery(session_id="s"))
+
+            self.assertEqual([a.id for a in actions], [action_id])
+            self.assertEqual(actions[0].command_info.output, "hi\n")
+        finally:
+            db_logger.close()
+
+    def test_inline_writes_without_background_thread(self):
+        """Test that write_behind=False commits on the caller's thread."""
+        db_logger = DatabaseActionLogger(self.db_path, write_behind=False)
+        try:
+            db_logger.log_action(ActionType.TASK_START, "inline")
+            self.assertEqual(self._committed_count(), 1)
+        finally:
+            db_logger.close()
+
+    def test_failing_record_does_not_stop_writer(self):
+        """Test that a record raising a non-sqlite error is dropped and counted."""
+        db_logger = DatabaseActionLogger(self.db_path, batch_size=1000, flush_interval=60)
+        try:
+            db_logger.log_file_change("a.txt", "modify", before_content=b"x", after_content=b"y")
+            action_id = db_logger.log_action(ActionType.TASK_START, "after failure", session_id="s")
+
+            self.assertTrue(db_logger.flush(timeout=2))
+            self.assertEqual(db_logger.get_write_stats()["failed_records"], 1)
+            self.assertEqual([a.id for a in db_logger.get_actions(LogQuery(session_id="s"))], [action_id])
+        finally:
+            db_logger.close()
+
+
+class TestKeysetPagination(unittest.TestCase):
+    """Test cases for (timestamp, id) keyset pagination."""
+
+    def setUp(self):
+        """Set up loggers with actions sharing timestamps."""
+        self.loggers = [DatabaseActionLogger(), ActionLogger()]
+        # Whole-second timestamps serialize without a fractional part
+        self.timestamps = [datetime(2024, 1, 1, 12, 0, 0)] * 5 + \
+                          [datetime(2024, 1, 1, 12, 0, 0, 500000)] * 3 + \
+                          [datetime(2024, 1, 1, 12, 0, 1)] * 4
+        for i, timestamp in enumerate(self.timestamps):
+            self.loggers[0].log_action(ActionType.TASK_START, f"action {i}", session_id="s",
+                                       timestamp=timestamp)
+            # The in-memory logger always stamps with now(), so backdate in place
+            self.loggers[1].log_action(ActionType.TASK_START, f"action {i}", session_id="s")
+            self.loggers[1]._actions[-1].timestamp = timestamp
+
+    def tearDown(self):
+        """Clean up test environment."""
+        self.loggers[0].close()
+
+    def _expected_order(self, action_logger):
+        actions = action_logger.get_actions(LogQuery(session_id="s"))
+        return [(a.timestamp, a.id) for a in actions]
+
+    def test_pages_across_equal_timestamps(self):
+        """Test that paging by cursor visits every action once when timestamps tie."""
+        for action_logger in self.loggers:
+            expected = self._expected_order(action_logger)
+            self.assertEqual(len(expected), len(self.timestamps))
+            self.assertEqual(expected, sorted(expected))
+
+            seen = []
+            query = LogQuery(session_id="s", limit=2)
+            while True:
+                page = action_logger.get_actions(query)
+                if not page:
+                    break
+                seen.extend((a.timestamp, a.id) for a in page)
+                query.after = (page[-1].timestamp, page[-1].id)
+
+            self.assertEqual(seen, expected, type(action_logger).__name__)
+
+    def test_cursor_round_trip(self):
+        """Test that a cursor taken from a returned action resumes right after it."""
+        for action_logger in self.loggers:
+            expected = self._expected_order(action_logger)
+            for position in (0, 4, 5, 7, 10):
+                timestamp, action_id = expected[position]
+                page = action_logger.get_actions(LogQuery(session_id="s", after=(timestamp, action_id)))
+                self.assertEqual([(a.timestamp, a.id) for a in page], expected[position + 1:])
+
+    def test_iter_actions_pages_with_offset_and_limit(self):
+        """Test that iter_actions matches one big query for any page size."""
+        db_logger = self.loggers[0]
+        expected = self._expected_order(db_logger)
+        for page_size in (1, 3, 5, 100):
+            ids = [(a.timestamp, a.id) for a in
+                   db_logger.iter_actions(LogQuery(session_id="s", offset=2, limit=7), page_size)]
+            self.assertEqual(ids, expected[2:9])
+
+    def test_details_loaded_per_page(self):
+        """Test that batched detail loading attaches rows to the right actions."""
+        db_logger = self.loggers[0]
+        start = datetime(2024, 1, 2)
+        command_id = db_logger.log_command("ls", "/", "out", "", 0, 0.1, session_id="d", timestamp=start)
+        error_id = db_logger.log_error("ValueError", "bad", session_id="d",
+                                       timestamp=start + timedelta(seconds=1))
+        change_id = db_logger.log_file_change("a.py", "create", after_content="x = 1\n",
+                                              session_id="d", timestamp=start + timedelta(seconds=2))
+
+        actions = {a.id: a for a in db_logger.get_actions(LogQuery(session_id="d"))}
+
+        self.assertEqual(actions[command_id].command_info.command, "ls")
+        self.assertEqual(actions[error_id].error_info.message, "bad")
+        self.assertEqual(actions[change_id].file_changes[0].after_content, "x = 1\n")
+        bare = db_logger.get_actions(LogQuery(session_id="d", include_details=False))
+        self.assertTrue(all(a.command_info is None and not a.file_changes for a in bare))
+
+
+class TestClearLogs(unittest.TestCase):
+    """Test cases for clearing logs together with their file versions."""
+
+    def setUp(self):
+        """Set up an in-memory logger."""
+        self.db_logger = DatabaseActionLogger()
+
+    def tearDown(self):
+        """Clean up test environment."""
+        self.db_logger.close()
+
+    def _storage(self):
+        return self.db_logger.get_database_stats()["file_content_storage"]
+
+    def test_clear_drops_unreferenced_versions(self):
+        """Test that versions only cleared actions used are deleted and shared ones kept."""
+        body = "".join(f"line {i}\n" for i in range(50))
+        v1, v2, v3 = body, body + "v2\n", body + "v2\nv3\n"
+        self.db_logger.log_file_change("a.py", "create", after_content=v1, session_id="old")
+        self.db_logger.log_file_change("a.py", "modify", before_content=v1, after_content=v2, session_id="old")
+        self.db_logger.log_file_change("a.py", "modify", before_content=v2, after_content=v3, session_id="new")
+        self.assertEqual(self._storage()["file_versions"], 3)
+
+        self.assertEqual(self.db_logger.clear_logs(session_id="old"), 2)
+
+        # v1 is gone; v2 survives as the before side of the remaining change
+        storage = self._storage()
+        self.assertEqual((storage["file_versions"], storage["keyframes"], storage["content_blobs"]), (2, 1, 1))
+        change = self.db_logger.get_actions(LogQuery(session_id="new"))[0].file_changes[0]
+        self.assertEqual((change.before_content, change.after_content), (v2, v3))
+
+        self.db_logger.clear_logs(session_id="new")
+        storage = self._storage()
+        self.assertEqual((storage["file_versions"], storage["content_blobs"]), (0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+"""
+Unit tests for streaming log and history exports.
+"""
+
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from ..types import ActionType
+from .database import DatabaseActionLogger
+from .export import CSV_HEADER, action_to_csv_rows, action_to_dict
+from .history import ExecutionHistoryTracker
+from .models import LogQuery
+
+
+class TestStreamingExport(unittest.TestCase):
+    """Test that streamed exports keep the formats of the in-memory exports."""
+
+    def setUp(self):
+        """Set up a logger with one action of each kind."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_logger = DatabaseActionLogger()
+        self.db_logger.log_action(ActionType.TASK_START, "Build \"app\"", details={"steps": [1, 2], "note": "a\nb"},
+                                  session_id="s", task_id="build")
+        self.db_logger.log_file_change("src/ä.py", "create", after_content="print('hi')\n",
+                                       session_id="s", task_id="build")
+        self.db_logger.log_command("pytest -q", "/work", "1 passed\n", "", 0, 0.5, session_id="s", task_id="build")
+        self.db_logger.log_command("make lint", "/work", "", "E501, line too long", 2, 0.1,
+                                   session_id="s", task_id="lint")
+        self.db_logger.log_error("ValueError", "bad value", stack_trace="Traceback...\n",
+                                 context={"line": 3}, session_id="s", task_id="lint")
+
+    def tearDown(self):
+        """Clean up test environment."""
+        self.db_logger.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_json_export_matches_in_memory_layout(self):
+        """Test that the streamed JSON array is byte-identical to json.dumps(..., indent=2)."""
+        for query in (LogQuery(session_id="s"), LogQuery(session_id="missing")):
+            expected = json.dumps([action_to_dict(a) for a in self.db_logger.get_actions(query)], indent=2)
+            self.assertEqual(self.db_logger.export_logs(query, "json"), expected)
+            self.assertEqual("".join(self.db_logger.stream_logs(query, "json", page_size=2)), expected)
+
+    def test_csv_export_matches_in_memory_rows(self):
+        """Test that the streamed CSV matches writing every row at once."""
+        query = LogQuery(session_id="s")
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(CSV_HEADER)
+        for action in self.db_logger.get_actions(query):
+            writer.writerows(action_to_csv_rows(action))
+
+        self.assertEqual(self.db_logger.export_logs(query, "csv"), buffer.getvalue())
+
+    def test_ndjson_export_to_file(self):
+        """Test that export_logs_to writes one JSON object per action."""
+        query = LogQuery(session_id="s")
+        path = os.path.join(self.temp_dir, "actions.ndjson")
+
+        written = self.db_logger.export_logs_to(query, path, "ndjson")
+
+        with open(path, encoding="utf-8") as stream:
+            text = stream.read()
+        self.assertEqual(written, len(text))
+        self.assertEqual([json.loads(line) for line in text.splitlines()],
+                         [action_to_dict(a) for a in self.db_logger.get_actions(query)])
+
+    @staticmethod
+    def _sections(lines):
+        """Group markdown lines under their "## " headings."""
+        sections = {}
+        current = None
+        for line in lines:
+            if line.startswith("## "):
+                current = sections.setdefault(line, [])
+            elif current is not None and line:
+                current.append(line)
+        return sections
+
+    def test_history_stream_keeps_summary_sections(self):
+        """Test that the streamed markdown history carries every line of the in-memory summary."""
+        tracker = ExecutionHistoryTracker(self.db_logger)
+        summary = self._sections(tracker.export_execution_history("s", "markdown").splitlines())
+        streamed = self._sections("".join(tracker.stream_execution_history("s", "markdown")).splitlines())
+
+        self.assertIn("## Remaining Issues", summary)
+        for heading, lines in summary.items():
+            if heading == "## Remaining Issues":
+                # Issues are listed in log order when streamed, grouped by task otherwise
+                self.assertEqual(set(streamed[heading]), set(lines))
+                continue
+            # The stream adds per-task counts, so check the summary lines appear in order
+            remaining = iter(streamed[heading])
+            self.assertEqual([line for line in lines if line not in remaining], [], heading)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,252 @@
+"""
+Unit tests for the time-partitioned action logger.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from ..types import ActionType
+from .models import LogQuery
+from .partitioned import PartitionedActionLogger
+
+
+class _Clock(datetime):
+    """datetime whose now() is set by the test."""
+    current = datetime(2024, 3, 4, 12, 0)
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls.current
+
+
+class TestPartitionedActionLogger(unittest.TestCase):
+    """Test cases for partition rollover, eviction and cross-partition queries."""
+
+    def setUp(self):
+        """Set up a logger on a controllable clock."""
+        self.temp_dir = tempfile.mkdtemp()
+        clock = patch("sandbox.intelligent.logger.partitioned.datetime", _Clock)
+        clock.start()
+        self.addCleanup(clock.stop)
+        _Clock.current = datetime(2024, 3, 4, 12, 0)
+
+    def tearDown(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _logger(self, **kwargs) -> PartitionedActionLogger:
+        kwargs.setdefault("archive_after_days", None)
+        action_logger = PartitionedActionLogger(self.temp_dir, **kwargs)
+        self.addCleanup(action_logger.close)
+        return action_logger
+
+    def _log_days(self, action_logger, days: int, per_day: int = 3):
+        """Log per_day actions on each of `days` consecutive days."""
+        for day in range(days):
+            for i in range(per_day):
+                _Clock.current = datetime(2024, 3, 4, 12, 0) + timedelta(days=day, minutes=i)
+                action_logger.log_action(ActionType.TASK_START, f"day {day} action {i}", session_id="s")
+
+    def test_rollover_creates_partitions_and_runs_retention(self):
+        """Test that writes on a new day go to a new partition and old ones are retired."""
+        action_logger = self._logger(retention_days=1)
+        self._log_days(action_logger, 2)
+        self.assertEqual([p.key for p in action_logger.list_partitions()], ["2024-03-04", "2024-03-05"])
+
+        _Clock.current = datetime(2024, 3, 8, 9, 0)
+        action_logger.log_action(ActionType.TASK_START, "later", session_id="s")
+        self.assertTrue(action_logger.wait_for_maintenance(timeout=10))
+
+        self.assertEqual([p.key for p in action_logger.list_partitions()], ["2024-03-08"])
+        self.assertEqual([a.description for a in action_logger.get_actions(LogQuery())], ["later"])
+
+    def test_weekly_partitions_start_on_monday(self):
+        """Test that week partitions are keyed by the Monday of the week."""
+        action_logger = self._logger(period="week")
+        self._log_days(action_logger, 8, per_day=1)
+
+        self.assertEqual([p.key for p in action_logger.list_partitions()], ["2024-03-04", "2024-03-11"])
+
+    def test_cross_partition_queries(self):
+        """Test ordering, limit/offset and cursors across partition boundaries."""
+        action_logger = self._logger()
+        self._log_days(action_logger, 3)
+
+        actions = action_logger.get_actions(LogQuery(session_id="s"))
+        self.assertEqual(len(actions), 9)
+        self.assertEqual(actions, sorted(actions, key=lambda a: (a.timestamp, a.id)))
+
+        page = action_logger.get_actions(LogQuery(session_id="s", offset=2, limit=4))
+        self.assertEqual([a.id for a in page], [a.id for a in actions[2:6]])
+
+        resumed = action_logger.get_actions(LogQuery(session_id="s", after=(actions[4].timestamp, actions[4].id)))
+        self.assertEqual([a.id for a in resumed], [a.id for a in actions[5:]])
+
+        ranged = action_logger.get_actions(LogQuery(start_time=datetime(2024, 3, 5), end_time=datetime(2024, 3, 5, 23)))
+        self.assertEqual([a.description for a in ranged], [f"day 1 action {i}" for i in range(3)])
+
+    def test_eviction_keeps_write_partition_open(self):
+        """Test that queries over many partitions never close the partition being written."""
+        action_logger = self._logger(max_open_partitions=2)
+        self._log_days(action_logger, 4)
+        writer = action_logger._open["2024-03-07"]
+
+        self.assertEqual(len(action_logger.get_actions(LogQuery())), 12)
+
+        self.assertLessEqual(len(action_logger._open), 2)
+        self.assertIs(action_logger._open["2024-03-07"], writer)
+        action_logger.log_action(ActionType.TASK_START, "after query", session_id="s")
+        self.assertEqual(len(action_logger.get_actions(LogQuery(session_id="s"))), 13)
+
+    def test_partition_in_use_is_not_evicted(self):
+        """Test that a partition an unfinished query is reading survives eviction pressure."""
+        action_logger = self._logger(max_open_partitions=2)
+        self._log_days(action_logger, 4)
+
+        reading = action_logger.iter_actions(LogQuery(), page_size=1)
+        first = next(reading)
+        pinned = action_logger._open["2024-03-04"]
+
+        # Touch every other partition while the first one is mid-iteration
+        for day in range(5, 8):
+            action_logger.get_actions(LogQuery(start_time=datetime(2024, 3, day), end_time=datetime(2024, 3, day, 23)))
+        self.assertIs(action_logger._open.get("2024-03-04"), pinned)
+
+        rest = list(reading)
+        self.assertEqual(len(rest) + 1, 12)
+        self.assertEqual(first.description, "day 0 action 0")
+        self.assertEqual(action_logger._pins, {})
+        self.assertLessEqual(len(action_logger._open), 2)
+
+    def test_log_summary_skips_archives_unless_asked(self):
+        """Test that a summary without a start time leaves archived partitions compressed."""
+        action_logger = self._logger(archive_after_days=1)
+        self._log_days(action_logger, 4)
+        self.assertTrue(action_logger.wait_for_maintenance(timeout=10))
+        # Rollover maintenance has archived the partitions that ended over a day ago
+        self.assertEqual([p.archived for p in action_logger.list_partitions()], [True, True, False, False])
+
+        summary = action_logger.get_log_summary(session_id="s")
+        self.assertEqual(summary.total_actions, 6)
+        self.assertIsNone(action_logger._scratch_dir)
+
+        summary = action_logger.get_log_summary(session_id="s", start_time=datetime(2024, 3, 5, 12, 1))
+        self.assertEqual(summary.total_actions, 8)
+        self.assertEqual(summary.time_range[0], datetime(2024, 3, 5, 12, 1))
+
+    def test_retention_skips_partition_in_use(self):
+        """Test that retention leaves a partition alone while a query is reading it."""
+        action_logger = self._logger(retention_days=1)
+        self._log_days(action_logger, 2)
+        self.assertTrue(action_logger.wait_for_maintenance(timeout=10))
+
+        reading = action_logger.iter_actions(LogQuery(), page_size=1)
+        next(reading)
+        self.assertEqual(action_logger.apply_retention(datetime(2024, 3, 8)), 1)
+        self.assertEqual([p.key for p in action_logger.list_partitions()], ["2024-03-04"])
+
+        self.assertEqual(len(list(reading)), 2)
+        self.assertEqual(action_logger.apply_retention(datetime(2024, 3, 8)), 1)
+        self.assertEqual(action_logger.list_partitions(), [])
+
+    def test_rollover_archival_runs_in_background(self):
+        """Test that logging and queries proceed while an old partition is being archived."""
+        action_logger = self._logger(archive_after_days=1)
+        self._log_days(action_logger, 2)
+        self.assertTrue(action_logger.wait_for_maintenance(timeout=10))
+
+        compressing = threading.Event()
+        release = threading.Event()
+        self.addCleanup(release.set)
+        compress = PartitionedActionLogger._compress_compacted
+
+        def blocking_compress(source, archive_path):
+            compressing.set()
+            release.wait(10)
+            return compress(source, archive_path)
+
+        with patch.object(PartitionedActionLogger, "_compress_compacted", side_effect=blocking_compress):
+            _Clock.current = datetime(2024, 3, 7, 9, 0)
+            action_logger.log_action(ActionType.TASK_START, "rollover", session_id="s")
+            self.assertTrue(compressing.wait(10))
+
+            _Clock.current = datetime(2024, 3, 7, 9, 1)
+            action_logger.log_action(ActionType.TASK_START, "during archive", session_id="s")
+            current = action_logger.get_actions(LogQuery(start_time=datetime(2024, 3, 7)))
+            self.assertEqual([a.description for a in current], ["rollover", "during archive"])
+
+            release.set()
+            self.assertTrue(action_logger.wait_for_maintenance(timeout=10))
+
+        self.assertEqual([p.archived for p in action_logger.list_partitions()], [True, True, False])
+        self.assertEqual(len(action_logger.get_actions(LogQuery(session_id="s"))), 8)
+
+    def _archived_logger(self) -> PartitionedActionLogger:
+        """Logger with four days of actions, the first two of them archived."""
+        action_logger = self._logger(archive_after_days=1)
+        self._log_days(action_logger, 4)
+        self.assertTrue(action_logger.wait_for_maintenance(timeout=10))
+        self.assertEqual([p.archived for p in action_logger.list_partitions()], [True, True, False, False])
+        return action_logger
+
+    def test_archive_extracted_outside_lock(self):
+        """Test that logging proceeds while a query decompresses an archive."""
+        action_logger = self._archived_logger()
+
+        extracting = threading.Event()
+        release = threading.Event()
+        self.addCleanup(release.set)
+        extract = action_logger._extract
+
+        def blocking_extract(partition):
+            extracting.set()
+            release.wait(10)
+            return extract(partition)
+
+        results = []
+        with patch.object(action_logger, "_extract", side_effect=blocking_extract):
+            reader = threading.Thread(target=lambda: results.extend(
+                action_logger.get_actions(LogQuery(start_time=datetime(2024, 3, 4), end_time=datetime(2024, 3, 4, 23)))))
+            reader.start()
+            self.assertTrue(extracting.wait(10))
+
+            _Clock.current = datetime(2024, 3, 7, 13, 0)
+            action_logger.log_action(ActionType.TASK_START, "during extract", session_id="s")
+
+            release.set()
+            reader.join(10)
+
+        self.assertEqual([a.description for a in results], [f"day 0 action {i}" for i in range(3)])
+        self.assertEqual(len(action_logger.get_actions(LogQuery(session_id="s"))), 13)
+
+    def test_failed_extraction_leaves_no_partial_copy(self):
+        """Test that a corrupt archive is not later opened as a truncated database."""
+        action_logger = self._archived_logger()
+        archive = action_logger.list_partitions()[0]
+        archive.path.chmod(0o644)
+        archive.path.write_bytes(archive.path.read_bytes()[:64])
+
+        query = LogQuery(start_time=datetime(2024, 3, 4), end_time=datetime(2024, 3, 4, 23))
+        for _ in range(2):
+            with self.assertRaises(Exception):
+                action_logger.get_actions(query)
+        self.assertEqual(list(action_logger._scratch_dir.iterdir()), [])
+
+    def test_clear_logs_drops_archives_without_extracting(self):
+        """Test that dropping whole archived partitions uses their recorded counts."""
+        action_logger = self._archived_logger()
+
+        with patch.object(action_logger, "_extract", side_effect=AssertionError("archive was decompressed")):
+            self.assertEqual(action_logger.clear_logs(before_date="2024-03-06"), 6)
+
+        self.assertEqual([p.key for p in action_logger.list_partitions()], ["2024-03-06", "2024-03-07"])
+        self.assertEqual([name for name in os.listdir(self.temp_dir) if not name.endswith((".db", "-wal", "-shm"))], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+"""
+Unit tests for delta-compressed file version storage.
+"""
+
+import sqlite3
+import unittest
+
+from .version_store import (
+    DeltaVersionStore, FileVersionHistory, apply_delta, encode_delta
+)
+
+
+def _revisions(count: int):
+    """Successive revisions of a small file, each changing one line."""
+    lines = [f"line {i}\n" for i in range(40)]
+    for revision in range(count):
+        lines[revision % len(lines)] = f"line {revision % len(lines)} revision {revision}\n"
+        yield "".join(lines)
+
+
+class TestDeltaVersionStore(unittest.TestCase):
+    """Test cases for DeltaVersionStore."""
+
+    def setUp(self):
+        """Set up an in-memory store."""
+        self.conn = sqlite3.connect(":memory:")
+        self.store = DeltaVersionStore(keyframe_interval=4, codec="zlib", cache_size=0)
+        self.store.create_schema(self.conn)
+
+    def tearDown(self):
+        """Clean up test environment."""
+        self.conn.close()
+
+    def _blob_count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM content_blobs").fetchone()[0]
+
+    def test_delta_round_trip(self):
+        """Test that encoded deltas rebuild the target exactly."""
+        cases = [
+            ("", "new\n"),
+            ("a\nb\nc\n", "a\nc\nd"),
+            ("same\n", "same\n"),
+            ("no trailing newline", "no trailing newline\nmore"),
+            ("x\r\ny\r\n", "x\r\nz\r\n"),
+        ]
+        for base, target in cases:
+            self.assertEqual(apply_delta(base, encode_delta(base, target)), target)
+
+    def test_versions_round_trip_through_chains(self):
+        """Test that every version rebuilds, across deltas and keyframes, singly or in bulk."""
+        contents = list(_revisions(10))
+        ids = [self.store.put(self.conn, "a.py", content) for content in contents]
+
+        for version_id, content in zip(ids, contents):
+            self.assertEqual(self.store.get(self.conn, version_id), content)
+        self.assertEqual(self.store.get_many(self.conn, ids + [None, 9999]), dict(zip(ids, contents)))
+
+        keyframes = [v["version_id"] for v in self.store.list_versions(self.conn, "a.py") if v["keyframe"]]
+        self.assertEqual(keyframes, [ids[0], ids[4], ids[8]])
+
+    def test_size_counts_encoded_bytes(self):
+        """Test that logical size is the UTF-8 length, not the character count."""
+        content = "héllo wörld ✓\n"
+        self.store.put(self.conn, "u.txt", content)
+
+        self.assertEqual(self.store.list_versions(self.conn, "u.txt")[0]["size"], len(content.encode("utf-8")))
+        self.assertEqual(self.conn.execute("SELECT size FROM content_blobs").fetchone()[0],
+                         len(content.encode("utf-8")))
+
+    def test_prune_keeps_survivors_readable(self):
+        """Test that pruning into a delta chain rewrites the oldest survivor as a keyframe."""
+        contents = list(_revisions(7))
+        ids = [self.store.put(self.conn, "a.py", content) for content in contents]
+
+        removed = self.store.prune(self.conn, "a.py", keep=2)
+
+        self.assertEqual(removed, 5)
+        versions = self.store.list_versions(self.conn, "a.py")
+        self.assertEqual([v["version_id"] for v in versions], ids[5:])
+        self.assertTrue(versions[0]["keyframe"])
+        self.assertEqual(self.store.get_many(self.conn, ids), dict(zip(ids[5:], contents[5:])))
+        # Only the survivor's keyframe blob is left
+        self.assertEqual(self._blob_count(), 1)
+
+    def test_delete_collects_only_dereferenced_blobs(self):
+        """Test that deleting versions drops their blobs unless another keyframe shares them."""
+        shared = self.store.put(self.conn, "a.py", "shared\n")
+        other = self.store.put(self.conn, "b.py", "shared\n")
+        lone = self.store.put(self.conn, "c.py", "lone\n")
+        self.assertEqual(self._blob_count(), 2)
+
+        self.assertEqual(self.store.delete(self.conn, [shared, lone]), 2)
+
+        self.assertEqual(self._blob_count(), 1)
+        self.assertEqual(self.store.get(self.conn, other), "shared\n")
+        self.assertEqual(self.store.collect_garbage(self.conn), 0)
+
+
+class TestFileVersionHistory(unittest.TestCase):
+    """Test cases for FileVersionHistory."""
+
+    def test_prunes_in_batches(self):
+        """Test that a path grows to max_versions plus slack before pruning back."""
+        history = FileVersionHistory(max_versions=5, prune_slack=3)
+        try:
+            contents = list(_revisions(14))
+            counts = []
+            for content in contents:
+                history.record("a.py", content)
+                counts.append(history.count("a.py"))
+
+            self.assertEqual(counts, [1, 2, 3, 4, 5, 6, 7, 8, 5, 6, 7, 8, 5, 6])
+            self.assertEqual([v["content"] for v in history.recent("a.py", 3)], contents[-3:])
+            self.assertEqual(history.get_stats()["content_blobs"], history.get_stats()["keyframes"])
+        finally:
+            history.close()
+
+    def test_unbounded_history(self):
+        """Test that max_versions=None keeps every version."""
+        history = FileVersionHistory(max_versions=None)
+        try:
+            for content in _revisions(20):
+                history.record("a.py", content)
+            self.assertEqual(history.count("a.py"), 20)
+        finally:
+            history.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,539 @@
+"""
+Content-addressed, delta-compressed storage for successive file versions.
+
+Each file path has a chain of versions. A keyframe stores its content as a
+compressed, content-addressed blob (identical content is stored once across
+all files); every other version stores a compressed line delta against the
+previous version of the same path. Full content is rebuilt on demand by
+applying deltas forward from the nearest keyframe, and a keyframe is forced
+every ``keyframe_interval`` versions so rebuild cost stays bounded.
+"""
+
+import difflib
+import hashlib
+import json
+import sqlite3
+import threading
+import zlib
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+
+DEFAULT_CODEC = "zstd" if ZSTD_AVAILABLE else "zlib"
+
+
+def compress(data: bytes, codec: str = DEFAULT_CODEC) -> bytes:
+    """Compress bytes with the given codec ("zstd" or "zlib")."""
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=6).compress(data)
+    if codec == "zlib":
+        return zlib.compress(data, 6)
+    raise ValueError(f"Unsupported compression codec: {codec}")
+
+
+def decompress(data: bytes, codec: str) -> bytes:
+    """Decompress bytes written by compress()."""
+    if codec == "zstd":
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("zstandard is required to read zstd-compressed versions")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == "zlib":
+        return zlib.decompress(data)
+    raise ValueError(f"Unsupported compression codec: {codec}")
+
+
+def encode_delta(base: str, target: str) -> bytes:
+    """
+    Encode target as a line delta against base.
+
+    The delta is a JSON list whose items are either ``[start, end]`` (copy
+    base lines start..end) or a string (insert literal text).
+    """
+    base_lines = base.splitlines(keepends=True)
+    target_lines = target.splitlines(keepends=True)
+    matcher = difflib.SequenceMatcher(None, base_lines, target_lines, autojunk=False)
+
+    ops: List[Any] = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append([i1, i2])
+        elif j2 > j1:
+            ops.append("".join(target_lines[j1:j2]))
+
+    return json.dumps(ops, separators=(",", ":")).encode("utf-8")
+
+
+def apply_delta(base: str, delta: bytes) -> str:
+    """Rebuild the target text from base and a delta produced by encode_delta()."""
+    base_lines = base.splitlines(keepends=True)
+    parts: List[str] = []
+    for op in json.loads(delta.decode("utf-8")):
+        if isinstance(op, str):
+            parts.append(op)
+        else:
+            parts.extend(base_lines[op[0]:op[1]])
+    return "".join(parts)
+
+
+class DeltaVersionStore:
+    """
+    Stores file versions as keyframe blobs plus deltas in a SQLite database.
+
+    The store does not own a connection: every method takes the connection
+    to use, so it can share a database (and a transaction) with its caller.
+    Reconstructed contents are kept in a small LRU cache so walking a
+    history or appending to a chain does not rebuild the same version twice.
+    """
+
+    # Maximum number of ids bound into one IN (...) clause
+    _IN_CHUNK_SIZE = 500
+
+    def __init__(self, keyframe_interval: int = 32, codec: str = DEFAULT_CODEC,
+                 cache_size: int = 64):
+        """
+        Initialize the store.
+
+        Args:
+            keyframe_interval: Maximum delta chain length before a full keyframe
+            codec: Compression codec for new blobs and deltas ("zstd" or "zlib")
+            cache_size: Number of reconstructed versions kept in memory
+        """
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.codec = codec
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[int, tuple]" = OrderedDict()  # id -> (content_hash, content)
+        self._cache_lock = threading.Lock()
+
+    def create_schema(self, conn: sqlite3.Connection) -> None:
+        """Create the blob and version tables if they do not exist."""
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS content_blobs (
+                hash TEXT PRIMARY KEY,  -- sha256 of the uncompressed content
+                codec TEXT NOT NULL,
+                data BLOB NOT NULL,
+                size INTEGER NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS file_versions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                file_path TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                base_version_id INTEGER,  -- NULL for keyframes stored in content_blobs
+                codec TEXT,
+                delta BLOB,  -- compressed delta against base_version_id
+                chain_length INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                timestamp TEXT NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_file_versions_path ON file_versions (file_path, id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_file_versions_base ON file_versions (base_version_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_file_versions_hash ON file_versions (content_hash)")
+
+    def put(self, conn: sqlite3.Connection, file_path: str, content: str,
+            timestamp: Optional[str] = None) -> int:
+        """
+        Store a new version of a file.
+
+        If the content matches the latest stored version of the path, that
+        version is reused instead of adding a new one.
+
+        Returns:
+            The version id
+        """
+        encoded = content.encode("utf-8")
+        content_hash = hashlib.sha256(encoded).hexdigest()
+        timestamp = timestamp or datetime.now().isoformat()
+
+        latest = conn.execute(
+            "SELECT id, content_hash, chain_length FROM file_versions "
+            "WHERE file_path = ? ORDER BY id DESC LIMIT 1",
+            (file_path,)
+        ).fetchone()
+        if latest and latest[1] == content_hash:
+            return latest[0]
+
+        if latest and latest[2] + 1 < self.keyframe_interval:
+            base = self.get(conn, latest[0])
+            delta = compress(encode_delta(base, content), self.codec)
+            # Small or rewritten files can compress better on their own
+            if len(delta) < len(compress(encoded, self.codec)):
+                cursor = conn.execute(
+                    "INSERT INTO file_versions (file_path, content_hash, base_version_id, codec, "
+                    "delta, chain_length, size, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (file_path, content_hash, latest[0], self.codec, delta,
+                     latest[2] + 1, len(encoded), timestamp)
+                )
+                self._remember(cursor.lastrowid, content_hash, content)
+                return cursor.lastrowid
+
+        self._store_blob(conn, content_hash, content)
+        cursor = conn.execute(
+            "INSERT INTO file_versions (file_path, content_hash, chain_length, size, timestamp) "
+            "VALUES (?, ?, 0, ?, ?)",
+            (file_path, content_hash, len(encoded), timestamp)
+        )
+        self._remember(cursor.lastrowid, content_hash, content)
+        return cursor.lastrowid
+
+    def get(self, conn: sqlite3.Connection, version_id: int) -> Optional[str]:
+        """Rebuild the full content of a version (None if it does not exist)."""
+        # Walk back to a keyframe or a cached version, then apply deltas forward
+        chain = []
+        content = None
+        current = version_id
+        while content is None:
+            row = conn.execute(
+                "SELECT content_hash, base_version_id, codec, delta FROM file_versions WHERE id = ?",
+                (current,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            content = self._cached(current, row[0])
+            if content is None:
+                if row[1] is None:
+                    content = self._load_blob(conn, row[0])
+                    if content is None:
+                        return None
+                else:
+                    chain.append((row[2], row[3]))
+                    current = row[1]
+
+        for codec, delta in reversed(chain):
+            content = apply_delta(content, decompress(delta, codec))
+
+        if chain:
+            self._remember(version_id, hashlib.sha256(content.encode("utf-8")).hexdigest(), content)
+        return content
+
+    def get_many(self, conn: sqlite3.Connection, version_ids: Iterable[int]) -> Dict[int, str]:
+        """
+        Rebuild the contents of several versions in one pass.
+
+        The requested versions and their delta chains are fetched with one
+        query per chunk of ids and their keyframe blobs with one more, and
+        an ancestor shared by several versions is rebuilt only once.
+
+        Returns:
+            Content by version id (versions that do not exist are left out)
+        """
+        wanted = sorted({version_id for version_id in version_ids if version_id is not None})
+        rows: Dict[int, tuple] = {}
+        for chunk in self._chunks(wanted):
+            placeholders = ",".join("?" * len(chunk))
+            for row in conn.execute(f"""
+                WITH RECURSIVE chain(id) AS (
+                    SELECT id FROM file_versions WHERE id IN ({placeholders})
+                    UNION
+                    SELECT v.base_version_id FROM file_versions v JOIN chain ON v.id = chain.id
+                    WHERE v.base_version_id IS NOT NULL
+                )
+                SELECT id, content_hash, base_version_id, codec, delta
+                FROM file_versions WHERE id IN (SELECT id FROM chain)
+            """, chunk):
+                rows[row[0]] = tuple(row[1:])
+
+        blobs: Dict[str, tuple] = {}
+        for chunk in self._chunks(sorted({row[0] for row in rows.values() if row[1] is None})):
+            placeholders = ",".join("?" * len(chunk))
+            for content_hash, codec, data in conn.execute(
+                f"SELECT hash, codec, data FROM content_blobs WHERE hash IN ({placeholders})", chunk
+            ):
+                blobs[content_hash] = (codec, data)
+
+        resolved: Dict[int, Optional[str]] = {}
+        for version_id in wanted:
+            # Walk back to a version that is already rebuilt, cached or a keyframe
+            chain = []
+            current = version_id
+            while current not in resolved:
+                row = rows.get(current)
+                if row is None:
+                    resolved[current] = None
+                    break
+                cached = self._cached(current, row[0])
+                if cached is not None:
+                    resolved[current] = cached
+                elif row[1] is None:
+                    blob = blobs.get(row[0])
+                    resolved[current] = decompress(blob[1], blob[0]).decode("utf-8") if blob else None
+                else:
+                    chain.append(current)
+                    current = row[1]
+
+            content = resolved[current]
+            for chained_id in reversed(chain):
+                if content is not None:
+                    codec, delta = rows[chained_id][2:]
+                    content = apply_delta(content, decompress(delta, codec))
+                resolved[chained_id] = content
+
+            if chain and content is not None:
+                self._remember(version_id, rows[version_id][0], content)
+
+        return {version_id: resolved[version_id] for version_id in wanted if resolved[version_id] is not None}
+
+    def list_versions(self, conn: sqlite3.Connection, file_path: str,
+                      limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        List version metadata for a path, oldest first.
+
+        Args:
+            limit: Only return the most recent versions
+        """
+        sql = "SELECT id, timestamp, size, base_version_id FROM file_versions WHERE file_path = ? ORDER BY id DESC"
+        params: List[Any] = [file_path]
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        rows = conn.execute(sql, params).fetchall()
+        return [
+            {"version_id": row[0], "timestamp": row[1], "size": row[2], "keyframe": row[3] is None}
+            for row in reversed(rows)
+        ]
+
+    def count_versions(self, conn: sqlite3.Connection, file_path: str) -> int:
+        """Number of stored versions of a path."""
+        return conn.execute(
+            "SELECT COUNT(*) FROM file_versions WHERE file_path = ?", (file_path,)
+        ).fetchone()[0]
+
+    def prune(self, conn: sqlite3.Connection, file_path: str, keep: int) -> int:
+        """
+        Drop all but the newest ``keep`` versions of a path.
+
+        Returns:
+            Number of versions removed
+        """
+        rows = conn.execute(
+            "SELECT id FROM file_versions WHERE file_path = ? ORDER BY id DESC LIMIT -1 OFFSET ?",
+            (file_path, max(0, keep))
+        ).fetchall()
+        return self.delete(conn, [row[0] for row in rows])
+
+    def delete(self, conn: sqlite3.Connection, version_ids: Iterable[int]) -> int:
+        """
+        Delete versions while keeping the remaining ones readable.
+
+        A surviving version whose delta base is deleted is rewritten as a
+        keyframe first. Only the blobs of deleted keyframes are checked for
+        garbage afterwards.
+
+        Returns:
+            Number of versions removed
+        """
+        doomed = sorted(set(version_ids))
+        if not doomed:
+            return 0
+
+        doomed_set = set(doomed)
+        dependents = []
+        dereferenced = set()
+        for chunk in self._chunks(doomed):
+            placeholders = ",".join("?" * len(chunk))
+            dependents.extend(
+                row for row in conn.execute(
+                    f"SELECT id, content_hash FROM file_versions WHERE base_version_id IN ({placeholders})", chunk
+                )
+                if row[0] not in doomed_set
+            )
+            dereferenced.update(row[0] for row in conn.execute(
+                f"SELECT content_hash FROM file_versions WHERE base_version_id IS NULL AND id IN ({placeholders})",
+                chunk
+            ))
+
+        contents = self.get_many(conn, [row[0] for row in dependents])
+        for version_id, content_hash in dependents:
+            self._store_blob(conn, content_hash, contents[version_id])
+            conn.execute(
+                "UPDATE file_versions SET base_version_id = NULL, codec = NULL, delta = NULL, "
+                "chain_length = 0 WHERE id = ?",
+                (version_id,)
+            )
+
+        removed = 0
+        for chunk in self._chunks(doomed):
+            placeholders = ",".join("?" * len(chunk))
+            removed += conn.execute(f"DELETE FROM file_versions WHERE id IN ({placeholders})", chunk).rowcount
+        self.collect_garbage(conn, dereferenced)
+
+        with self._cache_lock:
+            for version_id in doomed:
+                self._cache.pop(version_id, None)
+        return removed
+
+    def collect_garbage(self, conn: sqlite3.Connection, hashes: Optional[Iterable[str]] = None) -> int:
+        """
+        Delete blobs no keyframe refers to. Returns the number removed.
+
+        Args:
+            hashes: Only consider these blobs (all blobs when omitted)
+        """
+        if hashes is None:
+            cursor = conn.execute("""
+                DELETE FROM content_blobs WHERE hash NOT IN (
+                    SELECT content_hash FROM file_versions WHERE base_version_id IS NULL
+                )
+            """)
+            return cursor.rowcount
+
+        removed = 0
+        for chunk in self._chunks(sorted(set(hashes))):
+            placeholders = ",".join("?" * len(chunk))
+            removed += conn.execute(f"""
+                DELETE FROM content_blobs WHERE hash IN ({placeholders}) AND NOT EXISTS (
+                    SELECT 1 FROM file_versions
+                    WHERE content_hash = content_blobs.hash AND base_version_id IS NULL
+                )
+            """, chunk).rowcount
+        return removed
+
+    def get_stats(self, conn: sqlite3.Connection) -> Dict[str, Any]:
+        """Storage statistics: logical size versus bytes actually stored."""
+        versions, keyframes, logical = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(base_version_id IS NULL), 0), COALESCE(SUM(size), 0) "
+            "FROM file_versions"
+        ).fetchone()
+        delta_bytes = conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(delta)), 0) FROM file_versions"
+        ).fetchone()[0]
+        blobs, blob_bytes = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM content_blobs"
+        ).fetchone()
+        return {
+            "file_versions": versions,
+            "keyframes": keyframes,
+            "content_blobs": blobs,
+            "logical_bytes": logical,
+            "stored_bytes": delta_bytes + blob_bytes,
+        }
+
+    def _store_blob(self, conn: sqlite3.Connection, content_hash: str, content: str) -> None:
+        """Insert a content blob unless the same content is already stored."""
+        encoded = content.encode("utf-8")
+        conn.execute(
+            "INSERT OR IGNORE INTO content_blobs (hash, codec, data, size) VALUES (?, ?, ?, ?)",
+            (content_hash, self.codec, compress(encoded, self.codec), len(encoded))
+        )
+
+    def _load_blob(self, conn: sqlite3.Connection, content_hash: str) -> Optional[str]:
+        """Load and decompress a content blob."""
+        row = conn.execute(
+            "SELECT codec, data FROM content_blobs WHERE hash = ?", (content_hash,)
+        ).fetchone()
+        if row is None:
+            return None
+        return decompress(row[1], row[0]).decode("utf-8")
+
+    @classmethod
+    def _chunks(cls, items: List[Any]) -> Iterable[List[Any]]:
+        """Split a list into slices small enough to bind into one IN (...) clause."""
+        for start in range(0, len(items), cls._IN_CHUNK_SIZE):
+            yield items[start:start + cls._IN_CHUNK_SIZE]
+
+    def _cached(self, version_id: int, content_hash: str) -> Optional[str]:
+        """
+        Return a cached reconstruction, refreshing its LRU position.
+
+        Entries are checked against the stored hash, since ids from a
+        rolled-back transaction can be reused.
+        """
+        with self._cache_lock:
+            entry = self._cache.get(version_id)
+            if entry is None or entry[0] != content_hash:
+                return None
+            self._cache.move_to_end(version_id)
+            return entry[1]
+
+    def _remember(self, version_id: int, content_hash: str, content: str) -> None:
+        """Cache a reconstructed version."""
+        if self.cache_size <= 0:
+            return
+        with self._cache_lock:
+            self._cache[version_id] = (content_hash, content)
+            self._cache.move_to_end(version_id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+
+class FileVersionHistory:
+    """
+    Self-contained per-file version history backed by a DeltaVersionStore.
+
+    Owns its SQLite connection, so it can be used where there is no action
+    log database (e.g. the MCP server's write_to_file history). Once a path
+    has more than ``max_versions + prune_slack`` versions it is pruned back
+    to the newest ``max_versions``, so pruning runs once per batch of writes
+    instead of on every write.
+    """
+
+    def __init__(self, db_path: str = ":memory:", max_versions: Optional[int] = 100,
+                 keyframe_interval: int = 32, prune_slack: Optional[int] = None):
+        """
+        Initialize the history.
+
+        Args:
+            db_path: SQLite database file (in-memory by default)
+            max_versions: Versions kept per path (None keeps all)
+            keyframe_interval: Maximum delta chain length before a full keyframe
+            prune_slack: Extra versions a path may gather before it is pruned
+                (defaults to a tenth of max_versions)
+        """
+        self.max_versions = max_versions
+        self.prune_slack = prune_slack if prune_slack is not None else max(1, (max_versions or 0) // 10)
+        self.store = DeltaVersionStore(keyframe_interval=keyframe_interval)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self.store.create_schema(self._conn)
+
+    def record(self, file_path: str, content: str) -> int:
+        """Record a new version of a file and return its version id."""
+        with self._lock, self._conn:
+            version_id = self.store.put(self._conn, file_path, content)
+            if self.max_versions and \
+                    self.store.count_versions(self._conn, file_path) > self.max_versions + self.prune_slack:
+                self.store.prune(self._conn, file_path, self.max_versions)
+            return version_id
+
+    def __contains__(self, file_path: str) -> bool:
+        return self.count(file_path) > 0
+
+    def count(self, file_path: str) -> int:
+        """Number of stored versions of a file."""
+        with self._lock:
+            return self.store.count_versions(self._conn, file_path)
+
+    def recent(self, file_path: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """Return the most recent versions (oldest first) with their full content."""
+        with self._lock:
+            versions = self.store.list_versions(self._conn, file_path, limit)
+            return [
+                {
+                    "version_id": version["version_id"],
+                    "timestamp": version["timestamp"],
+                    "content": self.store.get(self._conn, version["version_id"]),
+                }
+                for version in versions
+            ]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Storage statistics for all tracked files."""
+        with self._lock:
+            return self.store.get_stats(self._conn)
+
+    def close(self) -> None:
+        """Close the underlying connection."""
+        with self._lock:
+            self._conn.close()
@@ -8,19 +8,58 @@ This module provides:
 - Request validation and rate limiting
 """
 
+import atexit
 import hashlib
 import hmac
+import os
+import secrets
+import threading
 import time
 import uuid
 import logging
-from typing import Dict, Any, Optional, Set, List
+from collections import OrderedDict
+from typing import Dict, Any, FrozenSet, Optional, Set, List
 from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
 import json
 
+from ...core.rate_limiter import RateLimit, RateLimiter
+
 logger = logging.getLogger(__name__)
 
+# Characters of an API key stored in clear to index the hashed keys
+API_KEY_PREFIX_LENGTH = 12
+
+# Fields whose change alters a user's authorization decisions
+_AUTHZ_FIELDS = ('role', 'permissions', 'active')
+
+
+def hash_api_key(api_key: str, salt: Optional[str] = None) -> str:
+    """
+    Salted hash of an API key, as "sha256$<salt>$<digest>".
+
+    Generated keys carry 128 random bits, so a single SHA-256 round is
+    enough; a slow KDF would only make every request expensive.
+    """
+    salt = salt or secrets.token_hex(16)
+    digest = hashlib.sha256(f"{salt}${api_key}".encode()).hexdigest()
+    return f"sha256${salt}${digest}"
+
+
+def api_key_prefix(api_key: str) -> str:
+    """Indexed part of an API key; at most half of it, so short keys are not exposed."""
+    return api_key[:min(API_KEY_PREFIX_LENGTH, len(api_key) // 2)]
+
+
+def verify_api_key(api_key: str, key_hash: str) -> bool:
+    """Check an API key against a hash from hash_api_key()."""
+    try:
+        _, salt, _ = key_hash.split('$', 2)
+    except ValueError:
+        return False
+    return hmac.compare_digest(hash_api_key(api_key, salt), key_hash)
+
 
 class Role(Enum):
     """User roles for access control."""
@@ -43,18 +82,36 @@ class Permission(Enum):
 
 @dataclass
 class User:
-    """User account information."""
+    """
+    User account information.
+
+    api_key holds the plaintext key only when it was issued by this
+    process; users loaded from the config file have just the hash.
+    """
     id: str
     username: str
     api_key: str
     role: Role
-    permissions: Set[Permission] = field(default_factory=set)
+    permissions: FrozenSet[Permission] = field(default_factory=frozenset)
     created_at: float = field(default_factory=time.time)
     last_access: float = field(default_factory=time.time)
     active: bool = True
     rate_limit: int = 100  # requests per hour
-    current_requests: int = 0
-    rate_limit_reset: float = field(default_factory=time.time)
+    api_key_hash: str = ""
+    api_key_prefix: str = ""
+    
+    def __post_init__(self):
+        if self.api_key and not self.api_key_hash:
+            self.api_key_hash = hash_api_key(self.api_key)
+            self.api_key_prefix = api_key_prefix(self.api_key)
+    
+    def __setattr__(self, name, value):
+        if name == 'permissions':
+            # Immutable, so every change goes through here and bumps the version
+            value = frozenset(value)
+        if name in _AUTHZ_FIELDS:
+            self.__dict__['authz_version'] = self.__dict__.get('authz_version', 0) + 1
+        super().__setattr__(name, value)
 
 
 @dataclass
@@ -72,13 +129,29 @@ class Session:
 class AuthenticationManager:
     """Manages user authentication and API key validation."""
     
-    def __init__(self, config_path: Optional[str] = None):
+    def __init__(self, config_path: Optional[str] = None, rate_limiter: Optional[RateLimiter] = None,
+                 last_access_flush_interval: float = 60.0):
+        """
+        Initialize the authentication manager.
+        
+        Args:
+            config_path: Users file (default: sandbox_auth.json)
+            rate_limiter: Limiter for per-user hourly limits
+            last_access_flush_interval: Seconds between writes of last_access
+                times to the users file
+        """
         self.config_path = config_path or "sandbox_auth.json"
         self.users: Dict[str, User] = {}
-        self.api_key_to_user: Dict[str, str] = {}
+        self.key_index: Dict[str, List[str]] = {}  # API key prefix -> user IDs
         self.sessions: Dict[str, Session] = {}
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.last_access_flush_interval = last_access_flush_interval
+        self._dirty_access: Set[str] = set()
+        self._last_access_flush = time.monotonic()
+        self._save_lock = threading.Lock()
         self._load_users()
         self._setup_default_permissions()
+        atexit.register(self.flush_last_access)
     
     def _load_users(self):
         """Load users from configuration file."""
@@ -88,22 +161,30 @@ class AuthenticationManager:
                 with open(config_file, 'r') as f:
                     data = json.load(f)
                     
+                plaintext_keys = False
                 for user_data in data.get('users', []):
+                    # Older files stored plaintext keys; they are hashed on load
+                    plaintext_keys |= 'api_key' in user_data
                     user = User(
                         id=user_data['id'],
                         username=user_data['username'],
-                        api_key=user_data['api_key'],
+                        api_key=user_data.get('api_key', ''),
                         role=Role(user_data['role']),
                         permissions=set(Permission(p) for p in user_data.get('permissions', [])),
                         created_at=user_data.get('created_at', time.time()),
                         last_access=user_data.get('last_access', time.time()),
                         active=user_data.get('active', True),
-                        rate_limit=user_data.get('rate_limit', 100)
+                        rate_limit=user_data.get('rate_limit', 100),
+                        api_key_hash=user_data.get('api_key_hash', ''),
+                        api_key_prefix=user_data.get('api_key_prefix', '')
                     )
                     self.users[user.id] = user
-                    self.api_key_to_user[user.api_key] = user.id
+                    self._index_key(user)
                     
                 logger.info(f"Loaded {len(self.users)} users from {self.config_path}")
+                if plaintext_keys:
+                    self._save_users()
+                    logger.info(f"Replaced plaintext API keys in {self.config_path} with hashes")
             else:
                 # Create default admin user
                 self._create_default_admin()
@@ -126,13 +207,19 @@ class AuthenticationManager:
         )
         
         self.users[admin_id] = admin_user
-        self.api_key_to_user[admin_key] = admin_id
+        self._index_key(admin_user)
         
         # Save to file
         self._save_users()
         
+        # Only the hash is stored, so this is the one chance to see the key
         logger.info(f"Created default admin user with API key: {admin_key}")
     
+    def _index_key(self, user: User):
+        """Add a user's key hash to the prefix index."""
+        if user.api_key_hash:
+            self.key_index.setdefault(user.api_key_prefix, []).append(user.id)
+    
     def _save_users(self):
         """Save users to configuration file."""
         try:
@@ -141,24 +228,49 @@ class AuthenticationManager:
                     {
                         'id': user.id,
                         'username': user.username,
-                        'api_key': user.api_key,
+                        'api_key_hash': user.api_key_hash,
+                        'api_key_prefix': user.api_key_prefix,
                         'role': user.role.value,
-                        'permissions': [p.value for p in user.permissions],
+                        'permissions': sorted(p.value for p in user.permissions),
                         'created_at': user.created_at,
                         'last_access': user.last_access,
                         'active': user.active,
                         'rate_limit': user.rate_limit
                     }
-                    for user in self.users.values()
+                    for user in list(self.users.values())
                 ]
             }
             
-            with open(self.config_path, 'w') as f:
-                json.dump(data, f, indent=2)
+            # Write a temporary file and swap it in, so readers never see a partial file
+            config_path = Path(self.config_path)
+            temp_path = config_path.with_name(f".{config_path.name}.tmp")
+            with self._save_lock:
+                with open(temp_path, 'w') as f:
+                    json.dump(data, f, indent=2)
+                os.replace(temp_path, config_path)
                 
         except Exception as e:
             logger.error(f"Failed to save users: {e}")
     
+    def flush_last_access(self, force: bool = True) -> bool:
+        """
+        Write pending last_access updates to the users file.
+        
+        Args:
+            force: Write now instead of waiting for the flush interval
+            
+        Returns:
+            True if the file was written
+        """
+        if not self._dirty_access:
+            return False
+        if not force and time.monotonic() - self._last_access_flush < self.last_access_flush_interval:
+            return False
+        self._last_access_flush = time.monotonic()
+        self._dirty_access.clear()
+        self._save_users()
+        return True
+    
     def _generate_api_key(self) -> str:
         """Generate a secure API key."""
         return f"sb_{uuid.uuid4().hex}"
@@ -198,18 +310,19 @@ class AuthenticationManager:
             User object if authentication successful, None otherwise
         """
         try:
-            user_id = self.api_key_to_user.get(api_key)
-            if not user_id:
+            user = self._find_user_by_key(api_key)
+            if not user:
                 logger.warning(f"Authentication failed: Invalid API key")
                 return None
             
-            user = self.users.get(user_id)
-            if not user or not user.active:
+            if not user.active:
                 logger.warning(f"Authentication failed: User not found or inactive")
                 return None
             
-            # Update last access time
+            # Update last access time; the file is rewritten at most once per interval
             user.last_access = time.time()
+            self._dirty_access.add(user.id)
+            self.flush_last_access(force=False)
             
             # Check rate limiting
             if not self._check_rate_limit(user):
@@ -222,22 +335,19 @@ class AuthenticationManager:
             logger.error(f"Authentication error: {e}")
             return None
     
+    def _find_user_by_key(self, api_key: str) -> Optional[User]:
+        """Look up the user owning an API key through the prefix index."""
+        for user_id in self.key_index.get(api_key_prefix(api_key), ()):
+            user = self.users.get(user_id)
+            if user and verify_api_key(api_key, user.api_key_hash):
+                return user
+        return None
+    
     def _check_rate_limit(self, user: User) -> bool:
         """Check if user is within rate limits."""
-        current_time = time.time()
-        
-        # Reset rate limit counter if an hour has passed
-        if current_time >= user.rate_limit_reset:
-            user.current_requests = 0
-            user.rate_limit_reset = current_time + 3600  # Next hour
-        
-        # Check if user has exceeded rate limit
-        if user.current_requests >= user.rate_limit:
-            return False
-        
-        # Increment request counter
-        user.current_requests += 1
-        return True
+        # The whole hourly allowance may be used at once; it refills continuously
+        allowed, _ = self.rate_limiter.is_allowed(f"user:{user.id}", RateLimit(user.rate_limit, period=3600))
+        return allowed
     
     def create_session(self, user: User) -> Session:
         """
@@ -299,9 +409,21 @@ class AuthenticationManager:
 
 
 class AuthorizationManager:
-    """Manages user authorization and permissions."""
+    """
+    Manages user authorization and permissions.
     
-    def __init__(self):
+    Decisions are cached per (user, operation, resource) in a bounded LRU.
+    Entries are keyed by the user's authz_version, which changes whenever
+    the user's role, permissions or active flag is set, so stale decisions
+    are never returned. Call invalidate() after editing
+    operation_permissions.
+    """
+    
+    def __init__(self, cache_size: int = 4096):
+        self.cache_size = cache_size
+        self._decisions: "OrderedDict[tuple, bool]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.cache_stats = {'hits': 0, 'misses': 0}
         self.operation_permissions = {
             'create_sandbox_workspace': Permission.CREATE_WORKSPACE,
             'analyze_codebase': Permission.ANALYZE_CODEBASE,
@@ -325,6 +447,46 @@ class AuthorizationManager:
         Returns:
             True if authorized, False otherwise
         """
+        cache_key = self._cache_key(user, operation, resource_context)
+        if cache_key is not None:
+            with self._cache_lock:
+                decision = self._decisions.get(cache_key)
+                if decision is not None:
+                    self._decisions.move_to_end(cache_key)
+                    self.cache_stats['hits'] += 1
+                    return decision
+                self.cache_stats['misses'] += 1
+        
+        decision = self._authorize(user, operation, resource_context)
+        
+        if cache_key is not None:
+            with self._cache_lock:
+                self._decisions[cache_key] = decision
+                if len(self._decisions) > self.cache_size:
+                    self._decisions.popitem(last=False)
+        return decision
+    
+    def invalidate(self, user_id: Optional[str] = None):
+        """Drop cached decisions for one user, or for everyone."""
+        with self._cache_lock:
+            if user_id is None:
+                self._decisions.clear()
+            else:
+                for key in [k for k in self._decisions if k[0] == user_id]:
+                    del self._decisions[key]
+    
+    @staticmethod
+    def _cache_key(user: User, operation: str, resource_context: Optional[Dict[str, Any]]) -> Optional[tuple]:
+        """Cache key for a decision, or None if the resource context is not hashable."""
+        try:
+            resource_key = tuple(sorted(resource_context.items())) if resource_context else ()
+            hash(resource_key)
+        except TypeError:
+            return None
+        return (user.id, getattr(user, 'authz_version', 0), operation, resource_key)
+    
+    def _authorize(self, user: User, operation: str, resource_context: Optional[Dict[str, Any]]) -> bool:
+        """Evaluate an authorization decision without the cache."""
         try:
             # Check if user is active
             if not user.active:
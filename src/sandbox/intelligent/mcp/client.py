@@ -8,18 +8,19 @@ This module provides:
 - Task submission and workflow management
 """
 
-import json
 import time
 import logging
 import asyncio
 import threading
-from typing import Dict, Any, Optional, List, Callable, Union
+from typing import Dict, Any, Optional, List, Callable, Tuple, Union
 from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
 import subprocess
 import sys
 
+from .codec import get_codec
+
 logger = logging.getLogger(__name__)
 
 
@@ -71,15 +72,22 @@ class SandboxMCPClient:
     - Task planning and execution
     - Progress monitoring
     - Error handling and recovery
+    
+    Requests are pipelined: any number may be outstanding, each waiting on a
+    future keyed by its id that the reader task resolves as responses
+    arrive. call_tools() sends many tool calls at once, as one JSON-RPC
+    batch when the server advertises batching.
     """
     
-    def __init__(self, server_command: Optional[List[str]] = None, api_key: Optional[str] = None):
+    def __init__(self, server_command: Optional[List[str]] = None, api_key: Optional[str] = None,
+                 request_timeout: float = 30.0):
         """
         Initialize the sandbox MCP client.
         
         Args:
             server_command: Command to start the MCP server (for stdio transport)
             api_key: API key for authentication
+            request_timeout: Default seconds to wait for each response
         """
         self.server_command = server_command or [
             sys.executable, "-m", "src.sandbox.intelligent_sandbox_server"
@@ -88,7 +96,10 @@ class SandboxMCPClient:
         self.status = ClientStatus.DISCONNECTED
         self.server_process: Optional[subprocess.Popen] = None
         self.request_id = 0
+        self.request_timeout = request_timeout
+        self.codec = get_codec()
         self.pending_requests: Dict[int, asyncio.Future] = {}
+        self._write_lock = threading.Lock()
         self.progress_callbacks: List[Callable[[ProgressUpdate], None]] = []
         self.error_callbacks: List[Callable[[str, Dict[str, Any]], None]] = []
         
@@ -125,6 +136,9 @@ class SandboxMCPClient:
                 bufsize=0
             )
             
+            # The reader must run before the first request so its response is seen
+            self._reader_task = asyncio.create_task(self._read_responses())
+            
             # Initialize the connection
             init_response = await self._send_request("initialize", {
                 "protocolVersion": "2.0",
@@ -158,7 +172,6 @@ class SandboxMCPClient:
             logger.info("Successfully connected to MCP server")
             
             # Start background monitoring
-            self._reader_task = asyncio.create_task(self._read_responses())
             self._monitor_task = asyncio.create_task(self._monitor_operations())
             
             return True
@@ -546,6 +559,38 @@ class SandboxMCPClient:
         """Get operation history."""
         return self.operation_history.copy()
     
+    async def call_tools(self, calls: List[Tuple[str, Dict[str, Any]]],
+                         timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Call several tools concurrently, e.g. to fan analysis out over workspaces.
+        
+        The API key is added to each call's arguments. A failed call yields
+        {"success": False, "error": ...} in its slot instead of raising.
+        
+        Args:
+            calls: (tool name, arguments) pairs
+            timeout: Seconds to wait for each response (default: request_timeout)
+            
+        Returns:
+            Tool results in the order of calls
+        """
+        requests = [
+            ("tools/call", {"name": name, "arguments": {**arguments, "api_key": self.api_key}})
+            for name, arguments in calls
+        ]
+        responses = await self._send_batch(requests, timeout)
+        
+        results = []
+        for response in responses:
+            if isinstance(response, BaseException):
+                results.append({"success": False, "error": str(response)})
+            else:
+                try:
+                    results.append(self._parse_tool_response(response))
+                except Exception as e:
+                    results.append({"success": False, "error": str(e)})
+        return results
+    
     def get_server_info(self) -> Dict[str, Any]:
         """Get server information and capabilities."""
         return {
@@ -558,9 +603,43 @@ class SandboxMCPClient:
     
     # Internal methods
     
-    async def _send_request(self, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Send a request to the MCP server."""
-        if self.status != ClientStatus.CONNECTED and method != "initialize":
+    async def _send_request(self, method: str, params: Dict[str, Any],
+                            timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Send a request to the MCP server and wait for its response."""
+        request, future = self._new_request(method, params)
+        self._write_message(request)
+        return await self._await_response(request["id"], future, method, timeout)
+    
+    async def _send_batch(self, requests: List[Tuple[str, Dict[str, Any]]],
+                          timeout: Optional[float] = None) -> List[Union[Dict[str, Any], BaseException]]:
+        """
+        Send several requests at once and wait for all of their responses.
+        
+        They go out as one JSON-RPC batch array if the server supports it,
+        otherwise as back-to-back pipelined requests.
+        
+        Returns:
+            Responses in request order; a request that failed has its exception
+        """
+        if not requests:
+            return []
+        
+        pending = [self._new_request(method, params) for method, params in requests]
+        messages = [request for request, _ in pending]
+        if self.server_capabilities.get("experimental", {}).get("batching"):
+            self._write_message(messages)
+        else:
+            for message in messages:
+                self._write_message(message)
+        
+        return await asyncio.gather(*(
+            self._await_response(request["id"], future, request["method"], timeout)
+            for request, future in pending
+        ), return_exceptions=True)
+    
+    def _new_request(self, method: str, params: Dict[str, Any]) -> Tuple[Dict[str, Any], asyncio.Future]:
+        """Build a request and register the future its response resolves."""
+        if self.status not in (ClientStatus.CONNECTING, ClientStatus.CONNECTED):
             raise Exception("Client not connected to server")
         
         self.request_id += 1
@@ -572,24 +651,44 @@ class SandboxMCPClient:
         }
         
         # Create future for response
-        future = asyncio.Future()
+        future = asyncio.get_running_loop().create_future()
         self.pending_requests[self.request_id] = future
-        
-        # Send request
-        request_json = json.dumps(request) + "\n"
-        if self.server_process and self.server_process.stdin:
-            self.server_process.stdin.write(request_json)
-            self.server_process.stdin.flush()
-        else:
-            raise Exception("Server process not available")
-        
-        # Wait for response
+        return request, future
+    
+    async def _await_response(self, request_id: int, future: asyncio.Future, method: str,
+                              timeout: Optional[float]) -> Dict[str, Any]:
+        """Wait for a response; on timeout or cancellation, tell the server to drop the request."""
         try:
-            response = await asyncio.wait_for(future, timeout=30.0)
-            return response
+            return await asyncio.wait_for(future, timeout=timeout or self.request_timeout)
         except asyncio.TimeoutError:
-            self.pending_requests.pop(self.request_id, None)
+            self._cancel_request(request_id, "timeout")
             raise Exception(f"Request timeout for method: {method}")
+        except asyncio.CancelledError:
+            self._cancel_request(request_id, "cancelled")
+            raise
+    
+    def _cancel_request(self, request_id: int, reason: str):
+        """Forget a pending request and send a best-effort cancellation notification."""
+        if self.pending_requests.pop(request_id, None) is None:
+            return
+        try:
+            self._write_message({
+                "jsonrpc": "2.0",
+                "method": "notifications/cancelled",
+                "params": {"requestId": request_id, "reason": reason}
+            })
+        except Exception as e:
+            logger.debug(f"Failed to send cancellation for request {request_id}: {e}")
+    
+    def _write_message(self, message: Union[Dict[str, Any], List[Dict[str, Any]]]):
+        """Write one JSON-RPC message or batch as a line on the server's stdin."""
+        data = self.codec.dumps(message) + "\n"
+        with self._write_lock:
+            if self.server_process and self.server_process.stdin:
+                self.server_process.stdin.write(data)
+                self.server_process.stdin.flush()
+            else:
+                raise Exception("Server process not available")
     
     async def _send_notification(self, method: str, params: Dict[str, Any]):
         """Send a notification to the MCP server."""
@@ -599,10 +698,8 @@ class SandboxMCPClient:
             "params": params
         }
         
-        notification_json = json.dumps(notification) + "\n"
         if self.server_process and self.server_process.stdin:
-            self.server_process.stdin.write(notification_json)
-            self.server_process.stdin.flush()
+            self._write_message(notification)
     
     async def _call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """Call a tool on the MCP server."""
@@ -610,7 +707,10 @@ class SandboxMCPClient:
             "name": tool_name,
             "arguments": arguments
         })
-        
+        return self._parse_tool_response(response)
+    
+    def _parse_tool_response(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract a tool's JSON result from a tools/call response."""
         if "error" in response:
             raise Exception(f"Tool call error: {response['error']}")
         
@@ -620,40 +720,54 @@ class SandboxMCPClient:
         if content and len(content) > 0:
             text_content = content[0].get("text", "{}")
             try:
-                return json.loads(text_content)
-            except json.JSONDecodeError:
+                return self.codec.loads(text_content)
+            except ValueError:
                 return {"success": False, "error": "Invalid response format"}
         
         return {"success": False, "error": "No content in response"}
     
     async def _read_responses(self):
-        """Background task to read responses from the server."""
+        """Background task reading server messages and resolving pending requests."""
         try:
-            while self.status == ClientStatus.CONNECTED and self.server_process:
-                if self.server_process.stdout:
-                    line = await asyncio.get_event_loop().run_in_executor(
-                        None, self.server_process.stdout.readline
-                    )
-                    
-                    if not line:
-                        break
-                    
-                    line = line.strip()
-                    if not line:
-                        continue
-                    
-                    try:
-                        response = json.loads(line)
-                        await self._handle_response(response)
-                    except json.JSONDecodeError as e:
-                        logger.error(f"Failed to parse server response: {e}")
+            while (self.status in (ClientStatus.CONNECTING, ClientStatus.CONNECTED)
+                   and self.server_process and self.server_process.stdout):
+                line = await asyncio.get_running_loop().run_in_executor(
+                    None, self.server_process.stdout.readline
+                )
+                
+                if not line:
+                    break
+                
+                line = line.strip()
+                if not line:
+                    continue
+                
+                try:
+                    response = self.codec.loads(line)
+                    await self._handle_response(response)
+                except ValueError as e:
+                    logger.error(f"Failed to parse server response: {e}")
                         
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
             logger.error(f"Error reading server responses: {e}")
             self.status = ClientStatus.ERROR
+        finally:
+            # Nothing will answer the requests still waiting
+            for future in self.pending_requests.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Connection to MCP server closed"))
+            self.pending_requests.clear()
     
-    async def _handle_response(self, response: Dict[str, Any]):
-        """Handle a response from the server."""
+    async def _handle_response(self, response: Union[Dict[str, Any], List[Dict[str, Any]]]):
+        """Handle a response, or a batch of responses, from the server."""
+        if isinstance(response, list):
+            for item in response:
+                if isinstance(item, dict):
+                    await self._handle_response(item)
+            return
+        
         response_id = response.get("id")
         
         if response_id and response_id in self.pending_requests:
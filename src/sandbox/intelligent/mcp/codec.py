@@ -0,0 +1,136 @@
+"""
+JSON codecs for the MCP protocol layer.
+
+This module provides:
+- A common interface over the stdlib json module, orjson and msgspec
+- Automatic selection of the fastest installed library, overridable with
+  $SANDBOX_JSON_CODEC ("auto", "msgspec", "orjson" or "json")
+- Fallback to the stdlib for values a fast encoder rejects (e.g. integer
+  dict keys), so every codec accepts what json.dumps accepts
+"""
+
+import json
+import logging
+import os
+from typing import Any, Dict, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+logger = logging.getLogger(__name__)
+
+
+def _stdlib_dumps(obj: Any) -> str:
+    return json.dumps(obj, separators=(',', ':'))
+
+
+class JSONCodec:
+    """Stdlib codec; also the fallback for the faster ones."""
+
+    name = "json"
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        """
+        Decode a JSON document.
+
+        Raises:
+            ValueError: If the document is not valid JSON
+        """
+        return json.loads(data)
+
+    def dumps(self, obj: Any) -> str:
+        """Encode to a compact JSON string."""
+        return _stdlib_dumps(obj)
+
+    def dumps_bytes(self, obj: Any) -> bytes:
+        """Encode to UTF-8 JSON bytes, for transports that write bytes."""
+        return _stdlib_dumps(obj).encode('utf-8')
+
+
+class OrjsonCodec(JSONCodec):
+    """Codec backed by orjson."""
+
+    name = "orjson"
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        # orjson.JSONDecodeError is a ValueError
+        return orjson.loads(data)
+
+    def dumps(self, obj: Any) -> str:
+        return self.dumps_bytes(obj).decode('utf-8')
+
+    def dumps_bytes(self, obj: Any) -> bytes:
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            return super().dumps_bytes(obj)
+
+
+class MsgspecCodec(JSONCodec):
+    """Codec backed by msgspec."""
+
+    name = "msgspec"
+
+    def __init__(self):
+        self._decoder = msgspec.json.Decoder()
+        self._encoder = msgspec.json.Encoder()
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        try:
+            return self._decoder.decode(data)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+
+    def dumps(self, obj: Any) -> str:
+        return self.dumps_bytes(obj).decode('utf-8')
+
+    def dumps_bytes(self, obj: Any) -> bytes:
+        try:
+            return self._encoder.encode(obj)
+        except (TypeError, msgspec.EncodeError):
+            return super().dumps_bytes(obj)
+
+
+_CODECS: Dict[str, Any] = {
+    "msgspec": (MsgspecCodec, msgspec),
+    "orjson": (OrjsonCodec, orjson),
+    "json": (JSONCodec, json)
+}
+
+_default_codec: Optional[JSONCodec] = None
+
+
+def get_codec(name: Optional[str] = None) -> JSONCodec:
+    """
+    Get a codec by name.
+
+    Args:
+        name: "auto", "msgspec", "orjson" or "json" (default: $SANDBOX_JSON_CODEC
+            or "auto"). A library that is not installed falls back to auto.
+
+    Returns:
+        Codec instance; the default codec is shared
+    """
+    global _default_codec
+    if name is None:
+        if _default_codec is None:
+            _default_codec = get_codec(os.environ.get("SANDBOX_JSON_CODEC", "auto"))
+        return _default_codec
+
+    if name != "auto":
+        codec_class, module = _CODECS.get(name, (None, None))
+        if module is not None:
+            return codec_class()
+        logger.warning(f"JSON codec {name} is not available; selecting automatically")
+
+    for codec_class, module in _CODECS.values():
+        if module is not None:
+            return codec_class()
+    return JSONCodec()
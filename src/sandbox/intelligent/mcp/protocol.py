@@ -8,14 +8,15 @@ This module provides:
 - Protocol versioning support
 """
 
-import json
 import logging
 import time
 import uuid
-from typing import Dict, Any, Optional, List, Callable
+from typing import Dict, Any, Optional, List, Callable, Union
 from dataclasses import dataclass, field
 from enum import Enum
 
+from .codec import JSONCodec, get_codec
+
 logger = logging.getLogger(__name__)
 
 
@@ -48,6 +49,7 @@ class MCPCapabilities:
     prompts: bool = False
     completion: bool = False
     logging: bool = True
+    batching: bool = True  # Accept JSON-RPC batch arrays
     experimental: Dict[str, Any] = field(default_factory=dict)
 
 
@@ -112,9 +114,13 @@ class MCPProtocolHandler:
     """Handles MCP protocol parsing, validation, and response generation."""
     
     def __init__(self, capabilities: Optional[MCPCapabilities] = None, 
-                 server_info: Optional[MCPServerInfo] = None):
+                 server_info: Optional[MCPServerInfo] = None,
+                 codec: Optional[JSONCodec] = None,
+                 validator: Optional["MCPRequestValidator"] = None):
         self.capabilities = capabilities or MCPCapabilities()
         self.server_info = server_info or MCPServerInfo()
+        self.codec = codec or get_codec()
+        self.validator = validator or MCPRequestValidator()
         self.supported_versions = [MCPVersion.V2_0, MCPVersion.V1_0]
         self.initialized = False
         self.client_capabilities = {}
@@ -144,12 +150,12 @@ class MCPProtocolHandler:
         """Register a custom request handler."""
         self.request_handlers[method] = handler
     
-    def parse_request(self, raw_request: str) -> MCPRequest:
+    def parse_request(self, raw_request: Union[str, bytes]) -> MCPRequest:
         """
         Parse a raw MCP request.
         
         Args:
-            raw_request: Raw JSON-RPC request string
+            raw_request: Raw JSON-RPC request string or UTF-8 bytes
             
         Returns:
             Parsed MCPRequest object
@@ -157,9 +163,20 @@ class MCPProtocolHandler:
         Raises:
             ValueError: If request is invalid
         """
+        return self._request_from_data(self._decode(raw_request))
+    
+    def _decode(self, raw_message: Union[str, bytes]) -> Any:
+        """Decode a raw message after checking its size."""
+        if not self.validator.validate_request_size(raw_message):
+            raise ValueError(f"Request exceeds {self.validator.max_request_size} bytes")
+        try:
+            return self.codec.loads(raw_message)
+        except ValueError as e:
+            raise ValueError(f"Invalid JSON: {e}")
+    
+    def _request_from_data(self, data: Any) -> MCPRequest:
+        """Build an MCPRequest from a decoded JSON-RPC message."""
         try:
-            data = json.loads(raw_request)
-            
             # Validate required fields
             if not isinstance(data, dict):
                 raise ValueError("Request must be a JSON object")
@@ -173,16 +190,23 @@ class MCPProtocolHandler:
             if "method" not in data:
                 raise ValueError("Missing 'method' field")
             
+            if not self.validator.validate_method_security(data["method"]):
+                raise ValueError(f"Method not allowed: {data['method']}")
+            
+            # Depth limit and key sanitizing in one walk; values are not copied
+            params = data.get("params", {})
+            params_error = self.validator.check_params(params)
+            if params_error:
+                raise ValueError(params_error)
+            
             return MCPRequest(
                 jsonrpc=data["jsonrpc"],
                 id=data.get("id"),
                 method=data["method"],
-                params=data.get("params", {}),
+                params=params,
                 meta=data.get("meta", {})
             )
             
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Invalid JSON: {e}")
         except Exception as e:
             raise ValueError(f"Request parsing error: {e}")
     
@@ -237,6 +261,13 @@ class MCPProtocolHandler:
     
     def serialize_response(self, response: MCPResponse) -> str:
         """Serialize an MCP response to JSON."""
+        return self.codec.dumps(self._response_to_dict(response))
+    
+    def encode_response(self, response: MCPResponse) -> bytes:
+        """Serialize an MCP response to UTF-8 JSON bytes."""
+        return self.codec.dumps_bytes(self._response_to_dict(response))
+    
+    def _response_to_dict(self, response: MCPResponse) -> Dict[str, Any]:
         data = {
             "jsonrpc": response.jsonrpc,
             "id": response.id
@@ -247,7 +278,53 @@ class MCPProtocolHandler:
         else:
             data["result"] = response.result
         
-        return json.dumps(data)
+        return data
+    
+    def handle_message(self, raw_message: Union[str, bytes]) -> Optional[str]:
+        """
+        Handle one raw JSON-RPC message: a single request or a batch array.
+        
+        Batch members are processed in order and answered with one array.
+        Notifications (no id) are processed but get no response.
+        
+        Args:
+            raw_message: Raw JSON-RPC message string
+            
+        Returns:
+            Serialized response, or None if nothing needs to be sent
+        """
+        try:
+            data = self._decode(raw_message)
+        except ValueError as e:
+            return self.serialize_response(self.create_error_response(
+                None, MCPErrorCodes.PARSE_ERROR, str(e), jsonrpc="2.0"))
+        
+        if not isinstance(data, list):
+            response = self._process_message(data)
+            return self.codec.dumps(response) if response is not None else None
+        
+        if not data or not self.capabilities.batching:
+            message = "Empty batch" if data else "Batch requests not supported"
+            return self.serialize_response(self.create_error_response(
+                None, MCPErrorCodes.INVALID_REQUEST, message, jsonrpc="2.0"))
+        
+        responses = [self._process_message(item) for item in data]
+        responses = [response for response in responses if response is not None]
+        return self.codec.dumps(responses) if responses else None
+    
+    def _process_message(self, data: Any) -> Optional[Dict[str, Any]]:
+        """Process one decoded message; returns None for notifications."""
+        try:
+            request = self._request_from_data(data)
+        except ValueError as e:
+            request_id = data.get("id") if isinstance(data, dict) else None
+            return self._response_to_dict(self.create_error_response(
+                request_id, MCPErrorCodes.INVALID_REQUEST, str(e), jsonrpc="2.0"))
+        
+        response = self.process_request(request)
+        if request.id is None:
+            return None
+        return self._response_to_dict(response)
     
     def validate_request(self, request: MCPRequest) -> Optional[MCPError]:
         """
@@ -381,8 +458,11 @@ class MCPProtocolHandler:
         if self.capabilities.logging:
             capabilities_obj["logging"] = {}
         
-        if hasattr(self.capabilities, 'experimental') and self.capabilities.experimental:
-            capabilities_obj["experimental"] = self.capabilities.experimental
+        experimental = dict(getattr(self.capabilities, 'experimental', None) or {})
+        if self.capabilities.batching:
+            experimental["batching"] = True
+        if experimental:
+            capabilities_obj["experimental"] = experimental
         
         return {
             "protocolVersion": self.protocol_version.value,
@@ -494,6 +574,10 @@ class MCPProtocolHandler:
         }
 
 
+# Keys removed from request parameters (prototype pollution vectors for JS consumers)
+_DANGEROUS_KEYS = frozenset(('__proto__', 'constructor', 'prototype'))
+
+
 class MCPRequestValidator:
     """Validates MCP requests for security and correctness."""
     
@@ -502,48 +586,66 @@ class MCPRequestValidator:
         self.max_params_depth = 10
         self.blocked_methods = set()
     
-    def validate_request_size(self, raw_request: str) -> bool:
+    def validate_request_size(self, raw_request: Union[str, bytes]) -> bool:
         """Validate request size limits."""
+        if isinstance(raw_request, (bytes, bytearray)):
+            return len(raw_request) <= self.max_request_size
+        # A character takes 1-4 UTF-8 bytes; only encode when the bounds disagree
+        if len(raw_request) > self.max_request_size:
+            return False
+        if len(raw_request) * 4 <= self.max_request_size:
+            return True
         return len(raw_request.encode('utf-8')) <= self.max_request_size
     
     def validate_params_depth(self, params: Dict[str, Any], current_depth: int = 0) -> bool:
         """Validate parameter nesting depth."""
-        if current_depth > self.max_params_depth:
-            return False
+        return self._walk_params(params, current_depth, sanitize=False) is None
+    
+    def check_params(self, params: Any) -> Optional[str]:
+        """
+        Enforce the depth limit and remove dangerous keys in a single walk.
         
-        for value in params.values():
-            if isinstance(value, dict):
-                if not self.validate_params_depth(value, current_depth + 1):
-                    return False
-            elif isinstance(value, list):
-                for item in value:
-                    if isinstance(item, dict):
-                        if not self.validate_params_depth(item, current_depth + 1):
-                            return False
+        Dictionaries are cleaned in place and leaf values are never visited,
+        so large strings such as code or file contents are not copied.
         
-        return True
+        Returns:
+            Error message, or None if the parameters are acceptable
+        """
+        return self._walk_params(params, 0, sanitize=True)
     
     def validate_method_security(self, method: str) -> bool:
         """Validate method against security restrictions."""
         return method not in self.blocked_methods
     
     def sanitize_params(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Sanitize request parameters."""
-        # Remove potentially dangerous parameters
-        dangerous_keys = ['__proto__', 'constructor', 'prototype']
-        
-        def clean_dict(d):
-            if isinstance(d, dict):
-                return {
-                    k: clean_dict(v) for k, v in d.items()
-                    if k not in dangerous_keys
-                }
-            elif isinstance(d, list):
-                return [clean_dict(item) for item in d]
+        """Sanitize request parameters in place and return them."""
+        self._walk_params(params, 0, sanitize=True, enforce_depth=False)
+        return params
+    
+    def _walk_params(self, params: Any, depth: int, sanitize: bool,
+                     enforce_depth: bool = True) -> Optional[str]:
+        """Iterative walk over nested containers; dicts one level deeper count against the limit."""
+        stack = [(params, depth)]
+        while stack:
+            container, depth = stack.pop()
+            if enforce_depth and depth > self.max_params_depth:
+                return f"Parameters nested deeper than {self.max_params_depth} levels"
+            
+            if isinstance(container, dict):
+                if sanitize:
+                    for key in _DANGEROUS_KEYS.intersection(container):
+                        del container[key]
+                values = container.values()
             else:
-                return d
-        
-        return clean_dict(params)
+                values = container
+            
+            for value in values:
+                if isinstance(value, dict):
+                    stack.append((value, depth + 1))
+                elif isinstance(value, list):
+                    # Lists do not add a level themselves, their dicts do
+                    stack.append((value, depth))
+        return None
 
 
 def create_protocol_handler(capabilities: Optional[MCPCapabilities] = None,
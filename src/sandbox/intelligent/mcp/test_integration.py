@@ -9,6 +9,7 @@ Tests cover:
 """
 
 import asyncio
+import queue
 import unittest
 import tempfile
 import time
@@ -278,6 +279,116 @@ class TestSandboxMCPClient(unittest.IsolatedAsyncioTestCase):
             await self.client.disconnect()
 
 
+class _FakeServerProcess:
+    """Server process whose stdout is fed by the test and whose stdin is recorded."""
+    
+    def __init__(self):
+        self.lines = queue.Queue()
+        self.written: List[Any] = []
+        self.stdin = Mock()
+        self.stdin.write.side_effect = lambda data: self.written.append(json.loads(data))
+        self.stdout = Mock()
+        self.stdout.readline.side_effect = lambda: self.lines.get(timeout=5)
+        self.stderr = Mock()
+    
+    def reply(self, message: Any):
+        self.lines.put(json.dumps(message) + "\n")
+    
+    def terminate(self):
+        self.lines.put("")
+    
+    def wait(self, timeout=None):
+        return 0
+    
+    def kill(self):
+        pass
+
+
+class TestPipelinedRequests(unittest.IsolatedAsyncioTestCase):
+    """Test concurrent requests, batching, timeouts and cancellation."""
+    
+    async def asyncSetUp(self):
+        """Connect a client to a fake server."""
+        self.process = _FakeServerProcess()
+        self.process.reply({"jsonrpc": "2.0", "id": 1, "result": {
+            "capabilities": {"tools": {}, "experimental": {"batching": True}}
+        }})
+        self.process.reply({"jsonrpc": "2.0", "id": 2, "result": {"tools": []}})
+        
+        self.client = SandboxMCPClient(api_key="test_api_key", request_timeout=5.0)
+        with patch('subprocess.Popen', return_value=self.process):
+            self.assertTrue(await self.client.connect())
+        self.process.written.clear()
+    
+    async def asyncTearDown(self):
+        await self.client.disconnect()
+    
+    @staticmethod
+    def _tool_result(request_id: int, payload: Dict[str, Any]) -> Dict[str, Any]:
+        return {"jsonrpc": "2.0", "id": request_id,
+                "result": {"content": [{"type": "text", "text": json.dumps(payload)}]}}
+    
+    async def _wait_for_writes(self, count: int):
+        while len(self.process.written) < count:
+            await asyncio.sleep(0.01)
+    
+    async def test_out_of_order_responses(self):
+        """Test that concurrent requests are matched to responses by id."""
+        first = asyncio.create_task(self.client._send_request("ping", {}))
+        second = asyncio.create_task(self.client._send_request("ping", {}))
+        await self._wait_for_writes(2)
+        
+        self.process.reply({"jsonrpc": "2.0", "id": 4, "result": {"order": "second"}})
+        self.process.reply({"jsonrpc": "2.0", "id": 3, "result": {"order": "first"}})
+        
+        self.assertEqual((await first)["result"]["order"], "first")
+        self.assertEqual((await second)["result"]["order"], "second")
+    
+    async def test_call_tools_sends_one_batch(self):
+        """Test that call_tools sends a single batch and returns results in call order."""
+        calls = [("analyze_codebase", {"workspace_id": f"ws{i}"}) for i in range(3)]
+        task = asyncio.create_task(self.client.call_tools(calls))
+        await self._wait_for_writes(1)
+        
+        batch = self.process.written[0]
+        self.assertIsInstance(batch, list)
+        self.assertEqual(len(batch), 3)
+        self.assertEqual(batch[0]["params"]["arguments"]["api_key"], "test_api_key")
+        
+        self.process.reply([
+            self._tool_result(batch[2]["id"], {"success": True, "workspace_id": "ws2"}),
+            {"jsonrpc": "2.0", "id": batch[1]["id"], "error": {"code": -32603, "message": "boom"}},
+            self._tool_result(batch[0]["id"], {"success": True, "workspace_id": "ws0"})
+        ])
+        results = await task
+        
+        self.assertEqual(results[0]["workspace_id"], "ws0")
+        self.assertFalse(results[1]["success"])
+        self.assertEqual(results[2]["workspace_id"], "ws2")
+    
+    async def test_timeout_cancels_request(self):
+        """Test that a timed-out request is dropped and cancelled on the server."""
+        with self.assertRaises(Exception) as context:
+            await self.client._send_request("ping", {}, timeout=0.05)
+        
+        self.assertIn("timeout", str(context.exception))
+        self.assertEqual(self.client.pending_requests, {})
+        self.assertEqual(self.process.written[-1]["method"], "notifications/cancelled")
+        self.assertEqual(self.process.written[-1]["params"]["requestId"], 3)
+    
+    async def test_task_cancellation_cancels_request(self):
+        """Test that cancelling the awaiting task cancels the request."""
+        task = asyncio.create_task(self.client._send_request("ping", {}))
+        await self._wait_for_writes(1)
+        
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        
+        self.assertEqual(self.client.pending_requests, {})
+        self.assertEqual(self.process.written[-1]["params"]["reason"], "cancelled")
+
+
 class TestProgressAndStatusUpdates(unittest.TestCase):
     """Test progress tracking and status updates."""
     
@@ -23,6 +23,7 @@ from .auth import (
     AuthenticationManager, AuthorizationManager, MCPAuthenticationMiddleware,
     User, Role, Permission, create_auth_managers
 )
+from .codec import get_codec
 from .server import IntelligentSandboxMCPServer
 
 
@@ -177,6 +178,73 @@ class TestMCPProtocolHandler(unittest.TestCase):
         self.assertEqual(data["jsonrpc"], "2.0")
         self.assertEqual(data["id"], 1)
         self.assertEqual(data["result"]["success"], True)
+    
+    def test_parse_request_sanitizes_params(self):
+        """Test that dangerous keys are removed and large values kept as-is."""
+        content = "print('x')\n" * 10000
+        request = self.handler.parse_request(json.dumps({
+            "jsonrpc": "2.0", "id": 1, "method": "tools/call",
+            "params": {"name": "write", "__proto__": {}, "arguments": [{"content": content, "constructor": 1}]}
+        }))
+        
+        self.assertNotIn("__proto__", request.params)
+        self.assertEqual(request.params["arguments"], [{"content": content}])
+    
+    def test_parse_request_rejects_deep_params(self):
+        """Test that overly nested parameters are rejected."""
+        params = {"value": 1}
+        for _ in range(12):
+            params = {"nested": params}
+        
+        with self.assertRaises(ValueError) as context:
+            self.handler.parse_request(json.dumps({"jsonrpc": "2.0", "id": 1, "method": "ping", "params": params}))
+        
+        self.assertIn("nested deeper", str(context.exception))
+    
+    def test_codecs_agree(self):
+        """Test that every available codec round-trips the same documents."""
+        document = {"text": "caf\u00e9 \u2713", "numbers": [1, 2.5, -3], "flag": None, "nested": {"ok": True}}
+        for name in ("json", "orjson", "msgspec"):
+            codec = get_codec(name)
+            with self.subTest(codec=codec.name):
+                self.assertEqual(codec.loads(codec.dumps(document)), document)
+                self.assertEqual(codec.loads(codec.dumps_bytes(document)), document)
+                # Integer keys are not supported by every fast encoder; they fall back to the stdlib
+                self.assertEqual(codec.loads(codec.dumps({1: "a"})), {"1": "a"})
+                with self.assertRaises(ValueError):
+                    codec.loads("{not json")
+    
+    def test_handle_batch_message(self):
+        """Test that a batch array is answered with one array, skipping notifications."""
+        self.handler.initialized = True
+        batch = json.dumps([
+            {"jsonrpc": "2.0", "id": 1, "method": "ping"},
+            {"jsonrpc": "2.0", "method": "ping"},
+            {"jsonrpc": "2.0", "id": 2, "method": "unknown/method"},
+            {"id": 3}
+        ])
+        
+        responses = json.loads(self.handler.handle_message(batch))
+        
+        self.assertEqual([r["id"] for r in responses], [1, 2, 3])
+        self.assertIn("result", responses[0])
+        self.assertEqual(responses[1]["error"]["code"], MCPErrorCodes.METHOD_NOT_FOUND)
+        self.assertEqual(responses[2]["error"]["code"], MCPErrorCodes.INVALID_REQUEST)
+    
+    def test_handle_batch_message_rejected_without_batching(self):
+        """Test that batches are refused when the capability is disabled."""
+        handler = MCPProtocolHandler(MCPCapabilities(batching=False), self.server_info)
+        
+        response = json.loads(handler.handle_message(json.dumps([{"jsonrpc": "2.0", "id": 1, "method": "ping"}])))
+        
+        self.assertEqual(response["error"]["code"], MCPErrorCodes.INVALID_REQUEST)
+    
+    def test_handle_single_notification(self):
+        """Test that notifications produce no response."""
+        self.handler.initialized = True
+        
+        self.assertIsNone(self.handler.handle_message(json.dumps({"jsonrpc": "2.0", "method": "ping"})))
+        self.assertIsNotNone(self.handler.handle_message(json.dumps({"jsonrpc": "2.0", "id": 1, "method": "ping"})))
 
 
 class TestAuthentication(unittest.TestCase):
@@ -250,6 +318,44 @@ class TestAuthentication(unittest.TestCase):
         
         self.assertIsNone(retrieved_session)
         self.assertFalse(session.active)
+    
+    def test_api_keys_stored_hashed(self):
+        """Test that only key hashes reach the users file."""
+        admin_user = list(self.auth_manager.users.values())[0]
+        
+        saved = self.auth_config_path.read_text()
+        self.assertNotIn(admin_user.api_key, saved)
+        
+        # A fresh manager authenticates against the stored hash
+        reloaded = AuthenticationManager(str(self.auth_config_path))
+        user = reloaded.authenticate(admin_user.api_key)
+        self.assertIsNotNone(user)
+        self.assertEqual(user.id, admin_user.id)
+        self.assertIsNone(reloaded.authenticate(admin_user.api_key[:-1] + "x"))
+    
+    def test_plaintext_keys_migrated(self):
+        """Test that plaintext keys in an old users file are replaced by hashes."""
+        self.auth_config_path.write_text(json.dumps({'users': [
+            {'id': 'old_id', 'username': 'old', 'api_key': 'sb_oldkey', 'role': 'viewer'}
+        ]}))
+        
+        manager = AuthenticationManager(str(self.auth_config_path))
+        
+        self.assertNotIn('sb_oldkey', self.auth_config_path.read_text())
+        self.assertEqual(manager.authenticate('sb_oldkey').id, 'old_id')
+    
+    def test_last_access_flushed_in_batches(self):
+        """Test that last_access updates are written on flush, not per request."""
+        admin_user = list(self.auth_manager.users.values())[0]
+        saved_access = json.loads(self.auth_config_path.read_text())['users'][0]['last_access']
+        
+        time.sleep(0.01)
+        self.auth_manager.authenticate(admin_user.api_key)
+        self.assertEqual(json.loads(self.auth_config_path.read_text())['users'][0]['last_access'], saved_access)
+        
+        self.assertTrue(self.auth_manager.flush_last_access())
+        self.assertEqual(json.loads(self.auth_config_path.read_text())['users'][0]['last_access'],
+                         admin_user.last_access)
 
 
 class TestAuthorization(unittest.TestCase):
@@ -379,6 +485,30 @@ class TestAuthorization(unittest.TestCase):
         self.assertFalse(
             self.authz_manager.authorize(self.admin_user, 'get_sandbox_status')
         )
+    
+    def test_cached_decision_invalidated_on_permission_change(self):
+        """Test that cached decisions follow permission and role changes."""
+        context = {'workspace_id': 'ws1', 'plan_id': None}
+        
+        self.assertTrue(self.authz_manager.authorize(self.developer_user, 'create_task_plan', context))
+        self.assertTrue(self.authz_manager.authorize(self.developer_user, 'create_task_plan', context))
+        self.assertEqual(self.authz_manager.cache_stats['hits'], 1)
+        
+        self.developer_user.permissions = {Permission.VIEW_STATUS}
+        self.assertFalse(self.authz_manager.authorize(self.developer_user, 'create_task_plan', context))
+        
+        self.developer_user.role = Role.ADMIN
+        self.developer_user.permissions = set(Permission)
+        self.assertTrue(self.authz_manager.authorize(self.developer_user, 'manage_users', context))
+    
+    def test_decision_cache_bounded(self):
+        """Test that the decision cache evicts least recently used entries."""
+        authz_manager = AuthorizationManager(cache_size=2)
+        
+        for workspace_id in ('ws1', 'ws2', 'ws3'):
+            authz_manager.authorize(self.viewer_user, 'get_sandbox_status', {'workspace_id': workspace_id})
+        
+        self.assertEqual(len(authz_manager._decisions), 2)
 
 
 class TestMCPAuthenticationMiddleware(unittest.TestCase):
@@ -45,7 +45,7 @@ class IntelligentSandboxMCPServer:
         self.lifecycle_manager = WorkspaceLifecycleManager()
         self.codebase_analyzer = CodebaseAnalyzer()
         self.task_planner = TaskPlanner()
-        self.execution_engine = ExecutionEngine()
+        self.execution_engine = ExecutionEngine(disk_quota=self.lifecycle_manager.disk_quota)
         self.action_logger = ActionLogger()
         self.cache_manager = CacheManager()
         
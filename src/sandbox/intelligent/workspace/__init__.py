@@ -7,6 +7,7 @@ Handles workspace cloning, isolation, and lifecycle management.
 from .cloner import WorkspaceCloner
 from .models import SandboxWorkspace, IsolationConfig
 from .interfaces import WorkspaceClonerInterface
+from .env_cache import EnvironmentCache
 from ..types import WorkspaceStatus
 
 __all__ = [
@@ -14,5 +15,6 @@ __all__ = [
     'WorkspaceClonerInterface',
     'SandboxWorkspace', 
     'IsolationConfig',
+    'EnvironmentCache',
     'WorkspaceStatus'
 ]
\ No newline at end of file
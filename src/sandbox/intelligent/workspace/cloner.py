@@ -12,7 +12,7 @@ from pathlib import Path
 from typing import Optional, List, Dict, Any
 from .interfaces import WorkspaceClonerInterface
 from .models import SandboxWorkspace, IsolationConfig
-from .security import SandboxSecurityManager, SecurityPolicy
+from .security import DiskQuotaManager, SandboxSecurityManager, SecurityPolicy
 from ..types import WorkspaceStatus
 
 logger = logging.getLogger(__name__)
@@ -35,6 +35,11 @@ class WorkspaceCloner(WorkspaceClonerInterface):
         self._temp_directories: List[str] = []  # Track temp dirs for cleanup
         self._security_manager = SandboxSecurityManager(security_policy)
     
+    @property
+    def disk_quota(self) -> DiskQuotaManager:
+        """Disk quota accounting for the workspaces this cloner creates."""
+        return self._security_manager.resource_manager.disk_quota
+    
     def clone_workspace(self, source_path: str, sandbox_id: str = None,
                        isolation_config: Optional[IsolationConfig] = None) -> SandboxWorkspace:
         """Create an isolated copy of the host workspace."""
@@ -307,6 +312,8 @@ class WorkspaceCloner(WorkspaceClonerInterface):
                 else:
                     success = False
             
+            self._security_manager.resource_manager.release_resource_limits(workspace)
+            
             # Remove the sandbox directory
             if os.path.exists(workspace.sandbox_path):
                 shutil.rmtree(workspace.sandbox_path, ignore_errors=True)
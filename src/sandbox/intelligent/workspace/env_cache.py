@@ -0,0 +1,377 @@
+"""
+Host-level dependency caches shared by all sandbox workspaces.
+
+This module provides:
+- Shared download/wheel caches for pip, npm, yarn and Go modules, passed to installs
+  through environment variables
+- Virtualenv templates keyed by a hash of the interpreter and requirements,
+  built once per host and cloned into workspaces with reflinks (or copies)
+  instead of creating a venv and running pip install each time
+
+Templates are built on the host, outside any sandbox, so only trusted
+requirements go into them: plain name/version pins of allow-listed packages,
+installed from wheels only. Anything else a workspace asks for is installed
+inside the sandbox.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# ioctl request for cloning a file's extents (Linux FICLONE)
+_FICLONE = 0x40049409
+
+# Marker written into a template once it is fully built
+_TEMPLATE_MARKER = ".sandbox-template"
+
+# A bare "name[extras] <specifiers>" requirement: no options, URLs, paths or markers
+_VERSION_CLAUSE = r"(?:===|==|!=|~=|<=|>=|<|>)\s*[A-Za-z0-9.*+!_-]+"
+_PLAIN_REQUIREMENT = re.compile(
+    r"^(?P<name>[A-Za-z0-9](?:[A-Za-z0-9._-]*[A-Za-z0-9])?)\s*"
+    r"(?:\[\s*[A-Za-z0-9._-]+(?:\s*,\s*[A-Za-z0-9._-]+)*\s*\])?\s*"
+    rf"(?:{_VERSION_CLAUSE}(?:\s*,\s*{_VERSION_CLAUSE})*)?$"
+)
+
+
+class EnvironmentCache:
+    """Shared package caches and cloneable virtualenv templates."""
+
+    def __init__(self, cache_dir: Optional[str] = None, link_mode: str = "reflink",
+                 max_templates: int = 16, install_timeout: int = 900,
+                 allowed_packages: Optional[Iterable[str]] = None):
+        """
+        Initialize the environment cache.
+
+        Args:
+            cache_dir: Cache root (default: $SANDBOX_ENV_CACHE or ~/.swiss_sandbox/env_cache)
+            link_mode: How template files are cloned: "reflink" (copy where the
+                filesystem cannot reflink), "copy", or "hardlink". Hard-linked
+                clones share inodes with the template, so an in-place write in
+                one workspace changes every other clone.
+            max_templates: Least recently used templates beyond this count are removed
+            install_timeout: Seconds allowed for building a template
+            allowed_packages: Packages that may be installed into templates on the host
+                (default: comma-separated $SANDBOX_ENV_CACHE_ALLOWED_PACKAGES, else none)
+        """
+        if link_mode not in ("hardlink", "reflink", "copy"):
+            raise ValueError(f"Unknown link mode: {link_mode}")
+
+        if cache_dir is None:
+            cache_dir = os.environ.get("SANDBOX_ENV_CACHE") or \
+                str(Path.home() / ".swiss_sandbox" / "env_cache")
+        self.cache_dir = Path(cache_dir)
+        self.templates_dir = self.cache_dir / "venvs"
+        self.templates_dir.mkdir(parents=True, exist_ok=True)
+
+        if allowed_packages is None:
+            allowed_packages = os.environ.get("SANDBOX_ENV_CACHE_ALLOWED_PACKAGES", "").split(",")
+        self.allowed_packages = {self._normalize_name(name) for name in allowed_packages if name.strip()}
+
+        self.link_mode = link_mode
+        self.max_templates = max_templates
+        self.install_timeout = install_timeout
+        self._lock = threading.Lock()
+        self.stats = {"template_hits": 0, "template_builds": 0, "clones": 0, "build_failures": 0}
+
+    def package_manager_env(self) -> Dict[str, str]:
+        """Environment variables pointing package managers at the shared caches."""
+        return {
+            "PIP_CACHE_DIR": str(self.cache_dir / "pip"),
+            "npm_config_cache": str(self.cache_dir / "npm"),
+            "YARN_CACHE_FOLDER": str(self.cache_dir / "yarn"),
+            "GOMODCACHE": os.environ.get("GOMODCACHE", str(self.cache_dir / "gomod"))
+        }
+
+    @staticmethod
+    def read_requirements(path: Union[str, Path]) -> List[str]:
+        """Read requirement lines from a requirements file, if it exists."""
+        try:
+            lines = Path(path).read_text(encoding="utf-8").splitlines()
+        except OSError:
+            return []
+        return [line.strip() for line in lines if line.strip() and not line.strip().startswith("#")]
+
+    def is_trusted_requirement(self, requirement: str) -> bool:
+        """Whether a requirement line may be installed into a template on the host."""
+        match = _PLAIN_REQUIREMENT.match(requirement.strip())
+        return bool(match) and self._normalize_name(match.group("name")) in self.allowed_packages
+
+    def split_requirements(self, requirements: Iterable[str]) -> Tuple[List[str], List[str]]:
+        """Split requirement lines into (trusted for templates, to install in the sandbox)."""
+        trusted, untrusted = [], []
+        for requirement in requirements:
+            (trusted if self.is_trusted_requirement(requirement) else untrusted).append(requirement)
+        return trusted, untrusted
+
+    def template_key(self, requirements: Iterable[str], python: Optional[str] = None) -> str:
+        """Hash identifying the template for an interpreter and requirement set."""
+        interpreter = os.path.realpath(python or sys.executable)
+        info = os.stat(interpreter)
+        digest = hashlib.sha256()
+        # An upgraded interpreter at the same path gets a new template
+        digest.update(f"{interpreter}\0{info.st_size}\0{info.st_mtime_ns}".encode())
+        for requirement in sorted({r.strip() for r in requirements if r.strip()}):
+            digest.update(b"\0" + requirement.encode())
+        return digest.hexdigest()[:32]
+
+    def get_template(self, requirements: Iterable[str], python: Optional[str] = None) -> Optional[Path]:
+        """
+        Return the template venv for a requirement set, building it if needed.
+
+        Builds are serialized per key across processes with a file lock, so
+        concurrent sandboxes wait for one build instead of racing.
+
+        Returns:
+            Template path, or None if it could not be built
+
+        Raises:
+            ValueError: If a requirement is not trusted (see split_requirements)
+        """
+        requirements = list(requirements)
+        _, untrusted = self.split_requirements(requirements)
+        if untrusted:
+            raise ValueError(f"Requirements not allowed in host-built templates: {', '.join(untrusted)}")
+        python = python or sys.executable
+        key = self.template_key(requirements, python)
+        template = self.templates_dir / key
+
+        if (template / _TEMPLATE_MARKER).exists():
+            self._touch(template)
+            self.stats["template_hits"] += 1
+            return template
+
+        with self._lock, self._file_lock(key):
+            if (template / _TEMPLATE_MARKER).exists():
+                self.stats["template_hits"] += 1
+                return template
+
+            if not self._build_template(template, requirements, python):
+                self.stats["build_failures"] += 1
+                return None
+            self.stats["template_builds"] += 1
+
+        self.prune_templates()
+        return template
+
+    def clone_venv(self, destination: Union[str, Path], requirements: Iterable[str] = (),
+                   python: Optional[str] = None) -> bool:
+        """
+        Create a venv at destination by cloning the matching template.
+
+        Files are cloned from the template according to link_mode; only the
+        scripts and config files that embed the venv's own path are copied
+        and rewritten for the new location.
+
+        Returns:
+            True if the venv was created
+        """
+        template = self.get_template(requirements, python)
+        if template is None:
+            return False
+
+        destination = Path(destination)
+        if destination.exists():
+            raise FileExistsError(f"Destination already exists: {destination}")
+
+        staging = destination.with_name(f".{destination.name}.clone-{os.getpid()}")
+        try:
+            self._clone_tree(template, staging, str(template).encode(), str(destination).encode())
+            (staging / _TEMPLATE_MARKER).unlink()
+            os.replace(staging, destination)
+        except OSError as e:
+            logger.error(f"Failed to clone venv template {template.name}: {e}")
+            shutil.rmtree(staging, ignore_errors=True)
+            return False
+
+        self._touch(template)
+        self.stats["clones"] += 1
+        return True
+
+    def prune_templates(self) -> int:
+        """Remove least recently used templates beyond max_templates."""
+        templates = sorted(
+            (p for p in self.templates_dir.iterdir() if (p / _TEMPLATE_MARKER).exists()),
+            key=lambda p: (p / _TEMPLATE_MARKER).stat().st_mtime,
+            reverse=True
+        )
+        removed = 0
+        for template in templates[self.max_templates:]:
+            with self._file_lock(template.name):
+                shutil.rmtree(template, ignore_errors=True)
+            removed += 1
+        return removed
+
+    def get_stats(self) -> Dict[str, object]:
+        """Template and clone counters."""
+        templates = [p.name for p in self.templates_dir.iterdir() if (p / _TEMPLATE_MARKER).exists()]
+        return {**self.stats, "templates": len(templates), "cache_dir": str(self.cache_dir)}
+
+    def _build_template(self, template: Path, requirements: List[str], python: str) -> bool:
+        """Create a venv, install the requirements into it and publish it atomically."""
+        staging = Path(tempfile.mkdtemp(prefix=f".{template.name}.", dir=self.templates_dir))
+        try:
+            shutil.rmtree(staging)
+            env = {**os.environ, **self.package_manager_env()}
+
+            result = subprocess.run([python, "-m", "venv", str(staging)],
+                                    capture_output=True, text=True, timeout=self.install_timeout)
+            if result.returncode != 0:
+                logger.error(f"Failed to create template venv: {result.stderr}")
+                return False
+
+            if requirements:
+                requirements_file = staging / "requirements.txt"
+                requirements_file.write_text("\n".join(requirements) + "\n")
+                # Wheels only: building an sdist would run its code on the host
+                result = subprocess.run(
+                    [str(self._venv_python(staging)), "-m", "pip", "install", "--only-binary=:all:",
+                     "-r", str(requirements_file)],
+                    capture_output=True, text=True, env=env, timeout=self.install_timeout
+                )
+                requirements_file.unlink()
+                if result.returncode != 0:
+                    logger.error(f"Failed to install template requirements: {result.stderr}")
+                    return False
+
+            # Scripts refer to the staging path; rewrite them for the final one
+            self._rewrite_paths(staging, str(staging).encode(), str(template).encode())
+            (staging / _TEMPLATE_MARKER).write_text("\n".join(requirements))
+            os.replace(staging, template)
+            logger.info(f"Built venv template {template.name} with {len(requirements)} requirements")
+            return True
+
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.error(f"Error building venv template: {e}")
+            return False
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def _clone_tree(self, source: Path, destination: Path, old_prefix: bytes, new_prefix: bytes) -> None:
+        """Clone a template directory, rewriting files that embed its path."""
+        for dirpath, dirnames, filenames in os.walk(source):
+            rel_dir = os.path.relpath(dirpath, source)
+            target_dir = destination / rel_dir if rel_dir != "." else destination
+            target_dir.mkdir(parents=True, exist_ok=True)
+
+            for name in dirnames + filenames:
+                src = os.path.join(dirpath, name)
+                dst = target_dir / name
+                if os.path.islink(src):
+                    os.symlink(os.readlink(src), dst)
+                    if name in dirnames:
+                        dirnames.remove(name)
+                elif name in filenames:
+                    if self._embeds_prefix(src, rel_dir, name, old_prefix):
+                        self._copy_rewritten(src, dst, old_prefix, new_prefix)
+                    else:
+                        self._clone_file(src, dst)
+
+    @staticmethod
+    def _embeds_prefix(path: str, rel_dir: str, name: str, prefix: bytes) -> bool:
+        """Whether a template file hard-codes the template's own path."""
+        top = rel_dir.split(os.sep)[0]
+        if not (top in ("bin", "Scripts") or name == "pyvenv.cfg" or name.endswith(".pth")):
+            return False
+        try:
+            if os.path.getsize(path) > 1024 * 1024:
+                return False
+            with open(path, "rb") as f:
+                return prefix in f.read()
+        except OSError:
+            return False
+
+    @staticmethod
+    def _copy_rewritten(src: str, dst: Path, old_prefix: bytes, new_prefix: bytes) -> None:
+        with open(src, "rb") as f:
+            content = f.read()
+        with open(dst, "wb") as f:
+            f.write(content.replace(old_prefix, new_prefix))
+        shutil.copymode(src, dst)
+
+    def _clone_file(self, src: str, dst: Path) -> None:
+        """Hard-link, reflink or copy a file according to link_mode."""
+        if self.link_mode == "hardlink":
+            try:
+                os.link(src, dst)
+                return
+            except OSError:
+                pass
+        elif self.link_mode == "reflink" and fcntl is not None:
+            try:
+                with open(src, "rb") as s, open(dst, "wb") as d:
+                    fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+                shutil.copystat(src, dst)
+                return
+            except OSError:
+                pass
+        shutil.copy2(src, dst)
+
+    def _rewrite_paths(self, root: Path, old_prefix: bytes, new_prefix: bytes) -> None:
+        """Rewrite, in place, the files of a venv that embed its path."""
+        for dirpath, _, filenames in os.walk(root):
+            rel_dir = os.path.relpath(dirpath, root)
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                if not os.path.islink(path) and self._embeds_prefix(path, rel_dir, name, old_prefix):
+                    with open(path, "rb") as f:
+                        content = f.read()
+                    with open(path, "wb") as f:
+                        f.write(content.replace(old_prefix, new_prefix))
+
+    @staticmethod
+    def _normalize_name(name: str) -> str:
+        """PEP 503 normalized project name."""
+        return re.sub(r"[-_.]+", "-", name.strip()).lower()
+
+    @staticmethod
+    def _venv_python(venv: Path) -> Path:
+        if os.name == "nt":
+            return venv / "Scripts" / "python.exe"
+        return venv / "bin" / "python"
+
+    @staticmethod
+    def _touch(template: Path) -> None:
+        """Mark a template as recently used."""
+        try:
+            os.utime(template / _TEMPLATE_MARKER)
+        except OSError:
+            pass
+
+    def _file_lock(self, key: str):
+        """Cross-process lock for one template key."""
+        return _FileLock(self.templates_dir / f"{key}.lock")
+
+
+class _FileLock:
+    """Exclusive flock on a lock file; a no-op where fcntl is unavailable."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._fd = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            self._fd = os.open(self.path, os.O_CREAT | os.O_RDWR, 0o644)
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
@@ -10,8 +10,10 @@ This module provides:
 
 import os
 import time
+import heapq
 import threading
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Callable, Any
 from dataclasses import dataclass, field
@@ -19,7 +21,7 @@ from enum import Enum
 
 from .models import SandboxWorkspace, IsolationConfig
 from .cloner import WorkspaceCloner
-from .security import SecurityPolicy
+from .security import DiskQuotaManager, SecurityPolicy
 from ..types import WorkspaceStatus
 
 logger = logging.getLogger(__name__)
@@ -63,6 +65,10 @@ class WorkspaceSession:
         """Update the last accessed time and increment access count."""
         self.last_accessed = datetime.now()
         self.access_count += 1
+    
+    def expires_at(self, timeout_seconds: float) -> float:
+        """Return the epoch time at which this session becomes idle-expired."""
+        return self.last_accessed.timestamp() + timeout_seconds
 
 
 class WorkspaceLifecycleManager:
@@ -75,11 +81,19 @@ class WorkspaceLifecycleManager:
     - Status tracking and monitoring
     - Cleanup and resource management
     - Event handling and notifications
+    
+    Idle expiry is event driven: every session has one entry in a heap of
+    expiry deadlines and the monitoring thread sleeps until the earliest one
+    is due. Accessing a session only ever moves its deadline later, so heap
+    entries are revalidated lazily when they surface instead of being
+    rewritten on every access. Teardown of expired sessions runs on a worker
+    pool outside the manager lock.
     """
     
     def __init__(self, security_policy: Optional[SecurityPolicy] = None,
                  max_concurrent_workspaces: int = 10,
-                 workspace_timeout_minutes: int = 60):
+                 workspace_timeout_minutes: int = 60,
+                 cleanup_workers: int = 4):
         """
         Initialize the lifecycle manager.
         
@@ -87,6 +101,7 @@ class WorkspaceLifecycleManager:
             security_policy: Security policy for workspaces
             max_concurrent_workspaces: Maximum number of concurrent workspaces
             workspace_timeout_minutes: Timeout for inactive workspaces
+            cleanup_workers: Number of threads used to tear down expired workspaces
         """
         self._cloner = WorkspaceCloner(security_policy)
         self._sessions: Dict[str, WorkspaceSession] = {}
@@ -97,9 +112,23 @@ class WorkspaceLifecycleManager:
         self._shutdown_event = threading.Event()
         self._lock = threading.RLock()
         
+        # Expiry deadlines as (deadline_epoch, sequence, session_id)
+        self._expiry_heap: List[tuple] = []
+        self._expiry_seq = 0
+        self._wakeup_event = threading.Event()
+        self._cleanup_executor = ThreadPoolExecutor(
+            max_workers=max(1, cleanup_workers),
+            thread_name_prefix="WorkspaceCleanup"
+        )
+        
         # Start monitoring thread
         self._start_monitoring()
     
+    @property
+    def disk_quota(self) -> DiskQuotaManager:
+        """Disk quota accounting for the managed workspaces."""
+        return self._cloner.disk_quota
+    
     def add_event_handler(self, handler: Callable[[LifecycleEventData], None]):
         """
         Add an event handler for lifecycle events.
@@ -200,6 +229,7 @@ class WorkspaceLifecycleManager:
                 )
                 
                 self._sessions[session_id] = session
+                self._schedule_expiry(session)
                 
                 self._emit_event(LifecycleEvent.WORKSPACE_CREATED, session_id, {
                     "workspace_path": workspace.sandbox_path,
@@ -370,6 +400,9 @@ class WorkspaceLifecycleManager:
         """
         Destroy a workspace session and clean up resources.
         
+        The session is detached under the manager lock; the (potentially slow)
+        filesystem and container cleanup runs without holding it.
+        
         Args:
             session_id: The session ID to destroy
             
@@ -377,34 +410,57 @@ class WorkspaceLifecycleManager:
             True if destroyed successfully
         """
         with self._lock:
-            session = self._sessions.get(session_id)
-            if not session:
-                logger.warning(f"Session not found for destruction: {session_id}")
-                return False
+            session = self._detach_session(session_id)
+        
+        if not session:
+            logger.warning(f"Session not found for destruction: {session_id}")
+            return False
+        
+        return self._teardown_session(session)
+    
+    def _detach_session(self, session_id: str) -> Optional[WorkspaceSession]:
+        """
+        Remove a session from the active set. Must be called with the lock held.
+        
+        Args:
+            session_id: The session ID to detach
             
-            try:
-                self._emit_event(LifecycleEvent.WORKSPACE_CLEANUP_STARTED, session_id)
-                
-                # Clean up the workspace
-                result = self._cloner.cleanup_workspace(session.workspace)
-                
-                # Remove from sessions
-                del self._sessions[session_id]
-                
-                if result:
-                    self._emit_event(LifecycleEvent.WORKSPACE_DESTROYED, session_id)
-                    self._emit_event(LifecycleEvent.SESSION_ENDED, session_id)
-                    logger.info(f"Destroyed workspace session {session_id}")
-                else:
-                    logger.warning(f"Workspace cleanup had issues for session {session_id}")
-                
-                return result
-                
-            except Exception as e:
-                self._emit_event(LifecycleEvent.ERROR_OCCURRED, session_id, 
-                               {"operation": "destroy_workspace"}, e)
-                logger.error(f"Failed to destroy workspace {session_id}: {e}")
-                return False
+        Returns:
+            The detached session, or None if it was not active
+        """
+        session = self._sessions.pop(session_id, None)
+        if session:
+            self._emit_event(LifecycleEvent.WORKSPACE_CLEANUP_STARTED, session_id)
+        return session
+    
+    def _teardown_session(self, session: WorkspaceSession) -> bool:
+        """
+        Clean up the resources of a detached session.
+        
+        Args:
+            session: Session previously returned by _detach_session
+            
+        Returns:
+            True if the workspace was cleaned up successfully
+        """
+        session_id = session.session_id
+        try:
+            result = self._cloner.cleanup_workspace(session.workspace)
+            
+            if result:
+                self._emit_event(LifecycleEvent.WORKSPACE_DESTROYED, session_id)
+                self._emit_event(LifecycleEvent.SESSION_ENDED, session_id)
+                logger.info(f"Destroyed workspace session {session_id}")
+            else:
+                logger.warning(f"Workspace cleanup had issues for session {session_id}")
+            
+            return result
+            
+        except Exception as e:
+            self._emit_event(LifecycleEvent.ERROR_OCCURRED, session_id, 
+                           {"operation": "destroy_workspace"}, e)
+            logger.error(f"Failed to destroy workspace {session_id}: {e}")
+            return False
     
     def get_workspace_status(self, session_id: str) -> Dict[str, Any]:
         """
@@ -443,19 +499,72 @@ class WorkspaceLifecycleManager:
                 "metadata": session.metadata
             }
     
-    def _cleanup_expired_sessions(self):
-        """Clean up expired sessions based on timeout."""
-        current_time = datetime.now()
-        timeout_delta = timedelta(minutes=self._timeout_minutes)
+    def _schedule_expiry(self, session: WorkspaceSession):
+        """
+        Push the expiry deadline of a session onto the heap. Must be called
+        with the lock held.
+        
+        Args:
+            session: Session to schedule
+        """
+        deadline = session.expires_at(self._timeout_minutes * 60)
+        self._expiry_seq += 1
+        heapq.heappush(self._expiry_heap, (deadline, self._expiry_seq, session.session_id))
+        
+        # Wake the monitor if this is now the earliest deadline
+        if self._expiry_heap[0][2] == session.session_id:
+            self._wakeup_event.set()
+    
+    def _pop_due_sessions(self, now: float) -> List[WorkspaceSession]:
+        """
+        Detach all sessions whose deadline has passed. Must be called with the
+        lock held.
+        
+        Only heap entries with a deadline <= now are inspected. Entries for
+        sessions that were accessed since they were scheduled are pushed back
+        with their current deadline; entries for sessions that no longer exist
+        are dropped.
         
-        expired_sessions = []
-        for session_id, session in self._sessions.items():
-            if current_time - session.last_accessed > timeout_delta:
-                expired_sessions.append(session_id)
+        Args:
+            now: Current epoch time
+            
+        Returns:
+            List of detached sessions awaiting teardown
+        """
+        timeout_seconds = self._timeout_minutes * 60
+        due_sessions = []
         
-        for session_id in expired_sessions:
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            _, _, session_id = heapq.heappop(self._expiry_heap)
+            session = self._sessions.get(session_id)
+            if session is None:
+                continue
+            
+            if session.expires_at(timeout_seconds) > now:
+                self._schedule_expiry(session)
+                continue
+            
             logger.info(f"Cleaning up expired session: {session_id}")
-            self.destroy_workspace(session_id)
+            due_sessions.append(self._detach_session(session_id))
+        
+        return due_sessions
+    
+    def _next_deadline(self) -> Optional[float]:
+        """Return the earliest scheduled expiry deadline, if any."""
+        with self._lock:
+            return self._expiry_heap[0][0] if self._expiry_heap else None
+    
+    def _cleanup_expired_sessions(self):
+        """Clean up expired sessions based on timeout."""
+        with self._lock:
+            due_sessions = self._pop_due_sessions(time.time())
+        
+        for session in due_sessions:
+            try:
+                self._cleanup_executor.submit(self._teardown_session, session)
+            except RuntimeError:
+                # Executor already shut down; clean up inline
+                self._teardown_session(session)
     
     def _start_monitoring(self):
         """Start the monitoring thread for workspace lifecycle management."""
@@ -472,11 +581,16 @@ class WorkspaceLifecycleManager:
         """Main monitoring loop that runs in a separate thread."""
         while not self._shutdown_event.is_set():
             try:
-                # Clean up expired sessions every 5 minutes
                 self._cleanup_expired_sessions()
                 
-                # Wait for 5 minutes or until shutdown
-                self._shutdown_event.wait(300)  # 5 minutes
+                # Sleep until the next deadline, a new earlier deadline or shutdown
+                next_deadline = self._next_deadline()
+                wait_seconds = None
+                if next_deadline is not None:
+                    wait_seconds = max(0.0, next_deadline - time.time())
+                
+                self._wakeup_event.wait(wait_seconds)
+                self._wakeup_event.clear()
                 
             except Exception as e:
                 logger.error(f"Error in monitoring loop: {e}")
@@ -491,6 +605,7 @@ class WorkspaceLifecycleManager:
         
         # Signal shutdown
         self._shutdown_event.set()
+        self._wakeup_event.set()
         
         # Wait for monitoring thread to finish
         if self._monitoring_thread and self._monitoring_thread.is_alive():
@@ -499,11 +614,16 @@ class WorkspaceLifecycleManager:
         # Clean up all active sessions
         with self._lock:
             session_ids = list(self._sessions.keys())
-            for session_id in session_ids:
-                try:
-                    self.destroy_workspace(session_id)
-                except Exception as e:
-                    logger.error(f"Error cleaning up session {session_id}: {e}")
+        for session_id in session_ids:
+            try:
+                self.destroy_workspace(session_id)
+            except Exception as e:
+                logger.error(f"Error cleaning up session {session_id}: {e}")
+        
+        # Let in-flight expiry teardowns finish
+        self._cleanup_executor.shutdown(wait=True)
+        with self._lock:
+            self._expiry_heap.clear()
         
         # Clean up cloner resources
         self._cloner.cleanup_all()
@@ -534,5 +654,6 @@ class WorkspaceLifecycleManager:
                 "max_concurrent": self._max_concurrent,
                 "timeout_minutes": self._timeout_minutes,
                 "average_session_age_seconds": avg_age_seconds,
+                "scheduled_expiries": len(self._expiry_heap),
                 "monitoring_active": self._monitoring_thread.is_alive() if self._monitoring_thread else False
             }
\ No newline at end of file
@@ -4,12 +4,16 @@ Security and isolation controls for sandbox workspaces.
 This module provides:
 - Filesystem access controls and path validation
 - Resource limit enforcement
+- Incremental per-workspace disk quota accounting
 - Network isolation controls
 - Security policy validation
 """
 
 import os
 import re
+import errno
+import time
+import threading
 import subprocess
 import logging
 from pathlib import Path
@@ -94,6 +98,8 @@ class SecurityPolicy:
     max_cpu_percent: float = 50.0
     max_memory_mb: int = 2048
     max_disk_mb: int = 5120
+    disk_soft_limit_percent: float = 80.0  # Warn when usage crosses this share of max_disk_mb
+    disk_reconcile_interval: int = 300  # Seconds between disk usage reconciliations
     max_processes: int = 100
     max_execution_time: int = 300  # 5 minutes
 
@@ -393,11 +399,357 @@ class CommandSecurityManager:
         return True
 
 
+class DiskQuotaExceededError(PermissionError):
+    """Raised when a write would push a workspace over its hard disk quota."""
+    
+    def __init__(self, workspace_id: str, used_bytes: int, requested_bytes: int,
+                 limit_bytes: int):
+        self.workspace_id = workspace_id
+        self.used_bytes = used_bytes
+        self.requested_bytes = requested_bytes
+        self.limit_bytes = limit_bytes
+        super().__init__(
+            errno.EDQUOT,
+            f"Disk quota exceeded for workspace {workspace_id}: "
+            f"{used_bytes} bytes used + {requested_bytes} requested > {limit_bytes} limit"
+        )
+
+
+@dataclass
+class WorkspaceDiskUsage:
+    """Disk accounting state for a single workspace."""
+    workspace_id: str
+    root_path: str
+    hard_limit_bytes: int
+    soft_limit_bytes: int
+    used_bytes: int = 0
+    file_count: int = 0
+    last_reconciled: float = 0.0
+    dirty: bool = False
+    soft_limit_exceeded: bool = False
+
+
+class DiskQuotaManager:
+    """
+    Tracks per-workspace disk usage incrementally and enforces quotas.
+    
+    Writes made through the executor APIs are charged against the workspace
+    before they hit the disk, so usage queries are O(1) and a write that
+    would exceed the hard quota is rejected up front. Commands run through
+    a shell can write anywhere in the workspace; those workspaces are marked
+    dirty and corrected by a periodic reconciliation walk, while the
+    remaining quota is passed to the child as RLIMIT_FSIZE so a single
+    runaway file cannot outgrow it in between.
+    """
+    
+    def __init__(self, policy: SecurityPolicy):
+        self.policy = policy
+        self._usage: Dict[str, WorkspaceDiskUsage] = {}
+        self._lock = threading.Lock()
+        self._reconcile_thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+    
+    def register_workspace(self, workspace_id: str, root_path: str,
+                           hard_limit_bytes: Optional[int] = None,
+                           soft_limit_bytes: Optional[int] = None) -> WorkspaceDiskUsage:
+        """
+        Start tracking a workspace and take an initial usage measurement.
+        
+        Args:
+            workspace_id: Workspace identifier used as the accounting key
+            root_path: Root directory of the workspace
+            hard_limit_bytes: Hard quota (default: policy.max_disk_mb)
+            soft_limit_bytes: Soft quota (default: policy.disk_soft_limit_percent of hard)
+            
+        Returns:
+            The accounting record for the workspace
+        """
+        if hard_limit_bytes is None:
+            hard_limit_bytes = self.policy.max_disk_mb * 1024 * 1024
+        if soft_limit_bytes is None:
+            soft_limit_bytes = int(hard_limit_bytes * self.policy.disk_soft_limit_percent / 100.0)
+        
+        usage = WorkspaceDiskUsage(
+            workspace_id=workspace_id,
+            root_path=str(root_path),
+            hard_limit_bytes=hard_limit_bytes,
+            soft_limit_bytes=min(soft_limit_bytes, hard_limit_bytes)
+        )
+        with self._lock:
+            self._usage[workspace_id] = usage
+        
+        self.reconcile(workspace_id)
+        return usage
+    
+    def unregister_workspace(self, workspace_id: str) -> None:
+        """Stop tracking a workspace."""
+        with self._lock:
+            self._usage.pop(workspace_id, None)
+    
+    def is_registered(self, workspace_id: str) -> bool:
+        """Check whether a workspace is being tracked."""
+        return workspace_id in self._usage
+    
+    def workspace_for_path(self, path: str) -> Optional[str]:
+        """
+        Find the tracked workspace whose root contains path.
+        
+        Args:
+            path: A workspace root or any path inside one
+            
+        Returns:
+            The workspace ID with the deepest matching root, or None
+        """
+        target = os.path.realpath(path)
+        best_id, best_len = None, -1
+        with self._lock:
+            for usage in self._usage.values():
+                root = os.path.realpath(usage.root_path)
+                if (target == root or target.startswith(root + os.sep)) and len(root) > best_len:
+                    best_id, best_len = usage.workspace_id, len(root)
+        return best_id
+    
+    def charge_write(self, workspace_id: str, path: str, new_size: int) -> int:
+        """
+        Charge a pending write of new_size bytes to path against the quota.
+        
+        The charge is the size difference to the file currently at path, so
+        overwrites and truncations are accounted correctly.
+        
+        Args:
+            workspace_id: Workspace identifier
+            path: Absolute path of the file about to be written
+            new_size: Size in bytes the file will have after the write
+            
+        Returns:
+            The byte delta that was charged (pass to refund() if the write fails)
+            
+        Raises:
+            DiskQuotaExceededError: If the write would exceed the hard quota
+        """
+        try:
+            st = os.stat(path)
+            old_size, is_new = st.st_size, False
+        except OSError:
+            old_size, is_new = 0, True
+        delta = new_size - old_size
+        
+        with self._lock:
+            usage = self._usage.get(workspace_id)
+            if usage is None:
+                return 0
+            
+            if delta > 0 and usage.used_bytes + delta > usage.hard_limit_bytes:
+                raise DiskQuotaExceededError(
+                    workspace_id, usage.used_bytes, delta, usage.hard_limit_bytes
+                )
+            
+            usage.used_bytes += delta
+            if is_new:
+                usage.file_count += 1
+            self._check_soft_limit(usage)
+        
+        return delta
+    
+    def refund(self, workspace_id: str, delta: int) -> None:
+        """Undo a charge made by charge_write() for a write that did not happen."""
+        with self._lock:
+            usage = self._usage.get(workspace_id)
+            if usage is not None:
+                usage.used_bytes = max(0, usage.used_bytes - delta)
+                usage.dirty = True
+    
+    def record_delete(self, workspace_id: str, size: int) -> None:
+        """Credit the size of a deleted file back to the workspace."""
+        with self._lock:
+            usage = self._usage.get(workspace_id)
+            if usage is not None:
+                usage.used_bytes = max(0, usage.used_bytes - size)
+                usage.file_count = max(0, usage.file_count - 1)
+                self._check_soft_limit(usage)
+    
+    def mark_dirty(self, workspace_id: str) -> None:
+        """Flag a workspace for reconciliation after an untracked write (e.g. a shell command)."""
+        with self._lock:
+            usage = self._usage.get(workspace_id)
+            if usage is not None:
+                usage.dirty = True
+    
+    def remaining_bytes(self, workspace_id: str) -> Optional[int]:
+        """Return the bytes left under the hard quota, or None if untracked."""
+        usage = self._usage.get(workspace_id)
+        if usage is None:
+            return None
+        return max(0, usage.hard_limit_bytes - usage.used_bytes)
+    
+    def fsize_ulimit(self, workspace_id: str, block_size: int = 512,
+                     soft: bool = False) -> Optional[str]:
+        """
+        Build a shell ulimit command capping file size to the remaining quota.
+        
+        The command is meant to prefix what the shell runs, so the cap is set
+        in the shell itself rather than in a preexec_fn, which is unsafe once
+        the caller has other threads running.
+        
+        Args:
+            workspace_id: Workspace identifier
+            block_size: Bytes per ulimit -f unit (512 for POSIX sh, 1024 for bash)
+            soft: Set only the soft limit, which the shell can raise again
+            
+        Returns:
+            The ulimit command, or None if not applicable
+        """
+        remaining = self.remaining_bytes(workspace_id)
+        if remaining is None or os.name != 'posix':
+            return None
+        
+        return f"ulimit {'-S ' if soft else ''}-f {remaining // block_size}"
+    
+    def get_usage(self, workspace_id: str) -> Dict[str, Any]:
+        """
+        Get current disk usage for a workspace without touching the filesystem.
+        
+        Args:
+            workspace_id: Workspace identifier
+            
+        Returns:
+            Dictionary containing usage and quota information
+        """
+        usage = self._usage.get(workspace_id)
+        if usage is None:
+            return {}
+        
+        return {
+            'workspace_id': workspace_id,
+            'used_bytes': usage.used_bytes,
+            'used_mb': usage.used_bytes / (1024 * 1024),
+            'file_count': usage.file_count,
+            'soft_limit_bytes': usage.soft_limit_bytes,
+            'hard_limit_bytes': usage.hard_limit_bytes,
+            'percent_used': (usage.used_bytes / usage.hard_limit_bytes * 100.0
+                             if usage.hard_limit_bytes else 0.0),
+            'soft_limit_exceeded': usage.soft_limit_exceeded,
+            'pending_reconciliation': usage.dirty,
+            'last_reconciled': usage.last_reconciled
+        }
+    
+    def reconcile(self, workspace_id: str) -> Optional[int]:
+        """
+        Re-measure a workspace on disk and correct the tracked usage.
+        
+        Args:
+            workspace_id: Workspace identifier
+            
+        Returns:
+            The measured usage in bytes, or None if the workspace is untracked
+        """
+        usage = self._usage.get(workspace_id)
+        if usage is None:
+            return None
+        
+        total_bytes, file_count = self._measure_directory(usage.root_path)
+        
+        with self._lock:
+            if usage.used_bytes != total_bytes:
+                logger.debug(f"Disk usage drift for workspace {workspace_id}: "
+                             f"tracked {usage.used_bytes}, measured {total_bytes}")
+            usage.used_bytes = total_bytes
+            usage.file_count = file_count
+            usage.last_reconciled = time.time()
+            usage.dirty = False
+            self._check_soft_limit(usage)
+        
+        return total_bytes
+    
+    def reconcile_all(self, force: bool = False) -> int:
+        """
+        Reconcile tracked workspaces that are dirty or due for a periodic check.
+        
+        Args:
+            force: Reconcile every workspace regardless of state
+            
+        Returns:
+            Number of workspaces reconciled
+        """
+        now = time.time()
+        interval = self.policy.disk_reconcile_interval
+        with self._lock:
+            due = [
+                u.workspace_id for u in self._usage.values()
+                if force or u.dirty or now - u.last_reconciled >= interval
+            ]
+        
+        for workspace_id in due:
+            try:
+                self.reconcile(workspace_id)
+            except Exception as e:
+                logger.error(f"Disk usage reconciliation failed for {workspace_id}: {e}")
+        
+        return len(due)
+    
+    def start_reconciliation(self, interval: Optional[float] = None) -> None:
+        """Start the background reconciliation thread."""
+        if self._reconcile_thread and self._reconcile_thread.is_alive():
+            return
+        
+        wait_seconds = interval or max(1.0, self.policy.disk_reconcile_interval / 10.0)
+        self._stop_event.clear()
+        
+        def _loop():
+            while not self._stop_event.wait(wait_seconds):
+                self.reconcile_all()
+        
+        self._reconcile_thread = threading.Thread(
+            target=_loop, daemon=True, name="DiskQuotaReconciler"
+        )
+        self._reconcile_thread.start()
+    
+    def stop_reconciliation(self) -> None:
+        """Stop the background reconciliation thread."""
+        self._stop_event.set()
+        if self._reconcile_thread and self._reconcile_thread.is_alive():
+            self._reconcile_thread.join(timeout=5)
+    
+    def _check_soft_limit(self, usage: WorkspaceDiskUsage) -> None:
+        """Log once when a workspace crosses its soft quota. Called with the lock held."""
+        exceeded = usage.used_bytes > usage.soft_limit_bytes
+        if exceeded and not usage.soft_limit_exceeded:
+            logger.warning(f"Workspace {usage.workspace_id} exceeded soft disk quota: "
+                           f"{usage.used_bytes} > {usage.soft_limit_bytes} bytes")
+        usage.soft_limit_exceeded = exceeded
+    
+    @staticmethod
+    def _measure_directory(root_path: str) -> tuple:
+        """Return (total_bytes, file_count) for regular files under root_path."""
+        total_bytes = 0
+        file_count = 0
+        stack = [root_path]
+        
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                            elif entry.is_file(follow_symlinks=False):
+                                total_bytes += entry.stat(follow_symlinks=False).st_size
+                                file_count += 1
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+        
+        return total_bytes, file_count
+
+
 class ResourceLimitManager:
     """Manages resource limits for sandbox containers."""
     
     def __init__(self, policy: SecurityPolicy):
         self.policy = policy
+        self.disk_quota = DiskQuotaManager(policy)
     
     def apply_resource_limits(self, workspace: SandboxWorkspace) -> bool:
         """
@@ -419,6 +771,15 @@ class ResourceLimitManager:
             logger.error(f"Failed to apply resource limits: {e}")
             return False
     
+    def release_resource_limits(self, workspace: SandboxWorkspace) -> None:
+        """
+        Release resource tracking for a workspace that is being destroyed.
+        
+        Args:
+            workspace: The sandbox workspace being cleaned up
+        """
+        self.disk_quota.unregister_workspace(workspace.id)
+    
     def _apply_docker_limits(self, workspace: SandboxWorkspace) -> bool:
         """Apply resource limits to Docker container."""
         container_id = workspace.metadata.get('container_id')
@@ -450,9 +811,10 @@ class ResourceLimitManager:
     
     def _apply_system_limits(self, workspace: SandboxWorkspace) -> bool:
         """Apply system-level resource limits (for non-Docker environments)."""
-        # This would use ulimit, cgroups, or other system mechanisms
-        # For now, we'll log that system limits would be applied
-        logger.info(f"System resource limits would be applied to workspace {workspace.id}")
+        # Disk usage is accounted incrementally; CPU/memory would use ulimit or cgroups
+        self.disk_quota.register_workspace(workspace.id, workspace.sandbox_path)
+        self.disk_quota.start_reconciliation()
+        logger.info(f"System resource limits applied to workspace {workspace.id}")
         return True
     
     def monitor_resource_usage(self, workspace: SandboxWorkspace) -> Dict[str, Any]:
@@ -515,6 +877,7 @@ class ResourceLimitManager:
             'cpu_percent': '0%',
             'memory_usage': '0MB / 0MB',
             'processes': '0',
+            'disk_usage': self.disk_quota.get_usage(workspace.id),
             'method': 'system'
         }
 
@@ -0,0 +1,121 @@
+"""
+Unit tests for the host-level environment cache.
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from .env_cache import EnvironmentCache
+
+
+class TestEnvironmentCache(unittest.TestCase):
+    """Test cases for venv template reuse, eviction and trust checks."""
+
+    def setUp(self):
+        """Set up a cache whose venv and pip runs are recorded instead of executed."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.commands = []
+        runner = patch("sandbox.intelligent.workspace.env_cache.subprocess.run", side_effect=self._run)
+        runner.start()
+        self.addCleanup(runner.stop)
+
+    def tearDown(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _run(self, command, **kwargs):
+        """Lay out a minimal venv for "-m venv"; accept every pip install."""
+        self.commands.append(command)
+        if command[1:3] == ["-m", "venv"]:
+            venv = Path(command[3])
+            (venv / "bin").mkdir(parents=True)
+            (venv / "bin" / "activate").write_text(f'VIRTUAL_ENV="{venv}"\n')
+            (venv / "pyvenv.cfg").write_text("home = /usr/bin\n")
+            (venv / "lib").mkdir()
+            (venv / "lib" / "module.py").write_text("VALUE = 1\n")
+        return subprocess.CompletedProcess(command, 0, "", "")
+
+    def _cache(self, **kwargs) -> EnvironmentCache:
+        kwargs.setdefault("allowed_packages", ["requests", "typing_extensions"])
+        return EnvironmentCache(cache_dir=self.temp_dir, **kwargs)
+
+    def _pip_installs(self):
+        return [command for command in self.commands if "pip" in command]
+
+    def test_template_reused_across_clones(self):
+        """Test that a requirement set is built once and every clone gets its own paths."""
+        cache = self._cache()
+        first = Path(self.temp_dir) / "one" / ".venv"
+        second = Path(self.temp_dir) / "two" / ".venv"
+        first.parent.mkdir()
+        second.parent.mkdir()
+
+        self.assertTrue(cache.clone_venv(first, ["requests==2.31.0"]))
+        self.assertTrue(cache.clone_venv(second, ["requests==2.31.0"]))
+
+        stats = cache.get_stats()
+        self.assertEqual((stats["template_builds"], stats["template_hits"], stats["clones"]), (1, 1, 2))
+        self.assertEqual(len(self._pip_installs()), 1)
+        self.assertIn("--only-binary=:all:", self._pip_installs()[0])
+        self.assertEqual((second / "bin" / "activate").read_text(), f'VIRTUAL_ENV="{second}"\n')
+        self.assertFalse((second / ".sandbox-template").exists())
+
+    def test_clones_do_not_share_files_by_default(self):
+        """Test that writing a file in one clone leaves the template and other clones alone."""
+        cache = self._cache()
+        self.assertEqual(cache.link_mode, "reflink")
+        clones = [Path(self.temp_dir) / name for name in ("a", "b")]
+        for clone in clones:
+            self.assertTrue(cache.clone_venv(clone))
+
+        with open(clones[0] / "lib" / "module.py", "w") as f:
+            f.write("VALUE = 2\n")
+
+        template = cache.get_template([])
+        self.assertEqual((template / "lib" / "module.py").read_text(), "VALUE = 1\n")
+        self.assertEqual((clones[1] / "lib" / "module.py").read_text(), "VALUE = 1\n")
+
+    def test_least_recently_used_templates_evicted(self):
+        """Test that templates beyond max_templates are removed oldest-use first."""
+        cache = self._cache(max_templates=2)
+        old = cache.get_template(["requests==2.30.0"])
+        used = cache.get_template(["requests==2.31.0"])
+        os.utime(old / ".sandbox-template", (1000, 1000))
+        os.utime(used / ".sandbox-template", (2000, 2000))
+        # A hit marks the template as recently used again
+        self.assertEqual(cache.get_template(["requests==2.31.0"]), used)
+
+        newest = cache.get_template(["typing-extensions>=4"])
+
+        self.assertFalse(old.exists())
+        self.assertTrue(used.exists() and newest.exists())
+        self.assertEqual(cache.get_stats()["templates"], 2)
+
+    def test_untrusted_requirements_never_built_on_host(self):
+        """Test that only plain pins of allowed packages reach a host pip install."""
+        cache = self._cache()
+        requirements = [
+            "requests==2.31.0", "Typing.Extensions>=4,<5", "requests[socks]~=2.31",
+            "evil==1.0", "requests @ https://example.com/requests.whl", "-e .",
+            "--index-url https://example.com/simple", "./local-package",
+            "requests; os_name == 'nt'", "git+https://example.com/requests.git",
+        ]
+
+        trusted, untrusted = cache.split_requirements(requirements)
+
+        self.assertEqual(trusted, requirements[:3])
+        self.assertEqual(untrusted, requirements[3:])
+        with self.assertRaises(ValueError):
+            cache.get_template(["requests==2.31.0", "evil==1.0"])
+        self.assertEqual(self.commands, [])
+        self.assertEqual(self._cache(allowed_packages=[]).split_requirements(["requests"]),
+                         ([], ["requests"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
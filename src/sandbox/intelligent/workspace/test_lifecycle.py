@@ -0,0 +1,100 @@
+"""
+Unit tests for workspace lifecycle expiry.
+"""
+
+import time
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+from ..types import WorkspaceStatus
+from .lifecycle import LifecycleEvent, WorkspaceLifecycleManager, WorkspaceSession
+from .models import IsolationConfig, SandboxWorkspace
+
+
+class TestExpiryHeap(unittest.TestCase):
+    """Test cases for the session expiry deadline heap."""
+
+    def setUp(self):
+        """Set up a manager whose cloner does no filesystem work."""
+        self.manager = WorkspaceLifecycleManager(workspace_timeout_minutes=1)
+        self.manager._cloner = Mock()
+        self.manager._cloner.cleanup_workspace.return_value = True
+        self.events = []
+        self.manager.add_event_handler(self.events.append)
+
+    def tearDown(self):
+        """Clean up test environment."""
+        self.manager.shutdown()
+
+    def _add_session(self, session_id: str, idle_seconds: float) -> WorkspaceSession:
+        last_accessed = datetime.now() - timedelta(seconds=idle_seconds)
+        workspace = SandboxWorkspace(
+            id=session_id,
+            source_path="/tmp/source",
+            sandbox_path=f"/tmp/{session_id}",
+            isolation_config=IsolationConfig(use_docker=False),
+            created_at=last_accessed,
+            status=WorkspaceStatus.ACTIVE
+        )
+        session = WorkspaceSession(session_id, workspace, last_accessed, last_accessed)
+        with self.manager._lock:
+            self.manager._sessions[session_id] = session
+            self.manager._schedule_expiry(session)
+        return session
+
+    def test_pop_due_sessions(self):
+        """Test that only sessions past their deadline are detached."""
+        self._add_session("idle", idle_seconds=120)
+        self._add_session("fresh", idle_seconds=0)
+
+        with self.manager._lock:
+            due = self.manager._pop_due_sessions(time.time())
+
+        self.assertEqual([s.session_id for s in due], ["idle"])
+        self.assertEqual([s.session_id for s in self.manager.list_sessions()], ["fresh"])
+        self.assertEqual(self.manager._next_deadline(),
+                         self.manager._sessions["fresh"].expires_at(60))
+
+    def test_accessed_session_is_rescheduled(self):
+        """Test that a stale heap entry is pushed back instead of expiring the session."""
+        session = self._add_session("busy", idle_seconds=120)
+        session.update_access()
+
+        with self.manager._lock:
+            due = self.manager._pop_due_sessions(time.time())
+
+        self.assertEqual(due, [])
+        self.assertIn("busy", self.manager._sessions)
+        self.assertAlmostEqual(self.manager._next_deadline(), session.expires_at(60), places=3)
+
+    def test_destroyed_session_entry_is_dropped(self):
+        """Test that heap entries of sessions that no longer exist are discarded."""
+        self._add_session("gone", idle_seconds=120)
+        self.assertTrue(self.manager.destroy_workspace("gone"))
+
+        with self.manager._lock:
+            due = self.manager._pop_due_sessions(time.time())
+
+        self.assertEqual(due, [])
+        self.assertIsNone(self.manager._next_deadline())
+
+    def test_monitor_expires_sessions(self):
+        """Test that the monitor thread tears down an expired session and emits its events."""
+        self._add_session("idle", idle_seconds=120)
+        self.manager._wakeup_event.set()
+
+        deadline = time.time() + 5
+        while time.time() < deadline:
+            if any(e.event == LifecycleEvent.SESSION_ENDED for e in self.events):
+                break
+            time.sleep(0.01)
+
+        self.assertNotIn("idle", self.manager._sessions)
+        self.assertTrue(any(e.event == LifecycleEvent.SESSION_ENDED and e.workspace_id == "idle"
+                            for e in self.events))
+        self.manager._cloner.cleanup_workspace.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
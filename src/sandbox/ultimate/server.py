@@ -24,6 +24,7 @@ import threading
 import time
 import socket
 import base64
+import functools
 from pathlib import Path
 from typing import Dict, Any, Optional, List
 from datetime import datetime
@@ -43,6 +44,7 @@ from sandbox.intelligent.analyzer.analyzer import CodebaseAnalyzer
 from sandbox.intelligent.planner.planner import TaskPlanner
 from sandbox.intelligent.executor.engine import ExecutionEngine
 from sandbox.intelligent.logger.logger import ActionLogger
+from sandbox.intelligent.logger.version_store import FileVersionHistory
 from sandbox.intelligent.cache.cache_manager import CacheManager
 from sandbox.intelligent.config import get_config_manager
 
@@ -75,6 +77,7 @@ except ImportError as e:
 from sandbox.core.resource_manager import get_resource_manager
 from sandbox.core.security import get_security_manager, SecurityLevel
 from sandbox.core.connection_manager import get_connection_manager, initialize_connection_manager
+from sandbox.core.metrics_registry import MetricsFileExporter, collect_cache_metrics, get_metrics_registry
 
 # Set up logging to file to avoid MCP protocol interference
 log_file = Path(tempfile.gettempdir()) / "sandbox_mcp_server.log"
@@ -357,13 +360,22 @@ class UltimateSandboxMCPServer:
         self.lifecycle_manager = WorkspaceLifecycleManager()
         self.codebase_analyzer = CodebaseAnalyzer()
         self.task_planner = TaskPlanner()
-        self.execution_engine = ExecutionEngine()
+        self.execution_engine = ExecutionEngine(disk_quota=self.lifecycle_manager.disk_quota)
         self.action_logger = ActionLogger()
         self.cache_manager = CacheManager()
 
         # Initialize connection manager with rate limiting
         self.connection_manager = initialize_connection_manager(self.config_manager.config)
 
+        # Publish cache and connection metrics
+        self.metrics_registry = get_metrics_registry()
+        # Looked up on each scrape: configure_connection_limits replaces the manager
+        self.metrics_registry.register_collector("connections",
+                                                 lambda: self.connection_manager.collect_metrics())
+        self.metrics_registry.register_collector(
+            "cache", functools.partial(collect_cache_metrics, self.cache_manager)
+        )
+
         # Initialize Original Sandbox components if available
         if ORIGINAL_SANDBOX_AVAILABLE:
             self.sandbox_manager = SandboxManager()
@@ -382,7 +394,8 @@ class UltimateSandboxMCPServer:
         # Initialize CodeIndexer-style components
         self.indexed_projects = {}
         self.search_cache = {}
-        self.file_versions = {}
+        # Delta-compressed write_to_file history, capped per path
+        self.file_versions = FileVersionHistory(max_versions=100)
 
         # Track active resources
         self.active_workspaces = {}
@@ -600,16 +613,7 @@ class UltimateSandboxMCPServer:
                 os.makedirs(os.path.dirname(path), exist_ok=True)
 
                 # Store version history
-                if path in self.file_versions:
-                    self.file_versions[path].append({
-                        "timestamp": datetime.now().isoformat(),
-                        "content": content
-                    })
-                else:
-                    self.file_versions[path] = [{
-                        "timestamp": datetime.now().isoformat(),
-                        "content": content
-                    }]
+                self.file_versions.record(path, content)
 
                 with open(path, 'w', encoding='utf-8') as f:
                     f.write(content)
@@ -667,11 +671,12 @@ class UltimateSandboxMCPServer:
         def get_file_history(path: str) -> Dict[str, Any]:
             """Get version history of a file."""
             try:
-                if path in self.file_versions:
+                versions = self.file_versions.count(path)
+                if versions:
                     return {
                         "success": True,
-                        "versions": len(self.file_versions[path]),
-                        "history": self.file_versions[path][-5:]  # Last 5 versions
+                        "versions": versions,
+                        "history": self.file_versions.recent(path, 5)  # Last 5 versions
                     }
                 return {"success": False, "error": "No history for file"}
             except Exception as e:
@@ -912,7 +917,7 @@ class UltimateSandboxMCPServer:
                 # the connection ID would be available in the request context
                 connection_id = "mcp_default"  # Default for MCP stdio connections
 
-                allowed, retry_after = self.connection_manager.check_rate_limit(connection_id)
+                allowed, retry_after = self.connection_manager.check_rate_limit(connection_id, tool="execute")
                 if not allowed:
                     result = {
                         'stdout': '',
@@ -1449,6 +1454,11 @@ def main():
     print("📡 All MCP tools registered and available.")
     print("="*80)
     
+    # Dump metrics for scraping when requested (stdio has no HTTP endpoint)
+    metrics_file = os.environ.get("SANDBOX_METRICS_FILE")
+    if metrics_file:
+        MetricsFileExporter(server.metrics_registry, metrics_file).start()
+
     # Run the MCP server
     server.mcp.run()
 
@@ -8,6 +8,7 @@ functionality with proper error handling, security, and resource management.
 
 import json
 import logging
+import os
 import sys
 import traceback
 import shutil
@@ -31,6 +32,9 @@ from .core.logging_system import (
     ErrorCategory, with_error_handling, with_performance_monitoring
 )
 from .core.health_monitor import HealthMonitor
+from .core.metrics_registry import CONTENT_TYPE, MetricsFileExporter, get_metrics_registry
+from .core.admission_control import AdaptiveLimit, AdmissionController, Priority
+from .core.artifact_transfer import ArtifactTransferService
 
 # Configure basic logging as fallback
 logging.basicConfig(
@@ -39,6 +43,15 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Admission priorities of the execution tools; heavy renders go first under load
+EXECUTION_TOOL_PRIORITIES = {
+    'execute_python': Priority.NORMAL,
+    'execute_shell': Priority.NORMAL,
+    'execute_with_artifacts': Priority.NORMAL,
+    'execute_manim': Priority.LOW,
+    'create_manim_animation': Priority.LOW
+}
+
 
 class UnifiedSandboxServer:
     """
@@ -55,6 +68,7 @@ class UnifiedSandboxServer:
         
         # Initialize logging and error handling system
         log_dir = Path("logs")
+        self.log_dir = log_dir
         self.structured_logger = StructuredLogger("unified_server", log_dir)
         self.error_handler = ErrorHandler(self.structured_logger)
         self.performance_monitor = PerformanceMonitor(self.structured_logger)
@@ -65,14 +79,35 @@ class UnifiedSandboxServer:
         # Import ExecutionEngine here to avoid circular imports
         from .core.execution_engine import ExecutionEngine
         
-        # Core components
-        self.execution_engine = ExecutionEngine()
-        self.security_manager = None  # Will be initialized in task 3
-        
         # Initialize artifact manager (Task 4)
         from .core.artifact_manager import ArtifactManager
         self.artifact_manager = ArtifactManager(config=self.config)
         
+        # Large artifact content is fetched out of band instead of inline in JSON
+        self.artifact_transfer = ArtifactTransferService(
+            host=self.config.artifact_transfer_host,
+            port=self.config.artifact_transfer_port,
+            unix_socket=self.config.artifact_transfer_socket,
+            ttl=self.config.artifact_transfer_ttl,
+            max_ttl=self.config.artifact_transfer_max_ttl
+        )
+        
+        # Core components
+        self.execution_engine = ExecutionEngine(
+            structured_logger=self.structured_logger,
+            error_handler=self.error_handler,
+            performance_monitor=self.performance_monitor,
+            artifact_manager=self.artifact_manager
+        )
+        self.security_manager = None  # Will be initialized in task 3
+        
+        # Bound concurrent executions by server load, not just per-client rates
+        self.admission_controller = AdmissionController(
+            limit=AdaptiveLimit(initial=self.config.max_concurrent_executions,
+                                max_limit=self.config.max_concurrent_executions * 4),
+            tool_priorities=EXECUTION_TOOL_PRIORITIES
+        )
+        
         self.workspace_manager = None  # Will be initialized in task 5
         
         # Initialize migrated functionality (Task 7)
@@ -105,6 +140,11 @@ class UnifiedSandboxServer:
             metadata=self.config.to_dict()
         )
         
+        # Publish component metrics
+        self.metrics_registry = get_metrics_registry()
+        self.metrics_exporter: Optional[MetricsFileExporter] = None
+        self._register_metrics()
+        
         # Register core tools
         self._register_core_tools()
         self._register_execution_tools()
@@ -112,6 +152,21 @@ class UnifiedSandboxServer:
         self._register_migrated_tools()
         self._register_diagnostic_tools()
     
+    def _register_metrics(self):
+        """Register component collectors with the metrics registry and the /metrics route."""
+        self.metrics_registry.register_collector("logging", self.structured_logger.collect_metrics)
+        self.metrics_registry.register_collector("performance", self.performance_monitor.collect_metrics)
+        self.metrics_registry.register_collector("execution_engine", self.execution_engine.collect_metrics)
+        self.metrics_registry.register_collector("health", self.health_monitor.collect_metrics)
+        self.metrics_registry.register_collector("admission", self.admission_controller.collect_metrics)
+        self.metrics_registry.register_collector("artifact_transfer", self.artifact_transfer.collect_metrics)
+        
+        # Served by the HTTP transport; unused over stdio
+        @self.mcp.custom_route("/metrics", methods=["GET"])
+        async def metrics_endpoint(request):
+            from starlette.responses import Response
+            return Response(self.metrics_registry.render(), media_type=CONTENT_TYPE)
+    
     def _register_core_tools(self):
         """Register core MCP tools."""
         
@@ -259,23 +314,51 @@ class UnifiedSandboxServer:
                     'traceback': traceback.format_exc()
                 })
     
+    def _execution_timeout(self, timeout: int) -> int:
+        """Timeout for the current execution, capped if it was admitted under load."""
+        ticket = self.admission_controller.current_ticket()
+        if ticket and ticket.degraded:
+            return min(timeout, self.config.degraded_execution_timeout)
+        return timeout
+    
+    def _record_execution_outcome(self, result: ExecutionResult):
+        """Report timeouts to admission control as an overload signal."""
+        ticket = self.admission_controller.current_ticket()
+        if ticket and result.error_type == "TimeoutError":
+            ticket.timed_out = True
+    
     def _register_execution_tools(self):
         """Register execution-related MCP tools."""
+        admission = self.admission_controller
         
         @self.mcp.tool()
+        @admission.controlled("execute_python")
         def execute_python(
             code: str,
             workspace_id: str = "default",
-            timeout: int = 30
+            timeout: int = 30,
+            profile: Optional[bool] = None
         ) -> str:
-            """Execute Python code in a sandboxed environment."""
+            """
+            Execute Python code in a sandboxed environment.
+            
+            Set profile to sample the execution's stack; the flamegraph
+            (collapsed stacks) is stored as an artifact referenced from
+            metadata.profile. Defaults to the workspace's profiling flag.
+            """
             try:
                 # Get or create execution context
                 context = self.get_or_create_context(workspace_id)
-                context.resource_limits.max_execution_time = timeout
+                context.resource_limits.max_execution_time = self._execution_timeout(timeout)
+                
+                # Profiling is optional work; skip it when admitted under load
+                ticket = admission.current_ticket()
+                if ticket and ticket.degraded:
+                    profile = False
                 
                 # Execute code
-                result = self.execution_engine.execute_python(code, context)
+                result = self.execution_engine.execute_python(code, context, profile=profile)
+                self._record_execution_outcome(result)
                 
                 return json.dumps({
                     'success': result.success,
@@ -297,6 +380,18 @@ class UnifiedSandboxServer:
                 })
         
         @self.mcp.tool()
+        def set_workspace_profiling(workspace_id: str, enabled: bool = True) -> str:
+            """Turn sampling profiling on or off for every Python execution in a workspace."""
+            context = self.get_or_create_context(workspace_id)
+            context.profiling = enabled
+            return json.dumps({
+                'success': True,
+                'workspace_id': workspace_id,
+                'profiling': enabled
+            }, indent=2)
+        
+        @self.mcp.tool()
+        @admission.controlled("execute_shell")
         def execute_shell(
             command: str,
             workspace_id: str = "default",
@@ -306,10 +401,11 @@ class UnifiedSandboxServer:
             try:
                 # Get or create execution context
                 context = self.get_or_create_context(workspace_id)
-                context.resource_limits.max_execution_time = timeout
+                context.resource_limits.max_execution_time = self._execution_timeout(timeout)
                 
                 # Execute command
                 result = self.execution_engine.execute_shell(command, context)
+                self._record_execution_outcome(result)
                 
                 return json.dumps({
                     'success': result.success,
@@ -331,6 +427,7 @@ class UnifiedSandboxServer:
                 })
         
         @self.mcp.tool()
+        @admission.controlled("execute_manim")
         def execute_manim(
             script: str,
             workspace_id: str = "default",
@@ -342,12 +439,18 @@ class UnifiedSandboxServer:
             try:
                 # Get or create execution context
                 context = self.get_or_create_context(workspace_id)
-                context.resource_limits.max_execution_time = timeout
+                context.resource_limits.max_execution_time = self._execution_timeout(timeout)
+                
+                # Render at low quality when admitted under load
+                ticket = admission.current_ticket()
+                if ticket and ticket.degraded:
+                    quality = "low"
                 
                 # Execute Manim script
                 result = self.execution_engine.execute_manim(
                     script, context, quality, scene_name
                 )
+                self._record_execution_outcome(result)
                 
                 return json.dumps({
                     'success': result.success,
@@ -554,8 +657,14 @@ class UnifiedSandboxServer:
                 })
         
         @self.mcp.tool()
-        def get_artifact_content(artifact_id: str, as_text: bool = True) -> str:
-            """Get the content of an artifact."""
+        def get_artifact_content(artifact_id: str, as_text: bool = True,
+                                 use_transfer: Optional[bool] = None) -> str:
+            """
+            Get the content of an artifact.
+            
+            With use_transfer=True, content over the inline limit is returned as a
+            transfer handle instead; its URL is only reachable from the server's host.
+            """
             try:
                 artifact = self.artifact_manager.retrieve_artifact(artifact_id)
                 
@@ -571,6 +680,20 @@ class UnifiedSandboxServer:
                         'error': f'Artifact file does not exist: {artifact_id}'
                     })
                 
+                if use_transfer is None:
+                    use_transfer = self.config.artifact_transfer_by_default
+                if use_transfer and artifact.storage_path.stat().st_size > self.config.artifact_inline_max_bytes:
+                    # Too large to inline; hand out a handle for the raw bytes instead
+                    return json.dumps({
+                        'success': True,
+                        'content': None,
+                        'content_type': 'transfer',
+                        'size': artifact.metadata.size,
+                        'transfer': self._issue_artifact_transfer(artifact).to_dict(),
+                        'metadata': artifact.metadata.to_dict(),
+                        'note': 'Content exceeds the inline limit; fetch it from transfer.url'
+                    }, indent=2)
+                
                 try:
                     if as_text:
                         content = artifact.read_text()
@@ -607,6 +730,42 @@ class UnifiedSandboxServer:
                     'traceback': traceback.format_exc()
                 })
         
+        @self.mcp.tool()
+        def create_artifact_transfer(artifact_id: str, ttl_seconds: Optional[int] = None) -> str:
+            """
+            Get a short-lived URL for downloading an artifact's raw bytes, with HTTP range support.
+            
+            ttl_seconds is capped at the server's artifact_transfer_max_ttl.
+            """
+            try:
+                artifact = self.artifact_manager.retrieve_artifact(artifact_id)
+                
+                if artifact is None:
+                    return json.dumps({
+                        'success': False,
+                        'error': f'Artifact not found: {artifact_id}'
+                    })
+                
+                if not artifact.exists():
+                    return json.dumps({
+                        'success': False,
+                        'error': f'Artifact file does not exist: {artifact_id}'
+                    })
+                
+                return json.dumps({
+                    'success': True,
+                    'artifact_id': artifact_id,
+                    'transfer': self._issue_artifact_transfer(artifact, ttl_seconds).to_dict()
+                }, indent=2)
+                
+            except Exception as e:
+                logger.error(f"Failed to create artifact transfer: {e}")
+                return json.dumps({
+                    'success': False,
+                    'error': str(e),
+                    'traceback': traceback.format_exc()
+                })
+        
         @self.mcp.tool()
         def cleanup_artifacts(
             max_age_days: Optional[int] = None,
@@ -694,6 +853,7 @@ class UnifiedSandboxServer:
         """Register migrated functionality tools."""
         
         @self.mcp.tool()
+        @self.admission_controller.controlled("create_manim_animation")
         def create_manim_animation(
             script: str,
             workspace_id: str = "default",
@@ -809,6 +969,7 @@ class UnifiedSandboxServer:
                 })
         
         @self.mcp.tool()
+        @self.admission_controller.controlled("execute_with_artifacts")
         def execute_with_artifacts(
             code: str,
             workspace_id: str = "default",
@@ -820,7 +981,7 @@ class UnifiedSandboxServer:
             try:
                 # Get or create execution context
                 context = self.get_or_create_context(workspace_id)
-                context.resource_limits.max_execution_time = timeout
+                context.resource_limits.max_execution_time = self._execution_timeout(timeout)
                 
                 # Set up artifact interceptor
                 from .migration import ArtifactInterceptor
@@ -1068,6 +1229,17 @@ class UnifiedSandboxServer:
                     'traceback': traceback.format_exc()
                 })
     
+    def _issue_artifact_transfer(self, artifact, ttl: Optional[float] = None):
+        """Issue a transfer handle for a stored artifact."""
+        metadata = artifact.metadata
+        return self.artifact_transfer.issue(
+            artifact.storage_path,
+            name=metadata.name,
+            mime_type=metadata.mime_type,
+            ttl=ttl,
+            sha256=metadata.hash_sha256 if metadata.hash_sha256 != "unknown" else None
+        )
+    
     def get_or_create_context(self, workspace_id: str) -> ExecutionContext:
         """Get existing context or create a new one."""
         if workspace_id not in self.active_contexts:
@@ -1085,6 +1257,14 @@ class UnifiedSandboxServer:
         
         try:
             if transport == 'stdio':
+                # No HTTP endpoint to scrape, so dump metrics to a file instead
+                metrics_file = self.config.metrics_file or os.environ.get("SANDBOX_METRICS_FILE") \
+                    or str(self.log_dir / "metrics.prom")
+                self.metrics_exporter = MetricsFileExporter(
+                    self.metrics_registry, metrics_file, self.config.metrics_dump_interval
+                )
+                self.metrics_exporter.start()
+                logger.info(f"Writing metrics to {metrics_file}")
                 self.mcp.run()
             elif transport == 'http':
                 self.mcp.run(transport='http', host=host, port=port)
@@ -1121,6 +1301,11 @@ class UnifiedSandboxServer:
                     'traceback': traceback.format_exc()
                 })
         
+        @self.mcp.tool()
+        def get_metrics() -> str:
+            """Get all server metrics in the OpenMetrics text format."""
+            return self.metrics_registry.render()
+        
         @self.mcp.tool()
         def get_error_statistics() -> str:
             """Get error statistics and recovery information."""
@@ -1223,6 +1408,12 @@ class UnifiedSandboxServer:
         self.structured_logger.info("Cleaning up server resources...", component="unified_server")
         
         # Clean up monitoring and logging components
+        if getattr(self, 'metrics_exporter', None):
+            self.metrics_exporter.stop()
+        
+        if hasattr(self, 'artifact_transfer'):
+            self.artifact_transfer.stop()
+        
         if hasattr(self, 'health_monitor'):
             self.health_monitor.cleanup()
         